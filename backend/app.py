@@ -750,4 +750,10 @@ def get_applications():
     return jsonify(applications), 200
 
 if __name__ == '__main__':
+    # Hors gunicorn (python app.py, run.bat): synchroniseur Whoosh dans ce
+    # processus, pas dans celui qui surveille le rechargement (debug)
+    from backend.config.settings import SYNC_ENABLED
+    if SYNC_ENABLED and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from backend.indexation.sync_index import get_synchroniseur_whoosh
+        get_synchroniseur_whoosh().demarrer()
     app.run(debug=True, port=5000)
@@ -19,12 +19,19 @@ CV_FOLDER = DATA_DIR / "cvs"
 JOB_FOLDER = DATA_DIR / "jobs"
 INDEX_DIR = DATA_DIR / "index"
 SKILLS_FILE = DATA_DIR / "skills.json"
+TAXONOMY_FILE = DATA_DIR / "taxonomie.json"
 
 # Dossiers d'index
 CV_INDEX = INDEX_DIR / "cv_index"
 JOB_INDEX = INDEX_DIR / "job_index"
 QUERY_INDEX = INDEX_DIR / "query_index"
 
+# Manifeste des fichiers indexés (réindexation incrémentale), dans chaque
+# dossier d'index. Version à incrémenter quand l'extraction ou le schéma
+# change: tous les fichiers sont alors réindexés
+INDEX_MANIFEST_FILENAME = "manifest.json"
+INDEX_MANIFEST_VERSION = 1
+
 # ========================================================
 # CONFIGURATION NLTK
 # ========================================================
@@ -37,6 +44,100 @@ NLTK_DOWNLOADS = [
     'averaged_perceptron_tagger'
 ]
 
+# Aucune ressource n'est téléchargée au démarrage (voir backend.utils.nltk_resources).
+# Hors ligne: une ressource absente est une erreur immédiate, pas un mode dégradé
+NLTK_OFFLINE = os.getenv("SMARTHIRE_NLTK_OFFLINE", "0") == "1"
+NLTK_AUTO_DOWNLOAD = os.getenv("SMARTHIRE_NLTK_DOWNLOAD", "0") == "1"
+STOPWORDS_CACHE_FILE = INDEX_DIR / "stopwords.json"
+
+# Lemmatisation: cache mémoire borné + table persistée du vocabulaire indexé
+LEMMA_CACHE_SIZE = 50000
+LEMMA_TABLE_FILE = INDEX_DIR / "lemmes.json"
+LEMMA_TABLE_VERSION = 1
+
+# Tokenisation du texte déjà nettoyé: "regex" (un seul split compilé,
+# équivalent token pour token à NLTK sur ce texte) ou "nltk" (Punkt + Treebank)
+TOKENIZER_MODE = os.getenv("SMARTHIRE_TOKENIZER", "regex")
+
+# Prétraitement par lots (pretraiter_textes): 0 = un processus par cœur
+PREPROCESS_WORKERS = int(os.getenv("SMARTHIRE_PREPROCESS_WORKERS", "0"))
+PREPROCESS_CHUNK_SIZE = 16
+
+# Extraction PDF par lots (extraire_pdfs): chaque fichier est lu dans un
+# processus isolé, tué au-delà du délai ou de la mémoire autorisés
+PDF_WORKERS = int(os.getenv("SMARTHIRE_PDF_WORKERS", "0"))  # 0 = un par cœur
+PDF_TIMEOUT_S = float(os.getenv("SMARTHIRE_PDF_TIMEOUT", "30"))
+PDF_MEMORY_LIMIT_MB = int(os.getenv("SMARTHIRE_PDF_MEMORY_MB", "1024"))  # 0 = sans limite
+PDF_RETRIES = 2  # Nouvelles tentatives après un délai dépassé ou un crash
+PDF_RETRY_BACKOFF_S = 0.5  # Attente doublée à chaque tentative
+
+# Écriture des index: à partir de INDEX_BULK_MIN_DOCS documents (reconstruction),
+# writer multiprocessus de Whoosh; en deçà, AsyncWriter dans le processus courant
+INDEX_WRITER_PROCS = int(os.getenv("SMARTHIRE_INDEX_PROCS", "0"))  # 0 = un par cœur
+INDEX_WRITER_LIMITMB = int(os.getenv("SMARTHIRE_INDEX_LIMITMB", "128"))  # Par processus
+INDEX_WRITER_MULTISEGMENT = True
+INDEX_BULK_MIN_DOCS = 500
+
+# Flux d'offres partenaires (JSON Lines, .jsonl ou .jsonl.gz): lus ligne à
+# ligne et indexés par lots commités (mémoire bornée par le lot)
+JOB_STREAM_BATCH_SIZE = 5000  # Offres par commit
+JOB_STREAM_MAX_ERREURS_DETAIL = 20  # Erreurs détaillées conservées dans les statistiques
+
+# Indexation en temps réel (uploads): file en arrière-plan, un seul writer
+# et un seul commit pour toutes les opérations en attente (commit groupé)
+INDEXING_BATCH_SIZE = 64  # Opérations max par commit
+INDEXING_COMMIT_DELAY_S = 0.05  # Attente max d'autres opérations après la première
+INDEXING_LOCK_TIMEOUT_S = 30.0  # Attente du verrou d'écriture (indexation batch en cours)
+INDEXING_WAIT_TIMEOUT_S = 60.0  # Attente max d'un appelant synchrone
+
+# Insertion en masse des données validées (indexation manuelle):
+# execute_values multi-lignes, une seule transaction
+BULK_INSERT_PAGE_SIZE = 1000  # Lignes par INSERT
+
+# Journal des requêtes (query_index): tampon borné vidé par un thread,
+# jamais d'écriture Whoosh pendant la requête de recherche
+QUERY_LOG_BUFFER_SIZE = 10000  # Au-delà, les requêtes journalisées sont rejetées (comptées)
+QUERY_LOG_BATCH_SIZE = 500  # Requêtes max par commit
+QUERY_LOG_FLUSH_INTERVAL_S = 2.0  # Attente max d'autres requêtes après la première
+
+# Synchronisation PostgreSQL → index (backend.indexation.sync_index): les
+# triggers de cvs/offres écrivent dans la table index_outbox, consommée par
+# le synchroniseur Whoosh (processus lancé par gunicorn, ou python app.py) et par le suivi BM25 de chaque
+# processus de recherche
+SYNC_ENABLED = os.getenv("SMARTHIRE_SYNC", "1") == "1"
+SYNC_CHANNEL = "smarthire_outbox"  # Canal LISTEN/NOTIFY (réveil immédiat)
+SYNC_POLL_INTERVAL_S = 2.0  # Relecture de l'outbox sans notification
+SYNC_BATCH_SIZE = 500  # Changements max par cycle
+SYNC_GAP_TIMEOUT_S = 60.0  # Attente max d'un id manquant (transaction non encore commitée)
+SYNC_RETENTION_S = 24 * 3600  # Changements traités conservés (suivis en retard)
+
+# Magasin de documents (backend.indexation.doc_store): les champs volumineux
+# (affichage, texte prétraité) sont indexés par Whoosh mais stockés à part,
+# compressés, dans un fichier en ajout seul rangé avec l'index
+DOCSTORE_FILENAME = "documents.dat"
+DOCSTORE_COMPRESSION = 6  # Niveau zlib
+DOCSTORE_COMPACT_RATIO = 0.5  # Compaction quand cette part du fichier est obsolète
+CV_DOCSTORE_FIELDS = ("description_experience", "projets", "resume_complet", "texte_pretraite")
+JOB_DOCSTORE_FIELDS = ("description", "titre_poste_processed", "description_processed")
+
+# Maintenance des index (backend.indexation.maintenance): fusion des segments
+# par paliers de taille et snapshots par liens physiques
+SEGMENT_MAX_COUNT = 10  # Au-delà, fusion déclenchée
+SEGMENT_MERGE_FACTOR = 4  # Palier = log(nb docs, facteur); fusion quand un palier compte ce nombre de segments
+SEGMENT_DELETED_RATIO = 0.3  # Segment réécrit au-delà de cette part de documents supprimés
+MAINTENANCE_ENABLED = os.getenv("SMARTHIRE_MAINTENANCE", "0") == "1"  # Planificateur périodique (maître gunicorn)
+MAINTENANCE_INTERVAL_S = 300
+SNAPSHOT_DIR = INDEX_DIR / "snapshots"
+SNAPSHOT_INTERVAL_S = 24 * 3600
+SNAPSHOT_KEEP_LAST = 5  # Toujours conservés
+SNAPSHOT_MAX_AGE_DAYS = 14  # Au-delà (et hors des plus récents), supprimés
+
+# Cache persistant des tokens: à incrémenter à chaque changement du pipeline
+# de prétraitement (les entrées d'une autre version ne sont plus lues)
+PREPROCESS_VERSION = 1
+TOKEN_CACHE_ENABLED = os.getenv("SMARTHIRE_TOKEN_CACHE", "1") == "1"
+TOKEN_CACHE_FILE = INDEX_DIR / "tokens.sqlite"
+
 # Stopwords personnalisés
 CUSTOM_STOPWORDS = {
     'cv', 'resume', 'curriculum', 'vitae', 'email', 'phone',
@@ -82,6 +183,25 @@ NIVEAU_MAPPING = {
     "Expert": (11, 20)
 }
 
+# ========================================================
+# RECHERCHE
+# ========================================================
+# Budget temps par défaut d'une recherche avancée (ms, None = illimité)
+SEARCH_DEADLINE_MS = int(os.getenv("SEARCH_DEADLINE_MS", "0")) or None
+
+# Pagination par curseur : classements fusionnés gardés côté serveur, dans un
+# fichier SQLite partagé par les workers (un curseur sert sur n'importe lequel)
+SEARCH_CURSOR_CACHE_FILE = INDEX_DIR / "classements.sqlite"
+SEARCH_CURSOR_CACHE_SIZE = 256      # Nombre max de classements (LRU)
+SEARCH_CURSOR_TTL_SECONDS = 600     # Durée de vie d'un curseur
+SEARCH_CURSOR_MAX_RANKING = 1000    # Longueur max d'un classement conservé
+SEARCH_MAX_PAGE_SIZE = 100          # Taille max d'une page ("limit" de l'API)
+
+# Préchargement (serveur multi-workers) : index construits dans le maître
+# avant fork, figés en buffers plats pour rester partagés (copy-on-write)
+SEARCH_PRELOAD = os.getenv("SEARCH_PRELOAD", "0") == "1"
+SEARCH_FREEZE_INDEXES = os.getenv("SEARCH_FREEZE_INDEXES", "1") == "1"
+
 # ========================================================
 # LOGGING
 # ========================================================
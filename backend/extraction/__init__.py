@@ -9,6 +9,9 @@ from .pdf_reader import (
     lire_pdf,
     lire_pdf_avec_info,
     valider_pdf,
+    extraire_pdfs,
+    extraire_batch,
+    ResultatPDF,
     compter_pdfs,
     lister_pdfs
 )
@@ -16,7 +19,9 @@ from .pdf_reader import (
 from .skills_extractor import (
     SkillsDatabase,
     get_skills_database,
+    tag_taxonomie,
     extraire_competences,
+    localiser_competences,
     extraire_competences_avec_stats,
     categoriser_competences,
     valider_competence,
@@ -24,6 +29,12 @@ from .skills_extractor import (
     comparer_competences
 )
 
+from .section_segmenter import (
+    Section,
+    SegmentsCV,
+    segmenter_cv
+)
+
 from .info_extractor import (
     extraire_nom,
     extraire_titre_profil,
@@ -40,19 +51,29 @@ __all__ = [
     'lire_pdf',
     'lire_pdf_avec_info',
     'valider_pdf',
+    'extraire_pdfs',
+    'extraire_batch',
+    'ResultatPDF',
     'compter_pdfs',
     'lister_pdfs',
     
     # Skills Extractor
     'SkillsDatabase',
     'get_skills_database',
+    'tag_taxonomie',
     'extraire_competences',
+    'localiser_competences',
     'extraire_competences_avec_stats',
     'categoriser_competences',
     'valider_competence',
     'normaliser_competence',
     'comparer_competences',
     
+    # Section Segmenter
+    'Section',
+    'SegmentsCV',
+    'segmenter_cv',
+    
     # Info Extractor
     'extraire_nom',
     'extraire_titre_profil',
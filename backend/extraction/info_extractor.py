@@ -10,6 +10,7 @@ import logging
 from typing import Optional
 
 from backend.config.settings import MOROCCAN_CITIES
+from backend.extraction.section_segmenter import SegmentsCV, segmenter_cv
 
 logger = logging.getLogger(__name__)
 
@@ -68,12 +69,27 @@ def extraire_nom(texte: str) -> str:
 # ========================================================
 # EXTRACTION DU TITRE PROFESSIONNEL
 # ========================================================
-def extraire_titre_profil(texte: str) -> str:
+JOB_KEYWORDS = [
+    "developer", "engineer", "manager", "analyst", "architect",
+    "specialist", "lead", "senior", "junior", "designer",
+    "officer", "consultant", "administrator", "director",
+    "développeur", "ingénieur", "chef", "responsable", "scientist",
+    "technician", "coordinator", "supervisor", "programmer"
+]
+
+_TITRE_LIEU = re.compile(r'^([A-Z][a-zA-Z \t\-/+\.]{5,80}?)[ \t]*[\|\-][ \t]*[A-Z]', re.MULTILINE)
+_TITRE_POSTE = re.compile(
+    r"\b((?:[A-Z][a-zA-Z]*[ \t]+){0,3}(?:Developer|Engineer|Manager|Analyst|Designer|Consultant|Architect|Specialist|Lead))\b"
+)
+
+
+def extraire_titre_profil(texte: str, segments: Optional[SegmentsCV] = None) -> str:
     """
     Extrait le titre du profil professionnel
     
     Args:
         texte: Texte du CV
+        segments: Sections du CV (calculées si absentes)
         
     Returns:
         Titre professionnel ou "Professional" par défaut
@@ -81,44 +97,37 @@ def extraire_titre_profil(texte: str) -> str:
     if not texte:
         return "Professional"
     
-    job_keywords = [
-        "developer", "engineer", "manager", "analyst", "architect",
-        "specialist", "lead", "senior", "junior", "designer",
-        "officer", "consultant", "administrator", "director",
-        "développeur", "ingénieur", "chef", "responsable", "scientist",
-        "technician", "coordinator", "supervisor", "programmer"
-    ]
+    segments = segments or segmenter_cv(texte)
     
-    lines = texte.strip().split('\n')
+    # En-tête du CV (avant la première section), sinon début du texte
+    entete = segments.entete if segments.sections else texte.strip()
+    lines = entete.split('\n')
     
-    # 1️⃣ Cherche dans les 10 premières lignes
-    for i, line in enumerate(lines[:10]):
+    # 1️⃣ Cherche dans les 10 premières lignes de l'en-tête
+    for line in lines[:10]:
         line = line.strip()
         if not line or len(line) < 5:
             continue
         
         # Check si la ligne contient un mot-clé de job
-        if any(kw in line.lower() for kw in job_keywords):
+        if any(kw in line.lower() for kw in JOB_KEYWORDS):
             # Nettoie la ligne des caractères spéciaux au début/fin
             title = re.sub(r'^[\W_]+|[\W_]+$', '', line)
             if 5 < len(title) < 100:
                 return title
     
     # 2️⃣ Pattern "Titre | Location" ou "Titre - Location"
-    match = re.search(r'^([A-Z][a-zA-Z\s\-/+\.]{5,80}?)\s*[\|\-]\s*[A-Z]', texte, re.MULTILINE)
+    match = _TITRE_LIEU.search(entete)
     if match:
         title = match.group(1).strip()
-        if any(kw in title.lower() for kw in job_keywords):
+        if any(kw in title.lower() for kw in JOB_KEYWORDS):
             return title
     
-    # 3️⃣ Cherche les titres courants avec patterns spécifiques
-    match = re.search(
-        r"(?:^|\n)([A-Z][a-zA-Z\s]+(?:Developer|Engineer|Manager|Analyst|Designer|Consultant|Architect|Specialist|Lead))",
-        texte,
-        re.MULTILINE
-    )
-    if match:
-        return match.group(1).strip()
+    # 3️⃣ Intitulé de poste courant: expérience, puis résumé
+    for label in ("experience", "resume"):
+        match = _TITRE_POSTE.search(segments.contenu(label))
+        if match:
+            return match.group(1).strip()
     
     return "Professional"
 
@@ -215,13 +224,14 @@ def extraire_localisation(texte: str) -> str:
 # ========================================================
 # EXTRACTION DU RÉSUMÉ
 # ========================================================
-def extraire_resume(texte: str, max_length: int = 500) -> str:
+def extraire_resume(texte: str, max_length: int = 500, segments: Optional[SegmentsCV] = None) -> str:
     """
     Extrait le résumé professionnel
     
     Args:
         texte: Texte du CV
         max_length: Longueur maximale du résumé
+        segments: Sections du CV (calculées si absentes)
         
     Returns:
         Résumé professionnel
@@ -229,24 +239,17 @@ def extraire_resume(texte: str, max_length: int = 500) -> str:
     if not texte:
         return ""
     
-    # Recherche de la section Summary/Objective avec variations
-    patterns = [
-        r"(?:PROFESSIONAL\s+SUMMARY|Summary|Objective|Professional\s+Summary|Résumé|Professionnel|Profile)\s*[:\-]?\s*\n\s*(.*?)(?:\n\s*\n|\n\s*[A-Z]{3,})",
-        r"(?:PROFESSIONAL\s+SUMMARY|Summary|Objective)\s*[:\-]?\s*(.*?)(?:EXPERIENCE|SKILLS|EDUCATION)",
-    ]
+    # Section Summary/Objective/Profile
+    resume = (segments or segmenter_cv(texte)).contenu("resume")
     
-    for pattern in patterns:
-        match = re.search(pattern, texte, re.IGNORECASE | re.DOTALL)
-        if match:
-            resume = match.group(1).strip()
-            # Nettoyage des espaces multiples et retours à la ligne
-            resume = re.sub(r'\s+', ' ', resume)
-            # Limitation de la longueur
-            resume = resume[:max_length]
-            
-            # Validation: au moins 20 caractères
-            if len(resume) > 20:
-                return resume
+    # Nettoyage des espaces multiples et retours à la ligne
+    resume = " ".join(resume.split())
+    # Limitation de la longueur
+    resume = resume[:max_length]
+    
+    # Validation: au moins 20 caractères
+    if len(resume) > 20:
+        return resume
     
     return ""
 
@@ -254,13 +257,14 @@ def extraire_resume(texte: str, max_length: int = 500) -> str:
 # ========================================================
 # EXTRACTION DE L'EXPÉRIENCE
 # ========================================================
-def extraire_description_experience(texte: str, max_length: int = 1000) -> str:
+def extraire_description_experience(texte: str, max_length: int = 1000, segments: Optional[SegmentsCV] = None) -> str:
     """
     Extrait la description de l'expérience professionnelle
     
     Args:
         texte: Texte du CV
         max_length: Longueur maximale
+        segments: Sections du CV (calculées si absentes)
         
     Returns:
         Description de l'expérience
@@ -268,15 +272,10 @@ def extraire_description_experience(texte: str, max_length: int = 1000) -> str:
     if not texte:
         return ""
     
-    # Recherche de la section Experience (avec \n pour capturer après le titre)
-    match = re.search(
-        r"(?:EXPERIENCE|Expérience|Professional\s+Experience|PROFESSIONAL\s+EXPERIENCE|Work\s+Experience)\s*[:\-]?\s*\n(.*?)(?:\n\s*(?:SKILLS|EDUCATION|PROJECTS|CERTIFICATIONS|Compétences|Formation|Projets)|$)",
-        texte,
-        re.IGNORECASE | re.DOTALL
-    )
+    # Section Experience (jusqu'à la section suivante)
+    experience = (segments or segmenter_cv(texte)).contenu("experience")
     
-    if match:
-        experience = match.group(1).strip()
+    if experience:
         # Nettoyage des espaces multiples tout en gardant les retours à la ligne importants
         experience = re.sub(r'[ \t]+', ' ', experience)
         experience = re.sub(r'\n{3,}', '\n\n', experience)
@@ -291,12 +290,13 @@ def extraire_description_experience(texte: str, max_length: int = 1000) -> str:
 # ========================================================
 # EXTRACTION DES PROJETS
 # ========================================================
-def extraire_projets(texte: str) -> str:
+def extraire_projets(texte: str, segments: Optional[SegmentsCV] = None) -> str:
     """
     Extrait les noms des projets
     
     Args:
         texte: Texte du CV
+        segments: Sections du CV (calculées si absentes)
         
     Returns:
         Projets séparés par " | "
@@ -304,18 +304,12 @@ def extraire_projets(texte: str) -> str:
     if not texte:
         return ""
     
-    # Recherche de la section Projects
-    match = re.search(
-        r"PROJECTS?\s*[:\-]?(.*?)(?:SKILLS|EDUCATION|CERTIFICATIONS|LANGUAGES|$)",
-        texte,
-        re.DOTALL | re.IGNORECASE
-    )
+    # Section Projects
+    block = (segments or segmenter_cv(texte)).contenu("projets")
     
-    if not match:
+    if not block:
         return ""
     
-    block = match.group(1)
-    
     # Extraction des lignes de projets (format: "Nom du projet: Description")
     projets = []
     lines = block.split('\n')
@@ -347,24 +341,26 @@ def extraire_projets(texte: str) -> str:
 # ========================================================
 # FONCTION COMPLÈTE D'EXTRACTION
 # ========================================================
-def extraire_toutes_infos(texte: str) -> dict:
+def extraire_toutes_infos(texte: str, segments: Optional[SegmentsCV] = None) -> dict:
     """
     Extrait toutes les informations d'un CV
     
     Args:
         texte: Texte complet du CV
+        segments: Sections du CV (un seul découpage partagé par les extracteurs)
         
     Returns:
         Dictionnaire avec toutes les informations
     """
+    segments = segments or segmenter_cv(texte)
     return {
         'nom': extraire_nom(texte),
-        'titre_profil': extraire_titre_profil(texte),
+        'titre_profil': extraire_titre_profil(texte, segments),
         'annees_experience': extraire_annees_experience(texte),
         'localisation': extraire_localisation(texte),
-        'resume': extraire_resume(texte),
-        'description_experience': extraire_description_experience(texte),
-        'projets': extraire_projets(texte)
+        'resume': extraire_resume(texte, segments=segments),
+        'description_experience': extraire_description_experience(texte, segments=segments),
+        'projets': extraire_projets(texte, segments)
     }
 
 
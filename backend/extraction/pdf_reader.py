@@ -6,8 +6,13 @@ Extraction robuste de texte depuis les fichiers PDF
 """
 
 import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, Iterator, List, NamedTuple
 from io import BytesIO
 
 try:
@@ -16,6 +21,14 @@ try:
 except ImportError:
     raise ImportError("PyPDF2 est requis. Installez-le avec: pip install PyPDF2")
 
+from backend.config.settings import (
+    PDF_WORKERS,
+    PDF_TIMEOUT_S,
+    PDF_MEMORY_LIMIT_MB,
+    PDF_RETRIES,
+    PDF_RETRY_BACKOFF_S
+)
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -378,39 +391,248 @@ def lister_pdfs(directory: Path, valides_seulement: bool = False) -> List[Path]:
         return []
 
 
-def extraire_batch(directory: Path, limit: Optional[int] = None) -> Dict[str, str]:
+# ========================================================
+# EXTRACTION PARALLÈLE ISOLÉE
+# ========================================================
+class ResultatPDF(NamedTuple):
+    """Résultat de l'extraction d'un PDF par extraire_pdfs()"""
+    chemin: Path
+    texte: Optional[str]
+    erreur: Optional[str]  # None, "illisible", "timeout" ou "crash"
+    tentatives: int
+    duree: float  # Secondes, dernière tentative
+
+
+def _limiter_memoire(memoire_max_mb: int):
+    """Plafond d'espace d'adressage du worker (POSIX uniquement)"""
+    if not memoire_max_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limite = memoire_max_mb * 1024 * 1024
+    _, dure = resource.getrlimit(resource.RLIMIT_AS)
+    if dure != resource.RLIM_INFINITY:
+        limite = min(limite, dure)
+    resource.setrlimit(resource.RLIMIT_AS, (limite, dure))
+
+
+def _boucle_worker(conn, memoire_max_mb: int):
+    """Processus d'extraction: reçoit (index, chemin), renvoie (index, texte, erreur)"""
+    _limiter_memoire(memoire_max_mb)
+    while True:
+        try:
+            tache = conn.recv()
+        except (EOFError, OSError):
+            return
+        if tache is None:
+            return
+        index, chemin = tache
+        try:
+            texte = lire_pdf(Path(chemin))
+        except MemoryError:
+            texte = None
+        conn.send((index, texte, None if texte else "illisible"))
+
+
+class _WorkerPDF:
+    """Processus d'extraction et la tâche qu'il traite"""
+    
+    def __init__(self, contexte, memoire_max_mb: int):
+        self.conn, enfant = contexte.Pipe()
+        self.process = contexte.Process(target=_boucle_worker, args=(enfant, memoire_max_mb), daemon=True)
+        self.process.start()
+        enfant.close()
+        self.tache = None  # (index, chemin, tentative)
+        self.debut = 0.0
+    
+    def soumettre(self, tache):
+        self.tache = tache
+        self.debut = time.monotonic()
+        self.conn.send((tache[0], str(tache[1])))
+    
+    def arreter(self, tuer: bool = False):
+        try:
+            if tuer:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def extraire_pdfs(
+    pdfs: Iterable[Path],
+    workers: Optional[int] = None,
+    timeout: float = PDF_TIMEOUT_S,
+    memoire_max_mb: int = PDF_MEMORY_LIMIT_MB,
+    tentatives: int = PDF_RETRIES,
+    backoff: float = PDF_RETRY_BACKOFF_S
+) -> Iterator[ResultatPDF]:
     """
-    Extrait le texte de plusieurs PDFs en batch
+    Extrait le texte d'un flux de PDFs sur un pool de processus isolés
+    
+    Chaque fichier est lu par lire_pdf() dans un worker dont la mémoire est
+    plafonnée. Un worker qui dépasse le délai est tué puis remplacé: un PDF
+    pathologique ne bloque ni le lot ni le processus appelant. Les délais
+    dépassés et les crashs sont retentés avec une attente croissante; un
+    PDF simplement illisible ne l'est pas.
+    
+    Les résultats sont produits dans l'ordre d'entrée, au fil de l'eau: au
+    plus deux fichiers par worker sont lus en avance sur le consommateur.
+    
+    Args:
+        pdfs: Itérable (éventuellement paresseux) de chemins PDF
+        workers: Nombre de processus (défaut PDF_WORKERS, 0 = un par cœur)
+        timeout: Délai maximal par fichier et par tentative (secondes)
+        memoire_max_mb: Plafond mémoire d'un worker (0 = sans limite)
+        tentatives: Nouvelles tentatives après un délai dépassé ou un crash
+        backoff: Attente avant la première nouvelle tentative (doublée ensuite)
+        
+    Yields:
+        ResultatPDF pour chaque fichier
+    """
+    workers = PDF_WORKERS if workers is None else workers
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    fenetre = 2 * workers
+    
+    source = iter(pdfs)
+    epuise = False
+    lus = 0
+    prochain = 0
+    a_faire = deque()  # (index, chemin, tentative, pas_avant)
+    termines: Dict[int, ResultatPDF] = {}
+    
+    contexte = multiprocessing.get_context()
+    pool: List[_WorkerPDF] = []
+    
+    def _echec(worker: _WorkerPDF, erreur: str):
+        index, chemin, tentative = worker.tache
+        duree = time.monotonic() - worker.debut
+        if tentative <= tentatives:
+            attente = backoff * 2 ** (tentative - 1)
+            logger.warning(f"⚠️ {chemin.name}: {erreur} après {duree:.1f}s, nouvelle tentative dans {attente:.1f}s")
+            a_faire.append((index, chemin, tentative + 1, time.monotonic() + attente))
+        else:
+            logger.error(f"❌ {chemin.name}: {erreur} ({tentative} tentatives), fichier ignoré")
+            termines[index] = ResultatPDF(chemin, None, erreur, tentative, duree)
+    
+    try:
+        while True:
+            # 1️⃣ Lecture paresseuse du flux, bornée par la fenêtre
+            while not epuise and lus - prochain < fenetre:
+                try:
+                    chemin = next(source)
+                except StopIteration:
+                    epuise = True
+                    break
+                a_faire.append((lus, Path(chemin), 1, 0.0))
+                lus += 1
+            
+            # 2️⃣ Résultats dans l'ordre d'entrée
+            while prochain in termines:
+                yield termines.pop(prochain)
+                prochain += 1
+            if epuise and prochain == lus:
+                return
+            
+            # 3️⃣ Distribution aux workers libres (créés à la demande)
+            maintenant = time.monotonic()
+            for tache in [t for t in a_faire if t[3] <= maintenant]:
+                worker = next((w for w in pool if w.tache is None), None)
+                if worker is None and len(pool) < workers:
+                    worker = _WorkerPDF(contexte, memoire_max_mb)
+                    pool.append(worker)
+                if worker is None:
+                    break
+                a_faire.remove(tache)
+                worker.soumettre(tache[:3])
+            
+            # 4️⃣ Attente d'un résultat, d'un délai dépassé ou d'une reprise
+            occupes = [w for w in pool if w.tache is not None]
+            echeances = [w.debut + timeout for w in occupes] + [t[3] for t in a_faire]
+            attente = max(0.0, min(echeances) - time.monotonic()) if echeances else None
+            if occupes:
+                prets = wait([w.conn for w in occupes], timeout=attente)
+            else:
+                time.sleep(attente or 0)
+                prets = []
+            
+            maintenant = time.monotonic()
+            for i, worker in enumerate(pool):
+                if worker.tache is None:
+                    continue
+                if worker.conn in prets:
+                    try:
+                        index, texte, erreur = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # Processus mort en cours de lecture (segfault, OOM)
+                        _echec(worker, "crash")
+                        worker.arreter(tuer=True)
+                        pool[i] = _WorkerPDF(contexte, memoire_max_mb)
+                        continue
+                    _, chemin, tentative = worker.tache
+                    termines[index] = ResultatPDF(chemin, texte, erreur, tentative, maintenant - worker.debut)
+                    worker.tache = None
+                elif maintenant - worker.debut >= timeout:
+                    _echec(worker, "timeout")
+                    worker.arreter(tuer=True)
+                    pool[i] = _WorkerPDF(contexte, memoire_max_mb)
+    finally:
+        # Consommateur arrêté en route ou fin du flux: aucun worker ne survit
+        for worker in pool:
+            worker.arreter(tuer=worker.tache is not None)
+
+
+def extraire_batch(
+    directory: Path,
+    limit: Optional[int] = None,
+    workers: Optional[int] = None,
+    timeout: float = PDF_TIMEOUT_S
+) -> Dict[str, str]:
+    """
+    Extrait le texte de plusieurs PDFs en batch (pool isolé, voir extraire_pdfs)
+    
+    Les PDFs ne sont plus validés au préalable dans le processus courant:
+    lire_pdf() les valide dans les workers, sous délai et plafond mémoire.
     
     Args:
         directory: Dossier contenant les PDFs
         limit: Nombre maximum de PDFs à traiter (None = tous)
+        workers: Nombre de processus (défaut PDF_WORKERS)
+        timeout: Délai maximal par fichier (secondes)
         
     Returns:
         Dictionnaire {nom_fichier: texte_extrait}
     """
     results = {}
     
-    pdfs = lister_pdfs(directory, valides_seulement=True)
+    pdfs = lister_pdfs(directory)
     
     if limit:
         pdfs = pdfs[:limit]
     
     logger.info(f"📄 Extraction de {len(pdfs)} PDFs depuis {directory}")
+    debut = time.monotonic()
     
-    for i, pdf_path in enumerate(pdfs, 1):
-        try:
-            texte = lire_pdf(pdf_path)
-            if texte:
-                results[pdf_path.name] = texte
-                logger.info(f"✅ [{i}/{len(pdfs)}] {pdf_path.name}")
-            else:
-                logger.warning(f"⚠️ [{i}/{len(pdfs)}] Échec extraction: {pdf_path.name}")
-        except Exception as e:
-            logger.error(f"❌ [{i}/{len(pdfs)}] Erreur {pdf_path.name}: {e}")
-            continue
+    for i, resultat in enumerate(extraire_pdfs(pdfs, workers=workers, timeout=timeout), 1):
+        if resultat.texte:
+            results[resultat.chemin.name] = resultat.texte
+            logger.info(f"✅ [{i}/{len(pdfs)}] {resultat.chemin.name}")
+        else:
+            logger.warning(f"⚠️ [{i}/{len(pdfs)}] Échec extraction ({resultat.erreur}): {resultat.chemin.name}")
     
-    logger.info(f"✅ Extraction terminée: {len(results)}/{len(pdfs)} réussis")
+    duree = time.monotonic() - debut
+    logger.info(
+        f"✅ Extraction terminée: {len(results)}/{len(pdfs)} réussis "
+        f"en {duree:.1f}s ({len(pdfs) / duree if duree else 0:.1f} PDF/s)"
+    )
     return results
 
 
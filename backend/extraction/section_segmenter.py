@@ -0,0 +1,148 @@
+"""
+============================================================================
+SMARTHIRE - Segmentation des CV en sections
+Un seul parcours du texte avec une regex d'en-têtes précompilée: chaque
+extracteur (résumé, expérience, projets, titre, compétences) lit ensuite
+sa section au lieu de rechercher ses propres bornes dans tout le CV.
+============================================================================
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# ========================================================
+# VOCABULAIRE DES EN-TÊTES
+# ========================================================
+# Ordre indifférent: l'alternance est triée du plus long au plus court
+# ("Professional Experience" avant "Experience")
+EN_TETES_SECTIONS: Dict[str, List[str]] = {
+    "resume": [
+        "professional summary", "summary", "career objective", "objective",
+        "professional profile", "profile", "about me", "résumé", "profil"
+    ],
+    "competences": [
+        "technical skills", "skills", "skill", "core competencies", "compétences techniques",
+        "compétences", "compétence", "competences", "expertise", "technologies"
+    ],
+    "experience": [
+        "professional experience", "work experience", "employment history", "experience",
+        "experiences", "expérience professionnelle", "expériences professionnelles",
+        "expérience", "expériences"
+    ],
+    "projets": ["personal projects", "academic projects", "projects", "project", "projets", "projet"],
+    "formation": ["education", "academic background", "formation", "formations"],
+    "certifications": ["certifications", "certification", "certificates"],
+    "langues": ["languages", "language", "langues"],
+    "realisations": ["achievements", "achievement", "awards", "réalisations"],
+    "interets": ["interests", "hobbies", "centres d'intérêt"]
+}
+
+_LABELS: Dict[str, str] = {
+    titre: label for label, titres in EN_TETES_SECTIONS.items() for titre in titres
+}
+
+
+def _alternance(titres) -> str:
+    return "|".join(
+        r"[ \t]+".join(re.escape(mot) for mot in titre.split())
+        for titre in sorted(titres, key=len, reverse=True)
+    )
+
+
+# Texte ligne à ligne: en-tête seul sur sa ligne, ou suivi de ":"
+_EN_TETE_LIGNE = re.compile(
+    r"^[ \t]*(?P<titre>" + _alternance(_LABELS) + r")[ \t]*(?::[ \t]*|-?[ \t]*$)",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Texte aplati (nettoyer_texte_brut): plus de lignes, seuls les en-têtes
+# en MAJUSCULES, ou en Capitale suivis de ":", servent de bornes
+# ("Senior Project Manager" reste dans l'expérience)
+_EN_TETE_EN_LIGNE = re.compile(
+    r"(?<!\w)(?P<titre>"
+    + _alternance({titre.upper() for titre in _LABELS})
+    + r"|(?:"
+    + _alternance({
+        variante
+        for titre in _LABELS
+        for variante in (titre.title(), titre[:1].upper() + titre[1:])
+    })
+    + r")(?=[ \t]*:))(?!\w)[ \t]*:?[ \t]*"
+)
+
+
+# ========================================================
+# SEGMENTS
+# ========================================================
+class Section(NamedTuple):
+    """Section d'un CV: en-tête [debut, debut_contenu[, contenu [debut_contenu, fin["""
+    label: str
+    titre: str
+    debut: int
+    debut_contenu: int
+    fin: int
+
+
+class SegmentsCV:
+    """Découpage d'un texte en sections étiquetées (première occurrence par label)"""
+
+    def __init__(self, texte: str, sections: Tuple[Section, ...]):
+        self.texte = texte
+        self.sections = sections
+        self._par_label: Dict[str, Section] = {}
+        for section in sections:
+            self._par_label.setdefault(section.label, section)
+
+    def __contains__(self, label: str) -> bool:
+        return label in self._par_label
+
+    def __repr__(self) -> str:
+        return f"SegmentsCV({[s.label for s in self.sections]})"
+
+    def section(self, label: str) -> Optional[Section]:
+        return self._par_label.get(label)
+
+    def span(self, label: str) -> Optional[Tuple[int, int]]:
+        """(début, fin) du contenu de la section dans le texte"""
+        section = self._par_label.get(label)
+        return (section.debut_contenu, section.fin) if section else None
+
+    def contenu(self, label: str) -> str:
+        section = self._par_label.get(label)
+        return self.texte[section.debut_contenu:section.fin].strip() if section else ""
+
+    @property
+    def entete(self) -> str:
+        """Texte avant la première section (nom, titre, coordonnées)"""
+        fin = self.sections[0].debut if self.sections else len(self.texte)
+        return self.texte[:fin].strip()
+
+
+@lru_cache(maxsize=32)
+def segmenter_cv(texte: str) -> SegmentsCV:
+    """
+    Segmente un CV en un seul parcours (mis en cache: les extracteurs
+    d'un même texte partagent le résultat)
+
+    Args:
+        texte: Texte du CV, ligne à ligne ou aplati
+
+    Returns:
+        SegmentsCV (sections dans l'ordre du texte)
+    """
+    if not texte:
+        return SegmentsCV("", ())
+
+    regex = _EN_TETE_LIGNE if "\n" in texte else _EN_TETE_EN_LIGNE
+    en_tetes = [
+        (match.start("titre"), match.end(), match.group("titre"))
+        for match in regex.finditer(texte)
+    ]
+
+    sections = []
+    for i, (debut, debut_contenu, titre) in enumerate(en_tetes):
+        fin = en_tetes[i + 1][0] if i + 1 < len(en_tetes) else len(texte)
+        label = _LABELS[" ".join(titre.lower().split())]
+        sections.append(Section(label, titre, debut, debut_contenu, fin))
+    return SegmentsCV(texte, tuple(sections))
@@ -9,25 +9,58 @@ import re
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Set, Tuple, Optional
+from typing import List, Dict, FrozenSet, Set, Tuple, Optional
 
-from backend.config.settings import SKILLS_FILE
+from backend.config.settings import SKILLS_FILE, TAXONOMY_FILE
+from backend.utils.skill_matcher import SkillMatcher
+from backend.extraction.section_segmenter import segmenter_cv
 
 logger = logging.getLogger(__name__)
 
 # ========================================================
 # CHARGEMENT DE LA BASE DE COMPÉTENCES
 # ========================================================
+def tag_taxonomie(skill: str) -> str:
+    """
+    Forme "tag" d'une compétence, celle de taxonomie.json
+    (minuscules, underscores): "Spring Boot" → "spring_boot",
+    "Node.js" → "nodejs", "C#" → "csharp", "C++" → "cpp"
+    """
+    tag = skill.lower().strip().replace("#", "sharp").replace("+", "p").replace(".", "")
+    tag = re.sub(r"[\s\-/]+", "_", tag)
+    return tag.strip("_")
+
+
 class SkillsDatabase:
-    """Gestion de la base de données de compétences"""
+    """
+    Gestion de la base de données de compétences
+    
+    Tables de correspondance construites au chargement (aucune lecture
+    de fichier ensuite, recherches en O(1)):
+        skills_lower_map : compétence (minuscules) → compétence
+        alias_map        : alias (minuscules) → compétence canonique
+        category_map     : compétence (minuscules) → catégories de skills.json
+        tag_map          : tag taxonomie ("spring_boot") → compétence canonique
+        taxonomy         : tag taxonomie → catégorie de taxonomie.json
+    """
     
-    def __init__(self, skills_file: Path = SKILLS_FILE):
+    def __init__(self, skills_file: Path = SKILLS_FILE, taxonomy_file: Path = TAXONOMY_FILE):
         self.skills_file = skills_file
+        self.taxonomy_file = taxonomy_file
         self.skills: List[str] = []
         self.aliases: Dict[str, List[str]] = {}
         self.skills_lower_map: Dict[str, str] = {}
+        self.alias_map: Dict[str, str] = {}
+        self.category_map: Dict[str, List[str]] = {}
+        self.categories: List[str] = []
+        self.tag_map: Dict[str, str] = {}
+        self.taxonomy: Dict[str, str] = {}
+        self._skills_set: Optional[FrozenSet[str]] = None
+        self._matcher: Optional[SkillMatcher] = None
         
         self._load_skills()
+        self._load_taxonomy()
+        self._build_lookup_tables()
     
     def _load_skills(self):
         """Charge les compétences depuis le fichier JSON"""
@@ -45,6 +78,11 @@ class SkillsDatabase:
             for category, skills in data.items():
                 if category != "aliases" and isinstance(skills, list):
                     all_skills.extend(skills)
+                    self.categories.append(category)
+                    for skill in skills:
+                        categories = self.category_map.setdefault(skill.lower(), [])
+                        if category not in categories:
+                            categories.append(category)
             
             # Récupérer les aliases
             self.aliases = data.get("aliases", {})
@@ -96,19 +134,96 @@ class SkillsDatabase:
         
         self.skills = default_skills
         self.aliases = default_aliases
+        self.category_map = {}
+        self.categories = []
         
         for skill in default_skills:
             self.skills_lower_map[skill.lower()] = skill
         
         logger.warning(f"⚠️ Utilisation de {len(default_skills)} compétences par défaut")
     
+    def _load_taxonomy(self):
+        """Charge les tags de taxonomie.json (tag → catégorie)"""
+        try:
+            if not self.taxonomy_file.exists():
+                return
+            
+            with open(self.taxonomy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            for category, tags in data.items():
+                if category.startswith("_") or category == "//":
+                    continue
+                # "technologies" est découpée en sous-catégories
+                groupes = tags.items() if isinstance(tags, dict) else [(category, tags)]
+                for groupe, liste in groupes:
+                    if isinstance(liste, list):
+                        for tag in liste:
+                            self.taxonomy.setdefault(tag, groupe)
+            
+            logger.info(f"✅ {len(self.taxonomy)} tags de taxonomie chargés")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Taxonomie non chargée: {e}")
+    
+    def _build_lookup_tables(self):
+        """Construit alias → compétence et tag → compétence"""
+        # Premier alias déclaré gagne (même ordre que l'ancien parcours linéaire)
+        for main_skill, alias_list in self.aliases.items():
+            canonique = self.skills_lower_map.get(main_skill.lower(), main_skill)
+            for alias in alias_list:
+                self.alias_map.setdefault(alias.lower(), canonique)
+        
+        # Tags: compétences d'abord, puis aliases
+        for skill_lower, skill in self.skills_lower_map.items():
+            self.tag_map.setdefault(tag_taxonomie(skill_lower), skill)
+        for alias_lower, canonique in self.alias_map.items():
+            self.tag_map.setdefault(tag_taxonomie(alias_lower), canonique)
+    
+    def resoudre(self, skill: str) -> Optional[str]:
+        """
+        Compétence canonique pour un nom, un alias ou un tag de taxonomie
+        
+        Returns:
+            Nom canonique, ou None si inconnu
+        """
+        skill_lower = skill.lower().strip()
+        
+        if skill_lower in self.skills_lower_map:
+            return self.skills_lower_map[skill_lower]
+        if skill_lower in self.alias_map:
+            return self.alias_map[skill_lower]
+        return self.tag_map.get(tag_taxonomie(skill_lower))
+    
+    def get_categories(self, skill: str) -> List[str]:
+        """Catégories (skills.json) d'une compétence"""
+        return self.category_map.get(skill.lower(), [])
+    
+    def get_tag_taxonomie(self, skill: str) -> Optional[str]:
+        """Tag de taxonomie.json correspondant à une compétence (ou None)"""
+        canonique = self.resoudre(skill) or skill
+        tag = tag_taxonomie(canonique)
+        return tag if tag in self.taxonomy else None
+    
     def get_all_skills(self) -> List[str]:
         """Retourne toutes les compétences"""
         return self.skills
     
-    def get_skills_set(self) -> Set[str]:
-        """Retourne un set de toutes les compétences"""
-        return set(self.skills)
+    def get_skills_set(self) -> FrozenSet[str]:
+        """
+        Retourne l'ensemble (figé) de toutes les compétences.
+        Toujours le même objet: le matcher compilé pour cet ensemble
+        (voir utils.skill_matcher) est réutilisé d'un appel à l'autre.
+        """
+        if self._skills_set is None:
+            self._skills_set = frozenset(self.skills)
+        return self._skills_set
+    
+    def get_matcher(self) -> SkillMatcher:
+        """Matcher compilé (une fois) sur compétences + aliases"""
+        if self._matcher is None:
+            self._matcher = SkillMatcher.depuis_aliases(self.skills, self.aliases)
+        return self._matcher
 
 
 # Instance globale
@@ -177,86 +292,56 @@ def extraire_competences(texte: str, priorite_section_skills: bool = True) -> Li
         return []
     
     db = get_skills_database()
-    skills_list = db.get_all_skills()
-    aliases = db.aliases
     
-    lower_text = texte.lower()
+    # Section Skills si demandé (découpage partagé avec extraire_toutes_infos)
+    section = segmenter_cv(texte).span("competences") if priorite_section_skills else None
     
-    # Extraction de la section Skills si demandé
-    skills_section = ""
-    skills_section_lower = ""
+    # Recherche des compétences (un seul passage, skills + aliases)
+    trouvees = localiser_competences(texte, section, db.get_matcher())
     
-    if priorite_section_skills:
-        # Patterns multiples pour détecter la section Skills
-        patterns = [
-            r"\b(?:SKILLS?|COMPÉTENCES?|TECHNICAL\s+SKILLS?|EXPERTISE|TECHNOLOGIES)\b\s*[:\-]?\s*\n(.*?)(?:\n\s*\b(?:PROJECTS?|EDUCATION|EXPERIENCE|EXPÉRIENCE|LANGUAGES?|CERTIFICATIONS?|FORMATION|ACHIEVEMENTS?|RÉALISATIONS?)\b|$)",
-            r"\b(?:SKILLS?|COMPÉTENCES?)\b\s*[:\-]?\s*\n(.*?)(?:\n\s*[A-Z]{2,}|$)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, texte, re.DOTALL | re.IGNORECASE | re.MULTILINE)
-            if match:
-                skills_section = match.group(1)
-                skills_section_lower = skills_section.lower()
-                break
-    
-    # Recherche des compétences
-    found = set()
-    found_in_skills_section = set()
-    
-    for skill in skills_list:
-        skill_lower = skill.lower()
-        
-        # Pattern avec word boundaries pour éviter les faux positifs
-        # Gère aussi les cas avec points (Node.js, Vue.js, etc.)
-        pattern = r'\b' + re.escape(skill_lower) + r'\b'
+    # Retourner: skills de la section d'abord, puis les autres,
+    # chacun par ordre de première apparition dans le texte
+    if priorite_section_skills and any(in_section for _, _, in_section in trouvees):
+        result = [skill for skill, _, in_section in trouvees if in_section]
+        result.extend(skill for skill, _, in_section in trouvees if not in_section)
+        return result
+    
+    return [skill for skill, _, _ in trouvees]
+
+
+def localiser_competences(
+    texte: str,
+    section: Optional[Tuple[int, int]] = None,
+    matcher: Optional[SkillMatcher] = None
+) -> List[Tuple[str, int, bool]]:
+    """
+    Localise toutes les compétences (et leurs aliases) en un passage
+    
+    Args:
+        texte: Texte à analyser
+        section: (début, fin) de la section Skills dans le texte
+        matcher: Matcher à utiliser (défaut: celui de la base de compétences)
         
-        try:
-            # Recherche dans le texte complet
-            if re.search(pattern, lower_text):
-                found.add(skill)
-                
-                # Recherche dans la section Skills
-                if skills_section_lower and re.search(pattern, skills_section_lower):
-                    found_in_skills_section.add(skill)
-                continue
-            
-            # Recherche via aliases
-            for alias in aliases.get(skill, []):
-                alias_pattern = r'\b' + re.escape(alias.lower()) + r'\b'
-                if re.search(alias_pattern, lower_text):
-                    found.add(skill)
-                    if skills_section_lower and re.search(alias_pattern, skills_section_lower):
-                        found_in_skills_section.add(skill)
-                    break
-                    
-        except re.error as e:
-            logger.warning(f"⚠️ Erreur regex pour '{skill}': {e}")
-            continue
-    
-    # Retourner: skills de la section d'abord, puis les autres (ordre préservé)
-    if priorite_section_skills and found_in_skills_section:
-        try:
-            # Préserver l'ordre d'apparition dans le texte
-            result = sorted(list(found_in_skills_section), 
-                           key=lambda s: lower_text.find(s.lower()) if s.lower() in lower_text else 999999)
-            
-            other_skills = sorted(list(found - found_in_skills_section),
-                                 key=lambda s: lower_text.find(s.lower()) if s.lower() in lower_text else 999999)
-            
-            result.extend(other_skills)
-            return result
-        except Exception as e:
-            logger.warning(f"⚠️ Erreur tri: {e}")
-            return list(found)
-    
-    # Si pas de section Skills, retourner par ordre d'apparition
-    try:
-        return sorted(list(found), 
-                     key=lambda s: lower_text.find(s.lower()) if s.lower() in lower_text else 999999)
-    except Exception as e:
-        logger.warning(f"⚠️ Erreur tri final: {e}")
-        return list(found)
+    Returns:
+        Liste de (compétence canonique, première position, trouvée dans la
+        section Skills), triée par première position
+    """
+    if matcher is None:
+        matcher = get_skills_database().get_matcher()
+    
+    premieres: Dict[str, List] = {}
+    for debut, fin, skill in matcher.occurrences(texte):
+        dans_section = section is not None and section[0] <= debut and fin <= section[1]
+        info = premieres.get(skill)
+        if info is None:
+            premieres[skill] = [debut, dans_section]
+        elif dans_section:
+            info[1] = True
+    
+    return [
+        (skill, position, dans_section)
+        for skill, (position, dans_section) in premieres.items()
+    ]
 
 
 def extraire_competences_avec_stats(texte: str) -> Dict:
@@ -276,13 +361,8 @@ def extraire_competences_avec_stats(texte: str) -> Dict:
     
     competences = extraire_competences(texte, priorite_section_skills=True)
     
-    # Détecte si une section Skills existe (pattern robuste)
-    # Utilise un contexte plus strict pour éviter les faux positifs
-    has_skills_section = bool(re.search(
-        r"(?:^|\n)\s*(?:SKILLS?|COMPÉTENCES?|TECHNICAL\s+SKILLS?|EXPERTISE|TECHNOLOGIES)\s*[:\-]?",
-        texte,
-        re.IGNORECASE | re.MULTILINE
-    ))
+    # Détecte si une section Skills existe (en-tête reconnu par le segmenteur)
+    has_skills_section = "competences" in segmenter_cv(texte)
     
     return {
         'competences': competences,
@@ -297,30 +377,20 @@ def categoriser_competences(competences: List[str]) -> Dict[str, List[str]]:
     Catégorise les compétences par type
     
     Returns:
-        Dictionnaire {categorie: [competences]}
+        Dictionnaire {categorie: [competences]}, catégories dans l'ordre de skills.json
     """
     if not competences:
         return {}
     
     db = get_skills_database()
     
-    # Charger les catégories depuis le JSON
     categories = {}
-    try:
-        with open(db.skills_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        for category, skills in data.items():
-            if category != "aliases" and isinstance(skills, list):
-                for skill in competences:
-                    if skill.lower() in [s.lower() for s in skills]:
-                        if category not in categories:
-                            categories[category] = []
-                        categories[category].append(skill)
-    except Exception as e:
-        logger.warning(f"⚠️ Impossible de catégoriser: {e}")
+    for skill in competences:
+        for category in db.get_categories(skill):
+            categories.setdefault(category, []).append(skill)
     
-    return categories
+    ordre = {category: i for i, category in enumerate(db.categories)}
+    return dict(sorted(categories.items(), key=lambda item: ordre.get(item[0], len(ordre))))
 
 
 # ========================================================
@@ -331,7 +401,7 @@ def valider_competence(skill: str) -> bool:
     Vérifie si une compétence existe dans la base
     
     Args:
-        skill: Nom de la compétence
+        skill: Nom de la compétence, alias ou tag de taxonomie
         
     Returns:
         True si valide
@@ -339,31 +409,17 @@ def valider_competence(skill: str) -> bool:
     if not skill or not isinstance(skill, str):
         return False
     
-    db = get_skills_database()
-    
-    # Vérifie en lowercase
-    skill_lower = skill.lower().strip()
-    
-    if skill_lower in db.skills_lower_map:
-        return True
-    
-    # Vérifie dans les aliases
-    for main_skill, alias_list in db.aliases.items():
-        if skill_lower in [a.lower() for a in alias_list]:
-            return True
-    
-    return False
-
-
+    return get_skills_database().resoudre(skill) is not None
 
 
 def normaliser_competence(skill: str) -> str:
     """
     Normalise une compétence (casse correcte)
-    Convertit les aliases vers le nom principal
+    Convertit les aliases et tags de taxonomie vers le nom principal
     
     Args:
-        skill: Nom de la compétence (peut être un alias comme 'k8s')
+        skill: Nom de la compétence (peut être un alias comme 'k8s'
+            ou un tag comme 'spring_boot')
         
     Returns:
         Nom normalisé (ex: 'k8s' → 'Kubernetes')
@@ -371,25 +427,8 @@ def normaliser_competence(skill: str) -> str:
     if not skill or not isinstance(skill, str):
         return skill
     
-    db = get_skills_database()
-    skill_lower = skill.lower().strip()
-    
-    # 1️⃣ Recherche directe dans le mapping principal
-    if skill_lower in db.skills_lower_map:
-        return db.skills_lower_map[skill_lower]
-    
-    # 2️⃣ Recherche dans les aliases
-    for main_skill, alias_list in db.aliases.items():
-        for alias in alias_list:
-            if skill_lower == alias.lower():
-                # Retourner le nom correctement formaté
-                main_skill_lower = main_skill.lower()
-                if main_skill_lower in db.skills_lower_map:
-                    return db.skills_lower_map[main_skill_lower]
-                return main_skill
-    
-    # 3️⃣ Pas trouvé, retourner tel quel
-    return skill
+    # Pas trouvé: retourner tel quel
+    return get_skills_database().resoudre(skill) or skill
 
 
 # ========================================================
@@ -0,0 +1,79 @@
+"""
+============================================================================
+SMARTHIRE - Configuration Gunicorn (production multi-workers)
+
+Usage (depuis backend/):
+    gunicorn -c gunicorn.conf.py app:app
+
+Préchargement (SEARCH_PRELOAD, activé par défaut ici): l'app et les index
+de recherche sont construits une fois dans le maître puis partagés par les
+workers forkés. Mémoire par worker: python -m backend.utils.memory_report
+
+Synchronisation (SMARTHIRE_SYNC, activée par défaut): un processus dédié,
+lancé et arrêté avec le maître (jamais de thread d'indexation hérité par
+les workers), applique index_outbox aux index Whoosh; chaque worker suit
+ses index BM25. Table et triggers:
+python -m backend.indexation.sync_index --installer
+============================================================================
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("SEARCH_PRELOAD", "1")
+
+from backend.config.settings import SEARCH_PRELOAD, MAINTENANCE_ENABLED, SYNC_ENABLED  # noqa: E402
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+pythonpath = str(PROJECT_ROOT)
+
+# Import de l'app dans le maître (requis pour partager les index)
+preload_app = SEARCH_PRELOAD
+
+# Synchroniseur Whoosh (processus dédié, voir when_ready)
+_synchroniseur: "subprocess.Popen | None" = None
+
+
+def when_ready(server):
+    """Maître prêt, workers pas encore forkés: construire les index"""
+    if SEARCH_PRELOAD:
+        from backend.utils.preload import precharger_application
+        precharger_application()
+    # Fusion des segments et snapshots des index depuis le maître
+    # (SMARTHIRE_MAINTENANCE=1; ailleurs, fusion seule à la demande)
+    if MAINTENANCE_ENABLED:
+        from backend.indexation.maintenance import get_planificateur
+        get_planificateur().demarrer()
+    # Outbox PostgreSQL → index Whoosh: un seul synchroniseur, hors du maître
+    # (ses services d'indexation seraient hérités sans thread par les workers)
+    global _synchroniseur
+    if SYNC_ENABLED:
+        _synchroniseur = subprocess.Popen(
+            [sys.executable, "-m", "backend.indexation.sync_index"], cwd=str(PROJECT_ROOT)
+        )
+        server.log.info(f"Synchroniseur Whoosh démarré (pid {_synchroniseur.pid})")
+
+
+def on_exit(server):
+    """Arrêt du maître: arrêter le synchroniseur"""
+    if _synchroniseur is not None and _synchroniseur.poll() is None:
+        _synchroniseur.terminate()
+        try:
+            _synchroniseur.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _synchroniseur.kill()
+
+
+def post_fork(server, worker):
+    """Dans chaque worker: ne jamais réutiliser une connexion du maître"""
+    if SEARCH_PRELOAD:
+        from backend.utils.preload import reinitialiser_apres_fork
+        reinitialiser_apres_fork()
@@ -7,6 +7,8 @@ Module d'indexation automatique avec preprocessing NLP pour CV, offres et requê
 
 from .preprocessing import (
     pretraiter_texte,
+    pretraiter_textes,
+    pretraiter_texte_cache,
     pretraiter_competences,
     nettoyer_texte_brut,
     compter_tokens,
@@ -14,9 +16,43 @@ from .preprocessing import (
     init_nltk
 )
 
+from .manifest import (
+    ManifesteIndex,
+    Changements,
+    empreinte_fichier
+)
+
+from .index_writer import (
+    ouvrir_writer,
+    DebitIndexation
+)
+
+from .doc_store import (
+    DocumentStore,
+    get_document_store,
+    get_cv_document_store,
+    get_job_document_store
+)
+
+from .maintenance import (
+    fusionner_segments,
+    creer_snapshot,
+    appliquer_retention,
+    restaurer_snapshot,
+    PlanificateurMaintenance,
+    get_planificateur
+)
+
+from .indexing_service import (
+    IndexingService,
+    get_cv_indexing_service,
+    get_job_indexing_service
+)
+
 from .cv_indexer import (
     CVIndexer,
     indexer_cvs_automatique,
+    soumettre_cv_depuis_texte,
     indexer_cv_depuis_texte,
     mettre_a_jour_cv,
     supprimer_cv,
@@ -26,6 +62,9 @@ from .cv_indexer import (
 from .job_indexer import (
     JobIndexer,
     indexer_offres_automatique,
+    indexer_flux_offres,
+    soumettre_offre_depuis_donnees,
+    indexer_offre_depuis_donnees,
     job_schema
 )
 
@@ -37,22 +76,63 @@ from .query_indexer import (
     QueryCorrector,        # ✅ Classe qui existe
     QueryProcessor as QueryIndexProcessor,  # ✅ Renommé pour éviter conflit
     QueryIndexer,          # ✅ Classe principale
+    JournalRequetes,
+    get_journal_requetes,
     indexer_requete,       # ✅ Fonction qui existe
     prepare_query_for_search,  # ✅ Fonction qui existe
 )
 
+from .sync_index import (
+    installer_outbox,
+    PositionOutbox,
+    SynchroniseurWhoosh,
+    SuiviBM25,
+    get_synchroniseur_whoosh,
+)
+
 __all__ = [
     # Preprocessing
     'pretraiter_texte',
+    'pretraiter_textes',
+    'pretraiter_texte_cache',
     'pretraiter_competences',
     'nettoyer_texte_brut',
     'compter_tokens',
     'calculer_reduction',
     'init_nltk',
     
+    # Manifeste (réindexation incrémentale)
+    'ManifesteIndex',
+    'Changements',
+    'empreinte_fichier',
+    
+    # Writers (reconstruction parallèle)
+    'ouvrir_writer',
+    'DebitIndexation',
+    
+    # Magasin de documents (champs volumineux hors de Whoosh)
+    'DocumentStore',
+    'get_document_store',
+    'get_cv_document_store',
+    'get_job_document_store',
+    
+    # Maintenance (fusion des segments, snapshots)
+    'fusionner_segments',
+    'creer_snapshot',
+    'appliquer_retention',
+    'restaurer_snapshot',
+    'PlanificateurMaintenance',
+    'get_planificateur',
+    
+    # Indexation en temps réel (commit groupé)
+    'IndexingService',
+    'get_cv_indexing_service',
+    'get_job_indexing_service',
+    
     # CV Indexer
     'CVIndexer',
     'indexer_cvs_automatique',
+    'soumettre_cv_depuis_texte',
     'indexer_cv_depuis_texte',
     'mettre_a_jour_cv',
     'supprimer_cv',
@@ -61,6 +141,9 @@ __all__ = [
     # Job Indexer
     'JobIndexer',
     'indexer_offres_automatique',
+    'indexer_flux_offres',
+    'soumettre_offre_depuis_donnees',
+    'indexer_offre_depuis_donnees',
     'job_schema',
     
     # Query Indexer (CORRIGÉ)
@@ -70,8 +153,17 @@ __all__ = [
     'QueryCorrector',
     'QueryIndexProcessor',
     'QueryIndexer',
+    'JournalRequetes',
+    'get_journal_requetes',
     'indexer_requete',
     'prepare_query_for_search',
+    
+    # Synchronisation PostgreSQL → index (outbox)
+    'installer_outbox',
+    'PositionOutbox',
+    'SynchroniseurWhoosh',
+    'SuiviBM25',
+    'get_synchroniseur_whoosh',
 ]
 
 __version__ = '1.0.0'
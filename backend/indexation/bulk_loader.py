@@ -0,0 +1,133 @@
+"""
+============================================================================
+SMARTHIRE - Insertion en masse des données validées
+Les CVs et offres validés (statut 'corrige') sont insérés par lots
+multi-lignes (execute_values) au lieu d'un INSERT ... RETURNING par
+document. Les ids sont réservés d'avance dans la séquence de chaque table
+(nextval sur generate_series): chaque ligne est reliée à son identifiant
+source sans dépendre de l'ordre des lignes renvoyées. CVs et offres sont
+chargés dans une seule transaction: tout ou rien.
+============================================================================
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from database.shared_queries import bulk_insert_system_cvs, bulk_insert_system_offres, reserve_ids
+from backend.config.settings import BULK_INSERT_PAGE_SIZE
+from backend.indexation.index_writer import DebitIndexation
+
+logger = logging.getLogger(__name__)
+
+# Colonnes insérées (ordre des requêtes de shared_queries) → clé du JSON validé
+_REQUIS = object()
+CHAMPS = {
+    "cvs": (
+        ("nom", _REQUIS), ("email", ""), ("competences", _REQUIS), ("niveau_estime", _REQUIS),
+        ("localisation", _REQUIS), ("type_contrat", _REQUIS), ("diplome", _REQUIS),
+        ("annees_experience", _REQUIS), ("tags_manuels", _REQUIS), ("chemin_pdf", _REQUIS),
+        ("texte_complet", _REQUIS)
+    ),
+    "offres": (
+        ("titre", _REQUIS), ("entreprise", _REQUIS), ("competences_requises", _REQUIS),
+        ("description", _REQUIS), ("localisation", _REQUIS), ("niveau_souhaite", _REQUIS),
+        ("type_contrat", _REQUIS), ("diplome_requis", _REQUIS), ("experience_min", _REQUIS),
+        ("tags_manuels", _REQUIS), ("texte_complet", _REQUIS)
+    )
+}
+
+_REQUETES = {"cvs": bulk_insert_system_cvs, "offres": bulk_insert_system_offres}
+
+
+def preparer_lignes(documents: Dict[str, Dict], table: str) -> Tuple[List[Tuple[str, tuple]], Dict[str, str]]:
+    """
+    Lignes à insérer pour les documents validés
+
+    Args:
+        documents: {id source: données} (JSON de vérification manuelle)
+        table: "cvs" ou "offres"
+
+    Returns:
+        ([(id source, valeurs)], {id source: erreur} pour les documents rejetés)
+    """
+    lignes, rejetes = [], {}
+    for source_id, data in documents.items():
+        if data.get("statut") != "corrige":
+            continue
+        manquants = [cle for cle, defaut in CHAMPS[table] if defaut is _REQUIS and cle not in data]
+        if manquants:
+            rejetes[source_id] = f"champs manquants: {manquants}"
+            continue
+        lignes.append((source_id, tuple(data.get(cle, defaut) for cle, defaut in CHAMPS[table])))
+    return lignes, rejetes
+
+
+def inserer_lignes(cur, table: str, lignes: List[Tuple[str, tuple]], taille_lot: int = BULK_INSERT_PAGE_SIZE) -> Dict[str, int]:
+    """
+    Insère les lignes par lots (sans commit: transaction de l'appelant)
+
+    Returns:
+        {id source: id en base}
+    """
+    if not lignes:
+        return {}
+
+    cur.execute(reserve_ids(table), (len(lignes),))
+    ids = [row[0] for row in cur.fetchall()]
+    requete, template = _REQUETES[table]()
+
+    for debut in range(0, len(lignes), taille_lot):
+        lot = lignes[debut:debut + taille_lot]
+        execute_values(
+            cur, requete,
+            [(db_id, *valeurs) for db_id, (_, valeurs) in zip(ids[debut:debut + taille_lot], lot)],
+            template=template,
+            page_size=taille_lot
+        )
+        logger.info(f"   📥 {table}: {debut + len(lot)}/{len(lignes)}")
+
+    return {source_id: db_id for (source_id, _), db_id in zip(lignes, ids)}
+
+
+def charger_donnees_validees(
+    conn,
+    cvs_corriges: Dict[str, Dict],
+    offres_corrigees: Dict[str, Dict],
+    taille_lot: Optional[int] = None
+) -> Dict:
+    """
+    Insère les CVs et offres validés en une transaction
+
+    Un document auquel il manque un champ est rejeté avant l'insertion
+    (listé dans "rejetes"); une erreur SQL annule tout le chargement.
+
+    Returns:
+        {"cvs": {id source: id}, "offres": {...}, "rejetes": {...}, "debit": DebitIndexation}
+
+    Raises:
+        psycopg2.Error: transaction annulée
+    """
+    taille_lot = taille_lot or BULK_INSERT_PAGE_SIZE
+    debit = DebitIndexation()
+    resultat = {"rejetes": {}}
+
+    cur = conn.cursor()
+    try:
+        for table, documents in (("cvs", cvs_corriges), ("offres", offres_corrigees)):
+            lignes, rejetes = preparer_lignes(documents, table)
+            for source_id, erreur in rejetes.items():
+                logger.warning(f"   ❌ {source_id}: {erreur}")
+            resultat["rejetes"].update(rejetes)
+            resultat[table] = inserer_lignes(cur, table, lignes, taille_lot)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    resultat["debit"] = debit.terminer(len(resultat["cvs"]) + len(resultat["offres"]))
+    logger.info(f"✅ Insertion en masse: {resultat['debit']}")
+    return resultat
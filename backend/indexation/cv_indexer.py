@@ -8,22 +8,35 @@ CORRECTION APPLIQUÉE : Toutes les erreurs 'annees' → 'annees_experience'
 
 import logging
 import shutil
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from whoosh.index import create_in, exists_in, open_dir
 from whoosh.fields import Schema, TEXT, ID, KEYWORD, NUMERIC
-from whoosh.writing import AsyncWriter
 
-from backend.config.settings import CV_FOLDER, CV_INDEX
-from backend.extraction.pdf_reader import lire_pdf
+from backend.config.settings import (
+    CV_FOLDER,
+    CV_INDEX,
+    CV_DOCSTORE_FIELDS,
+    INDEX_MANIFEST_VERSION,
+    INDEXING_WAIT_TIMEOUT_S
+)
+from backend.extraction.pdf_reader import lire_pdf, extraire_pdfs
 from backend.extraction.skills_extractor import extraire_competences, get_skills_database
 from backend.extraction.info_extractor import extraire_toutes_infos
 from backend.indexation.preprocessing import (
-    pretraiter_texte,
+    pretraiter_texte_cache,
+    pretraiter_textes,
     pretraiter_competences,
-    nettoyer_texte_brut
+    nettoyer_texte_brut,
+    signature_pretraitement
 )
+from backend.indexation.manifest import Changements, ManifesteIndex
+from backend.indexation.index_writer import DebitIndexation, ouvrir_writer
+from backend.indexation.indexing_service import get_cv_indexing_service
+from backend.indexation.doc_store import get_document_store, champs_documents
 
 logger = logging.getLogger(__name__)
 
@@ -117,24 +130,26 @@ def valider_texte_cv(texte: str) -> Tuple[bool, str]:
 # SCHÉMA D'INDEXATION CV (avec champs additionnels)
 # ========================================================
 cv_schema = Schema(
-    doc_id=ID(stored=True, unique=True),
+    doc_id=ID(stored=True, unique=True, sortable=True),
     nom=TEXT(stored=True),
     titre_profil=TEXT(stored=True),
     localisation=TEXT(stored=True),
     annees_experience=NUMERIC(stored=True, sortable=True),
-    description_experience=TEXT(stored=True),
     competences=KEYWORD(commas=True, lowercase=True, stored=True),
-    projets=TEXT(stored=True),
-    resume_complet=TEXT(stored=True),
-    texte_pretraite=TEXT(stored=True),
+    
+    # Indexés seulement: le contenu est dans le magasin de documents (CV_DOCSTORE_FIELDS)
+    description_experience=TEXT,
+    projets=TEXT,
+    resume_complet=TEXT,
+    texte_pretraite=TEXT,
     
     # Champs pour l'upload en temps réel
     original_filename=TEXT(stored=True),
     user_id=ID(stored=True),
     
     # Statistiques NLP
-    nb_tokens_original=NUMERIC(stored=True),
-    nb_tokens_processed=NUMERIC(stored=True)
+    nb_tokens_original=NUMERIC(stored=True, sortable=True),
+    nb_tokens_processed=NUMERIC(stored=True, sortable=True)
 )
 
 # ========================================================
@@ -143,15 +158,27 @@ cv_schema = Schema(
 class CVIndexer:
     """Classe pour indexer les CV avec preprocessing NLP"""
     
-    def __init__(self, cv_folder: Path = CV_FOLDER, index_dir: Path = CV_INDEX):
+    def __init__(
+        self,
+        cv_folder: Path = CV_FOLDER,
+        index_dir: Path = CV_INDEX,
+        workers: Optional[int] = None,
+        pdf_workers: Optional[int] = None,
+        index_procs: Optional[int] = None
+    ):
         self.cv_folder = cv_folder
         self.index_dir = index_dir
+        self.workers = workers  # Prétraitement NLP (None = PREPROCESS_WORKERS)
+        self.pdf_workers = pdf_workers  # Extraction PDF isolée (None = PDF_WORKERS)
+        self.index_procs = index_procs  # Écriture de l'index (None = INDEX_WRITER_PROCS)
         self.skills_db = get_skills_database()
         
         # Statistiques
         self.total_cvs = 0
         self.success_count = 0
         self.error_count = 0
+        self.changements: Optional[Changements] = None
+        self.debit: Optional[DebitIndexation] = None
     
     def _creer_index(self, force: bool = False):
         """Crée ou recrée l'index"""
@@ -165,13 +192,8 @@ class CVIndexer:
             create_in(str(self.index_dir), cv_schema)
             logger.info(f"✅ Nouvel index créé: {self.index_dir}")
     
-    def _traiter_cv(self, filepath: Path) -> Optional[dict]:
-        """
-        Traite un CV et extrait toutes les informations
-        
-        Returns:
-            Dictionnaire avec toutes les données ou None en cas d'erreur
-        """
+    def _lire_cv(self, filepath: Path) -> Optional[str]:
+        """Extrait et nettoie le texte d'un CV (None si vide ou illisible)"""
         try:
             # 1️⃣ Extraction du texte brut
             texte_brut = lire_pdf(filepath)
@@ -181,15 +203,43 @@ class CVIndexer:
                 return None
             
             # 2️⃣ Nettoyage léger du texte brut
-            texte_nettoye = nettoyer_texte_brut(texte_brut)
+            return nettoyer_texte_brut(texte_brut)
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture {filepath.name}: {e}")
+            return None
+    
+    def _traiter_cv(
+        self,
+        filepath: Path,
+        texte_nettoye: Optional[str] = None,
+        pretraitement: Optional[Tuple[str, List[str]]] = None
+    ) -> Optional[dict]:
+        """
+        Traite un CV et extrait toutes les informations
+        
+        Args:
+            filepath: Chemin du PDF
+            texte_nettoye: Texte déjà extrait par _lire_cv (sinon lu ici)
+            pretraitement: Résultat de pretraiter_texte déjà calculé (lots)
+        
+        Returns:
+            Dictionnaire avec toutes les données ou None en cas d'erreur
+        """
+        try:
+            if texte_nettoye is None:
+                texte_nettoye = self._lire_cv(filepath)
+                if texte_nettoye is None:
+                    return None
             
             # 3️⃣ Prétraitement NLP complet
-            skills_set = self.skills_db.get_skills_set()
-            texte_pretraite, tokens = pretraiter_texte(
-                texte_nettoye,
-                preserve_skills=True,
-                skills_list=skills_set
-            )
+            if pretraitement is None:
+                pretraitement = pretraiter_texte_cache(
+                    texte_nettoye,
+                    preserve_skills=True,
+                    skills_list=self.skills_db.get_skills_set()
+                )
+            texte_pretraite, tokens = pretraitement
             
             # 4️⃣ Extraction des informations (sur texte nettoyé)
             infos = extraire_toutes_infos(texte_nettoye)
@@ -224,9 +274,15 @@ class CVIndexer:
             logger.error(f"❌ Erreur traitement {filepath.name}: {e}")
             return None
     
+    def _signature_manifeste(self) -> str:
+        """Version de l'extraction + signature du prétraitement NLP"""
+        signature = signature_pretraitement(True, self.skills_db.get_skills_set())
+        return f"{INDEX_MANIFEST_VERSION}:{signature.hex()}"
+    
     def indexer_tous_les_cvs(self, force: bool = False):
         """
-        Indexe tous les CV du dossier
+        Indexe les CV ajoutés ou modifiés depuis le dernier passage et
+        retire de l'index ceux dont le fichier a disparu (manifeste)
         
         Args:
             force: Si True, recrée l'index complètement
@@ -235,40 +291,87 @@ class CVIndexer:
         logger.info("DÉBUT DE L'INDEXATION AUTOMATIQUE DES CV")
         logger.info("="*120)
         
-        # Création de l'index
+        # Création de l'index (le manifeste disparaît avec lui si force)
         self._creer_index(force=force)
+        manifeste = ManifesteIndex(self.index_dir, self._signature_manifeste())
         
-        # Récupération des fichiers PDF
+        # Récupération des fichiers PDF et comparaison au manifeste
         try:
             cv_files = sorted(self.cv_folder.glob("*.pdf"))
-            self.total_cvs = len(cv_files)
-            
-            if self.total_cvs == 0:
-                logger.warning(f"⚠️ Aucun CV trouvé dans {self.cv_folder}")
-                return
-            
-            logger.info(f"📁 {self.total_cvs} CV trouvés dans {self.cv_folder}\n")
-            
+            self.changements = manifeste.detecter_changements(cv_files)
         except Exception as e:
             logger.error(f"❌ Erreur lecture dossier: {e}")
             return
         
-        # Ouverture de l'index pour écriture
+        a_indexer = self.changements.a_indexer
+        self.total_cvs = len(a_indexer)
+        logger.info(f"📁 {len(cv_files)} CV dans {self.cv_folder}: {self.changements.resume()}\n")
+        
+        if self.changements.vide:
+            manifeste.sauvegarder()  # mtimes des fichiers seulement « touchés »
+            logger.info("✅ Index des CV à jour, rien à réindexer")
+            return
+        
+        # Ouverture de l'index pour écriture (parallèle pour une reconstruction)
+        self.debit = DebitIndexation()
         ix = open_dir(str(self.index_dir))
-        writer = AsyncWriter(ix)
+        writer = ouvrir_writer(ix, len(a_indexer), procs=self.index_procs)
+        documents = []  # Magasin de documents, écrit avant le commit
+        
+        # Fichiers disparus
+        for nom, doc_id in self.changements.supprimes.items():
+            if doc_id:
+                writer.delete_by_term('doc_id', doc_id)
+                documents.append((doc_id, None))
+            manifeste.oublier(nom)
+        
+        # Extraction PDF et prétraitement NLP tournent chacun sur leur pool,
+        # au fil de l'eau (les deux rendent les résultats dans l'ordre des fichiers)
+        lus = deque()
+        
+        def _textes():
+            fichiers = iter(a_indexer)
+            for resultat in extraire_pdfs((f.chemin for f in a_indexer), workers=self.pdf_workers):
+                texte_nettoye = None
+                if resultat.texte:
+                    texte_nettoye = nettoyer_texte_brut(resultat.texte)
+                else:
+                    logger.warning(f"⚠️ CV vide ou illisible ({resultat.erreur}): {resultat.chemin.name}")
+                lus.append((next(fichiers), texte_nettoye))
+                yield texte_nettoye or ""
+        
+        pretraitements = pretraiter_textes(
+            _textes(),
+            workers=self.workers,
+            preserve_skills=True,
+            skills_list=self.skills_db.get_skills_set()
+        )
         
         # Traitement de chaque CV
-        for i, filepath in enumerate(cv_files, 1):
+        for i, pretraitement in enumerate(pretraitements, 1):
+            fichier, texte_nettoye = lus.popleft()
+            filepath = fichier.chemin
             try:
+                # Un fichier modifié devenu illisible sort de l'index
+                if fichier.ancien_doc_id:
+                    writer.delete_by_term('doc_id', fichier.ancien_doc_id)
+                    documents.append((fichier.ancien_doc_id, None))
+                
+                if texte_nettoye is None:
+                    manifeste.enregistrer(fichier, None)
+                    self.error_count += 1
+                    continue
+                
                 # Traitement du CV
-                cv_data = self._traiter_cv(filepath)
+                cv_data = self._traiter_cv(filepath, texte_nettoye, pretraitement)
                 
                 if cv_data is None:
+                    manifeste.enregistrer(fichier, None)
                     self.error_count += 1
                     continue
                 
-                # Indexation
-                writer.add_document(
+                # Indexation (remplace le document de même doc_id)
+                writer.update_document(
                     doc_id=cv_data['doc_id'],
                     nom=cv_data['nom'],
                     titre_profil=cv_data['titre_profil'],
@@ -284,6 +387,9 @@ class CVIndexer:
                     nb_tokens_original=cv_data['nb_tokens_original'],
                     nb_tokens_processed=cv_data['nb_tokens_processed']
                 )
+                documents.append((cv_data['doc_id'], champs_documents(cv_data, CV_DOCSTORE_FIELDS)))
+                
+                manifeste.enregistrer(fichier, cv_data['doc_id'])
                 
                 # Affichage du résumé
                 self._afficher_resume_cv(i, cv_data)
@@ -295,9 +401,12 @@ class CVIndexer:
                 self.error_count += 1
                 continue
         
-        # Commit des changements
+        # Commit des changements, puis du manifeste qui les décrit
         try:
+            get_document_store(self.index_dir).ecrire_lot(documents)
             writer.commit()
+            manifeste.sauvegarder()
+            self.debit.terminer(self.success_count)
             self._afficher_statistiques_finales()
         except Exception as e:
             logger.error(f"❌ Erreur lors du commit: {e}")
@@ -342,7 +451,12 @@ class CVIndexer:
         logger.info(f"   • CV indexés avec succès: {self.success_count}")
         logger.info(f"   • CV en erreur: {self.error_count}")
         logger.info(f"   • Total traité: {self.total_cvs}")
-        logger.info(f"   • Taux de succès: {(self.success_count/self.total_cvs*100):.1f}%")
+        if self.total_cvs:
+            logger.info(f"   • Taux de succès: {(self.success_count/self.total_cvs*100):.1f}%")
+        if self.changements:
+            logger.info(f"   • Changements: {self.changements.resume()}")
+        if self.debit:
+            logger.info(f"   • Débit: {self.debit}")
         logger.info(f"\n📁 Index sauvegardé: {self.index_dir}")
         logger.info(f"\n🔍 Pipeline NLP appliqué:")
         logger.info(f"   ✓ Extraction PDF")
@@ -358,34 +472,41 @@ class CVIndexer:
 # ========================================================
 # FONCTION PRINCIPALE
 # ========================================================
-def indexer_cvs_automatique(force: bool = False):
+def indexer_cvs_automatique(
+    force: bool = False,
+    workers: Optional[int] = None,
+    pdf_workers: Optional[int] = None,
+    index_procs: Optional[int] = None
+):
     """
     Point d'entrée principal pour l'indexation automatique
     
     Args:
         force: Si True, recrée l'index complètement
+        workers: Processus de prétraitement NLP (None = PREPROCESS_WORKERS)
+        pdf_workers: Processus d'extraction PDF (None = PDF_WORKERS)
+        index_procs: Processus d'écriture de l'index (None = INDEX_WRITER_PROCS)
+    
+    Returns:
+        Changements détectés par le manifeste (None si le dossier est illisible)
     """
-    indexer = CVIndexer()
+    indexer = CVIndexer(workers=workers, pdf_workers=pdf_workers, index_procs=index_procs)
     indexer.indexer_tous_les_cvs(force=force)
+    return indexer.changements
 
 
 # ========================================================
 # INDEXATION EN TEMPS RÉEL (UPLOAD) - FIXED
 # ========================================================
-def indexer_cv_depuis_texte(
+def soumettre_cv_depuis_texte(
     cv_id: str,
     texte: str,
     filename: str = "",
     user_id: str = ""
-) -> bool:
+) -> Optional[Future]:
     """
-    Indexe un CV en temps réel après upload
-    
-    FIXED:
-    - Validation robuste de cv_id et texte
-    - Gestion des doublons (suppression avant ajout)
-    - Gestion d'erreurs complète
-    - CORRECTION : annees → annees_experience
+    Prépare le document d'un CV uploadé et le confie à la file d'indexation
+    (commit groupé avec les autres uploads, voir IndexingService)
     
     Args:
         cv_id: ID du CV dans PostgreSQL (devient doc_id dans Whoosh)
@@ -394,18 +515,18 @@ def indexer_cv_depuis_texte(
         user_id: ID de l'utilisateur propriétaire
         
     Returns:
-        True si succès, False sinon
+        Future résolu une fois le CV commité (None si le CV est invalide)
     """
     # FIXED: Validations robustes
     is_valid_id, error_msg_id = valider_cv_id(cv_id)
     if not is_valid_id:
         logger.error(f"❌ Validation cv_id échouée: {error_msg_id}")
-        return False
+        return None
     
     is_valid_texte, error_msg_texte = valider_texte_cv(texte)
     if not is_valid_texte:
         logger.error(f"❌ Validation texte échouée: {error_msg_texte}")
-        return False
+        return None
     
     cv_id_str = str(cv_id).strip()
     
@@ -414,7 +535,7 @@ def indexer_cv_depuis_texte(
         if not exists_in(str(CV_INDEX)):
             logger.error(f"❌ Index introuvable: {CV_INDEX}")
             logger.error(f"💡 Lancez d'abord: python -m backend.indexation.cv_indexer")
-            return False
+            return None
         
         # Nettoyage + NLP
         texte_net = nettoyer_texte_brut(texte)
@@ -422,7 +543,7 @@ def indexer_cv_depuis_texte(
         # Prétraitement avec préservation des skills
         skills_db = get_skills_database()
         skills_set = skills_db.get_skills_set()
-        texte_pretraite, tokens = pretraiter_texte(
+        texte_pretraite, tokens = pretraiter_texte_cache(
             texte_net,
             preserve_skills=True,
             skills_list=skills_set
@@ -437,65 +558,64 @@ def indexer_cv_depuis_texte(
         nb_tokens_original = compter_tokens(texte_net)
         nb_tokens_processed = len(tokens)
         
-        # FIXED: Suppression du doublon si existant
-        ix = open_dir(str(CV_INDEX))
-        
-        try:
-            with ix.searcher() as searcher:
-                from whoosh.qparser import QueryParser
-                query_parser = QueryParser("doc_id", ix.schema)
-                query = query_parser.parse(cv_id_str)
-                results = searcher.search(query)
-                
-                if len(results) > 0:
-                    logger.info(f"⚠️ CV #{cv_id_str} existe déjà. Suppression avant réindexation.")
-                    
-                    # Suppression via AsyncWriter
-                    with ix.writer() as writer:
-                        writer.delete_by_term("doc_id", cv_id_str)
-        except Exception as e:
-            logger.warning(f"⚠️ Vérification doublon échouée: {e}. Continuant l'indexation...")
-        
-        # Indexation Whoosh (nouveau writer après suppression)
-        writer = AsyncWriter(ix)
-        
-        try:
-            writer.add_document(
-                doc_id=cv_id_str,
-                nom=infos.get('nom', 'Inconnu'),
-                titre_profil=infos.get('titre_profil', 'Professional'),
-                localisation=infos.get('localisation', ''),
-                annees_experience=infos.get('annees_experience', 0),  # ✅ CORRIGÉ
-                description_experience=infos.get('description_experience', ''),
-                competences=competences_str,
-                projets=infos.get('projets', ''),
-                resume_complet=infos.get('resume', ''),
-                texte_pretraite=texte_pretraite,
-                original_filename=filename or f"cv_upload_{cv_id_str}.pdf",
-                user_id=str(user_id),
-                nb_tokens_original=nb_tokens_original,
-                nb_tokens_processed=nb_tokens_processed
-            )
-            
-            writer.commit()
-            
-            logger.info(f"✅ CV #{cv_id_str} indexé en temps réel par l'utilisateur {user_id}")
-            logger.info(f"   • Nom: {infos.get('nom', 'Inconnu')}")
-            logger.info(f"   • Compétences: {len(competences)} skills")
-            logger.info(f"   • Tokens: {nb_tokens_original} → {nb_tokens_processed}")
-            
-            return True
+        logger.info(f"📥 CV #{cv_id_str} en file d'indexation (utilisateur {user_id})")
+        logger.info(f"   • Nom: {infos.get('nom', 'Inconnu')}")
+        logger.info(f"   • Compétences: {len(competences)} skills")
+        logger.info(f"   • Tokens: {nb_tokens_original} → {nb_tokens_processed}")
+        
+        # Upsert: remplace le document de même doc_id s'il existe
+        return get_cv_indexing_service().upsert(dict(
+            doc_id=cv_id_str,
+            nom=infos.get('nom', 'Inconnu'),
+            titre_profil=infos.get('titre_profil', 'Professional'),
+            localisation=infos.get('localisation', ''),
+            annees_experience=infos.get('annees_experience', 0),  # ✅ CORRIGÉ
+            description_experience=infos.get('description_experience', ''),
+            competences=competences_str,
+            projets=infos.get('projets', ''),
+            resume_complet=infos.get('resume', ''),
+            texte_pretraite=texte_pretraite,
+            original_filename=filename or f"cv_upload_{cv_id_str}.pdf",
+            user_id=str(user_id),
+            nb_tokens_original=nb_tokens_original,
+            nb_tokens_processed=nb_tokens_processed
+        ))
+    
+    except Exception as e:
+        logger.error(f"❌ Échec préparation CV #{cv_id_str}: {e}", exc_info=True)
+        return None
+
+
+def indexer_cv_depuis_texte(
+    cv_id: str,
+    texte: str,
+    filename: str = "",
+    user_id: str = ""
+) -> bool:
+    """
+    Indexe un CV en temps réel après upload et attend son commit
+    
+    Args:
+        cv_id: ID du CV dans PostgreSQL (devient doc_id dans Whoosh)
+        texte: Contenu texte du CV
+        filename: Nom du fichier original
+        user_id: ID de l'utilisateur propriétaire
         
-        except Exception as e:
-            writer.cancel()
-            logger.error(f"❌ Erreur lors de l'ajout du document CV #{cv_id_str}: {e}")
-            return False
+    Returns:
+        True si succès, False sinon
+    """
+    future = soumettre_cv_depuis_texte(cv_id, texte, filename, user_id)
+    if future is None:
+        return False
     
+    try:
+        future.result(timeout=INDEXING_WAIT_TIMEOUT_S)
     except Exception as e:
-        logger.error(f"❌ Échec indexation CV #{cv_id_str}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"❌ Échec indexation CV #{str(cv_id).strip()}: {e}")
         return False
+    
+    logger.info(f"✅ CV #{str(cv_id).strip()} indexé en temps réel par l'utilisateur {user_id}")
+    return True
 
 
 # ========================================================
@@ -505,9 +625,8 @@ def mettre_a_jour_cv(cv_id: str, texte: str, filename: str = "", user_id: str =
     """
     Met à jour un CV existant dans l'index
     
-    FIXED:
-    - Validations robustes
-    - Suppression atomique + réindexation
+    L'upsert de la file d'indexation remplace l'ancien document dans le
+    même commit (plus de suppression séparée).
     
     Args:
         cv_id: ID du CV
@@ -518,33 +637,7 @@ def mettre_a_jour_cv(cv_id: str, texte: str, filename: str = "", user_id: str =
     Returns:
         True si succès
     """
-    is_valid_id, error_msg = valider_cv_id(cv_id)
-    if not is_valid_id:
-        logger.error(f"❌ Validation cv_id échouée: {error_msg}")
-        return False
-    
-    try:
-        if not exists_in(str(CV_INDEX)):
-            logger.error(f"❌ Index introuvable: {CV_INDEX}")
-            return False
-        
-        cv_id_str = str(cv_id).strip()
-        
-        ix = open_dir(str(CV_INDEX))
-        writer = ix.writer()
-        
-        # Supprimer l'ancien document
-        deleted = writer.delete_by_term('doc_id', cv_id_str)
-        writer.commit()
-        
-        logger.info(f"✅ Ancien CV #{cv_id_str} supprimé ({deleted} document(s))")
-        
-        # Réindexer avec les nouvelles données
-        return indexer_cv_depuis_texte(cv_id, texte, filename, user_id)
-        
-    except Exception as e:
-        logger.error(f"❌ Erreur mise à jour CV #{cv_id}: {e}")
-        return False
+    return indexer_cv_depuis_texte(cv_id, texte, filename, user_id)
 
 
 # ========================================================
@@ -552,7 +645,7 @@ def mettre_a_jour_cv(cv_id: str, texte: str, filename: str = "", user_id: str =
 # ========================================================
 def supprimer_cv(cv_id: str) -> bool:
     """
-    Supprime un CV de l'index
+    Supprime un CV de l'index (via la file d'indexation)
     
     FIXED:
     - Validation robuste de cv_id
@@ -574,13 +667,7 @@ def supprimer_cv(cv_id: str) -> bool:
             return False
         
         cv_id_str = str(cv_id).strip()
-        
-        ix = open_dir(str(CV_INDEX))
-        writer = ix.writer()
-        
-        # Supprimer le document
-        deleted = writer.delete_by_term('doc_id', cv_id_str)
-        writer.commit()
+        deleted = get_cv_indexing_service().supprimer(cv_id_str).result(timeout=INDEXING_WAIT_TIMEOUT_S)
         
         logger.info(f"✅ CV #{cv_id_str} supprimé de l'index ({deleted} document(s))")
         return True
@@ -0,0 +1,327 @@
+"""
+============================================================================
+SMARTHIRE - Magasin de documents compressés
+Les champs volumineux (texte prétraité, résumé, descriptions) sont indexés
+par Whoosh sans y être stockés: ils vivent ici, un enregistrement zlib par
+document, dans un fichier en ajout seul rangé avec l'index.
+
+Format: en-tête MAGIQUE puis enregistrements
+    <longueur doc_id: u16><longueur données: u32><doc_id utf-8><zlib(json)>
+Une longueur de données nulle est une suppression; pour un même doc_id,
+le dernier enregistrement l'emporte. Les positions sont reconstruites en
+parcourant les en-têtes (sans décompresser), puis seule la fin ajoutée
+depuis la dernière lecture est relue. Un enregistrement tronqué (arrêt
+pendant une écriture) est ignoré puis écrasé par l'écriture suivante.
+
+Les écritures ont lieu pendant que le writer Whoosh de l'index est ouvert
+(avant son commit): un document trouvé par une recherche a toujours ses
+champs dans le magasin.
+============================================================================
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: verrou d'octet via msvcrt
+    fcntl = None
+    import msvcrt
+
+from backend.config.settings import (
+    CV_INDEX,
+    JOB_INDEX,
+    DOCSTORE_FILENAME,
+    DOCSTORE_COMPRESSION
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIQUE = b"SHDOCS01"
+_ENTETE = struct.Struct("<HI")
+
+
+class DocumentStore:
+    """
+    Magasin clé/valeur (doc_id → dict) en ajout seul, à accès direct
+
+    Args:
+        index_dir: Dossier de l'index Whoosh associé
+        niveau: Niveau de compression zlib
+    """
+
+    def __init__(self, index_dir: Path, niveau: int = DOCSTORE_COMPRESSION):
+        self.chemin = Path(index_dir) / DOCSTORE_FILENAME
+        self.niveau = niveau
+
+        self._positions: Dict[str, Tuple[int, int]] = {}  # doc_id → (position, longueur)
+        self._fin = 0  # Fin du dernier enregistrement complet
+        self._octets_vivants = 0
+        self._fichier = None  # Lecture (seek + read sous self._lock)
+        self._inode = None
+        self._lock = threading.RLock()
+
+    # ----------------------------------------------------
+    # LECTURE
+    # ----------------------------------------------------
+    def lire(self, doc_id: str) -> Optional[Dict]:
+        return self.lire_plusieurs([doc_id]).get(str(doc_id))
+
+    def lire_plusieurs(self, doc_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Champs des documents connus (les doc_id absents sont omis)"""
+        with self._lock:
+            self._rafraichir()
+            documents = {}
+            for doc_id in doc_ids:
+                doc_id = str(doc_id)
+                position = self._positions.get(doc_id)
+                if position is not None:
+                    donnees = self._lire_a(position[0], position[1])
+                    documents[doc_id] = json.loads(zlib.decompress(donnees))
+            return documents
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            self._rafraichir()
+            return str(doc_id) in self._positions
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._rafraichir()
+            return len(self._positions)
+
+    def doc_ids(self) -> List[str]:
+        with self._lock:
+            self._rafraichir()
+            return list(self._positions)
+
+    # ----------------------------------------------------
+    # ÉCRITURE
+    # ----------------------------------------------------
+    def enregistrer(self, doc_id: str, champs: Dict):
+        self.ecrire_lot([(doc_id, champs)])
+
+    def supprimer(self, doc_id: str):
+        self.ecrire_lot([(doc_id, None)])
+
+    def ecrire_lot(self, operations: Iterable[Tuple[str, Optional[Dict]]]):
+        """
+        Ajoute un lot d'enregistrements en une écriture
+
+        Args:
+            operations: (doc_id, champs), champs None pour une suppression
+        """
+        morceaux = []
+        for doc_id, champs in operations:
+            cle = str(doc_id).encode("utf-8")
+            donnees = b"" if champs is None else zlib.compress(
+                json.dumps(champs, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                self.niveau
+            )
+            morceaux.append(_ENTETE.pack(len(cle), len(donnees)) + cle + donnees)
+        if not morceaux:
+            return
+
+        with self._lock:
+            self.chemin.parent.mkdir(parents=True, exist_ok=True)
+            with self._verrou_ecriture() as f:
+                self._rafraichir()
+                taille = os.fstat(f.fileno()).st_size
+                if taille < len(MAGIQUE):
+                    f.truncate(0)
+                    f.write(MAGIQUE)
+                elif taille > self._fin:
+                    # Enregistrement tronqué par un arrêt brutal
+                    f.truncate(self._fin)
+                f.write(b"".join(morceaux))
+                f.flush()
+            self._rafraichir()
+
+    def compacter(self, doc_ids_vivants: Optional[Set[str]] = None) -> Dict:
+        """
+        Réécrit le fichier sans les versions remplacées ni les suppressions
+        (et sans les documents hors de doc_ids_vivants, si fourni)
+
+        Les lecteurs d'autres processus détectent le nouveau fichier
+        (inode différent) à leur lecture suivante.
+        """
+        with self._lock:
+            if not self.chemin.exists():
+                return {"avant": 0, "apres": 0, "documents": 0}
+            with self._verrou_ecriture():
+                self._rafraichir()
+                avant = self._fin
+                tmp = self.chemin.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(MAGIQUE)
+                    for doc_id, (position, longueur) in self._positions.items():
+                        if doc_ids_vivants is not None and doc_id not in doc_ids_vivants:
+                            continue
+                        cle = doc_id.encode("utf-8")
+                        f.write(_ENTETE.pack(len(cle), longueur) + cle)
+                        f.write(self._lire_a(position, longueur))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.chemin)
+            self._rafraichir()
+            logger.info(f"🗜️ {self.chemin.parent.name}/{self.chemin.name}: {avant} → {self._fin} octets")
+            return {"avant": avant, "apres": self._fin, "documents": len(self._positions)}
+
+    # ----------------------------------------------------
+    # ÉTAT
+    # ----------------------------------------------------
+    @property
+    def ratio_obsolete(self) -> float:
+        """Part du fichier occupée par des versions remplacées ou supprimées"""
+        with self._lock:
+            self._rafraichir()
+            utile = len(MAGIQUE) + self._octets_vivants
+            return 1.0 - utile / self._fin if self._fin > len(MAGIQUE) else 0.0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            self._rafraichir()
+            return {
+                "documents": len(self._positions),
+                "taille_octets": self._fin,
+                "ratio_obsolete": round(self.ratio_obsolete, 3)
+            }
+
+    def fermer(self):
+        with self._lock:
+            if self._fichier is not None:
+                self._fichier.close()
+            self._fichier, self._inode = None, None
+            self._positions, self._fin, self._octets_vivants = {}, 0, 0
+
+    # ----------------------------------------------------
+    # PARCOURS DES EN-TÊTES
+    # ----------------------------------------------------
+    @contextmanager
+    def _verrou_ecriture(self):
+        """Fichier ouvert en ajout et verrouillé (entre processus)"""
+        while True:
+            f = open(self.chemin, "ab")
+            _verrouiller(f)
+            # Remplacé par une compaction pendant l'attente du verrou: rouvrir
+            try:
+                meme_fichier = os.fstat(f.fileno()).st_ino == os.stat(self.chemin).st_ino
+            except FileNotFoundError:
+                meme_fichier = False
+            if meme_fichier:
+                break
+            _deverrouiller(f)
+            f.close()
+        try:
+            yield f
+        finally:
+            _deverrouiller(f)
+            f.close()
+
+    def _lire_a(self, position: int, longueur: int) -> bytes:
+        """Lecture à une position (appelant: self._lock tenu)"""
+        self._fichier.seek(position)
+        return self._fichier.read(longueur)
+
+    def _rafraichir(self):
+        """Lit les enregistrements ajoutés depuis le dernier appel"""
+        try:
+            stat = os.stat(self.chemin)
+        except FileNotFoundError:
+            self.fermer()
+            return
+        if stat.st_size < len(MAGIQUE):
+            # Fichier en cours de création
+            self.fermer()
+            return
+
+        if (stat.st_dev, stat.st_ino) != self._inode:
+            # Premier accès, compaction ou index recréé
+            self.fermer()
+            self._fichier = open(self.chemin, "rb")
+            self._inode = (stat.st_dev, stat.st_ino)
+            if self._lire_a(0, len(MAGIQUE)) != MAGIQUE:
+                raise ValueError(f"Magasin de documents invalide: {self.chemin}")
+            self._fin = len(MAGIQUE)
+
+        taille = os.fstat(self._fichier.fileno()).st_size
+        if taille <= self._fin:
+            return
+
+        bloc = self._lire_a(self._fin, taille - self._fin)
+        curseur = 0
+        while curseur + _ENTETE.size <= len(bloc):
+            longueur_cle, longueur = _ENTETE.unpack_from(bloc, curseur)
+            debut_donnees = curseur + _ENTETE.size + longueur_cle
+            if debut_donnees + longueur > len(bloc):
+                break
+            doc_id = bloc[curseur + _ENTETE.size:debut_donnees].decode("utf-8")
+            ancienne = self._positions.pop(doc_id, None)
+            if ancienne is not None:
+                self._octets_vivants -= _ENTETE.size + longueur_cle + ancienne[1]
+            if longueur:
+                self._positions[doc_id] = (self._fin + debut_donnees, longueur)
+                self._octets_vivants += _ENTETE.size + longueur_cle + longueur
+            curseur = debut_donnees + longueur
+        self._fin += curseur
+
+
+# ========================================================
+# VERROU ENTRE PROCESSUS
+# ========================================================
+def _verrouiller(f):
+    """Verrou exclusif bloquant: flock (POSIX) ou premier octet (Windows)"""
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # Réessaie pendant ~10s
+            return
+        except OSError:
+            continue
+
+
+def _deverrouiller(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        return
+    f.seek(0)
+    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ========================================================
+# INSTANCES PARTAGÉES
+# ========================================================
+_magasins: Dict[str, DocumentStore] = {}
+_magasins_lock = threading.Lock()
+
+
+def get_document_store(index_dir: Path) -> DocumentStore:
+    """Magasin unique par index et par processus"""
+    cle = str(Path(index_dir).resolve())
+    with _magasins_lock:
+        if cle not in _magasins:
+            _magasins[cle] = DocumentStore(index_dir)
+        return _magasins[cle]
+
+
+def get_cv_document_store() -> DocumentStore:
+    return get_document_store(CV_INDEX)
+
+
+def get_job_document_store() -> DocumentStore:
+    return get_document_store(JOB_INDEX)
+
+
+def champs_documents(champs: Dict, noms: Tuple[str, ...]) -> Dict:
+    """Sous-ensemble des champs d'un document confié au magasin"""
+    return {nom: champs.get(nom, "") for nom in noms}
@@ -0,0 +1,93 @@
+"""
+============================================================================
+SMARTHIRE - Writers d'indexation
+- Mises à jour ponctuelles: AsyncWriter (attend le verrou en arrière-plan),
+  ou writer synchrone quand un délai d'attente du verrou est donné
+- Reconstructions (au moins INDEX_BULK_MIN_DOCS documents): writer
+  multiprocessus de Whoosh, l'analyse des champs et l'écriture des
+  segments sont réparties sur plusieurs cœurs
+- Mémoire bornée par processus (limitmb) et débit mesuré en docs/s
+============================================================================
+"""
+
+import logging
+import os
+import time
+from typing import Optional
+
+from whoosh.writing import AsyncWriter
+
+from backend.config.settings import (
+    INDEX_WRITER_PROCS,
+    INDEX_WRITER_LIMITMB,
+    INDEX_WRITER_MULTISEGMENT,
+    INDEX_BULK_MIN_DOCS
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _nombre_procs(procs: Optional[int]) -> int:
+    if procs is None:
+        procs = INDEX_WRITER_PROCS
+    return procs if procs > 0 else (os.cpu_count() or 1)
+
+
+def ouvrir_writer(
+    ix,
+    nb_documents: int,
+    procs: Optional[int] = None,
+    limitmb: int = INDEX_WRITER_LIMITMB,
+    multisegment: bool = INDEX_WRITER_MULTISEGMENT,
+    timeout: Optional[float] = None
+):
+    """
+    Writer adapté au volume à écrire
+
+    Args:
+        ix: Index Whoosh ouvert
+        nb_documents: Nombre de documents qui seront ajoutés ou remplacés
+        procs: Processus d'écriture (défaut INDEX_WRITER_PROCS, 0 = un par cœur)
+        limitmb: Mémoire du tampon de tri, par processus (Mo)
+        multisegment: Un segment par processus, sans fusion finale (commit
+            plus rapide; les segments sont fusionnés aux commits suivants)
+        timeout: Attente max du verrou d'écriture (secondes). None: LockError
+            immédiate pour une reconstruction, AsyncWriter pour un petit
+            volume; sinon le writer est toujours synchrone (commit fait au
+            retour de commit())
+
+    Returns:
+        AsyncWriter, SegmentWriter ou MpWriter (même interface)
+    """
+    if nb_documents < INDEX_BULK_MIN_DOCS:
+        if timeout is not None:
+            return ix.writer(limitmb=limitmb, timeout=timeout)
+        return AsyncWriter(ix, writerargs={"limitmb": limitmb})
+
+    timeout = timeout or 0.0
+    procs = _nombre_procs(procs)
+    if procs > 1:
+        logger.info(f"⚡ Écriture parallèle: {procs} processus, {limitmb} Mo chacun, multisegment={multisegment}")
+        return ix.writer(procs=procs, limitmb=limitmb, multisegment=multisegment, timeout=timeout)
+    return ix.writer(limitmb=limitmb, timeout=timeout)
+
+
+class DebitIndexation:
+    """Chronométrage d'une passe d'indexation (de la lecture au commit)"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.documents = 0
+        self.secondes = 0.0
+
+    def terminer(self, documents: int) -> "DebitIndexation":
+        self.documents = documents
+        self.secondes = time.perf_counter() - self.debut
+        return self
+
+    @property
+    def docs_par_seconde(self) -> float:
+        return self.documents / self.secondes if self.secondes else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.documents} documents en {self.secondes:.1f}s ({self.docs_par_seconde:.1f} docs/s)"
@@ -0,0 +1,267 @@
+"""
+============================================================================
+SMARTHIRE - Service d'indexation en temps réel (commit groupé)
+Les uploads ne touchent plus l'index eux-mêmes: ils déposent une opération
+(upsert ou suppression) dans une file et reçoivent un Future. Un thread
+unique vide la file par lots: un writer, un commit et au plus un segment
+pour toutes les opérations en attente, au lieu de deux commits par upload
+qui se disputent le verrou d'écriture. Les commits ne fusionnent pas: les
+segments sont regroupés par le planificateur de maintenance. Les champs
+volumineux sont écrits dans le magasin de documents de l'index, dans le
+même lot et avant le commit.
+============================================================================
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from whoosh.index import open_dir
+
+from backend.indexation.maintenance import signaler_commit
+from backend.indexation.doc_store import get_document_store, champs_documents
+from backend.config.settings import (
+    CV_INDEX,
+    JOB_INDEX,
+    CV_DOCSTORE_FIELDS,
+    JOB_DOCSTORE_FIELDS,
+    INDEXING_BATCH_SIZE,
+    INDEXING_COMMIT_DELAY_S,
+    INDEXING_LOCK_TIMEOUT_S
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Services vivants du processus (réinitialisés dans l'enfant d'un fork)
+_instances: "weakref.WeakSet[IndexingService]" = weakref.WeakSet()
+
+
+class _Operation(NamedTuple):
+    doc_id: str
+    champs: Optional[dict]  # None = suppression
+    future: Future
+
+
+class IndexingService:
+    """
+    File d'indexation d'un index Whoosh, appliquée par lots en arrière-plan
+
+    Un lot part dès que INDEXING_BATCH_SIZE opérations sont en attente ou
+    INDEXING_COMMIT_DELAY_S après sa première opération. Dans un lot, seule
+    la dernière opération d'un même document est appliquée; les précédentes
+    sont résolues avec elle.
+
+    champs_documents: champs stockés hors de Whoosh (doc_store), non stockés
+    par le schéma mais indexés
+    """
+
+    def __init__(
+        self,
+        index_dir: Path,
+        champ_id: str,
+        taille_lot: int = INDEXING_BATCH_SIZE,
+        delai_commit: float = INDEXING_COMMIT_DELAY_S,
+        timeout_verrou: float = INDEXING_LOCK_TIMEOUT_S,
+        champs_documents: Tuple[str, ...] = ()
+    ):
+        self.index_dir = Path(index_dir)
+        self.champ_id = champ_id
+        self.champs_documents = tuple(champs_documents)
+        self.taille_lot = max(1, taille_lot)
+        self.delai_commit = delai_commit
+        self.timeout_verrou = timeout_verrou
+
+        self._file: "queue.Queue[Optional[_Operation]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._arrete = False
+
+        # Statistiques
+        self.operations = 0
+        self.commits = 0
+        self.echecs = 0
+
+        _instances.add(self)
+
+    # ----------------------------------------------------
+    # API
+    # ----------------------------------------------------
+    def upsert(self, champs: dict) -> Future:
+        """Ajoute ou remplace le document (update_document sur champ_id)"""
+        champs = dict(champs)
+        champs[self.champ_id] = str(champs[self.champ_id]).strip()
+        return self._soumettre(_Operation(champs[self.champ_id], champs, Future()))
+
+    def supprimer(self, doc_id: str) -> Future:
+        """Supprime le document (résultat: nombre de documents supprimés)"""
+        return self._soumettre(_Operation(str(doc_id).strip(), None, Future()))
+
+    def vider(self):
+        """Attend que toutes les opérations soumises soient appliquées"""
+        self._file.join()
+
+    def arreter(self):
+        """Applique les opérations en attente puis arrête le thread"""
+        with self._lock:
+            if self._arrete:
+                return
+            self._arrete = True
+            thread = self._thread
+        if thread is not None:
+            self._file.put(None)
+            thread.join()
+
+    def get_stats(self) -> Dict:
+        return {
+            "index": str(self.index_dir),
+            "en_attente": self._file.qsize(),
+            "operations": self.operations,
+            "commits": self.commits,
+            "echecs": self.echecs,
+            "operations_par_commit": round(self.operations / self.commits, 2) if self.commits else 0.0
+        }
+
+    def _apres_fork(self):
+        """
+        Enfant d'un fork: file et verrou neufs (ceux du parent attendent ses
+        threads, absents ici); le thread repart à la prochaine opération
+        """
+        self._file = queue.Queue()
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------
+    # THREAD D'ÉCRITURE
+    # ----------------------------------------------------
+    def _soumettre(self, operation: _Operation) -> Future:
+        with self._lock:
+            if self._arrete:
+                raise RuntimeError(f"Service d'indexation arrêté ({self.index_dir})")
+            # Aussi après un fork: le thread du parent n'existe pas dans l'enfant
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.arreter)
+                self._thread = threading.Thread(
+                    target=self._boucle, name=f"indexation-{self.index_dir.name}", daemon=True
+                )
+                self._thread.start()
+            self._file.put(operation)
+        return operation.future
+
+    def _boucle(self):
+        arret = False
+        while not arret:
+            premiere = self._file.get()
+            if premiere is None:
+                self._file.task_done()
+                break
+
+            lot = [premiere]
+            echeance = time.monotonic() + self.delai_commit
+            while len(lot) < self.taille_lot:
+                try:
+                    suivante = self._file.get(timeout=max(0.0, echeance - time.monotonic()))
+                except queue.Empty:
+                    break
+                if suivante is None:
+                    arret = True
+                    break
+                lot.append(suivante)
+
+            try:
+                self._appliquer(lot)
+            finally:
+                for _ in range(len(lot) + arret):
+                    self._file.task_done()
+
+    def _appliquer(self, lot: List[_Operation]):
+        # Opérations annulées par l'appelant avant leur tour: ignorées
+        lot = [op for op in lot if op.future.set_running_or_notify_cancel()]
+        if not lot:
+            return
+
+        dernieres: Dict[str, _Operation] = {}
+        for op in lot:
+            dernieres[op.doc_id] = op
+
+        resultats = {}
+        try:
+            ix = open_dir(str(self.index_dir))
+            writer = ix.writer(timeout=self.timeout_verrou)
+            try:
+                for doc_id, op in dernieres.items():
+                    if op.champs is None:
+                        resultats[doc_id] = writer.delete_by_term(self.champ_id, doc_id)
+                    else:
+                        writer.update_document(**op.champs)
+                        resultats[doc_id] = True
+                if self.champs_documents:
+                    get_document_store(self.index_dir).ecrire_lot(
+                        (doc_id, None if op.champs is None else champs_documents(op.champs, self.champs_documents))
+                        for doc_id, op in dernieres.items()
+                    )
+                writer.commit(merge=False)
+            except BaseException:
+                writer.cancel()
+                raise
+        except Exception as e:
+            self.echecs += len(lot)
+            logger.error(f"❌ Lot d'indexation rejeté ({len(lot)} opérations, {self.index_dir.name}): {e}")
+            for op in lot:
+                op.future.set_exception(e)
+            return
+
+        self.operations += len(lot)
+        self.commits += 1
+        try:
+            signaler_commit(self.index_dir)
+        except Exception as e:
+            logger.warning(f"⚠️ Comptage des segments impossible ({self.index_dir.name}): {e}")
+        logger.debug(f"✅ Commit groupé: {len(lot)} opérations ({len(dernieres)} documents) → {self.index_dir.name}")
+        for op in lot:
+            op.future.set_result(resultats[op.doc_id] if op is dernieres[op.doc_id] else True)
+
+
+# ========================================================
+# INSTANCES PARTAGÉES
+# ========================================================
+_services: Dict[str, IndexingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_indexing_service(index_dir: Path, champ_id: str, champs_documents: Tuple[str, ...] = ()) -> IndexingService:
+    """Service unique par index (une seule file, un seul writer par processus)"""
+    cle = str(Path(index_dir).resolve())
+    with _services_lock:
+        service = _services.get(cle)
+        if service is None or service._arrete:
+            service = _services[cle] = IndexingService(index_dir, champ_id, champs_documents=champs_documents)
+        return service
+
+
+def _oublier_services():
+    """Dans l'enfant d'un fork: services (files, verrous) du parent oubliés"""
+    global _services, _services_lock
+    for service in list(_instances):
+        service._apres_fork()
+    _services = {}
+    _services_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_oublier_services)
+
+
+def get_cv_indexing_service() -> IndexingService:
+    return get_indexing_service(CV_INDEX, "doc_id", CV_DOCSTORE_FIELDS)
+
+
+def get_job_indexing_service() -> IndexingService:
+    return get_indexing_service(JOB_INDEX, "job_id", JOB_DOCSTORE_FIELDS)
@@ -2,25 +2,45 @@
 ============================================================================
 SMARTHIRE - Job Indexer Module (FIXED)
 Indexation automatique des offres d'emploi avec preprocessing NLP
+- Dossier data/jobs: un fichier JSON par offre (manifeste incrémental)
+- Flux partenaires: JSON Lines (.jsonl, .jsonl.gz), une offre par ligne,
+  lu à la volée et indexé par lots
 ============================================================================
 """
 
+import gzip
 import json
 import logging
 import shutil
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 from whoosh.index import create_in, exists_in, open_dir
 from whoosh.fields import Schema, TEXT, ID, KEYWORD, NUMERIC
-from whoosh.writing import AsyncWriter
 
-from backend.config.settings import JOB_FOLDER, JOB_INDEX, NIVEAU_MAPPING
+from backend.config.settings import (
+    JOB_FOLDER,
+    JOB_INDEX,
+    JOB_DOCSTORE_FIELDS,
+    NIVEAU_MAPPING,
+    INDEX_MANIFEST_VERSION,
+    INDEXING_WAIT_TIMEOUT_S,
+    INDEXING_LOCK_TIMEOUT_S,
+    JOB_STREAM_BATCH_SIZE,
+    JOB_STREAM_MAX_ERREURS_DETAIL
+)
 from backend.extraction.skills_extractor import get_skills_database
 from backend.indexation.preprocessing import (
-    pretraiter_texte,
-    pretraiter_competences
+    pretraiter_texte_cache,
+    pretraiter_competences,
+    signature_pretraitement
 )
+from backend.indexation.manifest import Changements, ManifesteIndex
+from backend.indexation.index_writer import DebitIndexation, ouvrir_writer
+from backend.indexation.indexing_service import get_job_indexing_service
+from backend.indexation.doc_store import get_document_store, champs_documents
+from backend.indexation.maintenance import signaler_commit
 
 logger = logging.getLogger(__name__)
 
@@ -125,28 +145,49 @@ def valider_job_id(job_id: any) -> Tuple[bool, str]:
     return True, ""
 
 
+def lire_lignes_jsonl(chemin: Path) -> Iterator[Tuple[int, bytes]]:
+    """
+    Lit un fichier JSON Lines à la volée (décompressé si .gz)
+    
+    Args:
+        chemin: Fichier .jsonl ou .jsonl.gz
+        
+    Yields:
+        (numéro de ligne, ligne brute) pour chaque ligne non vide
+    """
+    ouvrir = gzip.open if Path(chemin).suffix == ".gz" else open
+    with ouvrir(chemin, "rb") as f:
+        for numero, ligne in enumerate(f, 1):
+            ligne = ligne.strip()
+            if ligne:
+                yield numero, ligne
+
+
 # ========================================================
 # SCHÉMA D'INDEXATION OFFRES
 # ========================================================
 job_schema = Schema(
-    job_id=ID(stored=True, unique=True),
+    job_id=ID(stored=True, unique=True, sortable=True),
     titre_poste=TEXT(stored=True, field_boost=2.0),
-    description=TEXT(stored=True),
-    titre_poste_processed=TEXT(stored=True),
-    description_processed=TEXT(stored=True),
+    
+    # Indexés seulement: le contenu est dans le magasin de documents (JOB_DOCSTORE_FIELDS)
+    description=TEXT,
+    titre_poste_processed=TEXT,
+    description_processed=TEXT,
+    
     competences_requises=KEYWORD(commas=True, lowercase=True, stored=True, field_boost=1.5),
     localisation=TEXT(stored=True),
-    niveau_souhaite=ID(stored=True),
-    domaine=ID(stored=True),
-    annees_min=NUMERIC(stored=True),
-    annees_max=NUMERIC(stored=True),
+    niveau_souhaite=ID(stored=True, sortable=True),
+    domaine=ID(stored=True, sortable=True),
+    annees_min=NUMERIC(stored=True, sortable=True),
+    annees_max=NUMERIC(stored=True, sortable=True),
     entreprise=TEXT(stored=True),
     type_contrat=TEXT(stored=True),
     mode_travail=TEXT(stored=True),
     
     # Statistiques NLP
-    nb_tokens_original=NUMERIC(stored=True),
-    nb_tokens_processed=NUMERIC(stored=True)
+    nb_tokens_original=NUMERIC(stored=True, sortable=True),
+    nb_tokens_processed=NUMERIC(stored=True, sortable=True)
 )
 
 # ========================================================
@@ -155,15 +196,18 @@ job_schema = Schema(
 class JobIndexer:
     """Classe pour indexer les offres d'emploi avec preprocessing NLP"""
     
-    def __init__(self, job_folder: Path = JOB_FOLDER, index_dir: Path = JOB_INDEX):
+    def __init__(self, job_folder: Path = JOB_FOLDER, index_dir: Path = JOB_INDEX, index_procs: Optional[int] = None):
         self.job_folder = job_folder
         self.index_dir = index_dir
+        self.index_procs = index_procs  # Écriture de l'index (None = INDEX_WRITER_PROCS)
         self.skills_db = get_skills_database()
         
         # Statistiques
         self.total_jobs = 0
         self.success_count = 0
         self.error_count = 0
+        self.changements: Optional[Changements] = None
+        self.debit: Optional[DebitIndexation] = None
     
     def _creer_index(self, force: bool = False):
         """Crée ou recrée l'index"""
@@ -217,13 +261,13 @@ class JobIndexer:
             # 4️⃣ Prétraitement NLP
             skills_set = self.skills_db.get_skills_set()
             
-            titre_processed, _ = pretraiter_texte(
+            titre_processed, _ = pretraiter_texte_cache(
                 titre_poste,
                 preserve_skills=True,
                 skills_list=skills_set
             )
             
-            description_processed, _ = pretraiter_texte(
+            description_processed, _ = pretraiter_texte_cache(
                 description_text,
                 preserve_skills=True,
                 skills_list=skills_set
@@ -275,37 +319,74 @@ class JobIndexer:
             logger.error(f"❌ Erreur extraction données: {e}")
             return None
     
-  
-        # Récupération des fichiers JSON
+    def _signature_manifeste(self) -> str:
+        """Version de l'extraction + signature du prétraitement NLP"""
+        signature = signature_pretraitement(True, self.skills_db.get_skills_set())
+        return f"{INDEX_MANIFEST_VERSION}:{signature.hex()}"
+    
+    def indexer_toutes_les_offres(self, force: bool = False):
+        """
+        Indexe les offres ajoutées ou modifiées depuis le dernier passage et
+        retire de l'index celles dont le fichier a disparu (manifeste)
+        
+        Args:
+            force: Si True, recrée l'index complètement
+        """
+        logger.info("="*120)
+        logger.info("DÉBUT DE L'INDEXATION AUTOMATIQUE DES OFFRES")
+        logger.info("="*120)
+        
+        # Création de l'index (le manifeste disparaît avec lui si force)
+        self._creer_index(force=force)
+        manifeste = ManifesteIndex(self.index_dir, self._signature_manifeste())
+        
+        # Récupération des fichiers JSON et comparaison au manifeste
         try:
             json_files = sorted([
                 f for f in self.job_folder.glob("*.json")
                 if f.name != "all_jobs.json"  # Exclure le fichier agrégé
             ])
-            
-            self.total_jobs = len(json_files)
-            
-            if self.total_jobs == 0:
-                logger.warning(f"⚠️ Aucune offre trouvée dans {self.job_folder}")
-                return
-            
-            logger.info(f"📁 {self.total_jobs} offres trouvées dans {self.job_folder}\n")
-            
+            self.changements = manifeste.detecter_changements(json_files)
         except Exception as e:
             logger.error(f"❌ Erreur lecture dossier: {e}")
             return
         
-        # Ouverture de l'index pour écriture
+        a_indexer = self.changements.a_indexer
+        self.total_jobs = len(a_indexer)
+        logger.info(f"📁 {len(json_files)} offres dans {self.job_folder}: {self.changements.resume()}\n")
+        
+        if self.changements.vide:
+            manifeste.sauvegarder()  # mtimes des fichiers seulement « touchés »
+            logger.info("✅ Index des offres à jour, rien à réindexer")
+            return
+        
+        # Ouverture de l'index pour écriture (parallèle pour une reconstruction)
+        self.debit = DebitIndexation()
         ix = open_dir(str(self.index_dir))
-        writer = AsyncWriter(ix)
+        writer = ouvrir_writer(ix, len(a_indexer), procs=self.index_procs)
+        documents = []  # Magasin de documents, écrit avant le commit
+        
+        # Fichiers disparus
+        for nom, job_id in self.changements.supprimes.items():
+            if job_id:
+                writer.delete_by_term('job_id', job_id)
+                documents.append((job_id, None))
+            manifeste.oublier(nom)
         
-        # Traitement de chaque offre
-        for i, filepath in enumerate(json_files, 1):
+        # Traitement de chaque offre ajoutée ou modifiée
+        for i, fichier in enumerate(a_indexer, 1):
+            filepath = fichier.chemin
             try:
+                # Le job_id peut avoir changé dans le fichier modifié
+                if fichier.ancien_doc_id:
+                    writer.delete_by_term('job_id', fichier.ancien_doc_id)
+                    documents.append((fichier.ancien_doc_id, None))
+                
                 # Chargement du JSON
                 job_json = self._charger_json(filepath)
                 
                 if job_json is None:
+                    manifeste.enregistrer(fichier, None)
                     self.error_count += 1
                     continue
                 
@@ -313,11 +394,12 @@ class JobIndexer:
                 job_data = self._extraire_donnees_offre(job_json)
                 
                 if job_data is None:
+                    manifeste.enregistrer(fichier, None)
                     self.error_count += 1
                     continue
                 
-                # Indexation
-                writer.add_document(
+                # Indexation (remplace le document de même job_id)
+                writer.update_document(
                     job_id=job_data['job_id'],
                     titre_poste=job_data['titre_poste'],
                     description=job_data['description'],
@@ -335,6 +417,9 @@ class JobIndexer:
                     nb_tokens_original=job_data['nb_tokens_original'],
                     nb_tokens_processed=job_data['nb_tokens_processed']
                 )
+                documents.append((job_data['job_id'], champs_documents(job_data, JOB_DOCSTORE_FIELDS)))
+                
+                manifeste.enregistrer(fichier, job_data['job_id'])
                 
                 # Affichage du résumé
                 self._afficher_resume_offre(i, job_data)
@@ -346,13 +431,112 @@ class JobIndexer:
                 self.error_count += 1
                 continue
         
-        # Commit des changements
+        # Commit des changements, puis du manifeste qui les décrit
         try:
+            get_document_store(self.index_dir).ecrire_lot(documents)
             writer.commit()
+            manifeste.sauvegarder()
+            self.debit.terminer(self.success_count)
             self._afficher_statistiques_finales()
         except Exception as e:
             logger.error(f"❌ Erreur lors du commit: {e}")
     
+    def indexer_flux(self, chemin: Path, force: bool = False, taille_lot: int = JOB_STREAM_BATCH_SIZE) -> Dict:
+        """
+        Indexe un flux d'offres JSON Lines (une offre par ligne, .gz accepté)
+        
+        Les lignes sont lues et prétraitées à la volée; un commit par lot de
+        taille_lot offres (mémoire bornée, un segment par lot, fusionnés par
+        la maintenance signalée une fois en fin de flux). Une ligne invalide (JSON, job_id, extraction) est
+        comptée et ignorée sans interrompre le flux. Les offres du flux ne
+        sont pas suivies par le manifeste du dossier data/jobs.
+        
+        Args:
+            chemin: Fichier .jsonl ou .jsonl.gz
+            force: Si True, recrée l'index complètement
+            taille_lot: Offres par commit
+            
+        Returns:
+            {"lignes", "indexees", "erreurs", "lots", "docs_par_seconde", "detail_erreurs"}
+        """
+        chemin = Path(chemin)
+        logger.info(f"🌊 Indexation du flux {chemin.name} (lots de {taille_lot})")
+        
+        self._creer_index(force=force)
+        ix = open_dir(str(self.index_dir))
+        self.debit = DebitIndexation()
+        stats = {"lignes": 0, "indexees": 0, "erreurs": 0, "lots": 0, "detail_erreurs": []}
+        
+        lot: Dict[str, dict] = {}  # job_id → offre (la dernière l'emporte)
+        for numero, ligne in lire_lignes_jsonl(chemin):
+            stats["lignes"] += 1
+            try:
+                job_json = json.loads(ligne)
+                if not isinstance(job_json, dict):
+                    raise ValueError("l'enregistrement n'est pas un objet JSON")
+                is_valid, error_msg = valider_job_id(job_json.get("job_id"))
+                if not is_valid:
+                    raise ValueError(error_msg)
+                job_data = self._extraire_donnees_offre(job_json)
+                if job_data is None:
+                    raise ValueError("extraction des données impossible")
+            except Exception as e:
+                stats["erreurs"] += 1
+                if len(stats["detail_erreurs"]) < JOB_STREAM_MAX_ERREURS_DETAIL:
+                    stats["detail_erreurs"].append(f"ligne {numero}: {e}")
+                logger.warning(f"⚠️ {chemin.name}:{numero} ignorée - {e}")
+                continue
+            
+            job_data['job_id'] = str(job_data['job_id']).strip()
+            lot[job_data['job_id']] = job_data
+            if len(lot) >= taille_lot:
+                self._commiter_lot_flux(ix, lot, stats)
+                lot = {}
+        
+        if lot:
+            self._commiter_lot_flux(ix, lot, stats)
+        
+        # Après le dernier lot: une fusion lancée entre deux lots tiendrait le verrou
+        try:
+            signaler_commit(self.index_dir)
+        except Exception as e:
+            logger.warning(f"⚠️ Comptage des segments impossible ({self.index_dir.name}): {e}")
+        
+        self.debit.terminer(stats["indexees"])
+        stats["docs_par_seconde"] = round(self.debit.docs_par_seconde, 1)
+        self.total_jobs = stats["lignes"]
+        self.success_count = stats["indexees"]
+        self.error_count = stats["erreurs"]
+        logger.info(
+            f"✅ Flux {chemin.name}: {stats['indexees']} offres indexées, {stats['erreurs']} lignes en erreur "
+            f"sur {stats['lignes']}, {stats['lots']} lots - {self.debit}"
+        )
+        return stats
+    
+    def _commiter_lot_flux(self, ix, lot: Dict[str, dict], stats: Dict):
+        """Un writer, le magasin de documents puis un commit pour le lot"""
+        # Un seul segment par lot; attente du verrou (upload ou fusion en cours)
+        writer = ouvrir_writer(
+            ix, len(lot), procs=self.index_procs, multisegment=False, timeout=INDEXING_LOCK_TIMEOUT_S
+        )
+        try:
+            for job_data in lot.values():
+                writer.update_document(**{champ: job_data[champ] for champ in job_schema.names()})
+            get_document_store(self.index_dir).ecrire_lot(
+                (job_id, champs_documents(job_data, JOB_DOCSTORE_FIELDS)) for job_id, job_data in lot.items()
+            )
+            writer.commit(merge=False)
+        except BaseException:
+            writer.cancel()
+            raise
+        
+        stats["indexees"] += len(lot)
+        stats["lots"] += 1
+        logger.info(
+            f"   📦 Lot {stats['lots']}: {stats['indexees']} offres / {stats['lignes']} lignes "
+            f"({stats['erreurs']} erreurs)"
+        )
+    
     def _afficher_resume_offre(self, index: int, job_data: dict):
         """Affiche un résumé formaté de l'offre indexée"""
         # Preview des compétences
@@ -392,7 +576,12 @@ class JobIndexer:
         logger.info(f"   • Offres indexées avec succès: {self.success_count}")
         logger.info(f"   • Offres en erreur: {self.error_count}")
         logger.info(f"   • Total traité: {self.total_jobs}")
-        logger.info(f"   • Taux de succès: {(self.success_count/self.total_jobs*100):.1f}%")
+        if self.total_jobs:
+            logger.info(f"   • Taux de succès: {(self.success_count/self.total_jobs*100):.1f}%")
+        if self.changements:
+            logger.info(f"   • Changements: {self.changements.resume()}")
+        if self.debit:
+            logger.info(f"   • Débit: {self.debit}")
         logger.info(f"\n📁 Index sauvegardé: {self.index_dir}")
         logger.info(f"\n🔍 Pipeline NLP appliqué:")
         logger.info(f"   ✓ Chargement JSON")
@@ -407,32 +596,44 @@ class JobIndexer:
 # ========================================================
 # FONCTION PRINCIPALE
 # ========================================================
-def indexer_offres_automatique(force: bool = False):
+def indexer_offres_automatique(force: bool = False, index_procs: Optional[int] = None):
     """
     Point d'entrée principal pour l'indexation automatique
     
     Args:
         force: Si True, recrée l'index complètement
+        index_procs: Processus d'écriture de l'index (None = INDEX_WRITER_PROCS)
+    
+    Returns:
+        Changements détectés par le manifeste (None si le dossier est illisible)
     """
-    indexer = JobIndexer()
+    indexer = JobIndexer(index_procs=index_procs)
     indexer.indexer_toutes_les_offres(force=force)
+    return indexer.changements
+
+
+def indexer_flux_offres(chemin: Path, force: bool = False, index_procs: Optional[int] = None) -> Dict:
+    """
+    Indexe un flux partenaire JSON Lines (.jsonl / .jsonl.gz)
+    
+    Returns:
+        Statistiques du flux (voir JobIndexer.indexer_flux)
+    """
+    indexer = JobIndexer(index_procs=index_procs)
+    return indexer.indexer_flux(Path(chemin), force=force)
 
 
 # ========================================================
 # FONCTION D'INDEXATION EN TEMPS RÉEL (FIXED)
 # ========================================================
-def indexer_offre_depuis_donnees(
+def soumettre_offre_depuis_donnees(
     job_id: str,
     job_data: dict,
     user_id: str = ""
-) -> bool:
+) -> Optional[Future]:
     """
-    Indexe une offre d'emploi en temps réel après soumission par le recruteur.
-    
-    FIXED:
-    - Validation robuste de job_id
-    - Gestion des doublons (suppression avant ajout)
-    - Gestion d'erreurs complète
+    Prépare le document d'une offre soumise par un recruteur et le confie
+    à la file d'indexation (commit groupé, voir IndexingService)
     
     Args:
         job_id: L'ID de l'offre dans la base de données PostgreSQL.
@@ -440,13 +641,13 @@ def indexer_offre_depuis_donnees(
         user_id: ID du recruteur qui a posté l'offre.
         
     Returns:
-        True si l'indexation réussit, False sinon.
+        Future résolu une fois l'offre commitée (None si l'offre est invalide)
     """
     # FIXED: Validation de job_id
     is_valid, error_msg = valider_job_id(job_id)
     if not is_valid:
         logger.error(f"❌ Validation échouée pour l'offre: {error_msg}")
-        return False
+        return None
     
     job_id_str = str(job_id).strip()
     
@@ -459,67 +660,51 @@ def indexer_offre_depuis_donnees(
         
         if job_data_processed is None:
             logger.error(f"❌ Échec du prétraitement pour l'offre #{job_id_str}.")
-            return False
-
+            return None
+        
         # Mise à jour de l'ID
         job_data_processed['job_id'] = job_id_str
-
-        # 1. Ouverture de l'index Whoosh
-        ix = open_dir(str(JOB_INDEX))
         
-        # FIXED: Suppression du doublon si existant
-        try:
-            with ix.searcher() as searcher:
-                from whoosh.qparser import QueryParser
-                query_parser = QueryParser("job_id", ix.schema)
-                query = query_parser.parse(job_id_str)
-                results = searcher.search(query)
-                
-                if len(results) > 0:
-                    logger.info(f"⚠️ Offre #{job_id_str} existe déjà. Suppression avant réindexation.")
-                    
-                    # Suppression via AsyncWriter
-                    with ix.writer() as writer:
-                        writer.delete_by_term("job_id", job_id_str)
-        except Exception as e:
-            logger.warning(f"⚠️ Vérification doublon échouée: {e}. Continuant l'indexation...")
+        # Upsert: remplace l'offre de même job_id si elle existe
+        return get_job_indexing_service().upsert({
+            champ: job_data_processed[champ] for champ in job_schema.names()
+        })
+    
+    except Exception as e:
+        logger.error(f"❌ Échec préparation offre #{job_id_str}: {e}")
+        return None
 
-        # 2. Indexation du document (nouveau writer après suppression)
-        writer = AsyncWriter(ix)
-        
-        try:
-            writer.add_document(
-                job_id=job_data_processed['job_id'],
-                titre_poste=job_data_processed['titre_poste'],
-                description=job_data_processed['description'],
-                titre_poste_processed=job_data_processed['titre_poste_processed'],
-                description_processed=job_data_processed['description_processed'],
-                competences_requises=job_data_processed['competences_requises'],
-                localisation=job_data_processed['localisation'],
-                niveau_souhaite=job_data_processed['niveau_souhaite'],
-                domaine=job_data_processed['domaine'],
-                annees_min=job_data_processed['annees_min'],
-                annees_max=job_data_processed['annees_max'],
-                entreprise=job_data_processed['entreprise'],
-                type_contrat=job_data_processed['type_contrat'],
-                mode_travail=job_data_processed['mode_travail'],
-                nb_tokens_original=job_data_processed['nb_tokens_original'],
-                nb_tokens_processed=job_data_processed['nb_tokens_processed']
-            )
-            
-            # 3. Commit
-            writer.commit()
-            logger.info(f"✅ Offre d'emploi #{job_id_str} indexée en temps réel par le recruteur {user_id}.")
-            return True
+
+def indexer_offre_depuis_donnees(
+    job_id: str,
+    job_data: dict,
+    user_id: str = ""
+) -> bool:
+    """
+    Indexe une offre d'emploi en temps réel après soumission par le recruteur
+    et attend son commit.
+    
+    Args:
+        job_id: L'ID de l'offre dans la base de données PostgreSQL.
+        job_data: Dictionnaire contenant les données brutes de l'offre.
+        user_id: ID du recruteur qui a posté l'offre.
         
-        except Exception as e:
-            writer.cancel()
-            logger.error(f"❌ Erreur lors de l'ajout du document #{job_id_str}: {e}")
-            return False
+    Returns:
+        True si l'indexation réussit, False sinon.
+    """
+    future = soumettre_offre_depuis_donnees(job_id, job_data, user_id)
+    if future is None:
+        return False
     
+    job_id_str = str(job_id).strip()
+    try:
+        future.result(timeout=INDEXING_WAIT_TIMEOUT_S)
     except Exception as e:
         logger.error(f"❌ Échec indexation offre #{job_id_str}: {e}")
         return False
+    
+    logger.info(f"✅ Offre d'emploi #{job_id_str} indexée en temps réel par le recruteur {user_id}.")
+    return True
 
 
 if __name__ == "__main__":
@@ -535,4 +720,8 @@ if __name__ == "__main__":
     if force_recreate:
         logger.info("🔄 Mode FORCE: L'index sera complètement recréé")
     
-    indexer_offres_automatique(force=force_recreate)
\ No newline at end of file
+    if "--jsonl" in sys.argv:
+        # Flux partenaire: python -m backend.indexation.job_indexer --jsonl offres.jsonl.gz
+        indexer_flux_offres(Path(sys.argv[sys.argv.index("--jsonl") + 1]), force=force_recreate)
+    else:
+        indexer_offres_automatique(force=force_recreate)
\ No newline at end of file
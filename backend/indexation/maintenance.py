@@ -0,0 +1,541 @@
+"""
+============================================================================
+SMARTHIRE - Maintenance des index Whoosh (CV, offres, requêtes)
+- Fusion des segments par paliers de taille: les petits commits (uploads)
+  sont regroupés sans réécrire à chaque fois les gros segments
+- Snapshots par liens physiques: les fichiers de segment et de TOC sont
+  immuables, un snapshot ne copie donc aucune donnée et deux snapshots
+  successifs partagent tous les segments inchangés (seul le magasin de
+  documents, complété en place, est copié)
+- Compaction du magasin de documents quand il est surtout obsolète
+- Rétention: les plus récents sont conservés, les plus anciens supprimés
+- Planificateur en arrière-plan: passage complet périodique dans le seul
+  processus qui le démarre (maître gunicorn), fusion seule à la demande
+  dans tout processus où un index dépasse SEGMENT_MAX_COUNT segments
+
+Usage:
+    python -m backend.indexation.maintenance                  # État des index
+    python -m backend.indexation.maintenance --fusion --snapshot --retention
+    python -m backend.indexation.maintenance --migrer-sauvegardes
+============================================================================
+"""
+
+import argparse
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from whoosh.index import exists_in, open_dir, LockError
+
+from backend.config.settings import (
+    CV_INDEX,
+    JOB_INDEX,
+    QUERY_INDEX,
+    INDEX_MANIFEST_FILENAME,
+    DOCSTORE_FILENAME,
+    DOCSTORE_COMPACT_RATIO,
+    INDEXING_LOCK_TIMEOUT_S,
+    SEGMENT_MAX_COUNT,
+    SEGMENT_MERGE_FACTOR,
+    SEGMENT_DELETED_RATIO,
+    MAINTENANCE_INTERVAL_S,
+    SNAPSHOT_DIR,
+    SNAPSHOT_INTERVAL_S,
+    SNAPSHOT_KEEP_LAST,
+    SNAPSHOT_MAX_AGE_DAYS
+)
+
+from backend.indexation.doc_store import get_document_store
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAINTENUS = {"cv": CV_INDEX, "jobs": JOB_INDEX, "queries": QUERY_INDEX}
+
+_FORMAT_HORODATAGE = "%Y%m%d_%H%M%S"
+_NOM_SNAPSHOT = re.compile(r"^(\d{8}_\d{6})_g(\d+)(?:_(\w+))?$")
+
+
+# ========================================================
+# FUSION DES SEGMENTS PAR PALIERS
+# ========================================================
+def plan_fusion(
+    segments: List,
+    facteur: int = SEGMENT_MERGE_FACTOR,
+    max_segments: int = SEGMENT_MAX_COUNT,
+    ratio_supprimes: float = SEGMENT_DELETED_RATIO
+) -> List:
+    """
+    Segments à fusionner
+
+    1. Segments dont une part importante des documents est supprimée
+    2. Paliers (log(nb docs, facteur)) qui comptent au moins `facteur` segments
+    3. Si le total reste au-dessus de max_segments: les plus petits restants
+    """
+    a_fusionner = []
+    paliers = defaultdict(list)
+    for segment in segments:
+        total = segment.doc_count_all()
+        if total and segment.deleted_count() / total >= ratio_supprimes:
+            a_fusionner.append(segment)
+        else:
+            paliers[int(math.log(max(total, 1), facteur))].append(segment)
+
+    for groupe in paliers.values():
+        if len(groupe) >= facteur:
+            a_fusionner.extend(groupe)
+
+    retenus = {segment.segment_id() for segment in a_fusionner}
+    restants = sorted(
+        (s for s in segments if s.segment_id() not in retenus),
+        key=lambda s: s.doc_count_all()
+    )
+    # Après fusion: restants non fusionnés + un nouveau segment
+    excedent = len(restants) + 1 - max_segments
+    if excedent > 0:
+        a_fusionner.extend(restants[:excedent if a_fusionner else max(excedent, 2)])
+    return a_fusionner
+
+
+def fusion_par_paliers(writer, segments):
+    """Politique de fusion Whoosh (writer.commit(mergetype=fusion_par_paliers))"""
+    from whoosh.reading import SegmentReader
+
+    retenus = {segment.segment_id() for segment in plan_fusion(segments)}
+    if not retenus:
+        return segments
+    restants = []
+    for segment in segments:
+        if segment.segment_id() in retenus:
+            reader = SegmentReader(writer.storage, writer.schema, segment)
+            writer.add_reader(reader)
+            reader.close()
+        else:
+            restants.append(segment)
+    return restants
+
+
+def compacter_documents(
+    index_dir: Path,
+    ratio: float = DOCSTORE_COMPACT_RATIO,
+    timeout_verrou: float = INDEXING_LOCK_TIMEOUT_S
+) -> Optional[Dict]:
+    """
+    Compacte le magasin de documents si au moins `ratio` de son contenu est
+    obsolète (verrou d'écriture tenu: aucun lot ne s'y ajoute entre-temps).
+    Les documents absents de l'index (lot dont le commit a échoué) partent aussi.
+    """
+    index_dir = Path(index_dir)
+    if not (index_dir / DOCSTORE_FILENAME).exists():
+        return None
+    magasin = get_document_store(index_dir)
+    if magasin.ratio_obsolete < ratio:
+        return None
+
+    ix = open_dir(str(index_dir))
+    champ_id = next(nom for nom, champ in ix.schema.items() if getattr(champ, "unique", False))
+    writer = ix.writer(timeout=timeout_verrou)
+    try:
+        with ix.searcher() as searcher:
+            vivants = {champs.get(champ_id) for champs in searcher.all_stored_fields()}
+        return magasin.compacter(vivants)
+    finally:
+        writer.cancel()
+
+
+def nombre_segments(index_dir: Path) -> int:
+    return len(open_dir(str(index_dir))._segments()) if exists_in(str(index_dir)) else 0
+
+
+def fusionner_segments(index_dir: Path, timeout_verrou: float = INDEXING_LOCK_TIMEOUT_S) -> Dict:
+    """
+    Applique la politique par paliers (aucun commit si rien n'est à fusionner)
+
+    Returns:
+        {"avant": n, "apres": m, "fusionnes": k}
+    """
+    ix = open_dir(str(index_dir))
+    avant = len(ix._segments())
+    plan = plan_fusion(ix._segments())
+    if not plan:
+        return {"avant": avant, "apres": avant, "fusionnes": 0}
+
+    debut = time.perf_counter()
+    writer = ix.writer(timeout=timeout_verrou)
+    try:
+        writer.commit(mergetype=fusion_par_paliers)
+    except BaseException:
+        writer.cancel()
+        raise
+    apres = nombre_segments(index_dir)
+    logger.info(
+        f"🔀 {Path(index_dir).name}: {avant} → {apres} segments "
+        f"({len(plan)} fusionnés en {time.perf_counter() - debut:.2f}s)"
+    )
+    return {"avant": avant, "apres": apres, "fusionnes": len(plan)}
+
+
+# ========================================================
+# SNAPSHOTS (LIENS PHYSIQUES)
+# ========================================================
+def _lier(source: Path, destination: Path):
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Autre système de fichiers ou liens non supportés
+        shutil.copy2(source, destination)
+
+
+def lister_snapshots(index_dir: Path, racine: Path = SNAPSHOT_DIR) -> List[Path]:
+    """Snapshots d'un index, du plus ancien au plus récent"""
+    dossier = Path(racine) / Path(index_dir).name
+    if not dossier.exists():
+        return []
+    return sorted(p for p in dossier.iterdir() if p.is_dir() and _NOM_SNAPSHOT.match(p.name))
+
+
+def _date_snapshot(snapshot: Path) -> datetime:
+    return datetime.strptime(_NOM_SNAPSHOT.match(snapshot.name).group(1), _FORMAT_HORODATAGE)
+
+
+def creer_snapshot(
+    index_dir: Path,
+    racine: Path = SNAPSHOT_DIR,
+    etiquette: str = "",
+    si_plus_ancien_que: Optional[float] = None,
+    timeout_verrou: float = INDEXING_LOCK_TIMEOUT_S
+) -> Optional[Path]:
+    """
+    Snapshot cohérent de la dernière génération de l'index
+
+    Le verrou d'écriture est tenu le temps de créer les liens (aucun commit
+    ne peut supprimer un segment entre-temps).
+
+    Args:
+        index_dir: Dossier de l'index
+        racine: Dossier des snapshots (un sous-dossier par index)
+        etiquette: Suffixe du nom (ex: "pre_restore")
+        si_plus_ancien_que: Ne rien faire si le dernier snapshot a moins de
+            ce nombre de secondes (vérifié sous verrou: plusieurs processus
+            peuvent appeler cette fonction sans doublon)
+
+    Returns:
+        Dossier du snapshot, ou None si aucun n'a été créé
+    """
+    index_dir = Path(index_dir)
+    ix = open_dir(str(index_dir))
+    writer = ix.writer(timeout=timeout_verrou)
+    try:
+        if si_plus_ancien_que is not None:
+            existants = lister_snapshots(index_dir, racine)
+            if existants and (datetime.now() - _date_snapshot(existants[-1])).total_seconds() < si_plus_ancien_que:
+                return None
+
+        generation = writer.generation - 1
+        fichiers = {f"_{writer.indexname}_{generation}.toc"}
+        for segment in writer.segments:
+            fichiers.update(segment.list_files(writer.storage))
+        # Le manifeste est remplacé (os.replace) et jamais modifié sur place
+        if (index_dir / INDEX_MANIFEST_FILENAME).exists():
+            fichiers.add(INDEX_MANIFEST_FILENAME)
+
+        nom = f"{datetime.now().strftime(_FORMAT_HORODATAGE)}_g{generation}" + (f"_{etiquette}" if etiquette else "")
+        destination = Path(racine) / index_dir.name / nom
+        if destination.exists():
+            return destination
+        tmp = destination.with_name(destination.name + ".tmp")
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        for fichier in sorted(fichiers):
+            _lier(index_dir / fichier, tmp / fichier)
+        # Magasin de documents: complété en place, donc copié
+        if (index_dir / DOCSTORE_FILENAME).exists():
+            shutil.copy2(index_dir / DOCSTORE_FILENAME, tmp / DOCSTORE_FILENAME)
+        tmp.rename(destination)
+    finally:
+        writer.cancel()
+
+    logger.info(f"📸 Snapshot {index_dir.name}: {destination.name} ({len(fichiers)} fichiers liés)")
+    return destination
+
+
+def appliquer_retention(
+    index_dir: Path,
+    racine: Path = SNAPSHOT_DIR,
+    garder_derniers: int = SNAPSHOT_KEEP_LAST,
+    age_max_jours: float = SNAPSHOT_MAX_AGE_DAYS
+) -> List[Path]:
+    """
+    Supprime les snapshots au-delà des `garder_derniers` plus récents et
+    plus vieux que `age_max_jours`
+
+    Returns:
+        Snapshots supprimés
+    """
+    snapshots = lister_snapshots(index_dir, racine)
+    anciens = snapshots[:-garder_derniers] if garder_derniers > 0 else snapshots
+    limite = datetime.now().timestamp() - age_max_jours * 86400
+    supprimes = [s for s in anciens if _date_snapshot(s).timestamp() < limite]
+    for snapshot in supprimes:
+        shutil.rmtree(snapshot, ignore_errors=True)
+    if supprimes:
+        logger.info(f"🧹 {Path(index_dir).name}: {len(supprimes)} snapshot(s) supprimé(s)")
+    return supprimes
+
+
+def restaurer_snapshot(index_dir: Path, snapshot: Path, racine: Path = SNAPSHOT_DIR) -> Path:
+    """
+    Remplace l'index par un snapshot (l'état courant est d'abord conservé
+    dans un snapshot "pre_restore")
+    """
+    index_dir, snapshot = Path(index_dir), Path(snapshot)
+    if not exists_in(str(snapshot)):
+        raise ValueError(f"Snapshot invalide: {snapshot}")
+    if exists_in(str(index_dir)):
+        creer_snapshot(index_dir, racine, etiquette="pre_restore")
+
+    tmp = index_dir.with_name(index_dir.name + ".restore")
+    ancien = index_dir.with_name(index_dir.name + ".old")
+    for dossier in (tmp, ancien):
+        if dossier.exists():
+            shutil.rmtree(dossier)
+    tmp.mkdir(parents=True)
+    for fichier in snapshot.iterdir():
+        if fichier.name == DOCSTORE_FILENAME:
+            shutil.copy2(fichier, tmp / fichier.name)
+        else:
+            _lier(fichier, tmp / fichier.name)
+
+    if index_dir.exists():
+        os.replace(index_dir, ancien)
+    os.replace(tmp, index_dir)
+    shutil.rmtree(ancien, ignore_errors=True)
+    logger.info(f"♻️ {index_dir.name} restauré depuis {snapshot.name}")
+    return index_dir
+
+
+def migrer_sauvegardes(index_dir: Path, racine: Path = SNAPSHOT_DIR) -> List[Path]:
+    """
+    Range les anciennes copies complètes (<index>_backup_*, <index>_pre_restore_*)
+    parmi les snapshots (déplacement, sans copie), où la rétention s'applique
+    """
+    index_dir = Path(index_dir)
+    motif = re.compile(rf"^{re.escape(index_dir.name)}_(backup|pre_restore)_(\d{{8}}_\d{{6}}|\d+)$")
+    migres = []
+    for dossier in sorted(index_dir.parent.iterdir()):
+        correspondance = motif.match(dossier.name)
+        if not correspondance or not exists_in(str(dossier)):
+            continue
+        etiquette, horodatage = correspondance.groups()
+        if horodatage.isdigit():
+            horodatage = datetime.fromtimestamp(int(horodatage)).strftime(_FORMAT_HORODATAGE)
+        generation = open_dir(str(dossier)).latest_generation()
+        destination = Path(racine) / index_dir.name / f"{horodatage}_g{generation}_{etiquette}"
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(dossier, destination)
+        (destination / "MAIN_WRITELOCK").unlink(missing_ok=True)
+        migres.append(destination)
+    if migres:
+        logger.info(f"📦 {index_dir.name}: {len(migres)} sauvegarde(s) rangée(s) dans {Path(racine) / index_dir.name}")
+    return migres
+
+
+# ========================================================
+# ÉTAT
+# ========================================================
+def etat_index(index_dir: Path, racine: Path = SNAPSHOT_DIR) -> Dict:
+    """Segments, documents et snapshots d'un index"""
+    index_dir = Path(index_dir)
+    if not exists_in(str(index_dir)):
+        return {"index": index_dir.name, "existe": False}
+    segments = open_dir(str(index_dir))._segments()
+    snapshots = lister_snapshots(index_dir, racine)
+    magasin = get_document_store(index_dir).get_stats() if (index_dir / DOCSTORE_FILENAME).exists() else None
+    return {
+        "index": index_dir.name,
+        "existe": True,
+        "segments": len(segments),
+        "documents": sum(s.doc_count() for s in segments),
+        "supprimes": sum(s.deleted_count() for s in segments),
+        "taille_mo": round(sum(f.stat().st_size for f in index_dir.iterdir() if f.is_file()) / 1e6, 2),
+        "snapshots": len(snapshots),
+        "dernier_snapshot": snapshots[-1].name if snapshots else None,
+        "magasin_documents": magasin
+    }
+
+
+# ========================================================
+# PLANIFICATEUR
+# ========================================================
+class PlanificateurMaintenance:
+    """
+    Thread de maintenance: toutes les `intervalle` secondes, fusion par
+    paliers, compaction du magasin de documents, snapshot (au plus un par
+    `intervalle_snapshot`) et rétention
+    de chaque index; réveillé plus tôt par demander_fusion()
+
+    Seul le processus propriétaire appelle demarrer(): ailleurs (workers,
+    CLI), demander_fusion() lance un thread de fusion seule, qui s'arrête
+    une fois les demandes traitées
+    """
+
+    def __init__(
+        self,
+        index_dirs: Iterable[Path] = INDEX_MAINTENUS.values(),
+        intervalle: float = MAINTENANCE_INTERVAL_S,
+        intervalle_snapshot: float = SNAPSHOT_INTERVAL_S,
+        racine: Path = SNAPSHOT_DIR
+    ):
+        self.index_dirs = [Path(d) for d in index_dirs]
+        self.intervalle = intervalle
+        self.intervalle_snapshot = intervalle_snapshot
+        self.racine = Path(racine)
+
+        self._demandes: Set[Path] = set()
+        self._reveil = threading.Event()
+        self._arret = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_fusion: Optional[threading.Thread] = None
+
+    def demarrer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._arret.clear()
+                self._thread = threading.Thread(target=self._boucle, name="maintenance-index", daemon=True)
+                self._thread.start()
+
+    def arreter(self):
+        self._arret.set()
+        self._reveil.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def demander_fusion(self, index_dir: Path):
+        """Fusion à faire dès que possible (seuil de segments dépassé)"""
+        with self._lock:
+            self._demandes.add(Path(index_dir))
+            periodique = self._thread is not None and self._thread.is_alive()
+            fusion_en_cours = self._thread_fusion is not None and self._thread_fusion.is_alive()
+            if not periodique and not fusion_en_cours:
+                self._thread_fusion = threading.Thread(target=self._fusions, name="fusion-index", daemon=True)
+                self._thread_fusion.start()
+        if periodique:
+            self._reveil.set()
+
+    def executer(self, index_dirs: Optional[Iterable[Path]] = None, snapshots: bool = True):
+        """Un passage complet (ou la fusion seule si snapshots=False)"""
+        for index_dir in index_dirs or self.index_dirs:
+            if not exists_in(str(index_dir)):
+                continue
+            try:
+                fusionner_segments(index_dir)
+                compacter_documents(index_dir)
+                if snapshots:
+                    creer_snapshot(index_dir, self.racine, si_plus_ancien_que=self.intervalle_snapshot)
+                    appliquer_retention(index_dir, self.racine)
+            except LockError:
+                logger.info(f"⏳ {index_dir.name} verrouillé (indexation en cours), maintenance reportée")
+            except Exception as e:
+                logger.error(f"❌ Maintenance {index_dir.name}: {e}")
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            reveille = self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            if self._arret.is_set():
+                break
+            with self._lock:
+                demandes, self._demandes = self._demandes, set()
+            if reveille:
+                self.executer(demandes, snapshots=False)
+            else:
+                self.executer()
+
+    def _fusions(self):
+        """Fusion seule des index demandés, jusqu'à épuisement des demandes"""
+        while True:
+            with self._lock:
+                demandes, self._demandes = self._demandes, set()
+                if not demandes:
+                    self._thread_fusion = None
+                    return
+            self.executer(demandes, snapshots=False)
+
+
+_planificateur: Optional[PlanificateurMaintenance] = None
+_planificateur_lock = threading.Lock()
+
+
+def get_planificateur() -> PlanificateurMaintenance:
+    global _planificateur
+    with _planificateur_lock:
+        if _planificateur is None:
+            _planificateur = PlanificateurMaintenance()
+        return _planificateur
+
+
+def _oublier_planificateur():
+    """Dans l'enfant d'un fork: planificateur (threads, verrous) du parent oublié"""
+    global _planificateur, _planificateur_lock
+    _planificateur = None
+    _planificateur_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_oublier_planificateur)
+
+
+def signaler_commit(index_dir: Path, seuil: int = SEGMENT_MAX_COUNT):
+    """Après un commit sans fusion: réveille le planificateur si le seuil est dépassé"""
+    if nombre_segments(index_dir) > seuil:
+        get_planificateur().demander_fusion(index_dir)
+
+
+# ========================================================
+# CLI
+# ========================================================
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance des index SmartHire")
+    parser.add_argument("--index", choices=[*INDEX_MAINTENUS, "all"], default="all")
+    parser.add_argument("--fusion", action="store_true", help="Fusion des segments par paliers")
+    parser.add_argument("--snapshot", action="store_true", help="Snapshot par liens physiques")
+    parser.add_argument("--retention", action="store_true", help="Supprime les snapshots expirés")
+    parser.add_argument("--migrer-sauvegardes", action="store_true", help="Range les anciennes copies complètes parmi les snapshots")
+    parser.add_argument("--restaurer", metavar="SNAPSHOT", help="Restaure l'index choisi depuis ce snapshot")
+    args = parser.parse_args()
+
+    index_dirs = list(INDEX_MAINTENUS.values()) if args.index == "all" else [INDEX_MAINTENUS[args.index]]
+
+    if args.restaurer:
+        if len(index_dirs) != 1:
+            parser.error("--restaurer exige --index")
+        restaurer_snapshot(index_dirs[0], Path(args.restaurer))
+
+    for index_dir in index_dirs:
+        if args.migrer_sauvegardes:
+            migrer_sauvegardes(index_dir)
+        if not exists_in(str(index_dir)):
+            continue
+        if args.fusion:
+            fusionner_segments(index_dir)
+        if args.snapshot:
+            creer_snapshot(index_dir)
+        if args.retention or args.migrer_sauvegardes:
+            appliquer_retention(index_dir)
+
+    for index_dir in index_dirs:
+        print(etat_index(index_dir))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main()
@@ -0,0 +1,170 @@
+"""
+============================================================================
+SMARTHIRE - Manifeste d'indexation incrémentale
+Pour chaque fichier source déjà indexé: (mtime, taille, empreinte, doc_id).
+Une réindexation ne traite que les fichiers ajoutés ou modifiés et supprime
+de l'index les documents dont le fichier a disparu. Un fichier dont mtime et
+taille n'ont pas bougé n'est pas relu: un dossier inchangé se vérifie par
+de simples stat().
+============================================================================
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from backend.config.settings import INDEX_MANIFEST_FILENAME
+
+logger = logging.getLogger(__name__)
+
+_VERSION_MANIFESTE = 1
+_TAILLE_BLOC = 1 << 20
+
+
+def empreinte_fichier(chemin: Path) -> str:
+    """Empreinte du contenu (blake2b 128 bits, lecture par blocs)"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(chemin, 'rb') as f:
+        for bloc in iter(lambda: f.read(_TAILLE_BLOC), b""):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+class FichierModifie(NamedTuple):
+    """Fichier à (ré)indexer; ancien_doc_id est None pour un ajout"""
+    chemin: Path
+    empreinte: str
+    ancien_doc_id: Optional[str]
+
+
+class Changements(NamedTuple):
+    """Différence entre un dossier et le manifeste de son index"""
+    ajoutes: List[FichierModifie]
+    modifies: List[FichierModifie]
+    supprimes: Dict[str, Optional[str]]  # nom de fichier → doc_id indexé
+    inchanges: int
+
+    @property
+    def a_indexer(self) -> List[FichierModifie]:
+        return sorted(self.ajoutes + self.modifies, key=lambda f: f.chemin.name)
+
+    @property
+    def vide(self) -> bool:
+        return not (self.ajoutes or self.modifies or self.supprimes)
+
+    def resume(self) -> Dict[str, int]:
+        return {
+            "ajoutes": len(self.ajoutes),
+            "modifies": len(self.modifies),
+            "supprimes": len(self.supprimes),
+            "inchanges": self.inchanges
+        }
+
+
+class ManifesteIndex:
+    """
+    Manifeste JSON rangé dans le dossier de l'index (supprimé avec lui
+    lors d'une recréation forcée)
+
+    La signature décrit le pipeline qui a produit les documents: si elle
+    change (version du prétraitement, référentiel de compétences...), tous
+    les fichiers sont considérés comme modifiés.
+    """
+
+    def __init__(self, index_dir: Path, signature: str = ""):
+        self.chemin = Path(index_dir) / INDEX_MANIFEST_FILENAME
+        self.signature = signature
+        self.fichiers: Dict[str, dict] = {}
+        self._charger()
+
+    def _charger(self):
+        if not self.chemin.exists():
+            return
+        try:
+            with open(self.chemin, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Manifeste illisible ({self.chemin}): {e}. Réindexation complète.")
+            return
+        if data.get("version") != _VERSION_MANIFESTE or data.get("signature") != self.signature:
+            logger.info("🔄 Pipeline d'indexation modifié: tous les fichiers seront réindexés")
+            # Les doc_id restent connus pour supprimer les fichiers disparus
+            self.fichiers = {nom: {"doc_id": e.get("doc_id")} for nom, e in data.get("fichiers", {}).items()}
+            return
+        self.fichiers = data.get("fichiers", {})
+
+    def detecter_changements(self, fichiers: Iterable[Path]) -> Changements:
+        """
+        Compare un ensemble de fichiers au manifeste
+
+        mtime et taille identiques → inchangé sans lecture. Sinon le contenu
+        est haché: un fichier seulement « touché » reste inchangé (son mtime
+        est mis à jour dans le manifeste).
+        """
+        ajoutes, modifies = [], []
+        inchanges = 0
+        vus = set()
+
+        for chemin in fichiers:
+            chemin = Path(chemin)
+            vus.add(chemin.name)
+            try:
+                stat = chemin.stat()
+            except OSError as e:
+                logger.warning(f"⚠️ Fichier inaccessible ignoré {chemin.name}: {e}")
+                continue
+
+            entree = self.fichiers.get(chemin.name)
+            if entree and entree.get("mtime_ns") == stat.st_mtime_ns and entree.get("taille") == stat.st_size:
+                inchanges += 1
+                continue
+
+            empreinte = empreinte_fichier(chemin)
+            if entree is None:
+                ajoutes.append(FichierModifie(chemin, empreinte, None))
+            elif entree.get("empreinte") == empreinte:
+                entree["mtime_ns"] = stat.st_mtime_ns
+                entree["taille"] = stat.st_size
+                inchanges += 1
+            else:
+                modifies.append(FichierModifie(chemin, empreinte, entree.get("doc_id")))
+
+        supprimes = {
+            nom: entree.get("doc_id")
+            for nom, entree in self.fichiers.items()
+            if nom not in vus
+        }
+        return Changements(ajoutes, modifies, supprimes, inchanges)
+
+    def enregistrer(self, fichier: FichierModifie, doc_id: Optional[str]):
+        """
+        Consigne un fichier traité (doc_id None si son extraction a échoué:
+        il ne sera retenté qu'après modification ou avec --force)
+        """
+        try:
+            stat = fichier.chemin.stat()
+        except OSError:
+            return
+        self.fichiers[fichier.chemin.name] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "taille": stat.st_size,
+            "empreinte": fichier.empreinte,
+            "doc_id": doc_id
+        }
+
+    def oublier(self, nom: str):
+        self.fichiers.pop(nom, None)
+
+    def sauvegarder(self):
+        """Écriture atomique (après le commit de l'index)"""
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.chemin.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"version": _VERSION_MANIFESTE, "signature": self.signature, "fichiers": self.fichiers},
+                f, ensure_ascii=False, separators=(",", ":")
+            )
+        os.replace(tmp, self.chemin)
@@ -5,15 +5,17 @@ INSERTION MANUELLE - Validation et insertion directe en base
 
 import os
 import json
+import logging
 import sys
 import traceback
 from datetime import datetime
 
 # Ajouter le chemin parent pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from database.connection import get_db_connection
-from database.shared_queries import insert_system_cv, insert_system_offre
+from backend.indexation.bulk_loader import charger_donnees_validees
 
 class InsertionManuelle:
     def __init__(self):
@@ -110,11 +112,24 @@ class InsertionManuelle:
         print("="*80)
         
         conn = get_db_connection()
-        cur = conn.cursor()
+        try:
+            # Une transaction, INSERT multi-lignes par lots (bulk_loader)
+            charge = charger_donnees_validees(conn, cvs_corriges, offres_corrigees)
+        except Exception as e:
+            print(f"❌ Insertion annulée (aucune donnée insérée): {e}")
+            raise
+        finally:
+            conn.close()
+        
+        for source_id, erreur in charge["rejetes"].items():
+            print(f"   ❌ {source_id}: {erreur}")
+        cvs_inseres = len(charge["cvs"])
+        offres_inserees = len(charge["offres"])
+        print(f"📄 CVs: {cvs_inseres} | 💼 Offres: {offres_inserees} | ⚡ {charge['debit']}")
         
         mapping_ids = {
-            "cvs": {},
-            "offres": {},
+            "cvs": charge["cvs"],
+            "offres": charge["offres"],
             "metadata": {
                 "date_insertion": datetime.now().isoformat(),
                 "total_cvs": 0,
@@ -122,62 +137,6 @@ class InsertionManuelle:
             }
         }
         
-        # Insertion CVs
-        print("📄 INSERTION DES CVs...")
-        cvs_inseres = 0
-        for cv_id, cv_data in cvs_corriges.items():
-            if cv_data.get('statut') == 'corrige':
-                try:
-                    cur.execute(insert_system_cv(), (
-                        cv_data['nom'], 
-                        cv_data.get('email', ''), 
-                        cv_data['competences'],
-                        cv_data['niveau_estime'], 
-                        cv_data['localisation'],
-                        cv_data['type_contrat'], 
-                        cv_data['diplome'],
-                        cv_data['annees_experience'], 
-                        cv_data['tags_manuels'],
-                        cv_data['chemin_pdf'], 
-                        cv_data['texte_complet']
-                    ))
-                    db_id = cur.fetchone()[0]
-                    mapping_ids["cvs"][cv_id] = db_id
-                    cvs_inseres += 1
-                    print(f"   ✅ {cv_id} → ID {db_id}")
-                except Exception as e:
-                    print(f"   ❌ {cv_id}: {e}")
-        
-        # Insertion offres
-        print("\n💼 INSERTION DES OFFRES...")
-        offres_inserees = 0
-        for offre_id, offre_data in offres_corrigees.items():
-            if offre_data.get('statut') == 'corrige':
-                try:
-                    cur.execute(insert_system_offre(), (
-                        offre_data['titre'], 
-                        offre_data['entreprise'],
-                        offre_data['competences_requises'], 
-                        offre_data['description'],
-                        offre_data['localisation'], 
-                        offre_data['niveau_souhaite'],
-                        offre_data['type_contrat'], 
-                        offre_data['diplome_requis'],
-                        offre_data['experience_min'], 
-                        offre_data['tags_manuels'],
-                        offre_data['texte_complet']
-                    ))
-                    db_id = cur.fetchone()[0]
-                    mapping_ids["offres"][offre_id] = db_id
-                    offres_inserees += 1
-                    print(f"   ✅ {offre_id} → ID {db_id}")
-                except Exception as e:
-                    print(f"   ❌ {offre_id}: {e}")
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        
         # Mettre à jour les métadonnées
         mapping_ids["metadata"]["total_cvs"] = cvs_inseres
         mapping_ids["metadata"]["total_offres"] = offres_inserees
@@ -258,5 +217,6 @@ class InsertionManuelle:
             traceback.print_exc()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     insertion = InsertionManuelle()
     insertion.executer()
\ No newline at end of file
@@ -2,21 +2,46 @@
 ============================================================================
 SMARTHIRE - Schema Migration Script
 Migration des index existants pour ajouter les nouveaux champs
-sans perdre les données
+sans perdre les données, et passage au schéma compact (champs volumineux
+dans le magasin de documents au lieu des segments Whoosh, colonnes pour
+les champs triables)
+
+Usage:
+    python -m backend.indexation.migration_schema             # Champs additionnels CV
+    python -m backend.indexation.migration_schema --compact   # Schéma compact CV + offres
 ============================================================================
 """
 
+import argparse
 import logging
+import os
+import shutil
+import statistics
 import sys
+import time
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 # Ajout du répertoire parent au path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from whoosh.index import open_dir, exists_in
+from whoosh.index import open_dir, exists_in, create_in, LockError
+from whoosh.util.filelock import try_for
 from whoosh.fields import Schema, TEXT, ID, KEYWORD, NUMERIC
 
-from backend.config.settings import CV_INDEX, JOB_INDEX
+from backend.config.settings import (
+    CV_INDEX,
+    JOB_INDEX,
+    CV_DOCSTORE_FIELDS,
+    JOB_DOCSTORE_FIELDS,
+    DOCSTORE_FILENAME,
+    INDEX_MANIFEST_FILENAME,
+    INDEX_WRITER_LIMITMB,
+    INDEXING_LOCK_TIMEOUT_S,
+    SNAPSHOT_DIR
+)
+from backend.indexation.doc_store import DocumentStore, champs_documents
+from backend.indexation.maintenance import creer_snapshot
 
 logging.basicConfig(
     level=logging.INFO,
@@ -182,12 +207,161 @@ def verifier_migration():
         return False
 
 
+# ========================================================
+# SCHÉMA COMPACT (MAGASIN DE DOCUMENTS)
+# ========================================================
+def mesurer_index(index_dir: Path, repetitions: int = 5) -> Dict:
+    """
+    Taille des segments et durée d'ouverture d'un searcher (ouverture de
+    l'index, du searcher et lecture des champs stockés d'un document;
+    médiane sur `repetitions` ouvertures)
+    """
+    index_dir = Path(index_dir)
+    hors_segments = {DOCSTORE_FILENAME, INDEX_MANIFEST_FILENAME}
+    taille_segments = sum(
+        f.stat().st_size for f in index_dir.iterdir()
+        if f.is_file() and f.name not in hors_segments
+    )
+    magasin = index_dir / DOCSTORE_FILENAME
+
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        with open_dir(str(index_dir)).searcher() as searcher:
+            if searcher.doc_count_all():
+                searcher.stored_fields(0)
+        durees.append(time.perf_counter() - debut)
+
+    return {
+        "segments_mo": round(taille_segments / 1e6, 3),
+        "magasin_mo": round(magasin.stat().st_size / 1e6, 3) if magasin.exists() else 0.0,
+        "ouverture_ms": round(statistics.median(durees) * 1000, 2)
+    }
+
+
+def migrer_vers_schema_compact(
+    index_dir: Path,
+    schema: Schema,
+    deportes: Tuple[str, ...],
+    limitmb: int = INDEX_WRITER_LIMITMB,
+    racine_snapshots: Path = SNAPSHOT_DIR
+) -> Optional[Dict]:
+    """
+    Reconstruit un index avec le schéma compact: les champs `deportes` sont
+    toujours indexés (relus depuis leur valeur stockée ou le magasin) mais
+    leur contenu passe dans le magasin de documents. Un index dont les
+    colonnes (sortable=True) ou les champs stockés diffèrent du schéma cible
+    est aussi reconstruit.
+
+    L'index courant est d'abord sauvegardé (snapshot "pre_migration"); le
+    nouvel index est construit à côté puis échangé.
+
+    Returns:
+        {"documents", "avant", "apres"} (mesures de mesurer_index), ou None
+    """
+    index_dir = Path(index_dir)
+    if not exists_in(str(index_dir)):
+        logger.error(f"❌ L'index n'existe pas: {index_dir}")
+        return None
+
+    ix = open_dir(str(index_dir))
+    if not _schema_differe(ix.schema, schema):
+        logger.info(f"✅ {index_dir.name}: schéma déjà compact")
+        return None
+
+    avant = mesurer_index(index_dir)
+    creer_snapshot(index_dir, racine_snapshots, etiquette="pre_migration")
+    champ_id = next(nom for nom, champ in schema.items() if getattr(champ, "unique", False))
+
+    tmp = index_dir.with_name(index_dir.name + ".migration")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    # Verrou de l'ancien index: aucune écriture pendant la reconstruction
+    verrou = ix.lock("WRITELOCK")
+    if not try_for(verrou.acquire, timeout=INDEXING_LOCK_TIMEOUT_S):
+        raise LockError(f"Index verrouillé: {index_dir}")
+    try:
+        writer = create_in(str(tmp), schema).writer(limitmb=limitmb)
+        documents = []
+        magasin = DocumentStore(index_dir)
+        with ix.searcher() as searcher:
+            for champs in searcher.all_stored_fields():
+                # Index déjà compact: champs déportés relus dans le magasin
+                champs = {**(magasin.lire(champs[champ_id]) or {}), **champs}
+                writer.add_document(**{nom: valeur for nom, valeur in champs.items() if nom in schema})
+                documents.append((champs[champ_id], champs_documents(champs, deportes)))
+        magasin.fermer()
+        DocumentStore(tmp).ecrire_lot(documents)
+        writer.commit(optimize=True)
+
+        if (index_dir / INDEX_MANIFEST_FILENAME).exists():
+            shutil.copy2(index_dir / INDEX_MANIFEST_FILENAME, tmp / INDEX_MANIFEST_FILENAME)
+
+        ancien = index_dir.with_name(index_dir.name + ".old")
+        if ancien.exists():
+            shutil.rmtree(ancien)
+        os.replace(index_dir, ancien)
+        os.replace(tmp, index_dir)
+    finally:
+        verrou.release()
+    shutil.rmtree(ancien, ignore_errors=True)
+
+    apres = mesurer_index(index_dir)
+    logger.info(
+        f"✅ {index_dir.name}: {len(documents)} documents, segments "
+        f"{avant['segments_mo']} → {apres['segments_mo']} Mo (+ magasin {apres['magasin_mo']} Mo), "
+        f"ouverture {avant['ouverture_ms']} → {apres['ouverture_ms']} ms"
+    )
+    return {"documents": len(documents), "avant": avant, "apres": apres}
+
+
+def _schema_differe(actuel: Schema, cible: Schema) -> bool:
+    """Champs stockés ou colonnes différents entre deux schémas"""
+    for nom, champ in cible.items():
+        if nom not in actuel:
+            continue
+        if actuel[nom].stored != champ.stored:
+            return True
+        if bool(actuel[nom].column_type) != bool(champ.column_type):
+            return True
+    return False
+
+
+def migrer_index_compacts() -> bool:
+    """Schéma compact pour les index des CV et des offres"""
+    from backend.indexation.cv_indexer import cv_schema
+    from backend.indexation.job_indexer import job_schema
+
+    succes = True
+    for index_dir, schema, deportes in (
+        (CV_INDEX, cv_schema, CV_DOCSTORE_FIELDS),
+        (JOB_INDEX, job_schema, JOB_DOCSTORE_FIELDS)
+    ):
+        try:
+            migrer_vers_schema_compact(index_dir, schema, deportes)
+        except Exception as e:
+            logger.error(f"❌ Erreur migration compacte {index_dir.name}: {e}")
+            succes = False
+    return succes
+
+
 def main():
     """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(description="Migration des index SmartHire")
+    parser.add_argument("--compact", action="store_true", help="Champs volumineux vers le magasin de documents")
+    args = parser.parse_args()
+    
     logger.info("="*80)
     logger.info("SMARTHIRE - MIGRATION DES INDEX")
     logger.info("="*80)
     
+    if args.compact:
+        if not migrer_index_compacts():
+            sys.exit(1)
+        return
+    
     # Migration
     succes = migrer_index_cv()
     
@@ -11,16 +11,39 @@ Pipeline complet de traitement de texte:
 ============================================================================
 """
 
+import os
 import re
+import json
+import hashlib
 import string
 import logging
-from typing import List, Tuple, Set
-import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, islice
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Set
 
-from backend.config.settings import NLTK_DOWNLOADS, CUSTOM_STOPWORDS
+from backend.config.settings import (
+    CUSTOM_STOPWORDS,
+    LEMMA_CACHE_SIZE,
+    LEMMA_TABLE_FILE,
+    LEMMA_TABLE_VERSION,
+    TOKENIZER_MODE,
+    PREPROCESS_WORKERS,
+    PREPROCESS_CHUNK_SIZE,
+    PREPROCESS_VERSION
+)
+from backend.indexation.token_cache import cle_cache, get_token_cache
+from backend.utils.skill_matcher import get_skill_matcher
+from backend.utils.nltk_resources import (
+    charger_stopwords,
+    exiger_ressource,
+    telecharger_ressources,
+    verifier_ressources
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,31 +51,275 @@ logger = logging.getLogger(__name__)
 # INITIALISATION NLTK
 # ========================================================
 def init_nltk():
-    """Télécharge toutes les ressources NLTK nécessaires"""
+    """Télécharge toutes les ressources NLTK nécessaires (installation uniquement)"""
     try:
-        for resource in NLTK_DOWNLOADS:
-            nltk.download(resource, quiet=True)
+        etat = telecharger_ressources()
+        manquantes = [nom for nom, present in etat.items() if not present]
+        if manquantes:
+            raise RuntimeError(f"ressources non installées: {', '.join(manquantes)}")
         logger.info("✅ NLTK resources téléchargées avec succès")
     except Exception as e:
         logger.error(f"❌ Erreur téléchargement NLTK: {e}")
         raise
 
-# Initialisation au chargement du module
-init_nltk()
+# ========================================================
+# PRÉPARATEURS GLOBAUX (chargés au premier usage)
+# ========================================================
+# Rien n'est importé ni téléchargé à l'import du module, et jamais de
+# réseau au démarrage: stopwords au premier prétraitement (cache JSON),
+# WordNet à la première lemmatisation, Punkt au premier word_tokenize.
+lemmatizer = None
+stop_words = CUSTOM_STOPWORDS
+word_tokenize = None
+
+_ressources_chargees = False
+_ressources_lock = threading.Lock()
+
+
+def ressources_nltk_requises() -> List[Tuple[str, ...]]:
+    """Ressources dont le pipeline configuré a besoin (hors stopwords en cache)"""
+    requises = [('wordnet',)]
+    if TOKENIZER_MODE != "regex":
+        requises.append(('punkt_tab', 'punkt'))
+    return requises
+
+
+def charger_ressources():
+    """
+    Stopwords et table de lemmes au premier usage (WordNet et Punkt
+    restent différés: voir _lemmatiseur et tokeniser_nltk)
+    
+    Raises:
+        RessourceNLTKManquante: en mode hors ligne, si une ressource
+            requise est absente
+    """
+    global stop_words, _ressources_chargees
+    
+    if _ressources_chargees:
+        return
+    
+    with _ressources_lock:
+        if _ressources_chargees:
+            return
+        
+        verifier_ressources(ressources_nltk_requises())
+        
+        # Stopwords (anglais + français + custom)
+        stop_words = set(charger_stopwords(("english", "french"))) | CUSTOM_STOPWORDS
+        
+        charger_table_lemmes()
+        _ressources_chargees = True
+
+
+def _lemmatiseur():
+    """WordNetLemmatizer, construit à la première lemmatisation"""
+    global lemmatizer
+    if lemmatizer is None:
+        exiger_ressource('wordnet')
+        from nltk.stem import WordNetLemmatizer
+        lemmatizer = WordNetLemmatizer()
+    return lemmatizer
+
+
+def tokeniser_nltk(texte: str) -> List[str]:
+    """word_tokenize() de NLTK (Punkt + Treebank), chargé au premier appel"""
+    global word_tokenize
+    if word_tokenize is None:
+        exiger_ressource('punkt_tab', 'punkt')
+        from nltk.tokenize import word_tokenize as nltk_word_tokenize
+        word_tokenize = nltk_word_tokenize
+    return word_tokenize(texte)
+
 
 # ========================================================
-# PRÉPARATEURS GLOBAUX
+# LEMMATISATION MÉMOÏSÉE
 # ========================================================
-lemmatizer = WordNetLemmatizer()
+# Table persistée {token: lemme} du vocabulaire indexé (voir
+# sauvegarder_table_lemmes), puis cache LRU borné pour le reste.
+_table_lemmes: Dict[str, str] = {}
+_table_hits = 0
+
+# Vocabulaire observé pendant une indexation (voir collecte_vocabulaire)
+_vocabulaire_collecte: Optional[Set[str]] = None
+
+
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatiser_wordnet(token: str) -> str:
+    try:
+        # Lemmatisation verbes puis noms
+        wordnet = _lemmatiseur()
+        lemme = wordnet.lemmatize(token, pos='v')
+        return wordnet.lemmatize(lemme, pos='n')
+    except Exception:
+        return token
+
+
+def lemmatiser(token: str) -> str:
+    """Lemme d'un token: table persistée, sinon cache LRU, sinon WordNet"""
+    global _table_hits
+    lemme = _table_lemmes.get(token)
+    if lemme is not None:
+        _table_hits += 1
+        return lemme
+    return _lemmatiser_wordnet(token)
+
+
+def _wordnet_disponible() -> bool:
+    try:
+        _lemmatiseur().lemmatize("tests", pos='n')
+        return True
+    except Exception:
+        return False
+
+
+def charger_table_lemmes(chemin: Path = LEMMA_TABLE_FILE) -> int:
+    """
+    Charge la table de lemmes persistée (si présente et à jour)
+    
+    Returns:
+        Nombre d'entrées chargées
+    """
+    global _table_lemmes
+    try:
+        table = _lire_table_lemmes(chemin)
+        if not table:
+            return 0
+        _table_lemmes = table
+        logger.info(f"✅ Table de lemmes chargée: {len(_table_lemmes)} entrées")
+        return len(_table_lemmes)
+    except Exception as e:
+        logger.warning(f"⚠️ Table de lemmes non chargée: {e}")
+        return 0
+
+
+def _lire_table_lemmes(chemin: Path) -> Dict[str, str]:
+    """Entrées du fichier de lemmes ({} s'il est absent ou d'une autre version)"""
+    if not Path(chemin).exists():
+        return {}
+    with open(chemin, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != LEMMA_TABLE_VERSION:
+        logger.warning(f"⚠️ Table de lemmes obsolète ignorée: {chemin}")
+        return {}
+    return dict(data.get("lemmes", {}))
+
+
+def sauvegarder_table_lemmes(vocabulaire: Iterable[str], chemin: Path = LEMMA_TABLE_FILE) -> int:
+    """
+    Précalcule et persiste les lemmes d'un vocabulaire (fin d'indexation)
+    
+    Les entrées sont ajoutées à la table existante: une indexation
+    incrémentale ne voit que le vocabulaire des fichiers modifiés.
+    
+    Args:
+        vocabulaire: Tokens à lemmatiser (ex: collecte_vocabulaire())
+        chemin: Fichier JSON de destination
+        
+    Returns:
+        Nombre d'entrées écrites (0 si WordNet est indisponible: une table
+        identité figerait un prétraitement dégradé)
+    """
+    charger_ressources()
+    if not _wordnet_disponible():
+        logger.warning("⚠️ WordNet indisponible: table de lemmes non générée")
+        return 0
+    
+    try:
+        table = _lire_table_lemmes(chemin)
+    except Exception as e:
+        logger.warning(f"⚠️ Table de lemmes existante illisible, remplacée: {e}")
+        table = {}
+    table.update((token, _lemmatiser_wordnet(token)) for token in sorted(set(vocabulaire)))
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    tmp = chemin.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"version": LEMMA_TABLE_VERSION, "lemmes": table}, f, ensure_ascii=False)
+    tmp.replace(chemin)
+    
+    global _table_lemmes
+    _table_lemmes = table
+    logger.info(f"💾 Table de lemmes sauvegardée: {len(table)} entrées → {chemin}")
+    return len(table)
+
+
+@contextmanager
+def collecte_vocabulaire():
+    """
+    Collecte les tokens soumis à la lemmatisation pendant un bloc (ex: indexation)
+    
+    Usage:
+        with collecte_vocabulaire() as vocabulaire:
+            indexer_cvs_automatique()
+        sauvegarder_table_lemmes(vocabulaire)
+    """
+    global _vocabulaire_collecte
+    precedent = _vocabulaire_collecte
+    _vocabulaire_collecte = set() if precedent is None else precedent
+    try:
+        yield _vocabulaire_collecte
+    finally:
+        _vocabulaire_collecte = precedent
+
+
+def stats_lemmatisation() -> Dict:
+    """Taux de réussite de la table et du cache de lemmes"""
+    info = _lemmatiser_wordnet.cache_info()
+    total = _table_hits + info.hits + info.misses
+    return {
+        "table_entries": len(_table_lemmes),
+        "table_hits": _table_hits,
+        "cache_hits": info.hits,
+        "cache_misses": info.misses,
+        "cache_size": info.currsize,
+        "cache_maxsize": info.maxsize,
+        "hit_rate": round((_table_hits + info.hits) / total, 3) if total else 0.0
+    }
+
+# ========================================================
+# TOKENISATION
+# ========================================================
+_PONCTUATION_SANS_TIRET = str.maketrans('', '', string.punctuation.replace('-', ''))
+
+# Seules règles de NLTKWordTokenizer qui s'appliquent à un texte réduit à
+# [\w\s-] (minuscules, ponctuation retirée): isolement des doubles tirets
+# puis découpage des contractions sans apostrophe (CONTRACTIONS2).
+# Les formes "d'ye", "more'n", "'tis" exigent une apostrophe: hors champ.
+_DOUBLE_TIRET = re.compile(r'--')
+_CONTRACTIONS = re.compile(
+    r'\b(can)(not)\b|\b(gim|lem)(me)\b|\b(gon)(na)\b|\b(got)(ta)\b|\b(wan)(na)(?=\s)',
+    re.IGNORECASE
+)
+
+
+def _separer_contraction(match: re.Match) -> str:
+    return " " + " ".join(g for g in match.groups() if g) + " "
+
+
+def preparer_tokenisation(texte: str) -> str:
+    """
+    Étapes 1 à 3 du pipeline: nettoyage préliminaire, minuscules,
+    suppression de la ponctuation (le tiret est conservé)
+    """
+    texte = re.sub(r'\\[a-zA-Z]+\{.*?\}', ' ', texte)  # Commandes LaTeX
+    texte = re.sub(r'\d{4}-\d{4}', ' ', texte)  # Dates
+    texte = re.sub(r'[^\w\s\-]', ' ', texte)  # Caractères spéciaux
+    return texte.lower().translate(_PONCTUATION_SANS_TIRET)
+
+
+def tokeniser_rapide(texte: str) -> List[str]:
+    """
+    Tokenisation d'un texte déjà passé par preparer_tokenisation().
+
+    Produit exactement les tokens de word_tokenize() sur ce texte (sans
+    segmentation Punkt, inutile sans ponctuation): les termes à tiret
+    ("front-end", "-python") restent entiers. Pour du texte brut,
+    utiliser word_tokenize().
+    """
+    if '--' in texte:
+        texte = _DOUBLE_TIRET.sub(' -- ', texte)
+    return _CONTRACTIONS.sub(_separer_contraction, " " + texte + " ").split()
 
-# Stopwords (anglais + français + custom)
-try:
-    stop_words_en = set(stopwords.words('english'))
-    stop_words_fr = set(stopwords.words('french'))
-    stop_words = stop_words_en.union(stop_words_fr).union(CUSTOM_STOPWORDS)
-except Exception as e:
-    logger.warning(f"⚠️ Erreur chargement stopwords: {e}")
-    stop_words = CUSTOM_STOPWORDS
 
 # ========================================================
 # FONCTION PRINCIPALE DE PRÉTRAITEMENT
@@ -72,30 +339,27 @@ def pretraiter_texte(texte: str, preserve_skills: bool = True, skills_list: Set[
     if not texte:
         return "", []
     
-    # PROTECTION DES COMPÉTENCES (optionnel)
+    charger_ressources()
+    
+    # PROTECTION DES COMPÉTENCES (optionnel, un seul passage sur le texte)
     protected_terms = {}
     if preserve_skills and skills_list:
-        for skill in skills_list:
-            placeholder = f"__SKILL_{skill.replace(' ', '_').replace('.', '_').upper()}__"
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            texte = re.sub(pattern, placeholder, texte, flags=re.IGNORECASE)
+        def _proteger(skill: str) -> str:
+            placeholder = placeholder_competence(skill)
             protected_terms[placeholder] = skill
+            return placeholder
+        
+        texte = get_skill_matcher(skills_list).sub(_proteger, texte)
     
-    # ÉTAPE 1: Nettoyage préliminaire
-    texte = re.sub(r'\\[a-zA-Z]+\{.*?\}', ' ', texte)  # Commandes LaTeX
-    texte = re.sub(r'\d{4}-\d{4}', ' ', texte)  # Dates
-    texte = re.sub(r'[^\w\s\-]', ' ', texte)  # Caractères spéciaux
-    
-    # ÉTAPE 2: Passage en minuscules
-    texte_lower = texte.lower()
-    
-    # ÉTAPE 3: Suppression de la ponctuation
-    translator = str.maketrans('', '', string.punctuation.replace('-', ''))
-    texte_sans_ponctuation = texte_lower.translate(translator)
+    # ÉTAPES 1 à 3: Nettoyage, minuscules, suppression de la ponctuation
+    texte_sans_ponctuation = preparer_tokenisation(texte)
     
-    # ÉTAPE 4: Tokenisation
+    # ÉTAPE 4: Tokenisation (regex compilée par défaut, Punkt sur demande)
     try:
-        tokens = word_tokenize(texte_sans_ponctuation)
+        if TOKENIZER_MODE == "regex":
+            tokens = tokeniser_rapide(texte_sans_ponctuation)
+        else:
+            tokens = tokeniser_nltk(texte_sans_ponctuation)
     except LookupError:
         logger.warning("⚠️ Tokenisation NLTK échouée, utilisation du split simple")
         tokens = texte_sans_ponctuation.split()
@@ -111,16 +375,11 @@ def pretraiter_texte(texte: str, preserve_skills: bool = True, skills_list: Set[
         and not token.isdigit()
     ]
     
-    # ÉTAPE 6: Lemmatisation
-    tokens_lemmatises = []
-    for token in tokens_filtres:
-        try:
-            # Lemmatisation verbes puis noms
-            lemme = lemmatizer.lemmatize(token, pos='v')
-            lemme = lemmatizer.lemmatize(lemme, pos='n')
-            tokens_lemmatises.append(lemme)
-        except Exception:
-            tokens_lemmatises.append(token)
+    # ÉTAPE 6: Lemmatisation (mémoïsée, voir lemmatiser)
+    tokens_lemmatises = [lemmatiser(token) for token in tokens_filtres]
+    
+    if _vocabulaire_collecte is not None:
+        _vocabulaire_collecte.update(tokens_filtres)
     
     # RESTAURATION DES COMPÉTENCES PROTÉGÉES
     tokens_finaux = []
@@ -135,6 +394,210 @@ def pretraiter_texte(texte: str, preserve_skills: bool = True, skills_list: Set[
     return texte_pretraite, tokens_finaux
 
 
+# ========================================================
+# CACHE PERSISTANT (voir token_cache)
+# ========================================================
+@lru_cache(maxsize=8)
+def _signature(skills: FrozenSet[str]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    parties = (
+        f"v{PREPROCESS_VERSION}", TOKENIZER_MODE, f"wordnet={_wordnet_disponible()}",
+        *sorted(stop_words), "|", *sorted(skills)
+    )
+    for partie in parties:
+        h.update(partie.encode("utf-8"))
+        h.update(b"\0")
+    return h.digest()
+
+
+def signature_pretraitement(preserve_skills: bool = True, skills_list: Set[str] = None) -> bytes:
+    """
+    Empreinte de tout ce qui influe sur le résultat de pretraiter_texte():
+    version du pipeline, tokeniseur, WordNet, stopwords, compétences protégées
+    """
+    charger_ressources()
+    skills = frozenset(skills_list) if preserve_skills and skills_list else frozenset()
+    return _signature(skills)
+
+
+def _consulter_cache(lot: List[str], cache, signature: bytes) -> Tuple[List[str], Optional[List[bytes]], Dict]:
+    """(lot, clés, {clé: tokens} déjà connus) — sans cache: (lot, None, {})"""
+    if cache is None:
+        return lot, None, {}
+    cles = [cle_cache(signature, texte) for texte in lot]
+    return lot, cles, cache.get_many(cles)
+
+
+def _a_calculer(consulte) -> List[str]:
+    lot, cles, connus = consulte
+    if cles is None:
+        return lot
+    return [texte for texte, cle in zip(lot, cles) if cle not in connus]
+
+
+def _completer(consulte, calcules: List[Tuple[str, List[str]]], cache) -> List[Tuple[str, List[str]]]:
+    """Fusionne résultats connus et calculés (ordre du lot), puis met en cache"""
+    lot, cles, connus = consulte
+    if cles is None:
+        return calcules
+    calcules = iter(calcules)
+    resultats, nouveaux = [], []
+    for cle in cles:
+        tokens = connus.get(cle)
+        if tokens is not None:
+            resultats.append((" ".join(tokens), tokens))
+        else:
+            resultat = next(calcules)
+            resultats.append(resultat)
+            nouveaux.append((cle, resultat[1]))
+    cache.put_many(nouveaux)
+    return resultats
+
+
+# ========================================================
+# PRÉTRAITEMENT PAR LOTS (MULTIPROCESSUS)
+# ========================================================
+# Paramètres propres à chaque worker (fixés une fois par _initialiser_worker)
+_preserve_worker = True
+_skills_worker: Optional[FrozenSet[str]] = None
+
+
+def _initialiser_worker(preserve_skills: bool, skills_list: Optional[FrozenSet[str]]):
+    """Initialiseur du pool: NLTK, stopwords, table de lemmes et automate une seule fois"""
+    global _preserve_worker, _skills_worker
+    _preserve_worker = preserve_skills
+    _skills_worker = skills_list
+    charger_ressources()
+    if preserve_skills and skills_list:
+        get_skill_matcher(skills_list)
+
+
+def _pretraiter_lot(textes: List[str], collecter: bool) -> Tuple[List[Tuple[str, List[str]]], Optional[Set[str]]]:
+    """Tâche d'un worker: un lot de textes, et le vocabulaire observé si demandé"""
+    global _vocabulaire_collecte
+    vocabulaire = set() if collecter else None
+    _vocabulaire_collecte = vocabulaire
+    try:
+        resultats = [pretraiter_texte(texte, _preserve_worker, _skills_worker) for texte in textes]
+    finally:
+        _vocabulaire_collecte = None
+    return resultats, vocabulaire
+
+
+def _nombre_workers(workers: Optional[int]) -> int:
+    if workers is None:
+        workers = PREPROCESS_WORKERS
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _lots(textes: Iterable[str], taille: int) -> Iterator[List[str]]:
+    iterateur = iter(textes)
+    while True:
+        lot = list(islice(iterateur, taille))
+        if not lot:
+            return
+        yield lot
+
+
+def pretraiter_textes(
+    textes: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = PREPROCESS_CHUNK_SIZE,
+    preserve_skills: bool = True,
+    skills_list: Set[str] = None,
+    utiliser_cache: bool = True
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Prétraitement d'un flux de textes sur un pool de processus
+    
+    Produit (texte_prétraité, tokens) pour chaque texte, dans l'ordre
+    d'entrée et au fil de l'eau: au plus deux lots par worker sont en
+    cours, la mémoire reste bornée quelle que soit la taille du flux.
+    Les textes déjà prétraités (même texte, même configuration) sont lus
+    dans le cache persistant: seuls les autres partent aux workers.
+    
+    Args:
+        textes: Itérable (éventuellement paresseux) de textes bruts
+        workers: Nombre de processus (défaut PREPROCESS_WORKERS, 0 = un par
+            cœur, 1 = dans le processus courant)
+        chunk_size: Nombre de textes par tâche envoyée à un worker
+        preserve_skills: Comme pretraiter_texte()
+        skills_list: Comme pretraiter_texte()
+        utiliser_cache: Consulter et alimenter le cache persistant
+            (ignoré pendant collecte_vocabulaire, qui doit voir chaque token)
+        
+    Yields:
+        Tuple (texte_prétraité, tokens_prétraités)
+    """
+    workers = _nombre_workers(workers)
+    vocabulaire = _vocabulaire_collecte
+    collecter = vocabulaire is not None
+    
+    cache = get_token_cache() if utiliser_cache and not collecter else None
+    signature = signature_pretraitement(preserve_skills, skills_list) if cache else b""
+    lots = (_consulter_cache(lot, cache, signature) for lot in _lots(textes, max(1, chunk_size)))
+    
+    tete = list(islice(lots, 2))
+    
+    # Un seul worker ou un seul lot: le pool coûterait plus qu'il ne rapporte
+    if workers <= 1 or len(tete) < 2:
+        for consulte in chain(tete, lots):
+            calcules = [pretraiter_texte(t, preserve_skills, skills_list) for t in _a_calculer(consulte)]
+            yield from _completer(consulte, calcules, cache)
+        return
+    
+    skills = frozenset(skills_list) if skills_list else None
+    pool = None
+    en_cours = deque()
+    
+    def _soumettre(consulte):
+        nonlocal pool
+        a_calculer = _a_calculer(consulte)
+        future = None
+        if a_calculer:
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_initialiser_worker,
+                    initargs=(preserve_skills, skills)
+                )
+            future = pool.submit(_pretraiter_lot, a_calculer, collecter)
+        en_cours.append((consulte, future))
+    
+    def _resultats() -> List[Tuple[str, List[str]]]:
+        consulte, future = en_cours.popleft()
+        calcules = []
+        if future is not None:
+            calcules, vus = future.result()
+            if collecter:
+                vocabulaire.update(vus)
+        return _completer(consulte, calcules, cache)
+    
+    try:
+        for consulte in tete:
+            _soumettre(consulte)
+        for consulte in lots:
+            if len(en_cours) >= 2 * workers:
+                yield from _resultats()
+            _soumettre(consulte)
+        while en_cours:
+            yield from _resultats()
+    finally:
+        # Consommateur arrêté en route: on abandonne les lots non démarrés
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def pretraiter_texte_cache(texte: str, preserve_skills: bool = True, skills_list: Set[str] = None) -> Tuple[str, List[str]]:
+    """pretraiter_texte() derrière le cache persistant (un texte, processus courant)"""
+    return next(pretraiter_textes([texte], workers=1, preserve_skills=preserve_skills, skills_list=skills_list))
+
+
+def placeholder_competence(skill: str) -> str:
+    """Jeton qui protège une compétence pendant le prétraitement"""
+    return f"__SKILL_{skill.replace(' ', '_').replace('.', '_').upper()}__"
+
+
 def pretraiter_competences(competences_list: List[str]) -> str:
     """
     Prétraite les compétences (normalisation simple, sans lemmatisation)
@@ -194,8 +657,9 @@ def nettoyer_texte_brut(texte: str) -> str:
 # ========================================================
 def compter_tokens(texte: str) -> int:
     """Compte le nombre de tokens dans un texte"""
+    charger_ressources()
     try:
-        return len(word_tokenize(texte))
+        return len(tokeniser_nltk(texte))
     except:
         return len(texte.split())
 
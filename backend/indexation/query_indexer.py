@@ -2,22 +2,37 @@
 ============================================================================
 SMARTHIRE - Query System Modulaire Complet
 Validation + Auto-Correction + Indexation
+
+Les requêtes préparées sont déposées dans un tampon borné (JournalRequetes)
+qu'un thread écrit par lots dans l'index: la recherche n'attend jamais un
+commit Whoosh. Tampon plein: la requête n'est pas journalisée (comptée).
 ============================================================================
 """
 
+import atexit
 import os
 import json
+import queue
 import re
 import logging
 import shutil
+import threading
+import time
+import weakref
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Tuple
 
 from whoosh import index
 from whoosh.fields import Schema, TEXT, ID, NUMERIC, DATETIME, KEYWORD
-from whoosh.writing import AsyncWriter
 
-from backend.config.settings import QUERY_INDEX
+from backend.config.settings import (
+    QUERY_INDEX,
+    QUERY_LOG_BUFFER_SIZE,
+    QUERY_LOG_BATCH_SIZE,
+    QUERY_LOG_FLUSH_INTERVAL_S,
+    INDEXING_LOCK_TIMEOUT_S
+)
+from backend.indexation.maintenance import creer_snapshot, signaler_commit
 
 logger = logging.getLogger(__name__)
 
@@ -85,8 +100,7 @@ class QueryIndexManager:
             if not required_fields.issubset(schema_fields):
                 logger.warning("⚠️  Migration nécessaire - Ancien schéma détecté")
                 
-                backup_dir = f"{self.index_dir}_backup_{int(datetime.now().timestamp())}"
-                shutil.copytree(self.index_dir, backup_dir)
+                backup_dir = creer_snapshot(self.index_dir, etiquette="backup")
                 logger.info(f"✅ Backup créé: {backup_dir}")
                 
                 shutil.rmtree(self.index_dir)
@@ -103,10 +117,10 @@ class QueryIndexManager:
     def init_index(self, force_recreate: bool = False):
         """Initialise ou ouvre l'index"""
         if force_recreate and os.path.exists(self.index_dir):
-            backup_dir = f"{self.index_dir}_backup_{int(datetime.now().timestamp())}"
-            shutil.copytree(self.index_dir, backup_dir)
+            if index.exists_in(self.index_dir):
+                backup_dir = creer_snapshot(self.index_dir, etiquette="backup")
+                logger.info(f"✅ Ancien index sauvegardé: {backup_dir}")
             shutil.rmtree(self.index_dir)
-            logger.info(f"✅ Ancien index sauvegardé: {backup_dir}")
         
         if not os.path.exists(self.index_dir):
             os.makedirs(self.index_dir)
@@ -511,10 +525,11 @@ class QueryProcessor:
 # MODULE 5: INDEXATION PRINCIPALE
 # ========================================================
 class QueryIndexer:
-    """Système d'indexation complet"""
+    """Système d'indexation complet (écriture via le journal asynchrone)"""
     
     def __init__(self, index_dir: str = None):
-        self.manager = QueryIndexManager(index_dir)
+        self.journal = get_journal_requetes(index_dir)
+        self.manager = self.journal.manager
         self.validator = QueryValidator()
         self.corrector = QueryCorrector()
         self.processor = QueryProcessor()
@@ -533,6 +548,9 @@ class QueryIndexer:
         """
         Indexe une requête avec validation et auto-correction
         
+        Le document est mis en file (JournalRequetes): il est écrit par
+        le thread du journal, au plus QUERY_LOG_FLUSH_INTERVAL_S plus tard
+        
         Returns:
             {
                 "doc_id": str,
@@ -541,13 +559,11 @@ class QueryIndexer:
                 "query_processed": str,
                 "is_valid": bool,
                 "errors": List[str],
-                "corrections": List[str]
+                "corrections": List[str],
+                "queued": bool  # False si le tampon est plein
             }
         """
         try:
-            # Initialisation
-            idx = self.manager.init_index()
-            
             # ÉTAPE 1: Nettoyage
             query_cleaned = self.processor.clean(query_text) if query_text else ""
             filters_normalized = self.processor.normalize_filters(filters)
@@ -583,9 +599,8 @@ class QueryIndexer:
             
             doc_id = f"{datetime.now(timezone.utc).timestamp()}"
             
-            # ÉTAPE 6: Indexation
-            writer = AsyncWriter(idx)
-            writer.add_document(
+            # ÉTAPE 6: Mise en file (écriture par le thread du journal)
+            queued = self.journal.soumettre(dict(
                 id=doc_id,
                 query_original=query_text or "",
                 query_corrected=query_corrected,
@@ -601,26 +616,23 @@ class QueryIndexer:
                 timestamp=datetime.now(timezone.utc),
                 user_id=user_id or "",
                 session_id=session_id or ""
-            )
-            writer.commit()
+            ))
             
             # ÉTAPE 7: Logging
             if query_valid:
-                logger.info(f"✅ Requête VALIDE indexée: {doc_id}")
+                logger.debug(f"✅ Requête VALIDE journalisée: {doc_id}")
             else:
-                logger.warning(f"⚠️  Requête INVALIDE indexée: {doc_id}")
+                logger.warning(f"⚠️  Requête INVALIDE journalisée: {doc_id}")
                 logger.warning(f"   Erreurs: {validation_errors}")
             
             if corrections:
-                logger.info(f"   🔧 Corrections: {corrections}")
+                logger.debug(f"   🔧 Corrections: {corrections}")
             
-            logger.info(f"   📝 Original: {query_text}")
-            logger.info(f"   🔄 Corrigée: {query_corrected}")
-            logger.info(f"   💾 Processed: {query_processed}")
-            logger.info(f"   🏷️  Type: {query_type}")
-            logger.info(f"   🔍 Search: {search_type}")
-            logger.info(f"   🎯 Filtres: {filter_keys}")
-            logger.info(f"   📊 Résultats: {nb_resultats}")
+            logger.debug(
+                f"   📝 Original: {query_text} | 🔄 Corrigée: {query_corrected} | "
+                f"💾 Processed: {query_processed} | 🏷️  Type: {query_type} | 🔍 Search: {search_type} | "
+                f"🎯 Filtres: {filter_keys} | 📊 Résultats: {nb_resultats}"
+            )
             
             return {
                 "doc_id": doc_id,
@@ -629,7 +641,8 @@ class QueryIndexer:
                 "query_processed": query_processed,
                 "is_valid": query_valid,
                 "errors": validation_errors,
-                "corrections": corrections
+                "corrections": corrections,
+                "queued": queued
             }
             
         except Exception as e:
@@ -642,10 +655,194 @@ class QueryIndexer:
                 "query_processed": "",
                 "is_valid": False,
                 "errors": [str(e)],
-                "corrections": []
+                "corrections": [],
+                "queued": False
             }
 
 
+# ========================================================
+# MODULE 6: JOURNAL ASYNCHRONE (TAMPON + ÉCRITURE PAR LOTS)
+# ========================================================
+class JournalRequetes:
+    """
+    Tampon borné de documents du query_index, écrit par un thread
+    
+    Un lot part dès que taille_lot documents sont en attente ou
+    delai_ecriture secondes après son premier document: un writer et un
+    commit (sans fusion, segments regroupés par la maintenance) par lot.
+    soumettre() ne bloque jamais: tampon plein, le document est rejeté et
+    compté (rejetees). Le tampon est vidé à l'arrêt du processus.
+    """
+    
+    def __init__(
+        self,
+        index_dir: str = None,
+        taille_max: int = QUERY_LOG_BUFFER_SIZE,
+        taille_lot: int = QUERY_LOG_BATCH_SIZE,
+        delai_ecriture: float = QUERY_LOG_FLUSH_INTERVAL_S,
+        timeout_verrou: float = INDEXING_LOCK_TIMEOUT_S
+    ):
+        self.manager = QueryIndexManager(index_dir)
+        self.taille_lot = max(1, taille_lot)
+        self.delai_ecriture = delai_ecriture
+        self.timeout_verrou = timeout_verrou
+        
+        self._file: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max(1, taille_max))
+        self._index = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._arrete = False
+        
+        # Statistiques
+        self.ecrites = 0
+        self.rejetees = 0
+        self.perdues = 0  # Lots en échec (index verrouillé, disque...)
+        self.commits = 0
+        
+        _instances.add(self)
+    
+    # ----------------------------------------------------
+    # API
+    # ----------------------------------------------------
+    def soumettre(self, document: Dict) -> bool:
+        """Met le document en file; False s'il est rejeté (tampon plein ou arrêté)"""
+        with self._lock:
+            if self._arrete:
+                self.rejetees += 1
+                return False
+            # Aussi après un fork: le thread du parent n'existe pas dans l'enfant
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.arreter)
+                self._thread = threading.Thread(target=self._boucle, name="journal-requetes", daemon=True)
+                self._thread.start()
+            try:
+                self._file.put_nowait(document)
+            except queue.Full:
+                self.rejetees += 1
+                if self.rejetees == 1 or self.rejetees % 1000 == 0:
+                    logger.warning(f"⚠️ Journal des requêtes saturé: {self.rejetees} requêtes non journalisées")
+                return False
+        return True
+    
+    def vider(self):
+        """Attend que les documents en file soient écrits"""
+        self._file.join()
+    
+    def arreter(self):
+        """Écrit les documents en attente puis arrête le thread"""
+        with self._lock:
+            if self._arrete:
+                return
+            self._arrete = True
+            thread = self._thread
+        if thread is not None:
+            self._file.put(None)
+            thread.join()
+    
+    def get_stats(self) -> Dict:
+        return {
+            "index": self.manager.index_dir,
+            "en_attente": self._file.qsize(),
+            "capacite": self._file.maxsize,
+            "ecrites": self.ecrites,
+            "rejetees": self.rejetees,
+            "perdues": self.perdues,
+            "commits": self.commits
+        }
+    
+    def _apres_fork(self):
+        """
+        Enfant d'un fork: file et verrou neufs (ceux du parent attendent ses
+        threads, absents ici); le thread repart au prochain document
+        """
+        self._file = queue.Queue(maxsize=self._file.maxsize)
+        self._lock = threading.Lock()
+    
+    # ----------------------------------------------------
+    # THREAD D'ÉCRITURE
+    # ----------------------------------------------------
+    def _boucle(self):
+        arret = False
+        while not arret:
+            premier = self._file.get()
+            if premier is None:
+                self._file.task_done()
+                break
+            
+            lot = [premier]
+            echeance = time.monotonic() + self.delai_ecriture
+            while len(lot) < self.taille_lot:
+                try:
+                    suivant = self._file.get(timeout=max(0.0, echeance - time.monotonic()))
+                except queue.Empty:
+                    break
+                if suivant is None:
+                    arret = True
+                    break
+                lot.append(suivant)
+            
+            try:
+                self._ecrire(lot)
+            finally:
+                for _ in range(len(lot) + arret):
+                    self._file.task_done()
+    
+    def _ecrire(self, lot: List[Dict]):
+        try:
+            if self._index is None:
+                self._index = self.manager.init_index()
+            writer = self._index.writer(timeout=self.timeout_verrou)
+            try:
+                for document in lot:
+                    writer.add_document(**document)
+                writer.commit(merge=False)
+            except BaseException:
+                writer.cancel()
+                raise
+        except Exception as e:
+            self.perdues += len(lot)
+            self._index = None  # Réouvert (et recréé si besoin) au lot suivant
+            logger.error(f"❌ Journal des requêtes: lot de {len(lot)} requêtes perdu: {e}")
+            return
+        
+        self.ecrites += len(lot)
+        self.commits += 1
+        try:
+            signaler_commit(self.manager.index_dir)
+        except Exception as e:
+            logger.warning(f"⚠️ Comptage des segments impossible (query_index): {e}")
+        logger.debug(f"✅ Journal des requêtes: {len(lot)} requêtes écrites")
+
+
+_journaux: Dict[str, JournalRequetes] = {}
+_instances: "weakref.WeakSet[JournalRequetes]" = weakref.WeakSet()  # Réinitialisés après un fork
+_journaux_lock = threading.Lock()
+
+
+def get_journal_requetes(index_dir: str = None) -> JournalRequetes:
+    """Journal unique par index (un seul tampon, un seul writer par processus)"""
+    cle = os.path.abspath(index_dir or str(QUERY_INDEX))
+    with _journaux_lock:
+        journal = _journaux.get(cle)
+        if journal is None or journal._arrete:
+            journal = _journaux[cle] = JournalRequetes(index_dir)
+        return journal
+
+
+def _oublier_journaux():
+    """Dans l'enfant d'un fork: journaux (files, verrous) du parent oubliés"""
+    global _journaux, _journaux_lock
+    for journal in list(_instances):
+        journal._apres_fork()
+    _journaux = {}
+    _journaux_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_oublier_journaux)
+
+
 # ========================================================
 # API PUBLIQUE
 # ========================================================
@@ -735,6 +932,9 @@ if __name__ == "__main__":
         print(f"Corrections: {result['corrections']}")
         print(f"Erreurs: {result['errors']}")
     
+    indexer.journal.vider()
+    print(f"\nJournal: {indexer.journal.get_stats()}")
+    
     print("\n" + "="*80)
     print("✅ TESTS TERMINÉS")
     print("="*80)
\ No newline at end of file
@@ -0,0 +1,561 @@
+"""
+============================================================================
+SMARTHIRE - Synchronisation PostgreSQL → index de recherche
+Les triggers de cvs et offres enregistrent chaque écriture dans la table
+index_outbox (voir database/shared_queries.create_index_outbox), quel que
+soit le chemin d'écriture (routes, app.py, insertion en masse). Deux
+consommateurs la lisent:
+
+- SynchroniseurWhoosh (un seul: processus dédié lancé par gunicorn,
+  python app.py ou CLI) réserve
+  les changements non traités (FOR UPDATE SKIP LOCKED), applique aux index
+  Whoosh les CVs et offres uploadés (source_systeme = FALSE) via la file
+  d'indexation, puis les marque traités
+- SuiviBM25 (un par processus de recherche) relit l'outbox depuis la
+  position lue avant la construction des index BM25 et applique chaque
+  changement au modèle vectoriel en mémoire
+
+Réveil immédiat par LISTEN/NOTIFY, relecture toutes les
+SYNC_POLL_INTERVAL_S secondes en secours: les index suivent la base en
+quelques secondes, sans reconstruction complète. Les changements sont
+rejoués à partir de l'état courant des lignes: les appliquer deux fois
+est sans effet.
+
+Usage:
+    python -m backend.indexation.sync_index --installer   # table + triggers
+    python -m backend.indexation.sync_index               # synchroniseur Whoosh
+============================================================================
+"""
+
+import argparse
+import logging
+import os
+import select
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.connection import get_db_connection
+from database.shared_queries import (
+    create_index_outbox,
+    get_outbox_position,
+    get_outbox_changes_since,
+    claim_outbox_changes,
+    mark_outbox_processed,
+    purge_outbox,
+    get_rows_for_sync
+)
+from backend.config.settings import (
+    SYNC_CHANNEL,
+    SYNC_POLL_INTERVAL_S,
+    SYNC_BATCH_SIZE,
+    SYNC_GAP_TIMEOUT_S,
+    SYNC_RETENTION_S,
+    INDEXING_WAIT_TIMEOUT_S
+)
+from backend.indexation.preprocessing import nettoyer_texte_brut, pretraiter_textes
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("cvs", "offres")
+
+
+# ========================================================
+# OUTBOX
+# ========================================================
+def installer_outbox(conn, canal: str = SYNC_CHANNEL):
+    """Crée (ou met à jour) la table index_outbox et les triggers"""
+    cur = conn.cursor()
+    try:
+        cur.execute(create_index_outbox(canal))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+    logger.info("✅ Outbox de synchronisation installée (index_outbox + triggers)")
+
+
+def lire_position_outbox(conn, marge: float = SYNC_GAP_TIMEOUT_S) -> "PositionOutbox":
+    """
+    Position de départ d'un suivi, à lire avant de charger les données
+
+    Les `marge` dernières secondes de changements sont rejouées: une
+    transaction encore ouverte a pu réserver un id inférieur au maximum.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(get_outbox_position(), (marge,))
+        return PositionOutbox(cur.fetchone()[0])
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def regrouper_changements(lignes: Iterable[Tuple]) -> Dict[str, Dict[int, bool]]:
+    """
+    Regroupe les lignes de l'outbox par table et par document
+
+    Args:
+        lignes: (id, table_source, doc_id, operation, source_systeme)
+
+    Returns:
+        {table: {doc_id: True si l'index Whoosh est concerné}}; un document
+        modifié plusieurs fois n'est traité qu'une fois (état courant)
+    """
+    groupes: Dict[str, Dict[int, bool]] = {}
+    for _, table, doc_id, _, source_systeme in lignes:
+        if table not in TABLES:
+            continue
+        docs = groupes.setdefault(table, {})
+        docs[doc_id] = docs.get(doc_id, False) or not source_systeme
+    return groupes
+
+
+def offre_vers_job_json(ligne: Dict) -> Dict:
+    """Ligne de la table offres → format JSON attendu par JobIndexer"""
+    return {
+        "job_id": str(ligne["id"]),
+        "title": ligne.get("titre") or "",
+        "description": ligne.get("description") or ligne.get("texte_complet") or "",
+        "required_skills": list(ligne.get("competences_requises") or []),
+        "location": ligne.get("localisation") or "",
+        "experience_level": ligne.get("niveau_souhaite") or "Mid-Level",
+        "company": ligne.get("entreprise") or "",
+        "contract_type": ligne.get("type_contrat") or ""
+    }
+
+
+def lire_lignes(cur, table: str, doc_ids: List[int]) -> Dict[int, Dict]:
+    """État courant des documents modifiés ({id: colonnes}, absent = supprimé)"""
+    cur.execute(get_rows_for_sync(table), (list(doc_ids),))
+    colonnes = [c.name for c in cur.description]
+    return {row[0]: dict(zip(colonnes, row)) for row in cur.fetchall()}
+
+
+def lire_noms_fichiers(index_dir, doc_ids: Iterable[str]) -> Dict[str, str]:
+    """Noms de fichier déjà stockés dans Whoosh ({doc_id: original_filename})"""
+    from whoosh.index import open_dir
+
+    noms = {}
+    with open_dir(str(index_dir)).searcher() as searcher:
+        for doc_id in doc_ids:
+            document = searcher.document(doc_id=doc_id)
+            if document and document.get("original_filename"):
+                noms[doc_id] = document["original_filename"]
+    return noms
+
+
+class PositionOutbox:
+    """
+    Position de lecture dans index_outbox pour un suivi sans verrou
+
+    Les ids sont attribués au début des transactions mais visibles à leur
+    commit: un id sauté peut encore apparaître. Il est redemandé à chaque
+    lecture pendant `delai` secondes (au-delà: transaction annulée).
+    """
+
+    # Au-delà, un saut d'ids n'est pas suivi (insertion massive annulée)
+    MAX_TROUS = 10000
+
+    def __init__(self, position: int = 0, delai: float = SYNC_GAP_TIMEOUT_S):
+        self.position = position
+        self.delai = delai
+        self.trous: Dict[int, float] = {}  # {id attendu: vu manquant depuis}
+
+    def ids_attendus(self) -> List[int]:
+        return sorted(self.trous)
+
+    def avancer(self, ids: Iterable[int], maintenant: Optional[float] = None):
+        """Enregistre des ids lus (ordre croissant ou non)"""
+        maintenant = time.monotonic() if maintenant is None else maintenant
+        ids = sorted(set(ids))
+        for i in ids:
+            self.trous.pop(i, None)
+
+        precedent = self.position
+        for i in ids:
+            if i <= self.position:
+                continue
+            if i - precedent - 1 <= self.MAX_TROUS:
+                for manquant in range(precedent + 1, i):
+                    self.trous[manquant] = maintenant
+            precedent = i
+        if ids:
+            self.position = max(self.position, ids[-1])
+
+        for i, depuis in list(self.trous.items()):
+            if maintenant - depuis > self.delai:
+                del self.trous[i]
+
+
+# ========================================================
+# CONSOMMATEURS
+# ========================================================
+class _ConsommateurOutbox(ABC):
+    """
+    Thread de consommation de l'outbox: un cycle, puis attente d'une
+    notification (ou de l'intervalle) tant que le dernier cycle n'a pas
+    rempli un lot. Connexion dédiée; après une erreur, nouvel essai avec
+    une attente doublée à chaque échec (60s au plus).
+    """
+
+    nom_thread = "sync-outbox"
+
+    def __init__(self, intervalle: float = SYNC_POLL_INTERVAL_S, taille_lot: int = SYNC_BATCH_SIZE):
+        self.intervalle = intervalle
+        self.taille_lot = max(1, taille_lot)
+
+        self._conn = None
+        self._arret = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistiques
+        self.cycles = 0
+        self.changements = 0
+        self.erreurs = 0
+        self.dernier_cycle: Optional[float] = None
+
+    def demarrer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._arret.clear()
+                self._thread = threading.Thread(target=self._boucle, name=self.nom_thread, daemon=True)
+                self._thread.start()
+
+    def arreter(self):
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._fermer()
+
+    @abstractmethod
+    def executer_cycle(self) -> int:
+        """Traite au plus taille_lot changements; renvoie leur nombre"""
+
+    def get_stats(self) -> Dict:
+        return {
+            "actif": self._thread is not None and self._thread.is_alive(),
+            "cycles": self.cycles,
+            "changements": self.changements,
+            "erreurs": self.erreurs,
+            "dernier_cycle": self.dernier_cycle
+        }
+
+    # ----------------------------------------------------
+    # CONNEXION
+    # ----------------------------------------------------
+    def _connexion(self):
+        if self._conn is None or self._conn.closed:
+            conn = get_db_connection()
+            if conn is None:
+                raise ConnectionError("PostgreSQL indisponible")
+            cur = conn.cursor()
+            cur.execute(f"LISTEN {SYNC_CHANNEL}")
+            cur.close()
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _fermer(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _attendre(self):
+        """Jusqu'à une notification, l'intervalle ou l'arrêt"""
+        conn = self._conn
+        if conn is None or conn.closed:
+            self._arret.wait(self.intervalle)
+            return
+        if not conn.notifies:
+            select.select([conn], [], [], self.intervalle)
+        conn.poll()
+        conn.notifies.clear()
+
+    # ----------------------------------------------------
+    # BOUCLE
+    # ----------------------------------------------------
+    def _boucle(self):
+        echecs = 0
+        while not self._arret.is_set():
+            try:
+                traites = self.executer_cycle()
+            except Exception as e:
+                self.erreurs += 1
+                if not echecs:
+                    logger.warning(f"⚠️ {self.nom_thread}: cycle en échec, nouvel essai en attente: {e}")
+                echecs += 1
+                if self._conn is not None and self._conn.closed:
+                    self._fermer()
+                self._arret.wait(min(self.intervalle * 2 ** min(echecs, 5), 60.0))
+                continue
+
+            if echecs:
+                logger.info(f"✅ {self.nom_thread}: synchronisation rétablie")
+                echecs = 0
+            if traites < self.taille_lot and not self._arret.is_set():
+                try:
+                    self._attendre()
+                except Exception:
+                    self._fermer()
+
+    def _terminer_cycle(self, traites: int) -> int:
+        self.cycles += 1
+        self.changements += traites
+        self.dernier_cycle = time.time()
+        return traites
+
+
+class SynchroniseurWhoosh(_ConsommateurOutbox):
+    """
+    Applique aux index Whoosh les CVs et offres uploadés (un seul par
+    déploiement: les changements sont réservés puis marqués traités)
+
+    Les documents passent par la file d'indexation (IndexingService): même
+    prétraitement et même commit groupé que l'indexation des uploads.
+    Un échec d'écriture annule la transaction: le lot est relu au cycle
+    suivant. Un document invalide (texte vide...) est ignoré et compté.
+    """
+
+    nom_thread = "sync-whoosh"
+
+    # Purge des changements traités au plus toutes les n secondes
+    PURGE_EVERY_S = 300
+
+    def __init__(self, intervalle: float = SYNC_POLL_INTERVAL_S, taille_lot: int = SYNC_BATCH_SIZE, retention: float = SYNC_RETENTION_S):
+        super().__init__(intervalle, taille_lot)
+        self.retention = retention
+        self._derniere_purge = 0.0
+        self.indexes = 0
+        self.supprimes = 0
+        self.ignores = 0
+
+    def executer_cycle(self) -> int:
+        conn = self._connexion()
+        cur = conn.cursor()
+        try:
+            cur.execute(claim_outbox_changes(), (self.taille_lot,))
+            lignes = cur.fetchall()
+            for table, docs in regrouper_changements(lignes).items():
+                doc_ids = [doc_id for doc_id, whoosh in docs.items() if whoosh]
+                if doc_ids:
+                    self._appliquer(cur, table, doc_ids)
+            if lignes:
+                cur.execute(mark_outbox_processed(), ([ligne[0] for ligne in lignes],))
+            if time.monotonic() - self._derniere_purge > self.PURGE_EVERY_S:
+                cur.execute(purge_outbox(), (self.retention,))
+                self._derniere_purge = time.monotonic()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+        if lignes:
+            logger.info(f"🔄 Synchronisation Whoosh: {len(lignes)} changement(s) appliqué(s)")
+        return self._terminer_cycle(len(lignes))
+
+    def _appliquer(self, cur, table: str, doc_ids: List[int]):
+        from whoosh.index import exists_in
+        from backend.config.settings import CV_INDEX, JOB_INDEX
+        from backend.indexation.indexing_service import get_cv_indexing_service, get_job_indexing_service
+        from backend.indexation.cv_indexer import soumettre_cv_depuis_texte
+        from backend.indexation.job_indexer import soumettre_offre_depuis_donnees
+
+        index_dir, service = (CV_INDEX, get_cv_indexing_service) if table == "cvs" else (JOB_INDEX, get_job_indexing_service)
+        if not exists_in(str(index_dir)):
+            logger.warning(f"⚠️ Index introuvable ({index_dir}): {len(doc_ids)} changement(s) {table} ignoré(s)")
+            self.ignores += len(doc_ids)
+            return
+
+        lignes = lire_lignes(cur, table, doc_ids)
+        # Sans chemin_pdf (uploads de cv_routes): garder le nom déjà indexé
+        noms = {}
+        if table == "cvs":
+            noms = lire_noms_fichiers(index_dir, [
+                str(doc_id) for doc_id, ligne in lignes.items()
+                if not ligne["source_systeme"] and not ligne["chemin_pdf"]
+            ])
+        futures = []
+        for doc_id in doc_ids:
+            ligne = lignes.get(doc_id)
+            if ligne is None or ligne["source_systeme"]:
+                # Supprimée, ou devenue donnée système (servie par PostgreSQL)
+                futures.append(service().supprimer(str(doc_id)))
+                self.supprimes += 1
+                continue
+
+            user_id = str(ligne["user_id"] or "")
+            if table == "cvs":
+                future = soumettre_cv_depuis_texte(
+                    str(doc_id),
+                    ligne["texte_complet"] or "",
+                    filename=os.path.basename(ligne["chemin_pdf"] or "") or noms.get(str(doc_id), ""),
+                    user_id=user_id
+                )
+            else:
+                future = soumettre_offre_depuis_donnees(str(doc_id), offre_vers_job_json(ligne), user_id)
+
+            if future is None:
+                self.ignores += 1
+            else:
+                futures.append(future)
+                self.indexes += 1
+
+        for future in futures:
+            future.result(timeout=INDEXING_WAIT_TIMEOUT_S)
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        stats.update({"indexes": self.indexes, "supprimes": self.supprimes, "ignores": self.ignores})
+        return stats
+
+
+class SuiviBM25(_ConsommateurOutbox):
+    """
+    Applique les changements de l'outbox aux index BM25 d'un modèle
+    vectoriel (un suivi par processus, lecture seule de l'outbox)
+
+    Les lignes source_systeme vont aux index *_pg, les uploads aux index
+    *_whoosh (tokens issus de texte_complet). Le modèle fournit
+    position_outbox (lue avant sa construction) et appliquer_changements().
+    """
+
+    nom_thread = "sync-bm25"
+
+    def __init__(self, modele, intervalle: float = SYNC_POLL_INTERVAL_S, taille_lot: int = SYNC_BATCH_SIZE):
+        super().__init__(intervalle, taille_lot)
+        self.modele = modele
+
+    def executer_cycle(self) -> int:
+        position = self.modele.position_outbox
+        if position is None:
+            return 0  # Index pas encore construits
+
+        conn = self._connexion()
+        cur = conn.cursor()
+        try:
+            cur.execute(get_outbox_changes_since(), (position.position, position.ids_attendus(), self.taille_lot))
+            lignes = cur.fetchall()
+            changements = {
+                table: (docs, lire_lignes(cur, table, list(docs)))
+                for table, docs in regrouper_changements(lignes).items()
+            }
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+        for table, (docs, etats) in changements.items():
+            systeme = self._tokeniser(table, [etat for etat in etats.values() if etat["source_systeme"]], upload=False)
+            uploads = self._tokeniser(table, [etat for etat in etats.values() if not etat["source_systeme"]], upload=True)
+            supprimes = [str(doc_id) for doc_id in docs if doc_id not in etats]
+            self.modele.appliquer_changements(table, systeme, uploads, supprimes)
+
+        position.avancer(ligne[0] for ligne in lignes)
+        if lignes:
+            logger.info(f"🔄 Synchronisation BM25: {len(lignes)} changement(s) appliqué(s)")
+        return self._terminer_cycle(len(lignes))
+
+    @staticmethod
+    def _tokeniser(table: str, etats: List[Dict], upload: bool) -> Dict[str, List[str]]:
+        """
+        Tokens de chaque ligne, produits comme à la construction des index:
+        lignes système comme _load_postgresql_documents, uploads comme
+        l'indexation Whoosh (texte nettoyé pour un CV, compétences connues)
+        """
+        if not etats:
+            return {}
+        textes = [etat["texte_complet"] or "" for etat in etats]
+        skills_list = None
+        if upload:
+            from backend.extraction.skills_extractor import get_skills_database
+            skills_list = get_skills_database().get_skills_set()
+            if table == "cvs":
+                textes = [nettoyer_texte_brut(texte) for texte in textes]
+        pretraitements = pretraiter_textes(textes, workers=1, preserve_skills=True, skills_list=skills_list)
+        return {str(etat["id"]): tokens for etat, (_, tokens) in zip(etats, pretraitements)}
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        position = self.modele.position_outbox
+        stats.update({
+            "position": position.position if position else None,
+            "ids_attendus": len(position.trous) if position else 0
+        })
+        return stats
+
+
+_synchroniseur: Optional[SynchroniseurWhoosh] = None
+_synchroniseur_lock = threading.Lock()
+
+
+def get_synchroniseur_whoosh() -> SynchroniseurWhoosh:
+    global _synchroniseur
+    with _synchroniseur_lock:
+        if _synchroniseur is None:
+            _synchroniseur = SynchroniseurWhoosh()
+        return _synchroniseur
+
+
+def oublier_synchroniseur_whoosh():
+    """
+    Dans l'enfant d'un fork: oublie le synchroniseur du parent et sa
+    connexion LISTEN, sans la fermer (le socket appartient au parent)
+    """
+    global _synchroniseur, _synchroniseur_lock
+    if _synchroniseur is not None:
+        _synchroniseur._conn = None
+    _synchroniseur = None
+    _synchroniseur_lock = threading.Lock()
+
+
+# ========================================================
+# CLI
+# ========================================================
+def main():
+    parser = argparse.ArgumentParser(description="Synchronisation PostgreSQL → index SmartHire")
+    parser.add_argument("--installer", action="store_true", help="Crée la table index_outbox et les triggers")
+    parser.add_argument("--une-fois", action="store_true", help="Applique les changements en attente puis s'arrête")
+    args = parser.parse_args()
+
+    if args.installer:
+        conn = get_db_connection()
+        if conn is None:
+            raise SystemExit("PostgreSQL indisponible")
+        installer_outbox(conn)
+        conn.close()
+        return
+
+    synchroniseur = get_synchroniseur_whoosh()
+    if args.une_fois:
+        while synchroniseur.executer_cycle() == synchroniseur.taille_lot:
+            pass
+        synchroniseur.arreter()
+        logger.info(f"✅ {synchroniseur.get_stats()}")
+        return
+
+    synchroniseur.demarrer()
+    logger.info("👂 Synchronisation Whoosh en cours (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        synchroniseur.arreter()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    main()
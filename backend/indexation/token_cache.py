@@ -0,0 +1,129 @@
+"""
+============================================================================
+SMARTHIRE - Cache persistant du prétraitement NLP
+Clé = empreinte (texte brut, signature de configuration) → liste de tokens.
+Un même texte n'est prétraité qu'une fois, quel que soit le pipeline
+(indexation, modèle vectoriel, évaluation) et même après redémarrage.
+============================================================================
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.config.settings import TOKEN_CACHE_ENABLED, TOKEN_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+_SEPARATEUR = "\x1f"  # Jamais présent dans un token (ni espace ni contrôle)
+_LOT_SQL = 500  # Paramètres par requête IN (limite SQLite: 999)
+
+
+def cle_cache(signature: bytes, texte: str) -> bytes:
+    """Empreinte 128 bits du texte brut sous une signature de configuration"""
+    h = hashlib.blake2b(signature, digest_size=16)
+    h.update(texte.encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+class TokenCache:
+    """
+    Table SQLite {clé: tokens} (mode WAL: lecteurs et indexeurs concurrents)
+
+    Une connexion par processus: après un fork, elle est rouverte au
+    premier accès plutôt que partagée avec le parent.
+    """
+
+    def __init__(self, chemin: Path = TOKEN_CACHE_FILE):
+        self.chemin = Path(chemin)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connexion(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.chemin.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.chemin), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens (cle BLOB PRIMARY KEY, tokens TEXT NOT NULL) WITHOUT ROWID"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, cles: Sequence[bytes]) -> Dict[bytes, List[str]]:
+        """Tokens connus parmi les clés demandées"""
+        trouves: Dict[bytes, List[str]] = {}
+        if not cles:
+            return trouves
+        uniques = list(dict.fromkeys(cles))
+        with self._lock:
+            conn = self._connexion()
+            for debut in range(0, len(uniques), _LOT_SQL):
+                lot = uniques[debut:debut + _LOT_SQL]
+                requete = f"SELECT cle, tokens FROM tokens WHERE cle IN ({','.join('?' * len(lot))})"
+                for cle, tokens in conn.execute(requete, lot):
+                    trouves[cle] = tokens.split(_SEPARATEUR) if tokens else []
+            self.hits += len(trouves)
+            self.misses += len(uniques) - len(trouves)
+        return trouves
+
+    def put_many(self, entrees: Iterable[Tuple[bytes, List[str]]]):
+        """Enregistre des résultats (une transaction pour tout le lot)"""
+        lignes = [(cle, _SEPARATEUR.join(tokens)) for cle, tokens in entrees]
+        if not lignes:
+            return
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO tokens (cle, tokens) VALUES (?, ?)", lignes)
+
+    def vider(self):
+        """Supprime toutes les entrées"""
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                conn.execute("DELETE FROM tokens")
+
+    def fermer(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entrees = self._connexion().execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "fichier": str(self.chemin),
+            "entrees": entrees,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# ========================================================
+# INSTANCE PARTAGÉE
+# ========================================================
+_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> Optional[TokenCache]:
+    """Cache du prétraitement (None si désactivé par SMARTHIRE_TOKEN_CACHE=0)"""
+    global _cache
+    if not TOKEN_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = TokenCache()
+    return _cache
@@ -3,15 +3,17 @@
 SMARTHIRE - Main Indexation Script
 Script principal pour indexer les CV et les offres d'emploi
 Usage:
-    python main_indexation.py              # Indexe tout
+    python main_indexation.py              # Indexe ce qui a changé (manifeste)
     python main_indexation.py --cv         # Indexe uniquement les CV
     python main_indexation.py --jobs       # Indexe uniquement les offres
     python main_indexation.py --force      # Recrée les index complètement
+    python main_indexation.py --lemmes     # + table de lemmes du vocabulaire
 ============================================================================
 """
 
 import sys
 import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
 # Ajout du répertoire parent au path
@@ -21,23 +23,42 @@ from backend.utils.logger import setup_logging, get_logger, log_section
 from indexation.cv_indexer import indexer_cvs_automatique
 from indexation.job_indexer import indexer_offres_automatique
 from backend.config.settings import create_directories
+from backend.indexation.preprocessing import (
+    collecte_vocabulaire,
+    sauvegarder_table_lemmes,
+    stats_lemmatisation
+)
+from backend.indexation.token_cache import get_token_cache
 
 logger = get_logger(__name__)
 
 # ========================================================
 # FONCTIONS PRINCIPALES
 # ========================================================
-def indexer_tout(force: bool = False):
-    """Indexe les CV et les offres"""
+def indexer_tout(force: bool = False) -> dict:
+    """Indexe les CV et les offres (changements détectés par index)"""
     log_section(logger, "INDEXATION COMPLÈTE DU SYSTÈME SMARTHIRE")
     
     logger.info("🔄 Étape 1/2: Indexation des CV...")
-    indexer_cvs_automatique(force=force)
+    changements_cv = indexer_cvs_automatique(force=force)
     
     logger.info("\n🔄 Étape 2/2: Indexation des offres d'emploi...")
-    indexer_offres_automatique(force=force)
+    changements_offres = indexer_offres_automatique(force=force)
     
     log_section(logger, "✅ INDEXATION COMPLÈTE TERMINÉE")
+    return {"CV": changements_cv, "Offres": changements_offres}
+
+
+def afficher_changements(changements: dict):
+    """Résumé des fichiers ajoutés, modifiés, supprimés et inchangés"""
+    for nom, detail in changements.items():
+        if detail is None:
+            continue
+        resume = detail.resume()
+        logger.info(
+            f"📊 {nom}: {resume['ajoutes']} ajoutés, {resume['modifies']} modifiés, "
+            f"{resume['supprimes']} supprimés, {resume['inchanges']} inchangés"
+        )
 
 
 def afficher_statistiques():
@@ -88,12 +109,13 @@ def parse_arguments():
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
 Exemples d'utilisation:
-  python main_indexation.py              # Indexe tout (CV + offres)
+  python main_indexation.py              # Indexe ce qui a changé (CV + offres)
   python main_indexation.py --cv         # Indexe uniquement les CV
   python main_indexation.py --jobs       # Indexe uniquement les offres
   python main_indexation.py --force      # Recrée complètement les index
   python main_indexation.py --stats      # Affiche les statistiques
   python main_indexation.py --cv --force # Recrée l'index des CV uniquement
+  python main_indexation.py --lemmes     # Indexe et persiste la table des lemmes
         """
     )
     
@@ -115,6 +137,12 @@ Exemples d'utilisation:
         help='Force la recréation complète des index'
     )
     
+    parser.add_argument(
+        '--lemmes',
+        action='store_true',
+        help='Précalcule et sauvegarde la table des lemmes du vocabulaire indexé'
+    )
+    
     parser.add_argument(
         '--stats',
         action='store_true',
@@ -149,17 +177,29 @@ def main():
     
     # Indexation
     try:
-        if indexer_cv and indexer_job:
-            # Indexation complète
-            indexer_tout(force=args.force)
-        elif indexer_cv:
-            # CV uniquement
-            log_section(logger, "INDEXATION DES CV UNIQUEMENT")
-            indexer_cvs_automatique(force=args.force)
-        elif indexer_job:
-            # Offres uniquement
-            log_section(logger, "INDEXATION DES OFFRES UNIQUEMENT")
-            indexer_offres_automatique(force=args.force)
+        # La collecte du vocabulaire contourne le cache de tokens: seulement si demandée
+        with (collecte_vocabulaire() if args.lemmes else nullcontext()) as vocabulaire:
+            if indexer_cv and indexer_job:
+                # Indexation complète
+                changements = indexer_tout(force=args.force)
+            elif indexer_cv:
+                # CV uniquement
+                log_section(logger, "INDEXATION DES CV UNIQUEMENT")
+                changements = {"CV": indexer_cvs_automatique(force=args.force)}
+            elif indexer_job:
+                # Offres uniquement
+                log_section(logger, "INDEXATION DES OFFRES UNIQUEMENT")
+                changements = {"Offres": indexer_offres_automatique(force=args.force)}
+        
+        # Fichiers traités depuis le dernier passage
+        afficher_changements(changements)
+        
+        # Table des lemmes du vocabulaire indexé
+        if args.lemmes:
+            sauvegarder_table_lemmes(vocabulaire)
+        logger.info(f"📊 Lemmatisation: {stats_lemmatisation()}")
+        if get_token_cache():
+            logger.info(f"📊 Cache de tokens: {get_token_cache().get_stats()}")
         
         # Affichage des statistiques finales
         logger.info("\n")
@@ -367,12 +367,15 @@ def health_check():
     except Exception as e:
         services['whoosh_error'] = str(e)
     
-    # Vérifier NLTK
+    # Vérifier NLTK (présence locale, sans import ni téléchargement)
     try:
-        import nltk
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-        services['nltk_resources'] = True
+        from backend.indexation.preprocessing import ressources_nltk_requises
+        from backend.utils.nltk_resources import verifier_ressources
+        
+        manquantes = verifier_ressources(ressources_nltk_requises())
+        services['nltk_resources'] = not manquantes
+        if manquantes:
+            services['nltk_error'] = f"Ressources absentes: {', '.join(manquantes)}"
     except Exception as e:
         services['nltk_error'] = str(e)
     
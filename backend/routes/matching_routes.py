@@ -5,16 +5,10 @@ from flask import Blueprint, request, jsonify, session
 import logging
 import re
 from database.connection import get_db_connection
-from backend.search.boolean_search import BooleanSearchModel
-from backend.search.vectoriel_model import VectorielSearchModel
 
 matching_bp = Blueprint('matching', __name__, url_prefix='/api/matching')
 logger = logging.getLogger(__name__)
 
-# Initialiser les modèles
-boolean_model = BooleanSearchModel()
-vectoriel_model = VectorielSearchModel()
-
 # Fonction pour extraire l'ID numérique
 def extract_numeric_id(entity_id):
     """
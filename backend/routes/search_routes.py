@@ -2,15 +2,82 @@
 Routes pour la recherche avancée (booléenne, vectorielle, hybride)
 """
 from flask import Blueprint, request, jsonify, session
-from typing import Dict, List
+from typing import Dict, List, Optional
 import logging
+import math
 
-from backend.search.search_orchestrator import SearchOrchestrator
+from backend.search.search_orchestrator import SearchOrchestrator, CursorError
+from backend.config.settings import SEARCH_DEADLINE_MS, SEARCH_MAX_PAGE_SIZE
 
 search_bp = Blueprint('search', __name__, url_prefix='/api/search')
 
 logger = logging.getLogger(__name__)
 
+# Orchestrateur partagé entre les requêtes (index BM25 construits une seule fois)
+_orchestrator = None
+
+# Champs de l'API → champs des modèles à lire (projection poussée aux modèles)
+API_FIELDS = {
+    'jobs': {
+        'title': ('nom',),
+        'company': (),
+        'location': ('localisation',),
+        'remote': ('localisation', 'contrat'),
+        'experience': ('experience',),
+        'salary': (),
+        'skills': ('tags', 'competences'),
+        'description': (),
+        'matchScore': (),
+        'postedDate': (),
+        'source': ()
+    },
+    'cvs': {
+        'name': ('nom',),
+        'title': (),
+        'location': ('localisation',),
+        'experience': ('experience',),
+        'skills': ('competences', 'tags'),
+        'level': ('niveau',),
+        'cvSummary': ('extrait',),
+        'matchScore': (),
+        'uploadDate': (),
+        'source': ()
+    }
+}
+
+
+def get_orchestrator() -> SearchOrchestrator:
+    """Retourne l'orchestrateur partagé (créé au premier appel)"""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = SearchOrchestrator()
+    return _orchestrator
+
+
+def _lire_deadline_ms(valeur) -> Optional[float]:
+    """Budget temps de la requête en ms (None: aucun); ValueError si invalide"""
+    if valeur is None:
+        return None
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float, str)):
+        raise ValueError(valeur)
+    deadline_ms = float(valeur)
+    if not math.isfinite(deadline_ms) or deadline_ms <= 0:
+        raise ValueError(valeur)
+    return deadline_ms
+
+
+def _lire_limite(valeur) -> Optional[int]:
+    """Taille de page demandée (None: défaut); ValueError si invalide"""
+    if valeur is None:
+        return None
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, str)):
+        raise ValueError(valeur)
+    limite = int(valeur)
+    if not 0 < limite <= SEARCH_MAX_PAGE_SIZE:
+        raise ValueError(valeur)
+    return limite
+
+
 @search_bp.route('/advanced', methods=['POST'])
 def advanced_search():
     """
@@ -29,8 +96,17 @@ def advanced_search():
         },
         "target": "jobs",  # "jobs" ou "cvs"
         "mode": "auto",    # "auto", "boolean", "vectoriel", "hybrid"
-        "limit": 20
+        "limit": 20,
+        "deadlineMs": 300,  # Optionnel: budget temps (résultats partiels si dépassé)
+        "cursor": "...",    # Optionnel: page suivante (nextCursor de la réponse précédente)
+        "fields": ["title", "skills"],  # Optionnel: champs à renvoyer (défaut: tous)
+        "compact": false,   # Optionnel: résultats et stats réduits à l'essentiel
+        "sort": "-experience",  # Optionnel: tri par expérience (mode booléen)
+        "facets": true      # Optionnel: comptes par années d'expérience
     }
+    
+    La première requête conserve le classement complet côté serveur et
+    renvoie "nextCursor"; les pages suivantes ne ré-hydratent que la page.
     """
     try:
         data = request.json
@@ -49,7 +125,42 @@ def advanced_search():
         query = data.get('query', '').strip()
         filters = data.get('filters', {})
         mode = data.get('mode', 'auto')
-        limit = data.get('limit', 20)
+        try:
+            limit = _lire_limite(data.get('limit'))
+        except ValueError:
+            return jsonify({'success': False, 'error': f'limit doit être un entier entre 1 et {SEARCH_MAX_PAGE_SIZE}'}), 400
+        try:
+            deadline_ms = _lire_deadline_ms(data.get('deadlineMs', SEARCH_DEADLINE_MS))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'deadlineMs doit être un nombre de millisecondes positif'}), 400
+        cursor = data.get('cursor')
+        compact = bool(data.get('compact', False))
+        sort = data.get('sort')
+        facets = bool(data.get('facets', False))
+        
+        # Projection: champs API demandés → champs lus par les modèles
+        api_target = 'cvs' if target == 'cvs' else 'jobs'
+        api_fields = data.get('fields')
+        if api_fields:
+            inconnus = [f for f in api_fields if f not in API_FIELDS[api_target]]
+            if inconnus:
+                return jsonify({'success': False, 'error': f'Champs inconnus: {inconnus}'}), 400
+        else:
+            api_fields = list(API_FIELDS[api_target])
+        model_fields = sorted({m for f in api_fields for m in API_FIELDS[api_target][f]})
+        
+        # Page suivante: servie depuis le classement en cache
+        if cursor:
+            try:
+                result = get_orchestrator().fetch_page(
+                    cursor,
+                    limit=limit,  # défaut: taille de page du curseur
+                    target='cvs' if target == 'cvs' else 'offres'
+                )
+            except CursorError as e:
+                return jsonify({'success': False, 'error': str(e)}), 410
+            
+            return jsonify(_build_response(result, target, query, filters, api_fields, compact)), 200
         
         # Adapter les filtres pour le moteur de recherche
         processed_filters = {}
@@ -84,83 +195,25 @@ def advanced_search():
             if filters.get('remote') and 'location' in processed_filters:
                 processed_filters['location'].append('remote')
         
-        # Initialiser l'orchestrateur
-        orchestrator = SearchOrchestrator()
-        
-        # Effectuer la recherche
-        result = orchestrator.search(
-            query=query,
-            filters=processed_filters,
-            target='cvs' if target == 'cvs' else 'offres',
-            mode=mode,
-            top_k=limit
-        )
-        
-        # Formater les résultats
-        formatted_results = []
-        
-        for item in result['results']:
-            if target == 'jobs':
-                formatted_item = {
-                    'id': item.get('id') or item.get('doc_id'),
-                    'title': item.get('titre') or item.get('nom', ''),
-                    'company': item.get('entreprise', ''),
-                    'location': item.get('localisation', ''),
-                    'remote': 'remote' in item.get('localisation', '').lower() or 
-                              item.get('type_contrat', '').lower() == 'télétravail',
-                    'experience': item.get('experience_min') or item.get('experience', 0),
-                    'salary': {
-                        'min': item.get('salaire_min', 0),
-                        'max': item.get('salaire_max', 0)
-                    },
-                    'skills': item.get('competences_requises') or 
-                              item.get('tags', []) or 
-                              item.get('competences', []),
-                    'description': item.get('description', '')[:200] + '...' if 
-                                  item.get('description', '') else '',
-                    'matchScore': int(item.get('score_hybrid', 0) * 100) if 
-                                 item.get('score_hybrid') else 
-                                 int(item.get('score_bm25', 0) * 10) if 
-                                 item.get('score_bm25') else 0,
-                    'postedDate': item.get('date_publication', ''),
-                    'source': item.get('source_type', 'systeme')
-                }
-            else:  # CVs
-                formatted_item = {
-                    'id': item.get('id') or item.get('doc_id'),
-                    'name': item.get('nom', ''),
-                    'title': item.get('titre_profil', ''),
-                    'location': item.get('localisation', ''),
-                    'experience': item.get('annees_experience') or item.get('experience', 0),
-                    'skills': item.get('competences') or item.get('tags', []),
-                    'level': item.get('niveau_estime', ''),
-                    'cvSummary': item.get('texte', '')[:200] + '...' if 
-                                item.get('texte', '') else '',
-                    'matchScore': int(item.get('score_hybrid', 0) * 100) if 
-                                 item.get('score_hybrid') else 
-                                 int(item.get('score_bm25', 0) * 10) if 
-                                 item.get('score_bm25') else 0,
-                    'uploadDate': item.get('date_upload', ''),
-                    'source': item.get('source_type', 'uploaded')
-                }
-            
-            formatted_results.append(formatted_item)
-        
-        response = {
-            'success': True,
-            'totalResults': result['stats']['total_results'],
-            'modeUsed': result['mode_used'],
-            'results': formatted_results,
-            'searchStats': {
-                'query': query,
-                'filtersApplied': filters,
-                'mode': result['mode_used'],
-                'sources': result['stats'].get('source_breakdown', {}),
-                'executionTime': result['stats'].get('execution_time', 0)
-            }
-        }
+        # Effectuer la recherche (classement complet mis en cache)
+        try:
+            result = get_orchestrator().search(
+                query=query,
+                filters=processed_filters,
+                target='cvs' if target == 'cvs' else 'offres',
+                mode=mode,
+                top_k=limit or 20,
+                deadline_ms=deadline_ms,
+                paginate=True,
+                fields=model_fields,
+                compact=compact,
+                sort=sort,
+                facets=facets
+            )
+        except ValueError as e:  # Tri inconnu, tri/facettes hors mode booléen
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        return jsonify(response), 200
+        return jsonify(_build_response(result, target, query, filters, api_fields, compact)), 200
         
     except Exception as e:
         logger.error(f"Erreur recherche avancée: {str(e)}")
@@ -169,6 +222,101 @@ def advanced_search():
             'error': str(e)
         }), 500
 
+
+def _match_score(item: Dict, mode: str) -> int:
+    """Score d'affichage depuis un résultat complet ou compact"""
+    if 'score' in item:  # Encodage compact: un seul score, celui du mode
+        score = item['score'] or 0
+        if mode == 'hybrid':
+            return int(score * 100)
+        return int(score * 10) if mode == 'vectoriel' else 0
+    
+    if item.get('score_hybrid'):
+        return int(item['score_hybrid'] * 100)
+    return int(item['score_bm25'] * 10) if item.get('score_bm25') else 0
+
+
+def _build_response(
+    result: Dict,
+    target: str,
+    query: str,
+    filters: Dict,
+    api_fields: List[str] = None,
+    compact: bool = False
+) -> Dict:
+    """Formate un résultat d'orchestrateur pour le frontend"""
+    formatted_results = []
+    mode_used = result['mode_used']
+    keep = set(api_fields) | {'id'} if api_fields else None
+    
+    for item in result['results']:
+        if target == 'jobs':
+            formatted_item = {
+                'id': item.get('id') or item.get('doc_id'),
+                'title': item.get('titre') or item.get('nom', ''),
+                'company': item.get('entreprise', ''),
+                'location': item.get('localisation', ''),
+                'remote': 'remote' in item.get('localisation', '').lower() or 
+                          item.get('type_contrat', '').lower() == 'télétravail',
+                'experience': item.get('experience_min') or item.get('experience', 0),
+                'salary': {
+                    'min': item.get('salaire_min', 0),
+                    'max': item.get('salaire_max', 0)
+                },
+                'skills': item.get('competences_requises') or 
+                          item.get('tags', []) or 
+                          item.get('competences', []),
+                'description': item.get('description', '')[:200] + '...' if 
+                              item.get('description', '') else '',
+                'matchScore': _match_score(item, mode_used),
+                'postedDate': item.get('date_publication', ''),
+                'source': item.get('source_type', 'systeme')
+            }
+        else:  # CVs
+            formatted_item = {
+                'id': item.get('id') or item.get('doc_id'),
+                'name': item.get('nom', ''),
+                'title': item.get('titre_profil', ''),
+                'location': item.get('localisation', ''),
+                'experience': item.get('annees_experience') or item.get('experience', 0),
+                'skills': item.get('competences') or item.get('tags', []),
+                'level': item.get('niveau') or item.get('niveau_estime', ''),
+                'cvSummary': (item.get('extrait') or item.get('texte') or '')[:200] + '...' if 
+                            (item.get('extrait') or item.get('texte')) else '',
+                'matchScore': _match_score(item, mode_used),
+                'uploadDate': item.get('date_upload', ''),
+                'source': item.get('source_type', 'uploaded')
+            }
+        
+        if keep is not None:
+            formatted_item = {k: v for k, v in formatted_item.items() if k in keep}
+        
+        formatted_results.append(formatted_item)
+    
+    response = {
+        'success': True,
+        'totalResults': result['stats']['total_results'],
+        'modeUsed': result['mode_used'],
+        'results': formatted_results,
+        'searchStats': {
+            'mode': result['mode_used'],
+            'sources': result['stats'].get('source_breakdown', {}),
+            'executionTime': result['stats'].get('execution_time', 0),
+            'degraded': result['stats'].get('degraded', False),
+            'degradedLegs': result['stats'].get('degraded_legs', [])
+        },
+        'nextCursor': result.get('next_cursor')
+    }
+    
+    if result.get('facets') is not None:
+        response['facets'] = result['facets']
+    
+    if not compact:
+        response['searchStats']['query'] = query
+        response['searchStats']['filtersApplied'] = filters
+    
+    return response
+
 @search_bp.route('/suggestions', methods=['GET'])
 def get_suggestions():
     """
@@ -242,8 +390,7 @@ def get_search_stats():
     Statistiques de recherche
     """
     try:
-        orchestrator = SearchOrchestrator()
-        system_stats = orchestrator.get_system_stats()
+        system_stats = get_orchestrator().get_system_stats()
         
         return jsonify({
             'success': True,
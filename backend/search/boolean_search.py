@@ -5,13 +5,16 @@ SMARTHIRE - Modèle Booléen (CORRIGÉ - Gestion ID)
 ============================================================================
 """
 
+import heapq
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 import json
 
 from whoosh.index import open_dir, exists_in
 from whoosh import query as wquery
+from whoosh import sorting
+from whoosh.collectors import TimeLimitCollector, TimeLimit
 
 # Dans boolean_search.py, remplacez l'import par :
 import sys
@@ -30,17 +33,44 @@ from database.connection import get_db_connection
 
 from backend.config.settings import CV_INDEX, JOB_INDEX, BASE_DIR
 from backend.search.filter_processor import FilterProcessor
+from backend.search.deadline import appliquer_statement_timeout, est_annulation_requete
+from backend.search.projection import (
+    RESULT_FIELDS,
+    FACET_FIELDS,
+    PG_COLUMNS,
+    WHOOSH_FIELDS,
+    normaliser_champs,
+    normaliser_tri,
+    resoudre_champs,
+    pg_select,
+    pg_valeurs,
+    whoosh_valeurs,
+    whoosh_lit_magasin
+)
+from backend.indexation.doc_store import get_document_store
 
 logger = logging.getLogger(__name__)
 
+
+class ResultatsBooleens(list):
+    """Résultats fusionnés + facettes demandées ({champ: {valeur: nombre}})"""
+    
+    def __init__(self, resultats=(), facettes: Optional[Dict] = None):
+        super().__init__(resultats)
+        self.facettes = facettes or {}
+
+
 # ========================================================
 # CLASSE PRINCIPALE
 # ========================================================
 class BooleanSearchModel:
     """Modèle booléen qui gère CVs système + CVs uploadés"""
     
+    # Champs renvoyés sans projection explicite
+    DEFAULT_FIELDS = tuple(f for f in RESULT_FIELDS if f != "extrait")
+    
     def __init__(self):
-        self.pg_conn = get_db_connection()
+        self._pg_conn = None
         self.whoosh_cv_index = None
         self.whoosh_job_index = None
         self._init_whoosh()
@@ -48,8 +78,37 @@ class BooleanSearchModel:
         self._mapping_cache = None
     
     def __del__(self):
-        if hasattr(self, 'pg_conn') and self.pg_conn:
-            self.pg_conn.close()
+        if getattr(self, '_pg_conn', None):
+            self._pg_conn.close()
+
+    @property
+    def pg_conn(self):
+        """Connexion PostgreSQL, ouverte au premier usage (pas à la construction)"""
+        if self._pg_conn is None:
+            self._pg_conn = get_db_connection()
+        return self._pg_conn
+    
+    def reset_connection(self, close: bool = True):
+        """
+        Oublie la connexion PostgreSQL (rouverte au prochain usage)
+
+        Args:
+            close: False après un fork: le socket appartient au parent
+        """
+        if self._pg_conn is not None and close:
+            try:
+                self._pg_conn.close()
+            except Exception:
+                pass
+        self._pg_conn = None
+    
+    def _rollback_silencieux(self):
+        """Sort la connexion d'une transaction en échec (sans lever)"""
+        try:
+            if self._pg_conn:
+                self._pg_conn.rollback()
+        except Exception:
+            pass
     
     def _init_whoosh(self):
         """Initialise index Whoosh"""
@@ -71,11 +130,35 @@ class BooleanSearchModel:
         self,
         query_terms: Dict[str, List[str]] = None,
         filters: Dict = None,
-        target: str = "cvs"
-    ) -> List[Dict]:
-        """Recherche booléenne avec filtres"""
+        target: str = "cvs",
+        deadline=None,
+        fields=None,
+        sort: Optional[str] = None,
+        facets: bool = False
+    ) -> ResultatsBooleens:
+        """
+        Recherche booléenne avec filtres
+        
+        Args:
+            deadline: SearchDeadline optionnelle; chaque branche (PostgreSQL,
+                Whoosh) est bornée au temps restant et renvoie un résultat
+                partiel si le budget est épuisé
+            fields: Projection (voir projection.RESULT_FIELDS); seuls ces
+                champs sont lus en base / dans Whoosh. None = DEFAULT_FIELDS
+            sort: Tri par colonne ("experience", "-experience" décroissant)
+                au lieu du score; fait par chaque branche (ORDER BY, sortedby)
+            facets: Comptes par valeur de FACET_FIELDS sur tous les documents
+                trouvés (GROUP BY, groupedby), dans ResultatsBooleens.facettes
+        
+        Raises:
+            ValueError: tri ou champs inconnus
+        """
         query_terms = query_terms or {}
         filters = filters or {}
+        champs = resoudre_champs(normaliser_champs(fields), self.DEFAULT_FIELDS)
+        tri = normaliser_tri(sort)
+        if tri and tri[0] not in champs:
+            champs = champs + (tri[0],)  # Valeur nécessaire à la fusion des branches
         
         logger.info(f"🔍 Recherche booléenne sur {target}")
         
@@ -88,24 +171,32 @@ class BooleanSearchModel:
         
         logger.info(f"   Terms finaux: {combined_terms}")
         
-        pg_results = self._search_postgresql(
+        pg_results, pg_facettes = self._search_postgresql(
             combined_terms,
             processed_filters,
-            target
+            target,
+            deadline,
+            champs,
+            tri,
+            facets
         )
         logger.info(f"   PostgreSQL → {len(pg_results)} résultats")
         
-        whoosh_results = self._search_whoosh(
+        whoosh_results, whoosh_facettes = self._search_whoosh(
             combined_terms,
             processed_filters,
-            target
+            target,
+            deadline,
+            champs,
+            tri,
+            facets
         )
         logger.info(f"   Whoosh → {len(whoosh_results)} résultats")
         
-        merged = self._merge_results(pg_results, whoosh_results)
+        merged = self._merge_results(pg_results, whoosh_results, tri)
         
         logger.info(f"✅ Total: {len(merged)} résultats")
-        return merged
+        return ResultatsBooleens(merged, self._merge_facettes(pg_facettes, whoosh_facettes) if facets else None)
     
     def _combine_terms_and_filters(
         self,
@@ -146,10 +237,15 @@ class BooleanSearchModel:
         self,
         terms: Dict,
         processed_filters: Dict,
-        target: str
-    ) -> List[Dict]:
-        """Recherche dans PostgreSQL (CVs système validés)"""
+        target: str,
+        deadline=None,
+        champs: tuple = None,
+        tri: Optional[Tuple[str, bool]] = None,
+        facettes: bool = False
+    ) -> Tuple[List[Dict], Dict]:
+        """Recherche dans PostgreSQL (CVs système validés) → (résultats, facettes)"""
         table = "cvs" if target == "cvs" else "offres"
+        colonnes = PG_COLUMNS[table]
         
         sql_where = processed_filters.get("sql_conditions", {}).get("where", "TRUE")
         sql_params = processed_filters.get("sql_conditions", {}).get("params", [])
@@ -172,54 +268,53 @@ class BooleanSearchModel:
         final_where = " AND ".join(all_conditions)
         final_params = sql_params + extra_params
         
-        if target == "cvs":
-            query = f"""
-            SELECT 
-                id,
-                nom,
-                email,
-                tags_manuels,
-                competences,
-                localisation,
-                niveau_estime,
-                annees_experience,
-                type_contrat,
-                diplome,
-                texte_complet
-            FROM {table}
-            WHERE source_systeme = TRUE
-              AND {final_where}
-            LIMIT 100
-            """
-        else:
-            query = f"""
+        # Projection: id + tags_manuels (scoring) + colonnes demandées
+        if champs is None:
+            champs = self.DEFAULT_FIELDS
+        lus, expressions = pg_select(target, [c for c in champs if c != "tags"])
+        select_list = ",\n                ".join(["id", "tags_manuels"] + expressions)
+        order_by = f"ORDER BY {colonnes[tri[0]]} {'DESC' if tri[1] else 'ASC'} NULLS LAST" if tri else ""
+        
+        query = f"""
             SELECT 
-                id,
-                titre,
-                entreprise,
-                tags_manuels,
-                competences_requises,
-                localisation,
-                niveau_souhaite,
-                experience_min,
-                type_contrat,
-                diplome_requis,
-                texte_complet
+                {select_list}
             FROM {table}
             WHERE source_systeme = TRUE
               AND {final_where}
+            {order_by}
             LIMIT 100
             """
         
+        if deadline is not None and deadline.expired():
+            deadline.mark_missed("postgresql")
+            return [], {}
+        
         try:
             cur = self.pg_conn.cursor()
+            appliquer_statement_timeout(cur, deadline)
             cur.execute(query, final_params)
             rows = cur.fetchall()
+            
+            # Facettes: un GROUP BY par champ, mêmes conditions
+            groupes = {}
+            if facettes:
+                for champ in FACET_FIELDS:
+                    cur.execute(f"""
+                        SELECT {colonnes[champ]}, COUNT(*)
+                        FROM {table}
+                        WHERE source_systeme = TRUE
+                          AND {final_where}
+                        GROUP BY 1
+                    """, final_params)
+                    groupes[champ] = dict(cur.fetchall())
             cur.close()
+            if deadline is not None:
+                # Termine la transaction pour lever le SET LOCAL
+                self.pg_conn.rollback()
             
             results = []
             for row in rows:
-                tags = set(row[3])
+                tags = set(row[1])
                 
                 score = self._calculate_boolean_score(
                     tags,
@@ -227,28 +322,27 @@ class BooleanSearchModel:
                     terms.get("should_have", [])
                 )
                 
-                results.append({
-                    "id": row[0],
-                    "nom": row[1],
-                    "email": row[2] if target == "cvs" else None,
-                    "tags": list(tags),
-                    "competences": row[4],
-                    "localisation": row[5],
-                    "niveau": row[6],
-                    "experience": row[7],
-                    "contrat": row[8],
-                    "diplome": row[9],
-                    "texte": row[10],
+                item = {"id": row[0]}
+                item.update(pg_valeurs(champs, lus, row[2:]))
+                if "tags" in champs:
+                    item["tags"] = list(tags)
+                item.update({
                     "score_boolean": score,
                     "source": "postgresql",
                     "source_type": "systeme"
                 })
+                results.append(item)
             
-            return results
+            return results, groupes
             
         except Exception as e:
-            logger.error(f"❌ Erreur PostgreSQL: {e}")
-            return []
+            self._rollback_silencieux()
+            if deadline is not None and est_annulation_requete(e):
+                logger.warning("⚠️ PostgreSQL interrompu par la deadline")
+                deadline.mark_missed("postgresql")
+            else:
+                logger.error(f"❌ Erreur PostgreSQL: {e}")
+            return [], {}
     
     # ========================================================
     # RECHERCHE WHOOSH (CORRIGÉ)
@@ -257,18 +351,41 @@ class BooleanSearchModel:
         self,
         terms: Dict,
         processed_filters: Dict,
-        target: str
-    ) -> List[Dict]:
+        target: str,
+        deadline=None,
+        champs: tuple = None,
+        tri: Optional[Tuple[str, bool]] = None,
+        facettes: bool = False
+    ) -> Tuple[List[Dict], Dict]:
         """
-        Recherche dans Whoosh (CVs uploadés auto-indexés)
+        Recherche dans Whoosh (CVs uploadés auto-indexés) → (résultats, facettes)
         
         ✅ CORRECTION: Utilise doc_id comme identifiant unique
+        ✅ Collecte bornée par la deadline (résultats partiels si dépassée)
+        ✅ Tri et facettes lus dans les colonnes (sortable=True), sans
+           charger les champs stockés
         """
         idx = self.whoosh_cv_index if target == "cvs" else self.whoosh_job_index
         
         if not idx:
             logger.warning(f"⚠️ Index Whoosh {target} non disponible")
-            return []
+            return [], {}
+        
+        if deadline is not None and deadline.expired():
+            deadline.mark_missed("whoosh")
+            return [], {}
+        
+        if champs is None:
+            champs = self.DEFAULT_FIELDS
+        id_field = "doc_id" if target == "cvs" else "job_id"
+        mapping = WHOOSH_FIELDS["cvs" if target == "cvs" else "offres"]
+        
+        options = {"limit": 100}
+        if tri:
+            options["sortedby"] = sorting.FieldFacet(mapping[tri[0]], reverse=tri[1])
+        if facettes:
+            options["groupedby"] = {champ: sorting.FieldFacet(mapping[champ]) for champ in FACET_FIELDS}
+            options["maptype"] = sorting.Count
         
         try:
             with idx.searcher() as searcher:
@@ -320,50 +437,63 @@ class BooleanSearchModel:
                 
                 logger.debug(f"Whoosh query: {final_query}")
                 
-                results = searcher.search(final_query, limit=100)
+                if deadline is None:
+                    results = searcher.search(final_query, **options)
+                else:
+                    # use_alarm=False : SIGALRM ne fonctionne que dans le thread principal
+                    collector = TimeLimitCollector(
+                        searcher.collector(**options),
+                        timelimit=deadline.remaining(),
+                        use_alarm=False
+                    )
+                    try:
+                        searcher.search_with_collector(final_query, collector)
+                    except TimeLimit:
+                        logger.warning("⚠️ Whoosh interrompu par la deadline")
+                        deadline.mark_missed("whoosh")
+                    results = collector.results()
+                
+                # Colonnes (identifiant, champs triables): lues par numéro de
+                # document, sans décompresser les champs stockés
+                reader = searcher.reader()
+                noms = {id_field} | {mapping[c] for c in champs if mapping.get(c)}
+                colonnes = {nom: reader.column_reader(nom) for nom in noms if reader.has_column(nom)}
+                
+                def _colonnes(hit) -> Dict:
+                    return {nom: colonne[hit.docnum] for nom, colonne in colonnes.items()}
+                
+                def _identifiant(hit) -> str:
+                    if id_field in colonnes:
+                        return colonnes[id_field][hit.docnum]
+                    return hit.get(id_field, "")
+                
+                # Champs volumineux: une lecture groupée du magasin de documents
+                documents = {}
+                if whoosh_lit_magasin(target, champs):
+                    documents = get_document_store(Path(idx.storage.folder)).lire_plusieurs(
+                        _identifiant(hit) for hit in results
+                    )
                 
                 formatted = []
                 for hit in results:
-                    if target == "cvs":
-                        doc_id = hit.get("doc_id", "")
-                        formatted.append({
-                        "id": doc_id,
-                        "doc_id": doc_id,
-                        "nom": hit.get("nom", ""),
-                        "email": "",
-                        "competences": hit.get("competences", "").split(","),
-                        "localisation": hit.get("localisation", ""),
-                        "niveau": "",
-                        "experience": hit.get("annees_experience", 0),
-                        "texte": hit.get("texte_pretraite", ""),
-                        "score_boolean": hit.score,
-                        "source": "whoosh",
-                        "source_type": "uploaded"
-                        })
-
-                    else:
-                        # Format pour Offres
-                        job_id = hit.get("job_id", "")
-                        formatted.append({
-                        "id": job_id,
-                        "doc_id": job_id,
-                        "nom": hit.get("titre_poste", ""),  # titre_poste pour les offres
-                        "email": "",
-                        "competences": hit.get("competences_requises", "").split(","),
-                        "localisation": hit.get("localisation", ""),
-                        "niveau": hit.get("niveau_souhaite", ""),
-                        "experience": hit.get("annees_min", 0),  # annees_min pour les offres
-                        "texte": hit.get("description_processed", ""),
-                        "score_boolean": hit.score,
+                    # doc_id pour les CVs, job_id pour les offres
+                    doc_id = _identifiant(hit)
+                    item = {"id": doc_id, "doc_id": doc_id}
+                    item.update(whoosh_valeurs(hit, target, champs, documents.get(doc_id), _colonnes(hit)))
+                    item.update({
+                        # Trié: hit.score est la clé de tri, pas une pertinence
+                        "score_boolean": None if tri else hit.score,
                         "source": "whoosh",
                         "source_type": "uploaded"
                     })
+                    formatted.append(item)
                 
-                return formatted
+                groupes = {champ: results.groups(champ) for champ in FACET_FIELDS} if facettes else {}
+                return formatted, groupes
                 
         except Exception as e:
             logger.error(f"❌ Erreur Whoosh: {e}")
-            return []
+            return [], {}
     
 
     
@@ -398,13 +528,44 @@ class BooleanSearchModel:
     def _merge_results(
         self,
         pg_results: List[Dict],
-        whoosh_results: List[Dict]
+        whoosh_results: List[Dict],
+        tri: Optional[Tuple[str, bool]] = None
     ) -> List[Dict]:
-        """Fusionne PostgreSQL + Whoosh"""
+        """
+        Fusionne PostgreSQL + Whoosh
+        
+        Avec un tri, les deux listes arrivent déjà triées (ORDER BY /
+        colonne Whoosh): simple interclassement, valeurs absentes en dernier
+        """
+        if tri:
+            champ, decroissant = tri
+            if decroissant:
+                cle = lambda x: (x.get(champ) is not None, x.get(champ) or 0)
+            else:
+                cle = lambda x: (x.get(champ) is None, x.get(champ) or 0)
+            return list(heapq.merge(pg_results, whoosh_results, key=cle, reverse=decroissant))
+        
         all_results = pg_results + whoosh_results
         all_results.sort(key=lambda x: x["score_boolean"], reverse=True)
         return all_results
     
+    def _merge_facettes(self, *groupes: Dict) -> Dict[str, Dict]:
+        """Additionne les comptes par valeur des facettes PostgreSQL + Whoosh (valeurs absentes ignorées)"""
+        fusion = {}
+        for facettes in groupes:
+            for champ, comptes in facettes.items():
+                cible = fusion.setdefault(champ, {})
+                for valeur, nombre in comptes.items():
+                    if valeur is None:
+                        continue
+                    if float(valeur).is_integer():
+                        valeur = int(valeur)
+                    cible[valeur] = cible.get(valeur, 0) + nombre
+        return {
+            champ: dict(sorted(comptes.items()))
+            for champ, comptes in fusion.items()
+        }
+    
     # ========================================================
     # MATCHING CV ↔ OFFRE (CORRIGÉ)
     # ========================================================
@@ -0,0 +1,113 @@
+"""
+============================================================================
+SMARTHIRE - Budget temps des recherches (deadline)
+Propage un délai maximal à chaque branche : PostgreSQL, Whoosh, BM25
+============================================================================
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+# ========================================================
+# DEADLINE PARTAGÉE ENTRE LES BRANCHES
+# ========================================================
+class SearchDeadline:
+    """
+    Budget temps d'une recherche, partagé par toutes ses branches.
+
+    Chaque branche consulte le temps restant avant (et pendant) son travail
+    et signale via mark_missed() qu'elle a dû s'arrêter avant la fin.
+    L'orchestrateur renvoie alors des résultats partiels marqués "degraded".
+    """
+
+    # Plancher pour statement_timeout (0 désactiverait le timeout côté PG)
+    MIN_STATEMENT_TIMEOUT_MS = 1
+
+    def __init__(self, budget_ms: float):
+        """
+        Args:
+            budget_ms: Budget total de la recherche en millisecondes
+        """
+        if budget_ms <= 0:
+            raise ValueError(f"Deadline invalide: {budget_ms} ms (doit être > 0)")
+
+        self.budget_ms = float(budget_ms)
+        self._start = time.monotonic()
+        self._expires_at = self._start + self.budget_ms / 1000.0
+        self._lock = threading.Lock()
+        self.missed_legs: List[str] = []
+
+    @classmethod
+    def from_ms(cls, deadline_ms: Optional[float]) -> Optional["SearchDeadline"]:
+        """Crée une deadline, ou None si aucun budget n'est demandé"""
+        if deadline_ms is None:
+            return None
+        return cls(float(deadline_ms))
+
+    def remaining(self) -> float:
+        """Temps restant en secondes (jamais négatif)"""
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> float:
+        """Temps restant en millisecondes (jamais négatif)"""
+        return self.remaining() * 1000.0
+
+    def elapsed_ms(self) -> float:
+        """Temps écoulé depuis la création de la deadline"""
+        return (time.monotonic() - self._start) * 1000.0
+
+    def expired(self) -> bool:
+        """True si le budget est épuisé"""
+        return time.monotonic() >= self._expires_at
+
+    def statement_timeout_ms(self) -> int:
+        """Valeur à passer à statement_timeout pour la requête SQL suivante"""
+        return max(self.MIN_STATEMENT_TIMEOUT_MS, int(self.remaining_ms()))
+
+    def mark_missed(self, leg: str):
+        """Signale qu'une branche a été interrompue par la deadline"""
+        with self._lock:
+            if leg not in self.missed_legs:
+                self.missed_legs.append(leg)
+
+    @property
+    def degraded(self) -> bool:
+        """True si au moins une branche a renvoyé un résultat partiel"""
+        return bool(self.missed_legs)
+
+    def to_stats(self) -> Dict:
+        """Résumé à intégrer dans les statistiques de recherche"""
+        return {
+            "deadline_ms": self.budget_ms,
+            "degraded": self.degraded,
+            "degraded_legs": list(self.missed_legs)
+        }
+
+
+# ========================================================
+# HELPERS POSTGRESQL
+# ========================================================
+# SQLSTATE "query_canceled" (statement_timeout atteint)
+PG_QUERY_CANCELED = "57014"
+
+
+def appliquer_statement_timeout(cursor, deadline: Optional[SearchDeadline]):
+    """
+    Borne la prochaine requête SQL au temps restant de la deadline.
+
+    SET LOCAL ne vaut que pour la transaction courante : l'appelant doit
+    terminer la transaction (rollback) après sa lecture.
+    """
+    if deadline is None:
+        return
+    cursor.execute(
+        "SET LOCAL statement_timeout = %s",
+        (deadline.statement_timeout_ms(),)
+    )
+
+
+def est_annulation_requete(exc: Exception) -> bool:
+    """True si l'exception PostgreSQL provient d'un statement_timeout"""
+    return getattr(exc, "pgcode", None) == PG_QUERY_CANCELED
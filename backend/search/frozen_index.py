@@ -0,0 +1,470 @@
+"""
+============================================================================
+SMARTHIRE - Index BM25 figé (buffers plats, partageables après fork)
+Même scoring que BM25Scorer, mais stocké dans quelques tableaux contigus
+(array / bytes) au lieu de millions de dicts, ints et str Python :
+la lecture ne touche aucun compteur de références par posting, donc les
+pages héritées du processus maître restent partagées (copy-on-write)
+============================================================================
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class FrozenBM25Index:
+    """
+    Index BM25 en lecture seule, au format CSR (compressed sparse row).
+
+    Disposition mémoire:
+        vocabulaire   : termes triés (UTF-8) concaténés dans un bytes +
+                        offsets array('I')  → recherche dichotomique
+        postings      : term_ptr[i]..term_ptr[i+1] délimite, dans
+                        post_docs / post_tfs, les documents du terme i
+        idf           : array('d') aligné sur le vocabulaire
+        documents     : ids concaténés (bytes + offsets), normalisation de
+                        longueur précalculée array('d'), ordre d'origine
+                        conservé (les résultats sortent dans le même ordre
+                        que BM25Scorer.score_all)
+
+    Interface compatible BM25Scorer: score(), score_all(), get_stats(),
+    attributs k1, b, N, avgdl.
+    """
+
+    # Fréquence de vérification de la deadline (en postings parcourus)
+    DEADLINE_CHECK_EVERY = 4096
+
+    def __init__(
+        self,
+        k1: float,
+        b: float,
+        avgdl: float,
+        vocab: Tuple[bytes, array],
+        idf: array,
+        term_ptr: array,
+        post_docs: array,
+        post_tfs: array,
+        doc_ids: Tuple[bytes, array],
+        doc_norm: array,
+        doc_lengths: array
+    ):
+        self.k1 = k1
+        self.b = b
+        self.avgdl = avgdl
+        self.N = len(doc_norm)
+
+        self._vocab_blob, self._vocab_offsets = vocab
+        self._idf = idf
+        self._term_ptr = term_ptr
+        self._post_docs = post_docs
+        self._post_tfs = post_tfs
+        self._doc_blob, self._doc_offsets = doc_ids
+        self._doc_norm = doc_norm
+        self._doc_lengths = doc_lengths
+
+        # Permutation des documents triés par id (pour score(doc_id))
+        self._doc_order = array("I", sorted(
+            range(self.N), key=lambda i: self._doc_blob[self._doc_offsets[i]:self._doc_offsets[i + 1]]
+        ))
+
+    # ========================================================
+    # CONSTRUCTION
+    # ========================================================
+    @classmethod
+    def from_scorer(cls, scorer) -> "FrozenBM25Index":
+        """
+        Fige un BM25Scorer construit (build_index déjà appelé)
+
+        Les structures temporaires sont libérées au retour: appeler
+        gc.collect() ensuite avant de forker.
+        """
+        doc_ids = list(scorer.doc_terms.keys())
+        doc_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+
+        termes = sorted(scorer.idf.keys(), key=lambda t: t.encode("utf-8"))
+        term_index = {t: i for i, t in enumerate(termes)}
+
+        # Postings par terme, dans l'ordre des documents
+        postings: List[List[Tuple[int, int]]] = [[] for _ in termes]
+        for doc_id, freqs in scorer.doc_terms.items():
+            d = doc_index[doc_id]
+            for terme, tf in freqs.items():
+                t = term_index.get(terme)
+                if t is not None:
+                    postings[t].append((d, tf))
+
+        term_ptr = array("I", [0])
+        post_docs = array("I")
+        post_tfs = array("I")
+        for plist in postings:
+            for d, tf in plist:
+                post_docs.append(d)
+                post_tfs.append(tf)
+            term_ptr.append(len(post_docs))
+
+        avgdl = scorer.avgdl
+        doc_lengths = array("I", (scorer.doc_lengths.get(doc_id, 0) for doc_id in doc_ids))
+        doc_norm = array("d", (
+            (1 - scorer.b + scorer.b * (dl / avgdl)) if avgdl else 1.0
+            for dl in doc_lengths
+        ))
+
+        return cls(
+            k1=scorer.k1,
+            b=scorer.b,
+            avgdl=avgdl,
+            vocab=_pack_strings(termes),
+            idf=array("d", (scorer.idf[t] for t in termes)),
+            term_ptr=term_ptr,
+            post_docs=post_docs,
+            post_tfs=post_tfs,
+            doc_ids=_pack_strings(doc_ids),
+            doc_norm=doc_norm,
+            doc_lengths=doc_lengths
+        )
+
+    # ========================================================
+    # RECHERCHE
+    # ========================================================
+    def term_id(self, terme: str) -> int:
+        """Position du terme dans le vocabulaire (-1 si inconnu)"""
+        return _bisect_blob(
+            self._vocab_blob, self._vocab_offsets, None, terme.encode("utf-8")
+        )
+
+    def doc_id(self, d: int) -> str:
+        """Identifiant du document d"""
+        return self._doc_blob[self._doc_offsets[d]:self._doc_offsets[d + 1]].decode("utf-8")
+
+    def doc_index(self, doc_id: str) -> int:
+        """Position du document (-1 si inconnu)"""
+        return _bisect_blob(self._doc_blob, self._doc_offsets, self._doc_order, str(doc_id).encode("utf-8"))
+
+    def score(self, query_tokens: List[str], doc_id: str) -> float:
+        """Score BM25 d'un document (même résultat que BM25Scorer.score)"""
+        d = self.doc_index(doc_id)
+        if d < 0 or self._doc_lengths[d] == 0:
+            return 0.0
+
+        total = 0.0
+        for terme in set(query_tokens):
+            t = self.term_id(terme)
+            if t < 0:
+                continue
+            # Postings triés par document: recherche dichotomique
+            fin = self._term_ptr[t + 1]
+            p = bisect_left(self._post_docs, d, self._term_ptr[t], fin)
+            if p < fin and self._post_docs[p] == d:
+                total += self._term_score(t, p, d)
+        return round(total, 4)
+
+    def score_all(self, query_tokens: List[str], deadline=None) -> Dict[str, float]:
+        """
+        Score tous les documents contenant au moins un terme (term-at-a-time)
+
+        Args:
+            query_tokens: Tokens de la requête
+            deadline: SearchDeadline optionnelle; à expiration, les termes
+                déjà parcourus donnent des scores partiels
+
+        Returns:
+            {doc_id: score_bm25}, dans l'ordre des documents de l'index
+        """
+        k1 = self.k1
+        idf = self._idf
+        term_ptr = self._term_ptr
+        post_docs = self._post_docs
+        post_tfs = self._post_tfs
+        doc_norm = self._doc_norm
+        check_every = self.DEADLINE_CHECK_EVERY
+
+        acc: Dict[int, float] = {}
+        vus = 0
+        interrompu = False
+
+        # Même ordre d'accumulation que BM25Scorer.score (itération du set)
+        for terme in set(query_tokens):
+            t = self.term_id(terme)
+            if t < 0:
+                continue
+
+            idf_t = idf[t]
+            for p in range(term_ptr[t], term_ptr[t + 1]):
+                vus += 1
+                if deadline is not None and vus % check_every == 0 and deadline.expired():
+                    interrompu = True
+                    break
+
+                d = post_docs[p]
+                f = post_tfs[p]
+                acc[d] = acc.get(d, 0.0) + idf_t * ((f * (k1 + 1)) / (f + k1 * doc_norm[d]))
+
+            if interrompu:
+                deadline.mark_missed("bm25")
+                break
+
+        scores = {}
+        for d in sorted(acc):
+            score = round(acc[d], 4)
+            if score > 0:
+                scores[self.doc_id(d)] = score
+        return scores
+
+    def _term_score(self, t: int, p: int, d: int) -> float:
+        f = self._post_tfs[p]
+        return self._idf[t] * ((f * (self.k1 + 1)) / (f + self.k1 * self._doc_norm[d]))
+
+    # ========================================================
+    # STATISTIQUES
+    # ========================================================
+    def nbytes(self) -> int:
+        """Taille des buffers (octets), hors en-têtes d'objets"""
+        buffers = (
+            self._vocab_offsets, self._idf, self._term_ptr, self._post_docs,
+            self._post_tfs, self._doc_offsets, self._doc_norm,
+            self._doc_lengths, self._doc_order
+        )
+        return (
+            len(self._vocab_blob) + len(self._doc_blob)
+            + sum(a.itemsize * len(a) for a in buffers)
+        )
+
+    def get_stats(self) -> Dict:
+        """Retourne statistiques de l'index (même format que BM25Scorer)"""
+        return {
+            "total_documents": self.N,
+            "avg_doc_length": round(self.avgdl, 2),
+            "unique_terms": len(self._idf),
+            "k1": self.k1,
+            "b": self.b,
+            "frozen": True,
+            "postings": len(self._post_docs),
+            "bytes": self.nbytes()
+        }
+
+
+class SurcoucheBM25:
+    """
+    Index figé + changements incrémentaux (synchronisation PostgreSQL),
+    sans jamais écrire dans les buffers partagés entre workers.
+
+    Un document modifié ou supprimé est masqué dans l'index figé; sa
+    nouvelle version est tenue dans des dicts, comme dans BM25Scorer.
+    Comme les documents supprimés d'un segment Lucene, les versions
+    masquées restent comptées dans N, avgdl et df jusqu'à la prochaine
+    construction (redémarrage): les scores dérivent peu et retirer un
+    document ne demande aucun parcours des postings.
+
+    Interface compatible BM25Scorer: score(), score_all(), get_stats(),
+    appliquer_changements(), attributs k1, b, N, avgdl.
+    """
+
+    DEADLINE_CHECK_EVERY = FrozenBM25Index.DEADLINE_CHECK_EVERY
+
+    def __init__(self, base: FrozenBM25Index):
+        self.base = base
+        self.k1 = base.k1
+        self.b = base.b
+
+        self.masques: Set[int] = set()  # Positions masquées dans l'index figé
+        self.doc_terms: Dict[str, Dict[str, int]] = {}  # Documents ajoutés
+        self.doc_lengths: Dict[str, int] = {}
+        self.df: Dict[str, int] = {}  # df des documents ajoutés
+        self._longueur_base = sum(base._doc_lengths)
+        self._calculer_stats()
+
+    def appliquer_changements(self, upserts: Dict[str, List[str]], suppressions: Iterable[str] = ()):
+        """
+        Args:
+            upserts: {doc_id: tokens} (ajout ou remplacement)
+            suppressions: doc_ids à retirer (inconnus ignorés)
+        """
+        for doc_id in (*suppressions, *upserts):
+            self._retirer(str(doc_id))
+        for doc_id, tokens in upserts.items():
+            freqs = dict(Counter(tokens))
+            for terme in freqs:
+                self.df[terme] = self.df.get(terme, 0) + 1
+            self.doc_lengths[str(doc_id)] = len(tokens)
+            self.doc_terms[str(doc_id)] = freqs
+        self._calculer_stats()
+
+    def _retirer(self, doc_id: str):
+        freqs = self.doc_terms.pop(doc_id, None)
+        if freqs is not None:
+            self.doc_lengths.pop(doc_id, None)
+            for terme in freqs:
+                self.df[terme] -= 1
+                if not self.df[terme]:
+                    del self.df[terme]
+            return
+        d = self.base.doc_index(doc_id)
+        if d >= 0:
+            self.masques.add(d)
+
+    def _calculer_stats(self):
+        self.N = self.base.N + len(self.doc_terms)
+        total = self._longueur_base + sum(self.doc_lengths.values())
+        self.avgdl = total / self.N if self.N else 0.0
+
+    def _idf(self, terme: str, t: int) -> Optional[float]:
+        """IDF sur index figé + ajouts (None si le terme n'apparaît nulle part)"""
+        df = self.df.get(terme, 0)
+        if t >= 0:
+            df += self.base._term_ptr[t + 1] - self.base._term_ptr[t]
+        if not df:
+            return None
+        return math.log((self.N - df + 0.5) / (df + 0.5))
+
+    def _norm(self, longueur: int) -> float:
+        return (1 - self.b + self.b * (longueur / self.avgdl)) if self.avgdl else 1.0
+
+    def score(self, query_tokens: List[str], doc_id: str) -> float:
+        """Score BM25 d'un document"""
+        doc_id = str(doc_id)
+        freqs = self.doc_terms.get(doc_id)
+        if freqs is not None:
+            longueur = self.doc_lengths.get(doc_id, 0)
+        else:
+            d = self.base.doc_index(doc_id)
+            if d < 0 or d in self.masques:
+                return 0.0
+            longueur = self.base._doc_lengths[d]
+        if longueur == 0:
+            return 0.0
+
+        k1 = self.k1
+        norm = self._norm(longueur)
+        total = 0.0
+        for terme in set(query_tokens):
+            t = self.base.term_id(terme)
+            if freqs is not None:
+                f = freqs.get(terme, 0)
+            else:
+                f = self._tf_base(t, d)
+            if not f:
+                continue
+            total += self._idf(terme, t) * ((f * (k1 + 1)) / (f + k1 * norm))
+        return round(total, 4)
+
+    def _tf_base(self, t: int, d: int) -> int:
+        if t < 0:
+            return 0
+        base = self.base
+        p = bisect_left(base._post_docs, d, base._term_ptr[t], base._term_ptr[t + 1])
+        if p < base._term_ptr[t + 1] and base._post_docs[p] == d:
+            return base._post_tfs[p]
+        return 0
+
+    def score_all(self, query_tokens: List[str], deadline=None) -> Dict[str, float]:
+        """
+        Score tous les documents visibles (index figé non masqué, puis ajouts)
+
+        Returns:
+            {doc_id: score_bm25}
+        """
+        base = self.base
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        term_ptr, post_docs, post_tfs = base._term_ptr, base._post_docs, base._post_tfs
+        doc_lengths = base._doc_lengths
+        masques = self.masques
+        ajouts = list(self.doc_terms.items())
+        check_every = self.DEADLINE_CHECK_EVERY
+
+        acc_base: Dict[int, float] = {}
+        acc_ajouts: Dict[str, float] = {}
+        vus = 0
+        interrompu = False
+
+        for terme in set(query_tokens):
+            t = base.term_id(terme)
+            idf_t = self._idf(terme, t)
+            if idf_t is None:
+                continue
+
+            if t >= 0:
+                for p in range(term_ptr[t], term_ptr[t + 1]):
+                    vus += 1
+                    if deadline is not None and vus % check_every == 0 and deadline.expired():
+                        interrompu = True
+                        break
+
+                    d = post_docs[p]
+                    if d in masques:
+                        continue
+                    f = post_tfs[p]
+                    norm = (1 - b + b * (doc_lengths[d] / avgdl)) if avgdl else 1.0
+                    acc_base[d] = acc_base.get(d, 0.0) + idf_t * ((f * (k1 + 1)) / (f + k1 * norm))
+
+                if interrompu:
+                    deadline.mark_missed("bm25")
+                    break
+
+            for doc_id, freqs in ajouts:
+                f = freqs.get(terme)
+                if f:
+                    norm = self._norm(self.doc_lengths.get(doc_id, 0))
+                    acc_ajouts[doc_id] = acc_ajouts.get(doc_id, 0.0) + idf_t * ((f * (k1 + 1)) / (f + k1 * norm))
+
+        scores = {}
+        for d in sorted(acc_base):
+            score = round(acc_base[d], 4)
+            if score > 0:
+                scores[base.doc_id(d)] = score
+        for doc_id, total in acc_ajouts.items():
+            score = round(total, 4)
+            if score > 0:
+                scores[doc_id] = score
+        return scores
+
+    def get_stats(self) -> Dict:
+        """Statistiques de l'index figé + changements"""
+        stats = self.base.get_stats()
+        stats.update({
+            "total_documents": self.N,
+            "avg_doc_length": round(self.avgdl, 2),
+            "documents_ajoutes": len(self.doc_terms),
+            "documents_masques": len(self.masques)
+        })
+        return stats
+
+
+# ========================================================
+# HELPERS
+# ========================================================
+def _pack_strings(valeurs: List[str]) -> Tuple[bytes, array]:
+    """Concatène des chaînes UTF-8 dans un seul bytes + offsets"""
+    encodees = [str(v).encode("utf-8") for v in valeurs]
+    offsets = array("I", [0])
+    total = 0
+    for e in encodees:
+        total += len(e)
+        offsets.append(total)
+    return b"".join(encodees), offsets
+
+
+def _bisect_blob(blob: bytes, offsets: array, order: Optional[array], cle: bytes) -> int:
+    """
+    Recherche dichotomique d'une clé dans des chaînes concaténées triées
+
+    Args:
+        order: Permutation triée des positions (None = déjà triées)
+
+    Returns:
+        Position de la clé, ou -1
+    """
+    lo, hi = 0, len(offsets) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        i = order[mid] if order is not None else mid
+        courant = blob[offsets[i]:offsets[i + 1]]
+        if courant < cle:
+            lo = mid + 1
+        elif courant > cle:
+            hi = mid
+        else:
+            return i
+    return -1
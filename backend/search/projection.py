@@ -0,0 +1,268 @@
+"""
+============================================================================
+SMARTHIRE - Projection des champs de résultats
+Les modèles ne lisent (SQL / Whoosh) que les champs demandés, et les
+résultats peuvent être encodés en format compact (ids + scores + champs)
+============================================================================
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from backend.config.settings import CV_DOCSTORE_FIELDS, JOB_DOCSTORE_FIELDS
+
+# Longueur de l'extrait de texte calculé côté base (au lieu de [:200] côté route)
+EXTRAIT_LONGUEUR = 200
+
+# Champs projetables (hors identifiants, source et scores, toujours présents)
+RESULT_FIELDS = (
+    "nom",
+    "email",
+    "tags",
+    "competences",
+    "localisation",
+    "niveau",
+    "experience",
+    "contrat",
+    "diplome",
+    "texte",
+    "extrait"
+)
+
+# Champs toujours renvoyés, quelle que soit la projection
+CORE_FIELDS = ("id", "doc_id", "source", "source_type")
+
+# Scores conservés en encodage compact
+SCORE_FIELDS = ("score_boolean", "score_bm25", "score_hybrid")
+
+# Colonnes PostgreSQL par champ (None = champ sans équivalent, renvoyé à None)
+PG_COLUMNS = {
+    "cvs": {
+        "nom": "nom",
+        "email": "email",
+        "tags": "tags_manuels",
+        "competences": "competences",
+        "localisation": "localisation",
+        "niveau": "niveau_estime",
+        "experience": "annees_experience",
+        "contrat": "type_contrat",
+        "diplome": "diplome",
+        "texte": "texte_complet",
+        "extrait": f"LEFT(texte_complet, {EXTRAIT_LONGUEUR})"
+    },
+    "offres": {
+        "nom": "titre",
+        "email": None,
+        "tags": "competences_requises",
+        "competences": "competences_requises",
+        "localisation": "localisation",
+        "niveau": "niveau_souhaite",
+        "experience": "experience_min",
+        "contrat": "type_contrat",
+        "diplome": "diplome_requis",
+        "texte": "texte_complet",
+        "extrait": f"LEFT(texte_complet, {EXTRAIT_LONGUEUR})"
+    }
+}
+
+# Champs stockés Whoosh par champ (liste séparée par virgules pour tags/compétences)
+WHOOSH_FIELDS = {
+    "cvs": {
+        "nom": "nom",
+        "email": None,
+        "tags": "competences",
+        "competences": "competences",
+        "localisation": "localisation",
+        "niveau": None,
+        "experience": "annees_experience",
+        "contrat": None,
+        "diplome": None,
+        "texte": "texte_pretraite",
+        "extrait": "texte_pretraite"
+    },
+    "offres": {
+        "nom": "titre_poste",
+        "email": None,
+        "tags": "competences_requises",
+        "competences": "competences_requises",
+        "localisation": "localisation",
+        "niveau": "niveau_souhaite",
+        "experience": "annees_min",
+        "contrat": "type_contrat",
+        "diplome": "diplome_requis",
+        "texte": "description_processed",
+        "extrait": "description_processed"
+    }
+}
+
+_LIST_FIELDS = {"tags", "competences"}
+
+# Champs triables (colonnes Whoosh sortable=True / colonnes SQL indexables)
+SORT_FIELDS = ("experience",)
+
+# Champs regroupables en facettes (comptes par valeur)
+FACET_FIELDS = ("experience",)
+
+
+# ========================================================
+# NORMALISATION
+# ========================================================
+def normaliser_champs(fields: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """
+    Valide une projection demandée
+
+    Args:
+        fields: Champs demandés (None = projection par défaut du modèle)
+
+    Returns:
+        frozenset des champs, ou None
+
+    Raises:
+        ValueError: champ inconnu
+    """
+    if fields is None:
+        return None
+
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+
+    champs = frozenset(fields) - set(CORE_FIELDS) - set(SCORE_FIELDS)
+    inconnus = champs - set(RESULT_FIELDS)
+    if inconnus:
+        raise ValueError(
+            f"Champs inconnus: {sorted(inconnus)}. Utiliser: {list(RESULT_FIELDS)}"
+        )
+    return champs
+
+
+def normaliser_tri(sort: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """
+    Valide un tri demandé ("experience" croissant, "-experience" décroissant)
+
+    Returns:
+        (champ, décroissant), ou None
+
+    Raises:
+        ValueError: champ non triable
+    """
+    if not sort:
+        return None
+    champ, decroissant = (sort[1:], True) if sort.startswith("-") else (sort, False)
+    if champ not in SORT_FIELDS:
+        raise ValueError(f"Tri impossible sur {champ!r}. Utiliser: {list(SORT_FIELDS)}")
+    return champ, decroissant
+
+
+def resoudre_champs(fields: Optional[FrozenSet[str]], defaults: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Champs effectivement lus: projection demandée ou défaut du modèle"""
+    if fields is None:
+        return defaults
+    return tuple(f for f in RESULT_FIELDS if f in fields)
+
+
+# ========================================================
+# LECTURE DES SOURCES
+# ========================================================
+def pg_select(target: str, champs: Tuple[str, ...]) -> Tuple[List[str], List[str]]:
+    """
+    Expressions SQL à sélectionner pour une projection
+
+    Returns:
+        (champs lus en base, expressions SQL correspondantes)
+        Les champs sans colonne (ex: email des offres) ne sont pas lus.
+    """
+    colonnes = PG_COLUMNS["cvs" if target == "cvs" else "offres"]
+    lus, expressions = [], []
+    for champ in champs:
+        expression = colonnes.get(champ)
+        if expression is not None:
+            lus.append(champ)
+            expressions.append(expression)
+    return lus, expressions
+
+
+def pg_valeurs(champs: Tuple[str, ...], lus: List[str], valeurs) -> Dict:
+    """Construit le dict projeté depuis une ligne SQL (valeurs de `lus`)"""
+    par_champ = dict(zip(lus, valeurs))
+    item = {}
+    for champ in champs:
+        valeur = par_champ.get(champ)
+        if champ in _LIST_FIELDS and valeur is None:
+            valeur = []
+        item[champ] = valeur
+    return item
+
+
+def whoosh_lit_magasin(target: str, champs: Tuple[str, ...]) -> bool:
+    """La projection demande-t-elle un champ du magasin de documents ?"""
+    mapping = WHOOSH_FIELDS["cvs" if target == "cvs" else "offres"]
+    deportes = CV_DOCSTORE_FIELDS if target == "cvs" else JOB_DOCSTORE_FIELDS
+    return any(mapping.get(champ) in deportes for champ in champs)
+
+
+def whoosh_valeurs(
+    hit,
+    target: str,
+    champs: Tuple[str, ...],
+    document: Optional[Dict] = None,
+    colonnes: Optional[Dict] = None
+) -> Dict:
+    """
+    Construit le dict projeté depuis un hit Whoosh (seuls les champs demandés)
+
+    document: champs du magasin de documents pour ce hit (les champs
+    stockés dans Whoosh, ancien schéma, restent prioritaires)
+    colonnes: valeurs lues dans les colonnes Whoosh pour ce hit; si elles
+    (avec document) couvrent la projection, les champs stockés ne sont pas lus
+    """
+    mapping = WHOOSH_FIELDS["cvs" if target == "cvs" else "offres"]
+    valeurs = {**(document or {}), **(colonnes or {})}
+    if not all(mapping.get(champ) is None or mapping[champ] in valeurs for champ in champs):
+        valeurs.update(hit.fields())
+    item = {}
+    for champ in champs:
+        stored = mapping.get(champ)
+        if stored is None:
+            item[champ] = [] if champ in _LIST_FIELDS else ""
+            continue
+
+        if champ in _LIST_FIELDS:
+            item[champ] = valeurs.get(stored, "").split(",")
+        elif champ == "experience":
+            item[champ] = valeurs.get(stored, 0)
+        elif champ == "extrait":
+            item[champ] = (valeurs.get(stored, "") or "")[:EXTRAIT_LONGUEUR]
+        else:
+            item[champ] = valeurs.get(stored, "")
+    return item
+
+
+# ========================================================
+# ENCODAGE COMPACT
+# ========================================================
+def encoder_compact(results: List[Dict], score_key: str, champs: Optional[FrozenSet[str]] = None) -> List[Dict]:
+    """
+    Encodage compact: id + score + champs demandés (sans dicts de debug
+    comme *_norm, in_boolean, fusion_strategy)
+    """
+    compacts = []
+    for r in results:
+        item = {
+            "id": r.get("id") or r.get("doc_id"),
+            "score": r.get(score_key, 0.0),
+            "source_type": r.get("source_type")
+        }
+        if champs:
+            for champ in RESULT_FIELDS:
+                if champ in champs and champ in r:
+                    item[champ] = r[champ]
+        compacts.append(item)
+    return compacts
+
+
+def stats_compactes(stats: Dict) -> Dict:
+    """Statistiques réduites à l'essentiel pour l'encodage compact"""
+    cles = (
+        "mode", "total_results", "top_k", "source_breakdown",
+        "execution_time", "degraded", "degraded_legs"
+    )
+    return {k: stats[k] for k in cles if k in stats}
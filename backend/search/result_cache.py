@@ -0,0 +1,249 @@
+"""
+============================================================================
+SMARTHIRE - Cache des classements (pagination par curseur)
+Stocke le classement fusionné complet (ids + scores) côté serveur, dans un
+fichier SQLite commun aux workers, et distribue des curseurs opaques pour
+les pages suivantes
+============================================================================
+"""
+
+import base64
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from backend.config.settings import (
+    SEARCH_CURSOR_CACHE_FILE,
+    SEARCH_CURSOR_CACHE_SIZE,
+    SEARCH_CURSOR_TTL_SECONDS,
+    SEARCH_CURSOR_MAX_RANKING
+)
+
+
+class CursorError(ValueError):
+    """Curseur invalide, expiré ou évincé du cache"""
+
+
+# ========================================================
+# ENCODAGE DU CURSEUR
+# ========================================================
+def encode_cursor(key: str, offset: int, limit: int) -> str:
+    """Encode (clé de cache, offset, taille de page) en jeton opaque"""
+    payload = json.dumps({"k": key, "o": offset, "n": limit}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int]:
+    """
+    Décode un curseur produit par encode_cursor()
+
+    Raises:
+        CursorError: si le jeton est mal formé
+    """
+    if not isinstance(cursor, str) or not cursor:
+        raise CursorError("Curseur mal formé: chaîne attendue")
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        key, offset, limit = payload["k"], int(payload["o"]), int(payload["n"])
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise CursorError(f"Curseur mal formé: {e}")
+
+    if offset < 0 or limit <= 0:
+        raise CursorError("Curseur mal formé: offset/limit invalides")
+
+    return key, offset, limit
+
+
+# ========================================================
+# CACHE LRU BORNÉ
+# ========================================================
+class RankedListCache:
+    """
+    Cache LRU (nombre d'entrées + TTL) de classements complets.
+
+    Chaque entrée ne contient que des tuples (doc_id, source, score) :
+    les détails sont ré-hydratés page par page. Les entrées sont dans une
+    table SQLite (mode WAL) partagée par tous les processus: un curseur
+    émis par un worker gunicorn est servi par n'importe quel autre. Une
+    connexion par processus, rouverte après un fork.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEARCH_CURSOR_CACHE_SIZE,
+        ttl_seconds: float = SEARCH_CURSOR_TTL_SECONDS,
+        max_ranking: int = SEARCH_CURSOR_MAX_RANKING,
+        chemin: Path = SEARCH_CURSOR_CACHE_FILE
+    ):
+        """
+        Args:
+            max_entries: Nombre max de classements conservés (LRU)
+            ttl_seconds: Durée de vie d'un classement
+            max_ranking: Longueur max d'un classement (au-delà: tronqué)
+            chemin: Fichier SQLite partagé
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_ranking = max_ranking
+        self.chemin = Path(chemin)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connexion(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            self.chemin.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.chemin), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS classements ("
+                "cle TEXT PRIMARY KEY, ranking TEXT NOT NULL, meta TEXT NOT NULL, "
+                "expire REAL NOT NULL, acces REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS classements_acces ON classements (acces)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def put(self, ranking: List[Tuple], meta: Dict = None) -> str:
+        """
+        Stocke un classement et retourne sa clé
+
+        Args:
+            ranking: Liste ordonnée de (doc_id, source, score)
+            meta: Métadonnées (target, mode_used, score_key, stats...)
+        """
+        key = secrets.token_urlsafe(12)
+        maintenant = time.time()
+        ligne = (
+            key,
+            json.dumps(list(ranking[:self.max_ranking]), separators=(",", ":")),
+            json.dumps(dict(meta or {}), separators=(",", ":")),
+            maintenant + self.ttl_seconds,
+            maintenant
+        )
+
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                conn.execute("DELETE FROM classements WHERE expire < ?", (maintenant,))
+                conn.execute("INSERT INTO classements VALUES (?, ?, ?, ?, ?)", ligne)
+                en_trop = conn.execute("SELECT COUNT(*) FROM classements").fetchone()[0] - self.max_entries
+                if en_trop > 0:
+                    conn.execute(
+                        "DELETE FROM classements WHERE cle IN "
+                        "(SELECT cle FROM classements ORDER BY acces, rowid LIMIT ?)",
+                        (en_trop,)
+                    )
+                    self.evictions += en_trop
+
+        return key
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retourne l'entrée (et la marque récente) ou None si absente/expirée"""
+        maintenant = time.time()
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                ligne = conn.execute(
+                    "SELECT ranking, meta, expire FROM classements WHERE cle = ?", (key,)
+                ).fetchone()
+
+                if ligne is None:
+                    self.misses += 1
+                    return None
+
+                if ligne[2] < maintenant:
+                    conn.execute("DELETE FROM classements WHERE cle = ?", (key,))
+                    self.misses += 1
+                    return None
+
+                conn.execute("UPDATE classements SET acces = ? WHERE cle = ?", (maintenant, key))
+                self.hits += 1
+
+        return {
+            "ranking": [tuple(r) for r in json.loads(ligne[0])],
+            "meta": json.loads(ligne[1]),
+            "expires_at": ligne[2]
+        }
+
+    def get_page(self, cursor: str, limit: int = None) -> Tuple[List[Tuple], Dict, Optional[str], int]:
+        """
+        Découpe la page désignée par un curseur
+
+        Args:
+            cursor: Curseur opaque
+            limit: Taille de page (défaut: celle du curseur)
+
+        Returns:
+            (page, meta, next_cursor, total)
+
+        Raises:
+            CursorError: curseur invalide ou classement expiré
+            ValueError: taille de page non entière ou négative
+        """
+        key, offset, cursor_limit = decode_cursor(cursor)
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0):
+            raise ValueError(f"Taille de page invalide: {limit!r}")
+        limit = limit or cursor_limit
+
+        entry = self.get(key)
+        if entry is None:
+            raise CursorError("Curseur expiré, relancer la recherche")
+
+        ranking = entry["ranking"]
+        page = ranking[offset:offset + limit]
+
+        next_offset = offset + limit
+        next_cursor = encode_cursor(key, next_offset, limit) if next_offset < len(ranking) else None
+
+        return page, entry["meta"], next_cursor, len(ranking)
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                conn.execute("DELETE FROM classements")
+
+    def get_stats(self) -> Dict:
+        """Statistiques d'utilisation du cache (compteurs de ce processus)"""
+        with self._lock:
+            size = self._connexion().execute("SELECT COUNT(*) FROM classements").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+# ========================================================
+# INSTANCE GLOBALE (SINGLETON)
+# ========================================================
+_ranked_list_cache = None
+
+
+def get_ranked_list_cache() -> RankedListCache:
+    """Retourne l'instance singleton du cache de classements"""
+    global _ranked_list_cache
+    if _ranked_list_cache is None:
+        _ranked_list_cache = RankedListCache()
+    return _ranked_list_cache
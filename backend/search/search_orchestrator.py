@@ -5,6 +5,9 @@ SMARTHIRE - Search Orchestrator (VECTORIEL + BOOLÉEN + HYBRIDE)
 """
 
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, List, Optional
 
 from search.boolean_search import BooleanSearchModel
@@ -12,9 +15,24 @@ from search.vectoriel_model import VectorielSearchModel
 from search.hybrid_scorer import HybridScorer, analyze_score_distribution
 from search.filter_processor import FilterProcessor
 from search.query_processor import SearchQueryProcessor
+from search.deadline import SearchDeadline
+from search.result_cache import CursorError, encode_cursor, get_ranked_list_cache
+from search.projection import normaliser_champs, normaliser_tri, encoder_compact, stats_compactes
+from backend.indexation.preprocessing import stats_lemmatisation
+from backend.indexation.token_cache import get_token_cache
 
 logger = logging.getLogger(__name__)
 
+# Branches booléenne et vectorielle exécutées en parallèle en mode hybride
+_LEG_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-leg")
+
+# Score de classement selon le mode (stocké avec le classement paginé)
+SCORE_KEYS = {
+    "boolean": "score_boolean",
+    "vectoriel": "score_bm25",
+    "hybrid": "score_hybrid"
+}
+
 
 # ========================================================
 # ORCHESTRATEUR COMPLET
@@ -26,16 +44,17 @@ class SearchOrchestrator:
     """
     
     def __init__(self):
-        """Initialise tous les modèles"""
+        """Initialise les modules légers (modèles construits au premier usage)"""
         logger.info("🔧 Initialisation SearchOrchestrator...")
         
         # Modules de base
         self.query_processor = SearchQueryProcessor()
         self.filter_processor = FilterProcessor()
         
-        # Modèles de recherche
-        self.boolean_model = BooleanSearchModel()
-        self.vectoriel_model = VectorielSearchModel()
+        # Modèles de recherche (construction différée, voir propriétés)
+        self._boolean_model = None
+        self._vectoriel_model = None
+        self._models_lock = threading.Lock()
         
         # Scorer hybride par défaut
         self.hybrid_scorer = HybridScorer(
@@ -46,6 +65,24 @@ class SearchOrchestrator:
         
         logger.info("✅ SearchOrchestrator initialisé (booléen + vectoriel + hybride)")
     
+    @property
+    def boolean_model(self) -> BooleanSearchModel:
+        """Modèle booléen, construit au premier usage"""
+        if self._boolean_model is None:
+            with self._models_lock:
+                if self._boolean_model is None:
+                    self._boolean_model = BooleanSearchModel()
+        return self._boolean_model
+    
+    @property
+    def vectoriel_model(self) -> VectorielSearchModel:
+        """Modèle vectoriel, construit au premier usage"""
+        if self._vectoriel_model is None:
+            with self._models_lock:
+                if self._vectoriel_model is None:
+                    self._vectoriel_model = VectorielSearchModel()
+        return self._vectoriel_model
+    
     def search(
         self,
         query: str = "",
@@ -56,7 +93,13 @@ class SearchOrchestrator:
         auto_extract: bool = True,
         hybrid_strategy: str = "weighted",
         boolean_weight: float = 0.5,
-        bm25_weight: float = 0.5
+        bm25_weight: float = 0.5,
+        deadline_ms: Optional[float] = None,
+        paginate: bool = False,
+        fields: Optional[List[str]] = None,
+        compact: bool = False,
+        sort: Optional[str] = None,
+        facets: bool = False
     ) -> Dict:
         """
         Point d'entrée principal de la recherche
@@ -71,18 +114,42 @@ class SearchOrchestrator:
             hybrid_strategy: "weighted", "rrf", "max", "multiplicative"
             boolean_weight: Poids booléen (si weighted)
             bm25_weight: Poids BM25 (si weighted)
+            deadline_ms: Budget temps total (ms). Propagé à chaque branche;
+                si une branche le dépasse, les résultats des branches terminées
+                sont renvoyés avec stats["degraded"] = True
+            paginate: Conserver le classement complet en cache et renvoyer
+                un curseur ("next_cursor") pour les pages suivantes (fetch_page)
+            fields: Projection des champs (voir projection.RESULT_FIELDS),
+                poussée jusqu'aux requêtes SQL / lectures Whoosh
+            compact: Résultats réduits à id + score + champs demandés,
+                statistiques réduites (pas de debug de fusion)
+            sort: Tri par colonne ("experience", "-experience"), mode booléen
+            facets: Comptes par valeur (projection.FACET_FIELDS), mode booléen
             
         Returns:
             {
                 "mode_used": str,
                 "results": List[Dict],
                 "stats": Dict,
-                "config": Dict
+                "config": Dict,
+                "next_cursor": Optional[str],  # si paginate
+                "facets": Dict  # si facets (mode booléen)
             }
+            
+        Raises:
+            ValueError: tri inconnu, ou tri/facettes avec un mode autre
+                que "auto" ou "boolean"
         """
         
         logger.info(f"🔍 Recherche: query='{query}', filters={filters}, mode={mode}")
         
+        debut = time.perf_counter()
+        deadline = SearchDeadline.from_ms(deadline_ms)
+        champs = normaliser_champs(fields)
+        normaliser_tri(sort)
+        if (sort or facets) and mode not in ("auto", "boolean"):
+            raise ValueError(f"Tri et facettes exigent le mode booléen (mode demandé: {mode!r})")
+        
         # 1. PRÉTRAITEMENT
         processed_query = {}
         enriched_filters = filters or {}
@@ -99,38 +166,187 @@ class SearchOrchestrator:
                 )
                 logger.info(f"   Filters enrichis: {enriched_filters}")
         
-        # 2. DÉCISION MODE
-        if mode == "auto":
+        # 2. DÉCISION MODE (tri et facettes: colonnes du modèle booléen)
+        if mode == "auto" and (sort or facets):
+            mode = "boolean"
+        elif mode == "auto":
             mode = self._decide_mode(query, processed_query, enriched_filters)
         
         logger.info(f"   Mode sélectionné: {mode.upper()}")
         
-        # 3. CONFIGURATION HYBRIDE
+        # 3. CONFIGURATION HYBRIDE (locale: l'orchestrateur peut être partagé)
+        hybrid_scorer = self.hybrid_scorer
         if mode == "hybrid":
-            self.hybrid_scorer = HybridScorer(
+            hybrid_scorer = HybridScorer(
                 strategy=hybrid_strategy,
                 boolean_weight=boolean_weight,
                 bm25_weight=bm25_weight
             )
         
-        # 4. EXÉCUTION
+        # 4. EXÉCUTION (classement complet si pagination)
+        retrieval_k = None if paginate else top_k
+        
         if mode == "boolean":
-            return self._search_boolean(
-                processed_query, enriched_filters, target, top_k
+            result = self._search_boolean(
+                processed_query, enriched_filters, target, retrieval_k, deadline, champs,
+                sort, facets
             )
         
         elif mode == "vectoriel":
-            return self._search_vectoriel(
-                query, target, top_k
+            result = self._search_vectoriel(
+                query, target, retrieval_k, deadline, champs
             )
         
         elif mode == "hybrid":
-            return self._search_hybrid(
-                query, processed_query, enriched_filters, target, top_k
+            result = self._search_hybrid(
+                query, processed_query, enriched_filters, target, retrieval_k,
+                deadline, hybrid_scorer, champs
             )
         
         else:
             raise ValueError(f"Mode inconnu: {mode}")
+        
+        if paginate:
+            result = self._paginate_first_page(result, target, top_k, champs, compact)
+        
+        result = self._annotate_deadline(result, deadline, debut)
+        
+        if compact:
+            result = self._compact(result, champs)
+        
+        return result
+    
+    def _compact(self, result: Dict, champs) -> Dict:
+        """Applique l'encodage compact (ids + scores + champs demandés)"""
+        score_key = SCORE_KEYS[result["mode_used"]]
+        result["results"] = encoder_compact(result["results"], score_key, champs)
+        result["stats"] = stats_compactes(result["stats"])
+        return result
+    
+    # ========================================================
+    # PAGINATION PAR CURSEUR
+    # ========================================================
+    def _paginate_first_page(
+        self,
+        result: Dict,
+        target: str,
+        top_k: int,
+        champs=None,
+        compact: bool = False
+    ) -> Dict:
+        """
+        Met le classement complet (ids + scores) en cache et ne garde
+        que la première page dans la réponse
+        """
+        mode_used = result["mode_used"]
+        score_key = SCORE_KEYS[mode_used]
+        full_results = result["results"]
+        
+        ranking = [
+            (r.get("id") or r.get("doc_id"), r.get("source"), r.get(score_key, 0.0))
+            for r in full_results
+        ]
+        
+        cache = get_ranked_list_cache()
+        key = cache.put(ranking, {
+            "target": target,
+            "mode_used": mode_used,
+            "score_key": score_key,
+            "config": result["config"],
+            "fields": sorted(champs) if champs is not None else None,
+            "compact": compact
+        })
+        
+        result["results"] = full_results[:top_k]
+        result["stats"]["top_k"] = top_k
+        result["next_cursor"] = (
+            encode_cursor(key, top_k, top_k)
+            if len(full_results) > top_k and top_k < cache.max_ranking
+            else None
+        )
+        return result
+    
+    def fetch_page(self, cursor: str, limit: int = None, target: str = None) -> Dict:
+        """
+        Sert une page suivante depuis un classement en cache.
+        Seuls les documents de la page sont ré-hydratés; aucun modèle
+        n'est ré-exécuté.
+        
+        Args:
+            cursor: Curseur renvoyé par search(paginate=True) ou fetch_page()
+            limit: Taille de page (défaut: celle du curseur)
+            target: Si fourni, doit correspondre à la cible de la recherche initiale
+            
+        Raises:
+            CursorError: curseur invalide, expiré ou d'une autre cible
+        """
+        debut = time.perf_counter()
+        
+        page, meta, next_cursor, total = get_ranked_list_cache().get_page(cursor, limit)
+        
+        if target is not None and meta["target"] != target:
+            raise CursorError("Curseur émis pour une autre cible de recherche")
+        
+        results = self.vectoriel_model.hydrate(
+            page, meta["target"], meta["score_key"], meta.get("fields")
+        )
+        
+        result = {
+            "mode_used": meta["mode_used"],
+            "results": results,
+            "stats": {
+                "mode": meta["mode_used"],
+                "total_results": total,
+                "page_size": len(page),
+                "source_breakdown": self._count_sources(results),
+                "from_cache": True,
+                "execution_time": round((time.perf_counter() - debut) * 1000, 2),
+                "degraded": False
+            },
+            "config": meta["config"],
+            "next_cursor": next_cursor
+        }
+        
+        if meta.get("compact"):
+            result = self._compact(result, meta.get("fields"))
+        
+        return result
+    
+    def _annotate_deadline(
+        self,
+        result: Dict,
+        deadline: Optional[SearchDeadline],
+        debut: float
+    ) -> Dict:
+        """Ajoute temps d'exécution et état de la deadline aux stats"""
+        stats = result["stats"]
+        stats["execution_time"] = round((time.perf_counter() - debut) * 1000, 2)
+        
+        if deadline is None:
+            stats["degraded"] = False
+            return result
+        
+        stats.update(deadline.to_stats())
+        if deadline.degraded:
+            logger.warning(
+                f"⚠️ Deadline {deadline.budget_ms:.0f} ms dépassée → résultats partiels "
+                f"(branches: {', '.join(deadline.missed_legs)})"
+            )
+        return result
+    
+    def _collect_leg(self, future, leg: str, deadline: Optional[SearchDeadline], default):
+        """
+        Attend une branche lancée en parallèle, au plus jusqu'à la deadline.
+        Une branche non terminée est abandonnée (elle s'arrête d'elle-même
+        à sa prochaine vérification de la deadline).
+        """
+        timeout = deadline.remaining() if deadline is not None else None
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"⚠️ Branche {leg} abandonnée (deadline)")
+            deadline.mark_missed(leg)
+            return default
     
     def _decide_mode(
         self,
@@ -218,7 +434,11 @@ class SearchOrchestrator:
         processed_query: Dict,
         filters: Dict,
         target: str,
-        top_k: int
+        top_k: int,
+        deadline: Optional[SearchDeadline] = None,
+        champs=None,
+        sort: Optional[str] = None,
+        facets: bool = False
     ) -> Dict:
         """Mode booléen pur"""
         
@@ -238,7 +458,11 @@ class SearchOrchestrator:
         results = self.boolean_model.search(
             query_terms=query_terms,
             filters=filters,
-            target=target
+            target=target,
+            deadline=deadline,
+            fields=champs,
+            sort=sort,
+            facets=facets
         )
         
         # Top K
@@ -254,18 +478,23 @@ class SearchOrchestrator:
             "source_breakdown": self._count_sources(results)
         }
         
-        return {
+        result = {
             "mode_used": "boolean",
             "results": top_results,
             "stats": stats,
-            "config": {"target": target}
+            "config": {"target": target, "sort": sort}
         }
+        if facets:
+            result["facets"] = results.facettes
+        return result
     
     def _search_vectoriel(
         self,
         query: str,
         target: str,
-        top_k: int
+        top_k: int,
+        deadline: Optional[SearchDeadline] = None,
+        champs=None
     ) -> Dict:
         """Mode vectoriel pur (BM25)"""
         
@@ -274,7 +503,9 @@ class SearchOrchestrator:
         result = self.vectoriel_model.search(
             query=query,
             target=target,
-            top_k=top_k
+            top_k=top_k,
+            deadline=deadline,
+            fields=champs
         )
         
         # Enrichir stats
@@ -293,33 +524,54 @@ class SearchOrchestrator:
         processed_query: Dict,
         filters: Dict,
         target: str,
-        top_k: int
+        top_k: int,
+        deadline: Optional[SearchDeadline] = None,
+        hybrid_scorer: Optional[HybridScorer] = None,
+        champs=None
     ) -> Dict:
-        """Mode hybride: Booléen + Vectoriel fusionnés"""
+        """
+        Mode hybride: Booléen + Vectoriel fusionnés
+        
+        Les deux branches tournent en parallèle; avec une deadline, seules
+        les branches terminées à temps sont fusionnées.
+        """
         
         logger.info("🔍 Exécution: HYBRIDE")
         
+        hybrid_scorer = hybrid_scorer or self.hybrid_scorer
+        
         # 1. Recherche booléenne
         query_terms = {}
         if processed_query.get("skills"):
             query_terms["must_have"] = processed_query["skills"]
         
-        boolean_results = self.boolean_model.search(
+        boolean_future = _LEG_EXECUTOR.submit(
+            self.boolean_model.search,
             query_terms=query_terms,
             filters=filters,
-            target=target
+            target=target,
+            deadline=deadline,
+            fields=champs
         )
         
         # 2. Recherche vectorielle
-        vectoriel_result = self.vectoriel_model.search(
+        vectoriel_future = _LEG_EXECUTOR.submit(
+            self.vectoriel_model.search,
             query=query,
             target=target,
-            top_k=100  # Prendre plus pour fusion
+            top_k=100,  # Prendre plus pour fusion
+            deadline=deadline,
+            fields=champs
+        )
+        
+        boolean_results = self._collect_leg(boolean_future, "boolean", deadline, [])
+        vectoriel_result = self._collect_leg(
+            vectoriel_future, "vectoriel", deadline, {"results": []}
         )
         vectoriel_results = vectoriel_result["results"]
         
         # 3. Fusion hybride
-        fused_results = self.hybrid_scorer.fuse(
+        fused_results = hybrid_scorer.fuse(
             boolean_results=boolean_results,
             bm25_results=vectoriel_results,
             deduplicate=True
@@ -338,8 +590,8 @@ class SearchOrchestrator:
             "filters_applied": filters,
             "boolean_count": len(boolean_results),
             "vectoriel_count": len(vectoriel_results),
-            "fusion_strategy": self.hybrid_scorer.strategy,
-            "fusion_config": self.hybrid_scorer.get_config(),
+            "fusion_strategy": hybrid_scorer.strategy,
+            "fusion_config": hybrid_scorer.get_config(),
             "source_breakdown": self._count_sources(fused_results),
             "overlap_stats": self._analyze_overlap(boolean_results, vectoriel_results)
         }
@@ -350,10 +602,10 @@ class SearchOrchestrator:
             "stats": stats,
             "config": {
                 "target": target,
-                "fusion_strategy": self.hybrid_scorer.strategy,
+                "fusion_strategy": hybrid_scorer.strategy,
                 "weights": {
-                    "boolean": self.hybrid_scorer.boolean_weight,
-                    "bm25": self.hybrid_scorer.bm25_weight
+                    "boolean": hybrid_scorer.boolean_weight,
+                    "bm25": hybrid_scorer.bm25_weight
                 }
             }
         }
@@ -446,9 +698,35 @@ class SearchOrchestrator:
         
         return results
     
+    def preload(self, freeze: bool = True):
+        """
+        Construit modèles et index BM25 immédiatement (processus maître,
+        avant fork des workers), puis ferme les connexions PostgreSQL
+        pour qu'aucun socket ne soit partagé entre processus.
+
+        Args:
+            freeze: Fige les index BM25 en buffers plats (FrozenBM25Index)
+        """
+        self.boolean_model
+        self.vectoriel_model.ensure_indices(workers=None)  # Pool de prétraitement
+        if freeze:
+            self.vectoriel_model.freeze_indices()
+        self.reset_connections()
+
+    def demarrer_synchronisation(self):
+        """Suivi de index_outbox par les index BM25 déjà construits (après fork)"""
+        if self._vectoriel_model is not None:
+            self._vectoriel_model.demarrer_synchronisation()
+    
+    def reset_connections(self, close: bool = True):
+        """Oublie les connexions PostgreSQL (rouvertes au premier usage)"""
+        for model in (self._boolean_model, self._vectoriel_model):
+            if model is not None:
+                model.reset_connection(close=close)
+
     def get_system_stats(self) -> Dict:
         """Retourne statistiques globales du système"""
-        
+
         return {
             "boolean_model": {
                 "status": "active"
@@ -460,7 +738,10 @@ class SearchOrchestrator:
             "hybrid_scorer": {
                 "default_strategy": self.hybrid_scorer.strategy,
                 "available_strategies": list(HybridScorer.STRATEGIES.keys())
-            }
+            },
+            "cursor_cache": get_ranked_list_cache().get_stats(),
+            "lemmatisation": stats_lemmatisation(),
+            "token_cache": get_token_cache().get_stats() if get_token_cache() else None
         }
 
 
@@ -6,13 +6,27 @@ Implémente l'algorithme BM25 (Best Matching 25) pour la recherche par pertinenc
 """
 
 import math
+import threading
 from collections import Counter, defaultdict
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterable, List, Optional, Tuple, Set
 import json
+from pathlib import Path
 
 from database.connection import get_db_connection
-from backend.config.settings import CV_INDEX, JOB_INDEX
-from backend.indexation.preprocessing import pretraiter_texte
+from backend.config.settings import CV_INDEX, JOB_INDEX, SEARCH_PRELOAD, SYNC_ENABLED
+from backend.indexation.preprocessing import pretraiter_texte, pretraiter_textes
+from backend.search.deadline import appliquer_statement_timeout, est_annulation_requete
+from backend.search.frozen_index import FrozenBM25Index, SurcoucheBM25
+from backend.indexation.doc_store import get_document_store
+from backend.indexation.sync_index import PositionOutbox, SuiviBM25, lire_position_outbox
+from backend.search.projection import (
+    normaliser_champs,
+    resoudre_champs,
+    pg_select,
+    pg_valeurs,
+    whoosh_valeurs,
+    whoosh_lit_magasin
+)
 from whoosh.index import open_dir
 from whoosh import qparser
 
@@ -33,6 +47,9 @@ class BM25Scorer:
     - b = paramètre de normalisation de longueur (défaut: 0.75)
     """
     
+    # Fréquence de vérification de la deadline dans score_all (en documents)
+    DEADLINE_CHECK_EVERY = 256
+    
     def __init__(self, k1: float = 1.5, b: float = 0.75):
         """
         Args:
@@ -90,11 +107,47 @@ class BM25Scorer:
         self.avgdl = total_length / self.N if self.N > 0 else 0
         
         # 3. Calculer IDF pour tous les termes
-        for term, df_value in self.df.items():
-            # IDF(qi) = log((N - df(qi) + 0.5) / (df(qi) + 0.5))
-            self.idf[term] = math.log(
-                (self.N - df_value + 0.5) / (df_value + 0.5)
-            )
+        self._calculer_idf()
+    
+    def _calculer_idf(self):
+        """IDF de tous les termes (dict remplacé d'un bloc: lecteurs concurrents)"""
+        # IDF(qi) = log((N - df(qi) + 0.5) / (df(qi) + 0.5))
+        self.idf = {
+            term: math.log((self.N - df_value + 0.5) / (df_value + 0.5))
+            for term, df_value in self.df.items()
+        }
+    
+    def appliquer_changements(self, upserts: Dict[str, List[str]], suppressions: Iterable[str] = ()):
+        """
+        Met à jour l'index sans reconstruction (synchronisation PostgreSQL)
+        
+        Même état qu'un build_index sur le corpus modifié: N, avgdl, df et
+        IDF sont recalculés une fois par appel.
+        
+        Args:
+            upserts: {doc_id: tokens} (ajout ou remplacement)
+            suppressions: doc_ids à retirer (inconnus ignorés)
+        """
+        for doc_id in (*suppressions, *upserts):
+            freqs = self.doc_terms.pop(str(doc_id), None)
+            if freqs is None:
+                continue
+            self.doc_lengths.pop(str(doc_id), None)
+            for term in freqs:
+                self.df[term] -= 1
+                if not self.df[term]:
+                    del self.df[term]
+        
+        for doc_id, tokens in upserts.items():
+            term_freqs = dict(Counter(tokens))
+            for term in term_freqs:
+                self.df[term] = self.df.get(term, 0) + 1
+            self.doc_lengths[str(doc_id)] = len(tokens)
+            self.doc_terms[str(doc_id)] = term_freqs
+        
+        self.N = len(self.doc_terms)
+        self.avgdl = sum(self.doc_lengths.values()) / self.N if self.N > 0 else 0
+        self._calculer_idf()
     
     def score(self, query_tokens: List[str], doc_id: str) -> float:
         """
@@ -107,7 +160,8 @@ class BM25Scorer:
         Returns:
             Score BM25 (float >= 0)
         """
-        if doc_id not in self.doc_terms:
+        doc_term_freqs = self.doc_terms.get(doc_id)
+        if doc_term_freqs is None:
             return 0.0
         
         doc_len = self.doc_lengths.get(doc_id, 0)
@@ -115,7 +169,6 @@ class BM25Scorer:
             return 0.0
         
         score_total = 0.0
-        doc_term_freqs = self.doc_terms[doc_id]
         
         # Pour chaque terme unique de la requête
         for term in set(query_tokens):
@@ -144,16 +197,27 @@ class BM25Scorer:
         
         return round(score_total, 4)
     
-    def score_all(self, query_tokens: List[str]) -> Dict[str, float]:
+    def score_all(self, query_tokens: List[str], deadline=None) -> Dict[str, float]:
         """
         Score tous les documents pour une requête
         
+        Args:
+            query_tokens: Tokens de la requête
+            deadline: SearchDeadline optionnelle; si elle expire pendant la
+                boucle, les scores déjà calculés sont renvoyés (partiels)
+        
         Returns:
             {doc_id: score_bm25}
         """
         scores = {}
+        check_every = self.DEADLINE_CHECK_EVERY
         
-        for doc_id in self.doc_terms.keys():
+        # Copie des clés: la synchronisation peut modifier l'index en parallèle
+        for i, doc_id in enumerate(list(self.doc_terms)):
+            if deadline is not None and i % check_every == 0 and deadline.expired():
+                deadline.mark_missed("bm25")
+                break
+            
             score = self.score(query_tokens, doc_id)
             if score > 0:
                 scores[doc_id] = score
@@ -177,8 +241,11 @@ class VectorielSearchModel:
     Gère PostgreSQL + Whoosh
     """
     
+    # Champs renvoyés sans projection explicite
+    DEFAULT_FIELDS = ("nom", "tags", "localisation", "experience", "niveau")
+    
     def __init__(self):
-        self.pg_conn = get_db_connection()
+        self._pg_conn = None
         self.whoosh_cv_index = None
         self.whoosh_job_index = None
         self._init_whoosh()
@@ -189,8 +256,107 @@ class VectorielSearchModel:
         self.bm25_job_pg = BM25Scorer(k1=1.5, b=0.75)
         self.bm25_job_whoosh = BM25Scorer(k1=1.5, b=0.75)
         
-        # Construire index BM25
-        self._build_bm25_indices()
+        # Index BM25 construits à la première recherche (voir ensure_indices)
+        self._indices_construits = False
+        self._indices_lock = threading.Lock()
+        
+        # Synchronisation: position dans index_outbox lue avant la construction
+        self.position_outbox = None
+        self._suivi = None
+    
+    def __del__(self):
+        if getattr(self, '_pg_conn', None):
+            self._pg_conn.close()
+
+    @property
+    def pg_conn(self):
+        """Connexion PostgreSQL, ouverte au premier usage (pas à la construction)"""
+        if self._pg_conn is None:
+            self._pg_conn = get_db_connection()
+        return self._pg_conn
+    
+    def ensure_indices(self, workers: Optional[int] = 1):
+        """
+        Construit les index BM25 au premier appel (thread-safe)
+        
+        Args:
+            workers: Processus de prétraitement (1 = dans le processus
+                courant, pendant une requête; None = pool PREPROCESS_WORKERS,
+                réservé au préchargement)
+        """
+        if self._indices_construits:
+            return
+        with self._indices_lock:
+            if not self._indices_construits:
+                self._build_bm25_indices(workers)
+                self._indices_construits = True
+        # Préchargement: le suivi démarre dans chaque worker, après le fork
+        if SYNC_ENABLED and not SEARCH_PRELOAD:
+            self.demarrer_synchronisation()
+    
+    def demarrer_synchronisation(self):
+        """Suit index_outbox: changements PostgreSQL appliqués aux index BM25"""
+        if self._suivi is None:
+            self._suivi = SuiviBM25(self)
+        self._suivi.demarrer()
+    
+    def appliquer_changements(
+        self,
+        table: str,
+        systeme: Dict[str, List[str]],
+        uploads: Dict[str, List[str]],
+        suppressions: Iterable[str] = ()
+    ):
+        """
+        Applique des changements PostgreSQL aux index BM25 de la table
+        
+        Args:
+            table: "cvs" ou "offres"
+            systeme: {id: tokens} des lignes source_systeme (index *_pg)
+            uploads: {id: tokens} des lignes uploadées (index *_whoosh)
+            suppressions: ids supprimés de la table
+        
+        Un id est retiré de l'index qui ne le contient plus (changement de
+        source_systeme). Un index figé est enveloppé dans une SurcoucheBM25:
+        ses buffers restent partagés entre workers.
+        """
+        attrs = ("bm25_cv_pg", "bm25_cv_whoosh") if table == "cvs" else ("bm25_job_pg", "bm25_job_whoosh")
+        modifies = set(systeme) | set(uploads) | set(suppressions)
+        
+        with self._indices_lock:
+            for attr, upserts in zip(attrs, (systeme, uploads)):
+                scorer = getattr(self, attr)
+                if isinstance(scorer, FrozenBM25Index):
+                    scorer = SurcoucheBM25(scorer)
+                    setattr(self, attr, scorer)
+                scorer.appliquer_changements(upserts, modifies - set(upserts))
+    
+    def freeze_indices(self):
+        """
+        Remplace les 4 index BM25 (dicts Python) par des FrozenBM25Index
+        à buffers plats, partageables entre workers après fork
+        """
+        self.ensure_indices()
+        with self._indices_lock:
+            for attr in ("bm25_cv_pg", "bm25_cv_whoosh", "bm25_job_pg", "bm25_job_whoosh"):
+                scorer = getattr(self, attr)
+                if isinstance(scorer, BM25Scorer):
+                    setattr(self, attr, FrozenBM25Index.from_scorer(scorer))
+        print("🧊 Index BM25 figés (buffers plats)")
+    
+    def reset_connection(self, close: bool = True):
+        """
+        Oublie la connexion PostgreSQL (rouverte au prochain usage)
+
+        Args:
+            close: False après un fork: le socket appartient au parent
+        """
+        if self._pg_conn is not None and close:
+            try:
+                self._pg_conn.close()
+            except Exception:
+                pass
+        self._pg_conn = None
     
     def _init_whoosh(self):
         """Initialise connexions Whoosh"""
@@ -204,13 +370,20 @@ class VectorielSearchModel:
         except Exception as e:
             print(f"⚠️ Job Whoosh index non disponible: {e}")
     
-    def _build_bm25_indices(self):
+    def _build_bm25_indices(self, workers: Optional[int] = 1):
         """Construit les index BM25 pour toutes les sources"""
         
         print("🔨 Construction index BM25...")
         
+        # Avant tout chargement: les changements concurrents seront rejoués
+        try:
+            self.position_outbox = lire_position_outbox(self.pg_conn)
+        except Exception as e:
+            print(f"⚠️ Position outbox non lue (relecture depuis le début): {e}")
+            self.position_outbox = PositionOutbox()
+        
         # 1. CVs PostgreSQL
-        cv_pg_docs = self._load_postgresql_documents("cvs")
+        cv_pg_docs = self._load_postgresql_documents("cvs", workers)
         self.bm25_cv_pg.build_index(cv_pg_docs)
         print(f"  ✅ CVs PostgreSQL: {len(cv_pg_docs)} docs")
         
@@ -220,7 +393,7 @@ class VectorielSearchModel:
         print(f"  ✅ CVs Whoosh: {len(cv_whoosh_docs)} docs")
         
         # 3. Jobs PostgreSQL
-        job_pg_docs = self._load_postgresql_documents("offres")
+        job_pg_docs = self._load_postgresql_documents("offres", workers)
         self.bm25_job_pg.build_index(job_pg_docs)
         print(f"  ✅ Jobs PostgreSQL: {len(job_pg_docs)} docs")
         
@@ -231,7 +404,7 @@ class VectorielSearchModel:
         
         print("✅ Index BM25 construits\n")
     
-    def _load_postgresql_documents(self, table: str) -> List[Dict]:
+    def _load_postgresql_documents(self, table: str, workers: Optional[int] = 1) -> List[Dict]:
         """Charge documents PostgreSQL pour indexation BM25"""
         documents = []
         
@@ -254,15 +427,16 @@ class VectorielSearchModel:
             cur.execute(query)
             rows = cur.fetchall()
             
-            for row in rows:
+            # Prétraitement NLP par lots, ordre conservé (pool de processus
+            # seulement au préchargement: jamais de fork dans une requête)
+            pretraitements = pretraiter_textes(
+                (row[2] or "" for row in rows),
+                workers=workers,
+                preserve_skills=True
+            )
+            
+            for row, (texte_pretraite, tokens) in zip(rows, pretraitements):
                 doc_id = str(row[0])
-                texte = row[2] or ""
-                
-                # Prétraitement NLP
-                texte_pretraite, tokens = pretraiter_texte(
-                    texte, 
-                    preserve_skills=True
-                )
                 
                 documents.append({
                     "id": doc_id,
@@ -293,9 +467,14 @@ class VectorielSearchModel:
                 all_docs_query = wquery.Every()
                 results = searcher.search(all_docs_query, limit=None)
                 
+                # Texte prétraité: magasin de documents (schéma compact) ou champ stocké
+                magasin = get_document_store(Path(index.storage.folder)).lire_plusieurs(
+                    hit.get("doc_id", "") for hit in results
+                )
+                
                 for hit in results:
                     doc_id = hit.get("doc_id", "")
-                    texte_pretraite = hit.get("texte_pretraite", "")
+                    texte_pretraite = hit.get("texte_pretraite") or magasin.get(doc_id, {}).get("texte_pretraite", "")
                     
                     # Tokeniser
                     tokens = texte_pretraite.split() if texte_pretraite else []
@@ -317,7 +496,9 @@ class VectorielSearchModel:
         self,
         query: str,
         target: str = "cvs",
-        top_k: int = 20
+        top_k: int = 20,
+        deadline=None,
+        fields=None
     ) -> Dict:
         """
         Recherche vectorielle BM25
@@ -326,6 +507,10 @@ class VectorielSearchModel:
             query: Texte de la requête
             target: "cvs" ou "offres"
             top_k: Nombre max de résultats
+            deadline: SearchDeadline optionnelle propagée au scoring BM25
+                et à la récupération des détails (PostgreSQL, Whoosh)
+            fields: Projection (voir projection.RESULT_FIELDS); seuls ces
+                champs sont hydratés. None = DEFAULT_FIELDS
             
         Returns:
             {
@@ -334,6 +519,9 @@ class VectorielSearchModel:
             }
         """
         
+        champs = resoudre_champs(normaliser_champs(fields), self.DEFAULT_FIELDS)
+        self.ensure_indices()
+        
         # 1. Prétraiter la requête
         texte_pretraite, query_tokens = pretraiter_texte(
             query,
@@ -352,15 +540,15 @@ class VectorielSearchModel:
         
         # 2. Scorer avec BM25
         if target == "cvs":
-            scores_pg = self.bm25_cv_pg.score_all(query_tokens)
-            scores_whoosh = self.bm25_cv_whoosh.score_all(query_tokens)
+            scores_pg = self.bm25_cv_pg.score_all(query_tokens, deadline)
+            scores_whoosh = self.bm25_cv_whoosh.score_all(query_tokens, deadline)
         else:  # offres
-            scores_pg = self.bm25_job_pg.score_all(query_tokens)
-            scores_whoosh = self.bm25_job_whoosh.score_all(query_tokens)
+            scores_pg = self.bm25_job_pg.score_all(query_tokens, deadline)
+            scores_whoosh = self.bm25_job_whoosh.score_all(query_tokens, deadline)
         
         # 3. Récupérer détails et formater
-        results_pg = self._fetch_postgresql_results(scores_pg, target)
-        results_whoosh = self._fetch_whoosh_results(scores_whoosh, target)
+        results_pg = self._fetch_postgresql_results(scores_pg, target, deadline, champs)
+        results_whoosh = self._fetch_whoosh_results(scores_whoosh, target, deadline, champs)
         
         # 4. Fusionner et trier
         all_results = results_pg + results_whoosh
@@ -398,67 +586,83 @@ class VectorielSearchModel:
     def _fetch_postgresql_results(
         self,
         scores: Dict[str, float],
-        target: str
+        target: str,
+        deadline=None,
+        champs: tuple = None
     ) -> List[Dict]:
-        """Récupère détails documents PostgreSQL"""
+        """Récupère détails documents PostgreSQL (colonnes projetées uniquement)"""
         results = []
         
+        if champs is None:
+            champs = self.DEFAULT_FIELDS
+        
         if not scores:
             return results
         
+        if deadline is not None and deadline.expired():
+            deadline.mark_missed("postgresql")
+            return results
+        
         try:
             cur = self.pg_conn.cursor()
             ids = [int(doc_id) for doc_id in scores.keys()]
             
-            if target == "cvs":
-                query = """
-                    SELECT id, nom, tags_manuels, localisation, 
-                           annees_experience, niveau_estime
-                    FROM cvs
-                    WHERE id = ANY(%s)
-                """
-            else:
-                query = """
-                    SELECT id, titre, competences_requises, localisation,
-                           experience_min, niveau_souhaite
-                    FROM offres
+            table = "cvs" if target == "cvs" else "offres"
+            lus, expressions = pg_select(target, champs)
+            select_list = ", ".join(["id"] + expressions)
+            query = f"""
+                    SELECT {select_list}
+                    FROM {table}
                     WHERE id = ANY(%s)
                 """
             
+            appliquer_statement_timeout(cur, deadline)
             cur.execute(query, (ids,))
             rows = cur.fetchall()
+            if deadline is not None:
+                # Termine la transaction pour lever le SET LOCAL
+                self.pg_conn.rollback()
             
             for row in rows:
                 doc_id = str(row[0])
                 
-                results.append({
-                    "id": row[0],
-                    "doc_id": doc_id,
-                    "nom": row[1],
-                    "tags": row[2] if row[2] else [],
-                    "localisation": row[3],
-                    "experience": row[4],
-                    "niveau": row[5],
+                item = {"id": row[0], "doc_id": doc_id}
+                item.update(pg_valeurs(champs, lus, row[1:]))
+                item.update({
                     "score_bm25": scores[doc_id],
                     "source": "postgresql",
                     "source_type": "systeme"
                 })
+                results.append(item)
             
             cur.close()
             
         except Exception as e:
-            print(f"❌ Erreur fetch PostgreSQL: {e}")
+            try:
+                self.pg_conn.rollback()
+            except Exception:
+                pass
+            if deadline is not None and est_annulation_requete(e):
+                print("⚠️ Fetch PostgreSQL interrompu par la deadline")
+                deadline.mark_missed("postgresql")
+            else:
+                print(f"❌ Erreur fetch PostgreSQL: {e}")
         
         return results
     
     def _fetch_whoosh_results(
         self,
         scores: Dict[str, float],
-        target: str
+        target: str,
+        deadline=None,
+        champs: tuple = None
     ) -> List[Dict]:
-        """Récupère détails documents Whoosh"""
+        """Récupère détails documents Whoosh (champs projetés uniquement)"""
         results = []
         
+        if champs is None:
+            champs = self.DEFAULT_FIELDS
+        
         if not scores:
             return results
         
@@ -469,7 +673,12 @@ class VectorielSearchModel:
         
         try:
             with index.searcher() as searcher:
+                trouves = []
                 for doc_id, score in scores.items():
+                    if deadline is not None and deadline.expired():
+                        deadline.mark_missed("whoosh")
+                        break
+                    
                     from whoosh.qparser import QueryParser
                     parser = QueryParser("doc_id", index.schema)
                     query = parser.parse(doc_id)
@@ -477,33 +686,86 @@ class VectorielSearchModel:
                     hits = searcher.search(query, limit=1)
                     
                     if len(hits) > 0:
-                        hit = hits[0]
-                        
-                        results.append({
-                            "id": doc_id,
-                            "doc_id": doc_id,
-                            "nom": hit.get("nom", ""),
-                            "tags": hit.get("competences", "").split(","),
-                            "localisation": hit.get("localisation", ""),
-                            "experience": hit.get("annees", 0),
-                            "niveau": "",
-                            "score_bm25": score,
-                            "source": "whoosh",
-                            "source_type": "uploaded"
-                        })
+                        trouves.append((doc_id, score, hits[0]))
+                
+                # Champs volumineux: une lecture groupée du magasin de documents
+                documents = {}
+                if whoosh_lit_magasin(target, champs):
+                    documents = get_document_store(Path(index.storage.folder)).lire_plusieurs(
+                        doc_id for doc_id, _, _ in trouves
+                    )
+                
+                for doc_id, score, hit in trouves:
+                    item = {"id": doc_id, "doc_id": doc_id}
+                    item.update(whoosh_valeurs(hit, target, champs, documents.get(doc_id)))
+                    item.update({
+                        "score_bm25": score,
+                        "source": "whoosh",
+                        "source_type": "uploaded"
+                    })
+                    results.append(item)
         
         except Exception as e:
             print(f"❌ Erreur fetch Whoosh: {e}")
         
         return results
     
+    def hydrate(
+        self,
+        ranking: List[Tuple],
+        target: str,
+        score_key: str = "score_bm25",
+        fields=None
+    ) -> List[Dict]:
+        """
+        Ré-hydrate une page de classement (ids + scores) avec ses détails
+        
+        Args:
+            ranking: Liste ordonnée de (doc_id, source, score)
+            target: "cvs" ou "offres"
+            score_key: Clé sous laquelle replacer le score du classement
+            fields: Projection des champs à hydrater (None = DEFAULT_FIELDS)
+            
+        Returns:
+            Résultats détaillés dans l'ordre du classement
+            (les documents supprimés depuis sont ignorés)
+        """
+        champs = resoudre_champs(normaliser_champs(fields), self.DEFAULT_FIELDS)
+        scores_pg = {}
+        scores_whoosh = {}
+        
+        for doc_id, source, score in ranking:
+            if source == "postgresql":
+                scores_pg[str(doc_id)] = score
+            else:
+                scores_whoosh[str(doc_id)] = score
+        
+        details = {}
+        for item in self._fetch_postgresql_results(scores_pg, target, champs=champs) + \
+                self._fetch_whoosh_results(scores_whoosh, target, champs=champs):
+            details[(item["source"], item["doc_id"])] = item
+        
+        results = []
+        for doc_id, source, score in ranking:
+            item = details.get((source, str(doc_id)))
+            if item is None:
+                continue
+            
+            item.pop("score_bm25", None)
+            item[score_key] = score
+            results.append(item)
+        
+        return results
+    
     def get_index_stats(self) -> Dict:
         """Retourne statistiques de tous les index BM25"""
+        self.ensure_indices()
         return {
             "cvs_postgresql": self.bm25_cv_pg.get_stats(),
             "cvs_whoosh": self.bm25_cv_whoosh.get_stats(),
             "jobs_postgresql": self.bm25_job_pg.get_stats(),
-            "jobs_whoosh": self.bm25_job_whoosh.get_stats()
+            "jobs_whoosh": self.bm25_job_whoosh.get_stats(),
+            "synchronisation": self._suivi.get_stats() if self._suivi else None
         }
 
 
@@ -0,0 +1,51 @@
+"""
+Tests de la préparation des lots d'insertion en masse (indexation manuelle)
+Emplacement: backend/tests/test_bulk_loader.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.indexation.bulk_loader import CHAMPS, preparer_lignes, _REQUETES
+
+
+def _cv(**champs):
+    cv = {
+        "statut": "corrige", "nom": "Alice", "competences": ["python"], "niveau_estime": "senior",
+        "localisation": "Rabat", "type_contrat": "CDI", "diplome": "Master", "annees_experience": 6,
+        "tags_manuels": ["backend"], "chemin_pdf": "a.pdf", "texte_complet": "..."
+    }
+    cv.update(champs)
+    return cv
+
+
+def test_lignes_des_documents_valides():
+    incomplet = _cv()
+    del incomplet["diplome"]
+    lignes, rejetes = preparer_lignes(
+        {"cv_1": _cv(), "cv_2": _cv(statut="a_corriger"), "cv_3": incomplet, "cv_4": _cv(email="b@x.ma")},
+        "cvs"
+    )
+    assert [source_id for source_id, _ in lignes] == ["cv_1", "cv_4"]
+    assert lignes[0][1][:2] == ("Alice", "")  # email absent: valeur par défaut
+    assert lignes[1][1][1] == "b@x.ma"
+    assert list(rejetes) == ["cv_3"] and "diplome" in rejetes["cv_3"]
+
+
+@pytest.mark.parametrize("table", ["cvs", "offres"])
+def test_template_aligne_sur_les_champs(table):
+    requete, template = _REQUETES[table]()
+    # id réservé + un paramètre par champ, colonnes dans l'ordre des champs
+    assert template.count("%s") == 1 + len(CHAMPS[table])
+    colonnes = requete.split("(", 1)[1].split(")", 1)[0]
+    assert [c.strip() for c in colonnes.split(",")][1:1 + len(CHAMPS[table])] == [cle for cle, _ in CHAMPS[table]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
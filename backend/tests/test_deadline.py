@@ -0,0 +1,143 @@
+"""
+Tests du budget temps des recherches (deadline, branches en retard)
+Emplacement: backend/tests/test_deadline.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "backend"))  # Imports "search.*" de l'orchestrateur
+
+import pytest
+
+from backend.search.deadline import (
+    SearchDeadline,
+    PG_QUERY_CANCELED,
+    appliquer_statement_timeout,
+    est_annulation_requete
+)
+from backend.search.search_orchestrator import SearchOrchestrator
+
+
+def test_budget_et_temps_restant():
+    deadline = SearchDeadline(200)
+    assert 0 < deadline.remaining_ms() <= 200
+    assert not deadline.expired()
+    assert deadline.statement_timeout_ms() <= 200
+
+    time.sleep(0.25)
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+    assert deadline.elapsed_ms() >= 200
+    assert deadline.statement_timeout_ms() == SearchDeadline.MIN_STATEMENT_TIMEOUT_MS
+
+
+@pytest.mark.parametrize("budget", [0, -10])
+def test_budget_invalide(budget):
+    with pytest.raises(ValueError):
+        SearchDeadline(budget)
+
+
+def test_sans_budget():
+    assert SearchDeadline.from_ms(None) is None
+    assert SearchDeadline.from_ms("150").budget_ms == 150.0
+
+
+def test_branches_manquees():
+    deadline = SearchDeadline(1000)
+    assert deadline.to_stats() == {"deadline_ms": 1000.0, "degraded": False, "degraded_legs": []}
+
+    deadline.mark_missed("vectoriel")
+    deadline.mark_missed("whoosh")
+    deadline.mark_missed("vectoriel")
+    assert deadline.degraded
+    assert deadline.to_stats()["degraded_legs"] == ["vectoriel", "whoosh"]
+
+
+class _ErreurPg(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def test_annulation_postgresql():
+    assert est_annulation_requete(_ErreurPg(PG_QUERY_CANCELED))
+    assert not est_annulation_requete(_ErreurPg("40001"))
+    assert not est_annulation_requete(RuntimeError("timeout"))
+
+
+def test_statement_timeout():
+    class _Curseur:
+        requetes = []
+
+        def execute(self, requete, params=()):
+            self.requetes.append((requete, params))
+
+    curseur = _Curseur()
+    appliquer_statement_timeout(curseur, None)
+    assert curseur.requetes == []
+
+    appliquer_statement_timeout(curseur, SearchDeadline(500))
+    (requete, (valeur,)), = curseur.requetes
+    assert requete.startswith("SET LOCAL statement_timeout")
+    assert 0 < valeur <= 500
+
+
+# ========================================================
+# FUSION HYBRIDE AVEC UNE BRANCHE EN RETARD
+# ========================================================
+class _Booleen:
+    def search(self, **kwargs):
+        return [
+            {"id": "1", "score_boolean": 2.0, "source_type": "systeme"},
+            {"id": "2", "score_boolean": 1.0, "source_type": "uploaded"}
+        ]
+
+
+class _VectorielLent:
+    def __init__(self, delai):
+        self.delai = delai
+        self.libere = threading.Event()
+
+    def search(self, **kwargs):
+        self.libere.wait(self.delai)
+        return {"results": [{"id": "3", "score_bm25": 5.0, "source_type": "systeme"}]}
+
+
+@pytest.fixture
+def orchestrateur():
+    orchestrateur = SearchOrchestrator()
+    orchestrateur._boolean_model = _Booleen()
+    orchestrateur._vectoriel_model = _VectorielLent(delai=5.0)
+    yield orchestrateur
+    orchestrateur._vectoriel_model.libere.set()
+
+
+def test_branche_en_retard_resultats_partiels(orchestrateur):
+    debut = time.perf_counter()
+    result = orchestrateur.search("python developer", mode="hybrid", deadline_ms=150, auto_extract=False)
+
+    assert time.perf_counter() - debut < 2.0
+    assert [r["id"] for r in result["results"]] == ["1", "2"]
+    assert result["stats"]["degraded"] is True
+    assert result["stats"]["degraded_legs"] == ["vectoriel"]
+    assert result["stats"]["deadline_ms"] == 150.0
+    assert result["stats"]["vectoriel_count"] == 0
+
+
+def test_branches_a_temps_non_degrade(orchestrateur):
+    orchestrateur._vectoriel_model.delai = 0.0
+    result = orchestrateur.search("python developer", mode="hybrid", deadline_ms=2000, auto_extract=False)
+
+    assert {r["id"] for r in result["results"]} == {"1", "2", "3"}
+    assert result["stats"]["degraded"] is False
+    assert result["stats"]["degraded_legs"] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,140 @@
+"""
+Tests du magasin de documents et de la migration vers le schéma compact
+Emplacement: backend/tests/test_doc_store.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.fields import Schema, TEXT
+from whoosh.index import create_in, open_dir
+from whoosh.qparser import QueryParser
+
+from backend.config.settings import CV_DOCSTORE_FIELDS, DOCSTORE_FILENAME
+from backend.indexation.doc_store import DocumentStore
+from backend.indexation.indexing_service import IndexingService
+from backend.indexation.cv_indexer import cv_schema
+from backend.indexation.migration_schema import migrer_vers_schema_compact
+from backend.search.projection import whoosh_valeurs
+from backend.search.vectoriel_model import VectorielSearchModel
+
+
+def test_ecriture_lecture_suppression(tmp_path):
+    magasin = DocumentStore(tmp_path)
+    magasin.ecrire_lot([("a", {"texte": "python flask"}), ("b", {"texte": "java é"})])
+    magasin.enregistrer("a", {"texte": "python django"})
+    magasin.supprimer("b")
+
+    assert magasin.lire("a") == {"texte": "python django"}
+    assert magasin.lire("b") is None
+    assert len(magasin) == 1
+    # Relu depuis le disque par une autre instance
+    assert DocumentStore(tmp_path).lire_plusieurs(["a", "b", "c"]) == {"a": {"texte": "python django"}}
+
+
+def test_lecteur_voit_ajouts_et_compaction(tmp_path):
+    ecrivain, lecteur = DocumentStore(tmp_path), DocumentStore(tmp_path)
+    ecrivain.enregistrer("a", {"v": 1})
+    assert lecteur.lire("a") == {"v": 1}
+
+    for version in range(2, 50):
+        ecrivain.enregistrer("a", {"v": version})
+    ecrivain.enregistrer("orphelin", {"v": 0})
+    assert lecteur.lire("a") == {"v": 49}
+    assert ecrivain.ratio_obsolete > 0.9
+
+    resultat = ecrivain.compacter({"a"})
+    assert resultat["apres"] < resultat["avant"]
+    assert lecteur.lire("a") == {"v": 49}
+    assert "orphelin" not in lecteur
+    assert ecrivain.ratio_obsolete == 0.0
+    ecrivain.enregistrer("b", {"v": 2})
+    assert lecteur.lire("b") == {"v": 2}
+
+
+def test_enregistrement_tronque(tmp_path):
+    magasin = DocumentStore(tmp_path)
+    magasin.enregistrer("a", {"v": 1})
+    magasin.enregistrer("b", {"v": 2})
+    chemin = tmp_path / DOCSTORE_FILENAME
+    chemin.write_bytes(chemin.read_bytes()[:-3])  # Arrêt pendant l'écriture de "b"
+
+    relu = DocumentStore(tmp_path)
+    assert relu.doc_ids() == ["a"]
+    relu.enregistrer("c", {"v": 3})
+    assert DocumentStore(tmp_path).lire_plusieurs(["a", "b", "c"]) == {"a": {"v": 1}, "c": {"v": 3}}
+
+
+def test_service_ecrit_le_magasin(tmp_path):
+    create_in(str(tmp_path), cv_schema)
+    service = IndexingService(tmp_path, "doc_id", delai_commit=0.0, champs_documents=CV_DOCSTORE_FIELDS)
+    service.upsert({"doc_id": "1", "nom": "Alice", "texte_pretraite": "python flask"}).result(timeout=10)
+    service.supprimer("1").result(timeout=10)
+    service.upsert({"doc_id": "2", "nom": "Bob", "texte_pretraite": "java spring"}).result(timeout=10)
+    service.arreter()
+
+    magasin = DocumentStore(tmp_path)
+    assert magasin.doc_ids() == ["2"]
+    assert magasin.lire("2")["texte_pretraite"] == "java spring"
+    with open_dir(str(tmp_path)).searcher() as searcher:
+        assert "texte_pretraite" not in searcher.stored_fields(0)
+
+
+def test_migration_schema_compact(tmp_path):
+    # Ancien schéma: tous les champs stockés
+    ancien_schema = Schema(**{
+        nom: (TEXT(stored=True) if nom in CV_DOCSTORE_FIELDS else champ)
+        for nom, champ in cv_schema.items()
+    })
+    index_dir = tmp_path / "cv_index"
+    index_dir.mkdir()
+    writer = create_in(str(index_dir), ancien_schema).writer()
+    for i in range(60):
+        writer.add_document(
+            doc_id=str(i),
+            nom=f"Candidat {i}",
+            competences="python,sql",
+            texte_pretraite=" ".join(f"mot{i}{j} python" for j in range(300)),
+            resume_complet=f"Résumé du candidat {i} " * 20
+        )
+    writer.commit()
+
+    resultat = migrer_vers_schema_compact(index_dir, cv_schema, CV_DOCSTORE_FIELDS, racine_snapshots=tmp_path / "snapshots")
+    assert resultat["documents"] == 60
+    assert resultat["apres"]["segments_mo"] < resultat["avant"]["segments_mo"]
+    assert (tmp_path / "snapshots" / "cv_index").exists()
+
+    ix = open_dir(str(index_dir))
+    assert not ix.schema["texte_pretraite"].stored
+    with ix.searcher() as searcher:
+        hits = searcher.search(QueryParser("texte_pretraite", ix.schema).parse("mot70"), limit=5)
+        assert [hit["doc_id"] for hit in hits] == ["7"]
+        document = DocumentStore(index_dir).lire("7")
+        item = whoosh_valeurs(hits[0], "cvs", ("nom", "extrait", "competences"), document)
+        assert item["nom"] == "Candidat 7"
+        assert item["extrait"].startswith("mot70 python")
+        assert item["competences"] == ["python", "sql"]
+
+    # Déjà compact: rien à faire
+    assert migrer_vers_schema_compact(index_dir, cv_schema, CV_DOCSTORE_FIELDS, racine_snapshots=tmp_path / "snapshots") is None
+
+
+def test_hydratation_lit_le_magasin(tmp_path):
+    create_in(str(tmp_path), cv_schema)
+    service = IndexingService(tmp_path, "doc_id", delai_commit=0.0, champs_documents=CV_DOCSTORE_FIELDS)
+    service.upsert({"doc_id": "42", "nom": "Alice", "texte_pretraite": "python flask"}).result(timeout=10)
+    service.arreter()
+
+    modele = VectorielSearchModel.__new__(VectorielSearchModel)
+    modele.whoosh_cv_index = open_dir(str(tmp_path))
+    [item] = modele._fetch_whoosh_results({"42": 1.5}, "cvs", champs=("nom", "texte"))
+    assert (item["nom"], item["texte"], item["score_bm25"]) == ("Alice", "python flask", 1.5)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
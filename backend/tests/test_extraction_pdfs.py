@@ -0,0 +1,96 @@
+"""
+Tests de l'extraction PDF parallèle isolée (délai, mémoire, reprises)
+Emplacement: backend/tests/test_extraction_pdfs.py
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.config.settings import CV_FOLDER
+from backend.extraction import pdf_reader
+from backend.extraction.pdf_reader import extraire_pdfs, lire_pdf
+
+
+# Les lecteurs simulés sont hérités par les workers via fork
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="lecteurs simulés transmis aux workers par fork"
+)
+
+CVS = sorted(CV_FOLDER.glob("*.pdf"))[:6]
+
+
+def _lecteur_simule(chemin: Path):
+    if "lent" in chemin.name:
+        time.sleep(60)
+    if "crash" in chemin.name:
+        os._exit(1)
+    if "memoire" in chemin.name:
+        return str(len(bytearray(4 * 1024 ** 3)))
+    return chemin.name
+
+
+@pytest.fixture
+def lecteur_simule(monkeypatch):
+    monkeypatch.setattr(pdf_reader, "lire_pdf", _lecteur_simule)
+
+
+def test_ordre_et_textes_identiques():
+    chemins = CVS + [Path("absent.pdf")]
+    resultats = list(extraire_pdfs(chemins, workers=2))
+    assert [r.chemin for r in resultats] == chemins
+    assert [r.texte for r in resultats[:-1]] == [lire_pdf(p) for p in CVS]
+    assert resultats[-1].texte is None and resultats[-1].erreur == "illisible"
+    assert all(r.tentatives == 1 for r in resultats)
+
+
+def test_delai_depasse_puis_reprise(lecteur_simule):
+    chemins = [Path("a.pdf"), Path("lent.pdf"), Path("b.pdf"), Path("c.pdf")]
+    debut = time.monotonic()
+    resultats = list(extraire_pdfs(chemins, workers=2, timeout=0.5, tentatives=1, backoff=0))
+    assert time.monotonic() - debut < 10
+    assert [r.texte for r in resultats] == ["a.pdf", None, "b.pdf", "c.pdf"]
+    assert resultats[1].erreur == "timeout" and resultats[1].tentatives == 2
+    assert not multiprocessing.active_children()
+
+
+def test_crash_du_worker(lecteur_simule):
+    chemins = [Path("crash.pdf"), Path("a.pdf")]
+    resultats = list(extraire_pdfs(chemins, workers=1, tentatives=2, backoff=0.01))
+    assert resultats[0].erreur == "crash" and resultats[0].tentatives == 3
+    assert resultats[1].texte == "a.pdf"
+
+
+def test_plafond_memoire(lecteur_simule):
+    resultats = list(extraire_pdfs([Path("memoire.pdf"), Path("a.pdf")], workers=1, memoire_max_mb=2048))
+    assert resultats[0].texte is None and resultats[0].tentatives == 1
+    assert resultats[1].texte == "a.pdf"
+
+
+def test_lecture_paresseuse_bornee(lecteur_simule):
+    lus = []
+
+    def _flux():
+        for i in range(10000):
+            lus.append(i)
+            yield Path(f"cv_{i}.pdf")
+
+    flux = extraire_pdfs(_flux(), workers=2)
+    assert next(flux).texte == "cv_0.pdf"
+    flux.close()
+    # Au plus deux fichiers par worker en avance sur le consommateur
+    assert len(lus) <= 2 * 2 + 1
+    assert not multiprocessing.active_children()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
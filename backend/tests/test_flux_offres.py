@@ -0,0 +1,92 @@
+"""
+Tests de l'indexation des flux d'offres JSON Lines (.jsonl / .jsonl.gz)
+Emplacement: backend/tests/test_flux_offres.py
+"""
+
+import gzip
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.index import open_dir
+
+from backend.config.settings import JOB_FOLDER
+from backend.indexation import index_writer, token_cache
+from backend.indexation.doc_store import DocumentStore
+from backend.indexation.job_indexer import JobIndexer, lire_lignes_jsonl
+
+
+@pytest.fixture(autouse=True)
+def cache_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setattr(token_cache, "_cache", token_cache.TokenCache(tmp_path / "tokens.sqlite"))
+
+
+def _offres(n: int):
+    return [json.loads(f.read_text(encoding="utf-8")) for f in sorted(JOB_FOLDER.glob("job_0*.json"))[:n]]
+
+
+def test_flux_gzip_par_lots_avec_erreurs_isolees(tmp_path):
+    offres = _offres(5)
+    renommee = dict(offres[0], title="Titre mis à jour")
+    lignes = [json.dumps(o) for o in offres] + [
+        "{pas du json",
+        json.dumps({"title": "sans identifiant"}),
+        "[1, 2]",
+        "",
+        json.dumps(renommee)
+    ]
+    flux = tmp_path / "partenaire.jsonl.gz"
+    with gzip.open(flux, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lignes) + "\n")
+
+    index_dir = tmp_path / "job_index"
+    stats = JobIndexer(job_folder=tmp_path, index_dir=index_dir).indexer_flux(flux, taille_lot=2)
+
+    assert stats["lignes"] == 9  # Ligne vide ignorée
+    assert stats["erreurs"] == 3
+    assert [e.split(":")[0] for e in stats["detail_erreurs"]] == ["ligne 6", "ligne 7", "ligne 8"]
+    assert stats["lots"] == 3 and stats["indexees"] == 6
+
+    with open_dir(str(index_dir)).searcher() as searcher:
+        documents = {doc["job_id"]: doc for doc in searcher.all_stored_fields()}
+    assert sorted(documents) == sorted(str(o["job_id"]) for o in offres)
+    assert documents[str(offres[0]["job_id"])]["titre_poste"] == "Titre mis à jour"
+    assert DocumentStore(index_dir).lire(str(offres[1]["job_id"]))["description"].startswith(offres[1]["description"])
+
+
+@pytest.mark.parametrize("bulk_min", [1, 500])  # Lots de reconstruction, puis petits lots (dernier lot)
+def test_lot_attend_le_verrou_d_ecriture(tmp_path, monkeypatch, bulk_min):
+    monkeypatch.setattr(index_writer, "INDEX_BULK_MIN_DOCS", bulk_min)
+    flux = tmp_path / "offres.jsonl"
+    flux.write_text("\n".join(json.dumps(o) for o in _offres(4)) + "\n", encoding="utf-8")
+
+    commiter = JobIndexer._commiter_lot_flux
+
+    def avec_fusion_en_cours(self, ix, lot, stats):
+        if stats["lots"] == 1:
+            # Verrou tenu entre deux lots (fusion de la maintenance)
+            occupe = ix.writer()
+            threading.Timer(0.5, occupe.cancel).start()
+        commiter(self, ix, lot, stats)
+    monkeypatch.setattr(JobIndexer, "_commiter_lot_flux", avec_fusion_en_cours)
+
+    index_dir = tmp_path / "job_index"
+    stats = JobIndexer(job_folder=tmp_path, index_dir=index_dir, index_procs=1).indexer_flux(flux, taille_lot=2)
+    assert stats["lots"] == 2 and stats["indexees"] == 4
+    assert open_dir(str(index_dir)).doc_count() == 4
+
+
+def test_lecture_jsonl_non_compresse(tmp_path):
+    flux = tmp_path / "offres.jsonl"
+    flux.write_text('{"job_id": 1}\n\n  \n{"job_id": 2}\n', encoding="utf-8")
+    assert [(n, json.loads(l)["job_id"]) for n, l in lire_lignes_jsonl(flux)] == [(1, 1), (4, 2)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,119 @@
+"""
+Tests de l'index BM25 figé (buffers plats)
+Emplacement: backend/tests/test_frozen_index.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.search.vectoriel_model import BM25Scorer
+from backend.search.frozen_index import FrozenBM25Index
+from backend.search.deadline import SearchDeadline
+from backend.utils.memory_report import parser_smaps
+
+
+DOCS = [
+    {"id": "1", "tokens": ["python", "django", "web", "framework", "mvc"]},
+    {"id": "2", "tokens": ["python", "python", "flask", "api", "rest"]},
+    {"id": "3", "tokens": ["java", "spring", "backend", "jee", "enterprise"]},
+    {"id": "4", "tokens": ["javascript", "react", "frontend", "ui", "développeur"]},
+    {"id": "5", "tokens": ["ruby", "rails", "mvc", "backend", "web"]},
+    {"id": "6", "tokens": []}
+]
+
+
+def _paire(docs=DOCS):
+    scorer = BM25Scorer()
+    scorer.build_index(docs)
+    return scorer, FrozenBM25Index.from_scorer(scorer)
+
+
+@pytest.mark.parametrize("query", [
+    ["python"],
+    ["mvc", "web", "backend"],
+    ["développeur", "react"],
+    ["cobol"],
+    []
+])
+def test_score_all_identique_au_scorer(query):
+    scorer, frozen = _paire()
+    attendu = scorer.score_all(query)
+    obtenu = frozen.score_all(query)
+    assert obtenu == attendu
+    assert list(obtenu) == list(attendu)
+
+
+def test_score_unitaire_identique():
+    scorer, frozen = _paire()
+    for doc in DOCS:
+        for query in (["python", "web"], ["java"], ["inconnu"]):
+            assert frozen.score(query, doc["id"]) == scorer.score(query, doc["id"])
+    assert frozen.score(["python"], "absent") == 0.0
+
+
+def test_corpus_aleatoire_identique():
+    rng = random.Random(7)
+    vocab = [f"t{i}" for i in range(300)]
+    docs = [
+        {"id": f"CV_{i}", "tokens": [rng.choice(vocab[:40] if rng.random() < 0.3 else vocab) for _ in range(rng.randint(5, 60))]}
+        for i in range(400)
+    ]
+    scorer, frozen = _paire(docs)
+    for _ in range(20):
+        query = rng.sample(vocab, 4)
+        assert frozen.score_all(query) == scorer.score_all(query)
+        for doc in rng.sample(docs, 10):  # Longues listes de postings (termes fréquents)
+            assert frozen.score(query + vocab[:3], doc["id"]) == scorer.score(query + vocab[:3], doc["id"])
+
+
+def test_stats_et_vocabulaire():
+    scorer, frozen = _paire()
+    stats = frozen.get_stats()
+    for cle, valeur in scorer.get_stats().items():
+        assert stats[cle] == valeur
+    assert stats["frozen"] is True
+    assert frozen.term_id("python") >= 0
+    assert frozen.term_id("pyth") == -1
+    assert frozen.nbytes() > 0
+
+
+def test_corpus_vide():
+    scorer, frozen = _paire([])
+    assert frozen.N == 0
+    assert frozen.score_all(["python"]) == {}
+
+
+def test_deadline_expiree_partielle():
+    docs = [{"id": str(i), "tokens": ["python", "web"]} for i in range(10000)]
+    docs.append({"id": "rare", "tokens": ["rare"]})
+    _, frozen = _paire(docs)
+
+    deadline = SearchDeadline(1)
+    while not deadline.expired():
+        pass
+    frozen.score_all(["python", "web"], deadline)
+    assert deadline.missed_legs == ["bm25"]
+
+
+def test_parser_smaps():
+    texte = (
+        "00400000-ffffffffff600000 ---p 00000000 00:00 0  [rollup]\n"
+        "Rss:               53504 kB\n"
+        "Pss:               21344 kB\n"
+        "Private_Clean:      1200 kB\n"
+        "Private_Dirty:      5000 kB\n"
+    )
+    champs = parser_smaps(texte)
+    assert champs["Rss"] == 53504
+    assert champs["Private_Clean"] + champs["Private_Dirty"] == 6200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
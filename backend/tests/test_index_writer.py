@@ -0,0 +1,60 @@
+"""
+Tests des writers d'indexation (reconstruction multiprocessus)
+Emplacement: backend/tests/test_index_writer.py
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.index import create_in, open_dir
+from whoosh.multiproc import MpWriter
+from whoosh.writing import AsyncWriter, SegmentWriter
+
+from backend.config.settings import JOB_FOLDER
+from backend.indexation import index_writer, token_cache
+from backend.indexation.index_writer import ouvrir_writer
+from backend.indexation.job_indexer import JobIndexer, job_schema
+
+
+@pytest.fixture(autouse=True)
+def cache_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setattr(token_cache, "_cache", token_cache.TokenCache(tmp_path / "tokens.sqlite"))
+
+
+def test_choix_du_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_writer, "INDEX_BULK_MIN_DOCS", 100)
+    ix = create_in(str(tmp_path), job_schema)
+    for nb, procs, attendu in [(10, 4, AsyncWriter), (100, 1, SegmentWriter), (100, 2, MpWriter)]:
+        writer = ouvrir_writer(ix, nb, procs=procs)
+        assert type(writer) is attendu
+        writer.cancel()
+
+
+def _reconstruire(dossier: Path, index_dir: Path, procs: int):
+    indexer = JobIndexer(job_folder=dossier, index_dir=index_dir, index_procs=procs)
+    indexer.indexer_toutes_les_offres()
+    assert indexer.debit.documents == indexer.success_count > 0
+    with open_dir(str(index_dir)).searcher() as searcher:
+        return sorted(searcher.all_stored_fields(), key=lambda doc: doc["job_id"])
+
+
+def test_reconstruction_parallele_identique(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_writer, "INDEX_BULK_MIN_DOCS", 1)
+    dossier = tmp_path / "jobs"
+    dossier.mkdir()
+    for job in sorted(JOB_FOLDER.glob("job_*.json"))[:12]:
+        shutil.copy(job, dossier / job.name)
+
+    serie = _reconstruire(dossier, tmp_path / "serie", procs=1)
+    parallele = _reconstruire(dossier, tmp_path / "parallele", procs=2)
+    assert parallele == serie
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+"""
+Tests de la réindexation incrémentale pilotée par le manifeste
+Emplacement: backend/tests/test_indexation_incrementale.py
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.index import open_dir
+
+from backend.config.settings import CV_FOLDER, JOB_FOLDER
+from backend.indexation import token_cache
+from backend.indexation.manifest import ManifesteIndex
+from backend.indexation.cv_indexer import CVIndexer
+from backend.indexation.job_indexer import JobIndexer
+
+
+@pytest.fixture(autouse=True)
+def cache_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setattr(token_cache, "_cache", token_cache.TokenCache(tmp_path / "tokens.sqlite"))
+
+
+def _ids(index_dir: Path, champ: str):
+    with open_dir(str(index_dir)).searcher() as searcher:
+        return sorted(doc[champ] for doc in searcher.all_stored_fields())
+
+
+def test_detection_sans_relecture(tmp_path, monkeypatch):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("alpha")
+    b.write_text("beta")
+    manifeste = ManifesteIndex(tmp_path / "index", "v1")
+    changements = manifeste.detecter_changements([a, b])
+    assert changements.resume() == {"ajoutes": 2, "modifies": 0, "supprimes": 0, "inchanges": 0}
+    for fichier in changements.a_indexer:
+        manifeste.enregistrer(fichier, fichier.chemin.stem)
+    manifeste.sauvegarder()
+
+    # Inchangés: aucun fichier n'est relu
+    monkeypatch.setattr("backend.indexation.manifest.empreinte_fichier", lambda chemin: pytest.fail("relu"))
+    assert ManifesteIndex(tmp_path / "index", "v1").detecter_changements([a, b]).vide
+    monkeypatch.undo()
+
+    # Touché sans changement de contenu, modifié, supprimé
+    os.utime(a, ns=(0, 0))
+    b.write_text("beta 2")
+    changements = ManifesteIndex(tmp_path / "index", "v1").detecter_changements([a, b])
+    assert [f.ancien_doc_id for f in changements.modifies] == ["b"]
+    assert changements.inchanges == 1
+    assert ManifesteIndex(tmp_path / "index", "v1").detecter_changements([a]).supprimes == {"b.txt": "b"}
+
+    # Pipeline modifié: tout est à refaire, les doc_id restent connus
+    changements = ManifesteIndex(tmp_path / "index", "v2").detecter_changements([a, b])
+    assert sorted(f.ancien_doc_id for f in changements.modifies) == ["a", "b"]
+
+
+def test_cvs_ajout_modification_suppression(tmp_path):
+    dossier, index_dir = tmp_path / "cvs", tmp_path / "cv_index"
+    dossier.mkdir()
+    cvs = sorted(CV_FOLDER.glob("*.pdf"))[:4]
+    for cv in cvs[:3]:
+        shutil.copy(cv, dossier / cv.name)
+
+    def _indexer():
+        indexer = CVIndexer(cv_folder=dossier, index_dir=index_dir, workers=1, pdf_workers=1)
+        indexer.indexer_tous_les_cvs()
+        return indexer.changements.resume()
+
+    assert _indexer()["ajoutes"] == 3
+    assert _indexer() == {"ajoutes": 0, "modifies": 0, "supprimes": 0, "inchanges": 3}
+
+    (dossier / cvs[0].name).unlink()
+    shutil.copy(cvs[3], dossier / cvs[3].name)
+    shutil.copy(cvs[3], dossier / cvs[1].name)
+    assert _indexer() == {"ajoutes": 1, "modifies": 1, "supprimes": 1, "inchanges": 1}
+    assert _ids(index_dir, "doc_id") == sorted(cv.name for cv in cvs[1:])
+
+
+def test_offres_job_id_modifie(tmp_path):
+    dossier, index_dir = tmp_path / "jobs", tmp_path / "job_index"
+    dossier.mkdir()
+    for job in sorted(JOB_FOLDER.glob("job_0[1-3].json")):
+        shutil.copy(job, dossier / job.name)
+
+    def _indexer():
+        indexer = JobIndexer(job_folder=dossier, index_dir=index_dir)
+        indexer.indexer_toutes_les_offres()
+        return indexer.changements.resume()
+
+    assert _indexer()["ajoutes"] == 3
+    avant = _ids(index_dir, "job_id")
+
+    chemin = dossier / "job_02.json"
+    offre = json.loads(chemin.read_text(encoding="utf-8"))
+    ancien_id, offre["job_id"] = offre["job_id"], "JOB-RENOMME"
+    chemin.write_text(json.dumps(offre), encoding="utf-8")
+    (dossier / "job_03.json").unlink()
+
+    assert _indexer() == {"ajoutes": 0, "modifies": 1, "supprimes": 1, "inchanges": 1}
+    apres = _ids(index_dir, "job_id")
+    assert ancien_id not in apres and "JOB-RENOMME" in apres
+    assert len(apres) == len(avant) - 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
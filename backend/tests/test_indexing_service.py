@@ -0,0 +1,120 @@
+"""
+Tests du service d'indexation en temps réel (file + commit groupé)
+Emplacement: backend/tests/test_indexing_service.py
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.index import create_in, open_dir
+
+from backend.config.settings import CV_FOLDER
+from backend.extraction.pdf_reader import lire_pdf
+from backend.indexation import cv_indexer, indexing_service, token_cache
+from backend.indexation.cv_indexer import cv_schema, indexer_cv_depuis_texte, supprimer_cv
+from backend.indexation.indexing_service import IndexingService
+
+
+@pytest.fixture
+def index_cv(tmp_path, monkeypatch):
+    index_dir = tmp_path / "cv_index"
+    index_dir.mkdir()
+    create_in(str(index_dir), cv_schema)
+    monkeypatch.setattr(cv_indexer, "CV_INDEX", index_dir)
+    monkeypatch.setattr(indexing_service, "CV_INDEX", index_dir)
+    monkeypatch.setattr(indexing_service, "_services", {})
+    monkeypatch.setattr(token_cache, "_cache", token_cache.TokenCache(tmp_path / "tokens.sqlite"))
+    yield index_dir
+    for service in indexing_service._services.values():
+        service.arreter()
+
+
+def _documents(index_dir: Path):
+    with open_dir(str(index_dir)).searcher() as searcher:
+        return {doc["doc_id"]: doc for doc in searcher.all_stored_fields()}
+
+
+def test_commit_groupe_et_upsert(index_cv):
+    service = IndexingService(index_cv, "doc_id", delai_commit=0.2)
+    futures = []
+    verrou = threading.Lock()
+
+    def _uploader(i):
+        future = service.upsert({"doc_id": f"cv{i % 10}", "nom": f"version {i}"})
+        with verrou:
+            futures.append(future)
+
+    threads = [threading.Thread(target=_uploader, args=(i,)) for i in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(f.result(timeout=10) is True for f in futures)
+
+    documents = _documents(index_cv)
+    assert sorted(documents) == [f"cv{i}" for i in range(10)]
+    assert service.commits <= 2 and service.operations == 30
+
+    # Dernière opération d'un document dans le lot: elle seule est appliquée
+    service.upsert({"doc_id": "cv0", "nom": "finale"})
+    suppression = service.supprimer("cv1")
+    service.vider()
+    assert suppression.result() == 1
+    documents = _documents(index_cv)
+    assert documents["cv0"]["nom"] == "finale" and "cv1" not in documents
+    assert len(open_dir(str(index_cv))._segments()) <= 2
+    service.arreter()
+    with pytest.raises(RuntimeError):
+        service.upsert({"doc_id": "cv2"})
+
+
+def test_echec_du_lot_propage(tmp_path):
+    service = IndexingService(tmp_path / "absent", "doc_id", delai_commit=0)
+    future = service.upsert({"doc_id": "cv0"})
+    with pytest.raises(Exception):
+        future.result(timeout=10)
+    assert service.get_stats()["echecs"] == 1
+    service.arreter()
+
+
+def test_upload_puis_suppression(index_cv):
+    texte = lire_pdf(sorted(CV_FOLDER.glob("*.pdf"))[0])
+    assert indexer_cv_depuis_texte("42", texte, "cv.pdf", "7")
+    assert indexer_cv_depuis_texte("42", texte + " Kubernetes", "cv.pdf", "7")
+    assert list(_documents(index_cv)) == ["42"]
+    assert supprimer_cv("42")
+    assert _documents(index_cv) == {}
+    assert not indexer_cv_depuis_texte("", texte)
+
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork indisponible")
+def test_service_utilisable_apres_fork(index_cv):
+    service = IndexingService(index_cv, "doc_id", delai_commit=0)
+    assert service.upsert({"doc_id": "parent", "nom": "A"}).result(timeout=10) is True
+
+    pid = os.fork()
+    if pid == 0:  # Enfant: thread d'écriture du parent absent
+        code = 1
+        try:
+            nouveau = indexing_service.get_cv_indexing_service()
+            herite_ok = service.upsert({"doc_id": "herite", "nom": "B"}).result(timeout=10)
+            nouveau_ok = nouveau.upsert({"doc_id": "enfant", "nom": "C"}).result(timeout=10)
+            code = 0 if herite_ok and nouveau_ok else 1
+        finally:
+            os._exit(code)
+    _, statut = os.waitpid(pid, 0)
+    service.arreter()
+    assert os.waitstatus_to_exitcode(statut) == 0
+    assert {"parent", "herite", "enfant"} <= set(_documents(index_cv))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,70 @@
+"""
+Tests du journal asynchrone des requêtes (tampon borné, écriture par lots)
+Emplacement: backend/tests/test_journal_requetes.py
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.index import open_dir
+
+from backend.indexation.query_indexer import QueryIndexer, JournalRequetes
+
+
+def _nombre(dossier) -> int:
+    return open_dir(str(dossier)).doc_count()
+
+
+def test_requetes_ecrites_par_lots(tmp_path):
+    indexer = QueryIndexer(str(tmp_path / "query_index"))
+    resultats = [indexer.index_query(f"python AND django {i}", "job", nb_resultats=i) for i in range(20)]
+    assert all(r["queued"] for r in resultats)
+    assert resultats[0]["query_corrected"] == "python AND django 0"
+
+    indexer.journal.vider()
+    stats = indexer.journal.get_stats()
+    assert _nombre(tmp_path / "query_index") == 20
+    assert stats["ecrites"] == 20 and stats["commits"] < 20
+    indexer.journal.arreter()
+
+
+def test_tampon_plein_rejette_sans_bloquer(tmp_path):
+    journal = JournalRequetes(str(tmp_path / "query_index"), taille_max=3, taille_lot=1, delai_ecriture=0.0)
+    bloque, libere = threading.Event(), threading.Event()
+    ecrire = journal._ecrire
+
+    def ecrire_lent(lot):
+        bloque.set()
+        libere.wait(timeout=10)
+        ecrire(lot)
+    journal._ecrire = ecrire_lent
+
+    assert journal.soumettre({"id": "0", "query_original": "a"})
+    assert bloque.wait(timeout=10)  # Le thread écrit le premier lot
+    acceptes = [journal.soumettre({"id": str(i), "query_original": "b"}) for i in range(1, 8)]
+    assert acceptes == [True] * 3 + [False] * 4
+    assert journal.get_stats()["rejetees"] == 4
+
+    libere.set()
+    journal.arreter()
+    assert journal.get_stats()["ecrites"] == 4
+    assert _nombre(tmp_path / "query_index") == 4
+
+
+def test_arret_ecrit_le_tampon(tmp_path):
+    journal = JournalRequetes(str(tmp_path / "query_index"), delai_ecriture=60.0)
+    for i in range(5):
+        journal.soumettre({"id": str(i), "query_original": "java"})
+    journal.arreter()
+    assert _nombre(tmp_path / "query_index") == 5
+    assert not journal.soumettre({"id": "5", "query_original": "java"})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
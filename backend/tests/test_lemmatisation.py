@@ -0,0 +1,106 @@
+"""
+Tests de la lemmatisation mémoïsée et de la table de lemmes persistée
+Emplacement: backend/tests/test_lemmatisation.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+import backend.indexation.preprocessing as preprocessing
+
+
+class LemmatiseurFactice:
+    """Remplace WordNet: compte les appels, retire un 's' final"""
+
+    def __init__(self):
+        self.appels = 0
+
+    def lemmatize(self, token, pos='n'):
+        self.appels += 1
+        return token[:-1] if pos == 'n' and token.endswith("s") else token
+
+
+class LemmatiseurHorsLigne:
+    def lemmatize(self, token, pos='n'):
+        raise LookupError("wordnet")
+
+
+@pytest.fixture
+def lemmatiseur(monkeypatch):
+    preprocessing.charger_ressources()
+    factice = LemmatiseurFactice()
+    monkeypatch.setattr(preprocessing, "lemmatizer", factice)
+    monkeypatch.setattr(preprocessing, "_table_lemmes", {})
+    monkeypatch.setattr(preprocessing, "_table_hits", 0)
+    preprocessing._lemmatiser_wordnet.cache_clear()
+    yield factice
+    preprocessing._lemmatiser_wordnet.cache_clear()
+
+
+def test_cache_evite_les_appels_repetes(lemmatiseur):
+    texte = "developers developers developers building apis apis"
+    premier = preprocessing.pretraiter_texte(texte, preserve_skills=False)
+    appels = lemmatiseur.appels
+    assert preprocessing.pretraiter_texte(texte, preserve_skills=False) == premier
+    assert lemmatiseur.appels == appels
+
+    stats = preprocessing.stats_lemmatisation()
+    assert stats["cache_misses"] == 3  # developers, building, apis
+    assert stats["cache_hits"] == 9
+    assert stats["hit_rate"] == 0.75
+
+
+def test_table_persistee(lemmatiseur, tmp_path):
+    chemin = tmp_path / "lemmes.json"
+    with preprocessing.collecte_vocabulaire() as vocabulaire:
+        preprocessing.pretraiter_texte("managers deploying services", preserve_skills=False)
+    assert vocabulaire == {"managers", "deploying", "services"}
+
+    assert preprocessing.sauvegarder_table_lemmes(vocabulaire, chemin) == 3
+    preprocessing._table_lemmes = {}
+    assert preprocessing.charger_table_lemmes(chemin) == 3
+
+    appels = lemmatiseur.appels
+    preprocessing._lemmatiser_wordnet.cache_clear()
+    assert preprocessing.lemmatiser("services") == "service"
+    assert lemmatiseur.appels == appels
+    assert preprocessing.stats_lemmatisation()["table_hits"] == 1
+
+
+def test_table_completee_par_une_indexation_incrementale(lemmatiseur, tmp_path):
+    chemin = tmp_path / "lemmes.json"
+    assert preprocessing.sauvegarder_table_lemmes({"managers", "services"}, chemin) == 2
+    # Aucun fichier modifié: vocabulaire vide, la table est conservée
+    assert preprocessing.sauvegarder_table_lemmes(set(), chemin) == 2
+    assert preprocessing.sauvegarder_table_lemmes({"deploying"}, chemin) == 3
+    preprocessing._table_lemmes = {}
+    assert preprocessing.charger_table_lemmes(chemin) == 3
+
+
+def test_pas_de_table_sans_wordnet(monkeypatch, tmp_path):
+    preprocessing.charger_ressources()
+    monkeypatch.setattr(preprocessing, "lemmatizer", LemmatiseurHorsLigne())
+    preprocessing._lemmatiser_wordnet.cache_clear()
+    try:
+        assert preprocessing.lemmatiser("services") == "services"
+        assert preprocessing.sauvegarder_table_lemmes(["services"], tmp_path / "l.json") == 0
+        assert not (tmp_path / "l.json").exists()
+    finally:
+        preprocessing._lemmatiser_wordnet.cache_clear()
+
+
+def test_table_obsolete_ignoree(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessing, "_table_lemmes", {})
+    chemin = tmp_path / "lemmes.json"
+    chemin.write_text('{"version": -1, "lemmes": {"a": "b"}}', encoding="utf-8")
+    assert preprocessing.charger_table_lemmes(chemin) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
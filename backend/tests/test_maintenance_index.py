@@ -0,0 +1,183 @@
+"""
+Tests de la maintenance des index: fusion par paliers, snapshots, rétention
+Emplacement: backend/tests/test_maintenance_index.py
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from whoosh.fields import Schema, ID, TEXT
+from whoosh.index import create_in, open_dir
+
+from backend.indexation import maintenance
+from backend.indexation.maintenance import (
+    plan_fusion,
+    fusionner_segments,
+    nombre_segments,
+    creer_snapshot,
+    lister_snapshots,
+    appliquer_retention,
+    restaurer_snapshot,
+    migrer_sauvegardes,
+    PlanificateurMaintenance
+)
+from backend.indexation.indexing_service import IndexingService
+
+
+SCHEMA = Schema(doc_id=ID(stored=True, unique=True), texte=TEXT)
+
+
+def _index(dossier: Path, commits: int, docs_par_commit: int = 1) -> Path:
+    dossier.mkdir(parents=True)
+    ix = create_in(str(dossier), SCHEMA)
+    n = 0
+    for _ in range(commits):
+        writer = ix.writer()
+        for _ in range(docs_par_commit):
+            writer.add_document(doc_id=f"d{n}", texte=f"python flask {n}")
+            n += 1
+        writer.commit(merge=False)
+    return dossier
+
+
+def _ids(dossier: Path):
+    with open_dir(str(dossier)).searcher() as searcher:
+        return sorted(doc["doc_id"] for doc in searcher.all_stored_fields())
+
+
+class _Segment:
+    def __init__(self, nom, total, supprimes=0):
+        self.nom, self.total, self.supprimes = nom, total, supprimes
+
+    def segment_id(self):
+        return self.nom
+
+    def doc_count_all(self):
+        return self.total
+
+    def deleted_count(self):
+        return self.supprimes
+
+
+def test_plan_par_paliers():
+    gros = _Segment("gros", 10000)
+    petits = [_Segment(f"p{i}", 1) for i in range(3)]
+    # Palier incomplet, sous le seuil: rien à faire
+    assert plan_fusion([gros, *petits], facteur=4, max_segments=10) == []
+    # Palier complet: les petits seulement, jamais le gros
+    petits.append(_Segment("p3", 2))
+    assert {s.nom for s in plan_fusion([gros, *petits], facteur=4, max_segments=10)} == {"p0", "p1", "p2", "p3"}
+    # Segment criblé de suppressions: réécrit
+    troue = _Segment("troue", 100, supprimes=50)
+    assert [s.nom for s in plan_fusion([gros, troue], facteur=4, max_segments=10)] == ["troue"]
+    # Seuil dépassé sans palier complet: les plus petits
+    divers = [_Segment(f"s{i}", 4 ** i) for i in range(6)]
+    assert [s.nom for s in plan_fusion(divers, facteur=4, max_segments=4)] == ["s0", "s1", "s2"]
+
+
+def test_fusion_reduit_les_segments(tmp_path):
+    dossier = _index(tmp_path / "cv_index", commits=15)
+    assert nombre_segments(dossier) == 15
+    resultat = fusionner_segments(dossier)
+    assert resultat["avant"] == 15 and resultat["apres"] < 15
+    assert nombre_segments(dossier) <= maintenance.SEGMENT_MAX_COUNT
+    assert _ids(dossier) == sorted(f"d{n}" for n in range(15))
+    # Déjà compact: aucun commit
+    generation = open_dir(str(dossier)).latest_generation()
+    assert fusionner_segments(dossier)["fusionnes"] == 0
+    assert open_dir(str(dossier)).latest_generation() == generation
+
+
+def test_snapshot_par_liens_physiques(tmp_path):
+    dossier = _index(tmp_path / "cv_index", commits=3, docs_par_commit=5)
+    racine = tmp_path / "snapshots"
+    snapshot = creer_snapshot(dossier, racine)
+
+    assert lister_snapshots(dossier, racine) == [snapshot]
+    for fichier in snapshot.iterdir():
+        assert fichier.stat().st_ino == (dossier / fichier.name).stat().st_ino
+    assert _ids(snapshot) == _ids(dossier)
+
+    # Le snapshot survit à la fusion et aux suppressions de l'index vivant
+    ix = open_dir(str(dossier))
+    writer = ix.writer()
+    writer.delete_by_term("doc_id", "d0")
+    writer.commit(optimize=True)
+    assert "d0" not in _ids(dossier)
+    assert "d0" in _ids(snapshot)
+
+    # Pas de second snapshot avant l'intervalle
+    assert creer_snapshot(dossier, racine, si_plus_ancien_que=3600) is None
+
+
+def test_restauration(tmp_path):
+    dossier = _index(tmp_path / "job_index", commits=2)
+    racine = tmp_path / "snapshots"
+    snapshot = creer_snapshot(dossier, racine)
+    writer = open_dir(str(dossier)).writer()
+    writer.delete_by_term("doc_id", "d1")
+    writer.commit()
+
+    restaurer_snapshot(dossier, snapshot, racine)
+    assert _ids(dossier) == ["d0", "d1"]
+    assert any(s.name.endswith("_pre_restore") for s in lister_snapshots(dossier, racine))
+
+
+def test_retention(tmp_path):
+    racine = tmp_path / "snapshots"
+    dossier = tmp_path / "cv_index"
+    maintenant = datetime.now()
+    for jours in (40, 30, 20, 10, 9, 1, 0):
+        nom = (maintenant - timedelta(days=jours)).strftime("%Y%m%d_%H%M%S") + "_g1"
+        (racine / "cv_index" / nom).mkdir(parents=True)
+
+    supprimes = appliquer_retention(dossier, racine, garder_derniers=3, age_max_jours=15)
+    # Les 3 plus récents sont gardés; parmi les autres, seul celui de 10 jours est assez jeune
+    assert len(supprimes) == 3
+    assert len(lister_snapshots(dossier, racine)) == 4
+
+
+def test_migration_des_copies_completes(tmp_path):
+    dossier = _index(tmp_path / "cv_index", commits=1)
+    ancienne = _index(tmp_path / "cv_index_backup_1765422575", commits=2)
+    (tmp_path / "cv_index_backup_rien").mkdir()
+    racine = tmp_path / "snapshots"
+
+    migres = migrer_sauvegardes(dossier, racine)
+    assert len(migres) == 1 and not ancienne.exists()
+    assert migres[0].name.endswith("_backup")
+    assert _ids(migres[0]) == ["d0", "d1"]
+    assert (tmp_path / "cv_index_backup_rien").exists()
+
+
+def test_service_delegue_la_fusion(tmp_path, monkeypatch):
+    dossier = _index(tmp_path / "cv_index", commits=1)
+    planificateur = PlanificateurMaintenance([dossier], intervalle=3600, racine=tmp_path / "snapshots")
+    monkeypatch.setattr(maintenance, "_planificateur", planificateur)
+
+    # Un commit par upsert, sans fusion: le seuil finit par être dépassé
+    service = IndexingService(dossier, "doc_id", delai_commit=0.0)
+    for n in range(maintenance.SEGMENT_MAX_COUNT + 2):
+        service.upsert({"doc_id": f"u{n}", "texte": "java"}).result(timeout=10)
+    service.arreter()
+
+    echeance = time.monotonic() + 10
+    while nombre_segments(dossier) > maintenance.SEGMENT_MAX_COUNT and time.monotonic() < echeance:
+        time.sleep(0.05)
+    planificateur.arreter()
+    assert nombre_segments(dossier) <= maintenance.SEGMENT_MAX_COUNT
+    assert len(_ids(dossier)) == maintenance.SEGMENT_MAX_COUNT + 3
+    # Fusion seule: ni planificateur périodique ni snapshot dans ce processus
+    assert planificateur._thread is None
+    assert lister_snapshots(dossier, tmp_path / "snapshots") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
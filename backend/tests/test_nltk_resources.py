@@ -0,0 +1,119 @@
+"""
+Tests du gestionnaire de ressources NLTK (hors ligne, chargement différé)
+Emplacement: backend/tests/test_nltk_resources.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.utils import nltk_resources
+from backend.utils.nltk_resources import (
+    RessourceNLTKManquante,
+    charger_stopwords,
+    exiger_ressource,
+    ressource_disponible,
+    verifier_ressources
+)
+import backend.indexation.preprocessing as preprocessing
+
+
+@pytest.fixture
+def nltk_data(tmp_path, monkeypatch):
+    """Répertoire nltk_data isolé, seul emplacement consulté"""
+    repertoire = tmp_path / "nltk_data"
+    repertoire.mkdir()
+    monkeypatch.setattr(nltk_resources, "repertoires_nltk_data", lambda: [repertoire])
+    ressource_disponible.cache_clear()
+    yield repertoire
+    ressource_disponible.cache_clear()
+
+
+def _executer(code: str, **env) -> str:
+    resultat = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(root_path), env={**os.environ, **env},
+        capture_output=True, text=True, timeout=60
+    )
+    assert resultat.returncode == 0, resultat.stderr
+    return resultat.stdout.strip().splitlines()[-1]
+
+
+def test_detection_dossier_et_zip(nltk_data):
+    assert not ressource_disponible("stopwords")
+    (nltk_data / "corpora" / "stopwords").mkdir(parents=True)
+    (nltk_data / "corpora" / "wordnet.zip").touch()
+    ressource_disponible.cache_clear()
+    assert ressource_disponible("stopwords")
+    assert ressource_disponible("wordnet")
+    assert exiger_ressource("punkt_tab", "stopwords") == "stopwords"
+
+
+def test_hors_ligne_echec_explicite(nltk_data, monkeypatch):
+    monkeypatch.setattr(nltk_resources, "NLTK_OFFLINE", True)
+    with pytest.raises(RessourceNLTKManquante) as erreur:
+        exiger_ressource("wordnet")
+    assert "python -m nltk.downloader wordnet" in str(erreur.value)
+    with pytest.raises(LookupError):
+        verifier_ressources([("wordnet",), ("punkt_tab", "punkt")])
+
+
+def test_mode_degrade_avertit_une_fois(nltk_data, monkeypatch, caplog):
+    monkeypatch.setattr(nltk_resources, "_avertissements", set())
+    for _ in range(3):
+        with pytest.raises(LookupError):
+            exiger_ressource("wordnet")
+    assert sum("wordnet" in r.message for r in caplog.records) == 1
+    assert verifier_ressources([("wordnet",)]) == ["wordnet"]
+
+
+def test_charger_ressources_hors_ligne(nltk_data, monkeypatch):
+    monkeypatch.setattr(nltk_resources, "NLTK_OFFLINE", True)
+    monkeypatch.setattr(preprocessing, "_ressources_chargees", False)
+    with pytest.raises(RessourceNLTKManquante):
+        preprocessing.charger_ressources()
+
+
+def test_stopwords_depuis_le_cache(nltk_data, tmp_path):
+    chemin = tmp_path / "stopwords.json"
+    chemin.write_text(json.dumps({"langues": ["english", "french"], "mots": ["the", "le"]}), encoding="utf-8")
+    assert charger_stopwords(("english", "french"), chemin) == {"the", "le"}
+    # Langues différentes: corpus requis, absent → ensemble vide (mode dégradé)
+    assert charger_stopwords(("english",), chemin) == frozenset()
+
+
+def test_stopwords_corpus_puis_cache(tmp_path):
+    corpus = tmp_path / "nltk_data" / "corpora" / "stopwords"
+    corpus.mkdir(parents=True)
+    (corpus / "english").write_text("the\nand\n", encoding="utf-8")
+    (corpus / "french").write_text("le\net\n", encoding="utf-8")
+    chemin = tmp_path / "stopwords.json"
+
+    code = (
+        "from backend.utils.nltk_resources import charger_stopwords\n"
+        f"print(sorted(charger_stopwords(('english', 'french'), {str(chemin)!r})))"
+    )
+    assert _executer(code, NLTK_DATA=str(tmp_path / "nltk_data")) == "['and', 'et', 'le', 'the']"
+    assert json.loads(chemin.read_text(encoding="utf-8"))["mots"] == ["and", "et", "le", "the"]
+
+
+def test_import_sans_nltk():
+    code = (
+        "import sys\n"
+        "import backend.indexation.preprocessing\n"
+        "import backend.utils.nltk_resources\n"
+        "print('nltk' in sys.modules)"
+    )
+    assert _executer(code) == "False"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
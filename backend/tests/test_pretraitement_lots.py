@@ -0,0 +1,74 @@
+"""
+Tests du prétraitement par lots (pool de processus)
+Emplacement: backend/tests/test_pretraitement_lots.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.indexation import token_cache
+from backend.indexation.preprocessing import (
+    pretraiter_texte,
+    pretraiter_textes,
+    collecte_vocabulaire
+)
+
+
+SKILLS = frozenset({"Python", "Spring Boot", "Docker", "React"})
+
+
+@pytest.fixture(autouse=True)
+def cache_temporaire(tmp_path, monkeypatch):
+    monkeypatch.setattr(token_cache, "_cache", token_cache.TokenCache(tmp_path / "tokens.sqlite"))
+
+
+TEXTES = [
+    f"Développeur {i} Python et Spring Boot, déploiement Docker, front-end React"
+    if i % 3 else f"Data engineer {i}: pipelines Spark, dashboards et APIs"
+    for i in range(40)
+] + [""]
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 8), (2, 3), (3, 1), (2, 100)])
+def test_ordre_et_resultats_identiques(workers, chunk_size):
+    attendu = [pretraiter_texte(t, True, SKILLS) for t in TEXTES]
+    obtenu = list(pretraiter_textes(iter(TEXTES), workers=workers, chunk_size=chunk_size, skills_list=SKILLS))
+    assert obtenu == attendu
+
+
+def test_flux_vide():
+    assert list(pretraiter_textes([], workers=2)) == []
+
+
+def test_vocabulaire_collecte_depuis_workers():
+    with collecte_vocabulaire() as sequentiel:
+        list(pretraiter_textes(TEXTES, workers=1, skills_list=SKILLS))
+    with collecte_vocabulaire() as parallele:
+        list(pretraiter_textes(TEXTES, workers=2, chunk_size=4, skills_list=SKILLS))
+    assert parallele == sequentiel
+    assert "pipelines" in parallele
+
+
+def test_lecture_paresseuse_bornee():
+    lus = []
+
+    def _flux():
+        for i in range(10000):
+            lus.append(i)
+            yield f"texte numéro {i} python"
+
+    flux = pretraiter_textes(_flux(), workers=2, chunk_size=5)
+    next(flux)
+    flux.close()
+    # Au plus deux lots par worker en avance sur le consommateur
+    assert len(lus) <= 5 * (2 * 2 + 1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,107 @@
+"""
+Tests du cache de classements (pagination par curseur)
+Emplacement: backend/tests/test_result_cache.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.search.result_cache import (
+    RankedListCache,
+    CursorError,
+    encode_cursor,
+    decode_cursor
+)
+
+
+def _ranking(n):
+    return [(i, "postgresql" if i % 2 else "whoosh", round(1.0 - i / 100, 4)) for i in range(n)]
+
+
+def test_curseur_aller_retour():
+    cursor = encode_cursor("abc", 20, 10)
+    assert decode_cursor(cursor) == ("abc", 20, 10)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90LWpzb24", None, encode_cursor("k", -1, 10)])
+def test_curseur_mal_forme(cursor):
+    with pytest.raises(CursorError):
+        decode_cursor(cursor)
+
+
+def test_pages_successives_couvrent_le_classement(tmp_path):
+    cache = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=4, ttl_seconds=60)
+    ranking = _ranking(25)
+    key = cache.put(ranking, {"target": "cvs"})
+
+    cursor = encode_cursor(key, 0, 10)
+    vus = []
+    while cursor:
+        page, meta, cursor, total = cache.get_page(cursor)
+        assert meta["target"] == "cvs"
+        assert total == 25
+        vus.extend(page)
+
+    assert vus == ranking
+
+
+def test_eviction_lru(tmp_path):
+    cache = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=2, ttl_seconds=60)
+    k1 = cache.put(_ranking(3))
+    k2 = cache.put(_ranking(3))
+    cache.get(k1)  # k1 devient le plus récent
+    cache.put(_ranking(3))
+
+    assert cache.get(k1) is not None
+    assert cache.get(k2) is None
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expiration_ttl(tmp_path):
+    cache = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=2, ttl_seconds=0.01)
+    key = cache.put(_ranking(3))
+    time.sleep(0.02)
+
+    with pytest.raises(CursorError):
+        cache.get_page(encode_cursor(key, 0, 2))
+
+
+def test_classement_tronque(tmp_path):
+    cache = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=2, ttl_seconds=60, max_ranking=5)
+    key = cache.put(_ranking(50))
+    page, _, next_cursor, total = cache.get_page(encode_cursor(key, 0, 10))
+
+    assert total == 5
+    assert len(page) == 5
+    assert next_cursor is None
+
+
+@pytest.mark.parametrize("limit", [-5, 0, "10", 2.5])
+def test_taille_de_page_invalide(tmp_path, limit):
+    cache = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=2, ttl_seconds=60)
+    key = cache.put(_ranking(10))
+    with pytest.raises(ValueError):
+        cache.get_page(encode_cursor(key, 0, 5), limit)
+
+
+def test_curseur_servi_par_un_autre_processus(tmp_path):
+    # Deux workers: deux caches (deux connexions) sur le même fichier
+    emetteur = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=4, ttl_seconds=60)
+    autre = RankedListCache(chemin=tmp_path / "classements.sqlite", max_entries=4, ttl_seconds=60)
+    key = emetteur.put(_ranking(12), {"target": "cvs", "fields": ["nom"]})
+
+    page, meta, next_cursor, total = autre.get_page(encode_cursor(key, 5, 5))
+    assert page == _ranking(12)[5:10]
+    assert meta == {"target": "cvs", "fields": ["nom"]}
+    assert total == 12 and next_cursor is not None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,91 @@
+"""
+Tests de la route de recherche avancée (validation des paramètres)
+Emplacement: backend/tests/test_search_routes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "backend"))  # Imports "search.*" de l'orchestrateur
+
+import pytest
+from flask import Flask
+
+from backend.routes import search_routes
+from backend.routes.search_routes import search_bp
+
+
+class _Orchestrateur:
+    def __init__(self):
+        self.appels = []
+
+    def search(self, **kwargs):
+        self.appels.append(kwargs)
+        return {"mode_used": "boolean", "results": [], "stats": {"total_results": 0}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    orchestrateur = _Orchestrateur()
+    monkeypatch.setattr(search_routes, "_orchestrator", orchestrateur)
+
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.register_blueprint(search_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_type"] = "recruteur"
+    client.orchestrateur = orchestrateur
+    return client
+
+
+@pytest.mark.parametrize("deadline", ["vite", -5, 0, True, [300], "nan"])
+def test_deadline_invalide_refusee(client, deadline):
+    reponse = client.post("/api/search/advanced", json={"target": "cvs", "query": "python", "deadlineMs": deadline})
+    assert reponse.status_code == 400
+    assert "deadlineMs" in reponse.get_json()["error"]
+    assert client.orchestrateur.appels == []
+
+
+@pytest.mark.parametrize("deadline, attendu", [("300", 300.0), (250, 250.0), (None, None)])
+def test_deadline_convertie(client, deadline, attendu):
+    reponse = client.post("/api/search/advanced", json={"target": "cvs", "query": "python", "deadlineMs": deadline})
+    assert reponse.status_code == 200
+    assert client.orchestrateur.appels[0]["deadline_ms"] == attendu
+
+
+@pytest.mark.parametrize("limit", [-3, 0, "vingt", 2.5, True, 10_000])
+@pytest.mark.parametrize("cursor", [None, "abc"])
+def test_limite_invalide_refusee(client, limit, cursor):
+    corps = {"target": "cvs", "query": "python", "limit": limit}
+    if cursor:
+        corps["cursor"] = cursor
+    reponse = client.post("/api/search/advanced", json=corps)
+    assert reponse.status_code == 400
+    assert "limit" in reponse.get_json()["error"]
+    assert client.orchestrateur.appels == []
+
+
+@pytest.mark.parametrize("limit, attendu", [("15", 15), (None, 20)])
+def test_limite_convertie(client, limit, attendu):
+    reponse = client.post("/api/search/advanced", json={"target": "cvs", "query": "python", "limit": limit})
+    assert reponse.status_code == 200
+    assert client.orchestrateur.appels[0]["top_k"] == attendu
+
+
+def test_niveau_projete(client):
+    client.orchestrateur.search = lambda **kwargs: client.orchestrateur.appels.append(kwargs) or {
+        "mode_used": "boolean",
+        "results": [{"doc_id": "5", "nom": "Meriem", "niveau": "senior"}],
+        "stats": {"total_results": 1}
+    }
+    reponse = client.post("/api/search/advanced", json={"target": "cvs", "query": "python", "fields": ["name", "level"]})
+    assert client.orchestrateur.appels[0]["fields"] == ["niveau", "nom"]
+    assert reponse.get_json()["results"] == [{"id": "5", "name": "Meriem", "level": "senior"}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
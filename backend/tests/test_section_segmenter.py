@@ -0,0 +1,104 @@
+"""
+Tests de la segmentation des CV en sections (un seul parcours)
+Emplacement: backend/tests/test_section_segmenter.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.extraction.section_segmenter import segmenter_cv
+from backend.extraction.info_extractor import (
+    extraire_titre_profil,
+    extraire_resume,
+    extraire_description_experience,
+    extraire_projets,
+    extraire_toutes_infos
+)
+from backend.extraction.skills_extractor import extraire_competences
+from backend.indexation.preprocessing import nettoyer_texte_brut
+
+
+CV = """Meriem Hamidi
+meriem@example.com | +212 600 000 000
+Professional Summary
+Backend engineer skilled in Go, PostgreSQL and distributed systems performance.
+Experience
+OCP Group Casablanca
+Backend Developer Jan 2022 - Present
+- Built Kafka consumers in Go
+Projects
+Learning Management System | E-commerce Platform
+Skills: Go, Node.js
+Comfortable : PostgreSQL, MySQL
+Education
+Master in Computer Science
+"""
+
+# Export PDF courant: en-têtes en majuscules, seuls repères une fois le texte aplati
+CV_MAJUSCULES = CV
+for _titre in ("Professional Summary", "Experience", "Projects", "Education"):
+    CV_MAJUSCULES = CV_MAJUSCULES.replace(f"\n{_titre}\n", f"\n{_titre.upper()}\n")
+
+
+def test_sections_et_bornes():
+    segments = segmenter_cv(CV)
+    assert [s.label for s in segments.sections] == ["resume", "experience", "projets", "competences", "formation"]
+    assert segments.entete.startswith("Meriem Hamidi")
+    assert segments.contenu("competences") == "Go, Node.js\nComfortable : PostgreSQL, MySQL"
+    debut, fin = segments.span("projets")
+    assert CV[debut:fin].strip() == "Learning Management System | E-commerce Platform"
+    assert "certifications" not in segments
+    assert segments.contenu("certifications") == ""
+
+
+def test_mot_courant_n_est_pas_un_en_tete():
+    segments = segmenter_cv("Summary\nI love experience and skills sharing\nSkills\nPython")
+    assert [s.label for s in segments.sections] == ["resume", "competences"]
+
+
+def test_texte_aplati():
+    segments = segmenter_cv(nettoyer_texte_brut(CV_MAJUSCULES))
+    assert [s.label for s in segments.sections] == ["resume", "experience", "projets", "competences", "formation"]
+    assert segments.contenu("projets") == "Learning Management System | E-commerce Platform"
+
+
+def test_texte_aplati_titre_en_capitale_dans_une_phrase():
+    texte = nettoyer_texte_brut(
+        "EXPERIENCE\nSenior Project Manager at X, Experience with Technologies for Profile matching\n"
+        "Projects: Learning Platform\nEDUCATION\nMaster"
+    )
+    segments = segmenter_cv(texte)
+    assert [s.label for s in segments.sections] == ["experience", "projets", "formation"]
+    assert segments.contenu("experience") == "Senior Project Manager at X, Experience with Technologies for Profile matching"
+    assert segments.contenu("projets") == "Learning Platform"
+
+
+def test_texte_vide():
+    segments = segmenter_cv("")
+    assert segments.sections == () and segments.entete == ""
+
+
+@pytest.mark.parametrize("texte", [CV, nettoyer_texte_brut(CV_MAJUSCULES)])
+def test_extracteurs_sur_les_sections(texte):
+    segments = segmenter_cv(texte)
+    assert extraire_resume(texte, segments=segments).endswith("distributed systems performance.")
+    assert "Kafka consumers" in extraire_description_experience(texte, segments=segments)
+    assert extraire_projets(texte, segments=segments) == "Learning Management System | E-commerce Platform"
+    assert extraire_titre_profil(texte, segments=segments).endswith("Backend Developer")
+    assert extraire_toutes_infos(texte)["projets"] == extraire_projets(texte)
+
+
+def test_competences_de_la_section_en_tete():
+    for texte in (CV, nettoyer_texte_brut(CV_MAJUSCULES)):
+        competences = extraire_competences(texte)
+        assert {"go", "node.js", "postgresql", "mysql"} <= set(competences[:5])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
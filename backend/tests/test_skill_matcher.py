@@ -0,0 +1,124 @@
+"""
+Tests du matcher multi-compétences (protection en un seul passage)
+Emplacement: backend/tests/test_skill_matcher.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.utils.skill_matcher import SkillMatcher, get_skill_matcher
+from backend.indexation.preprocessing import pretraiter_texte, placeholder_competence
+from backend.extraction.skills_extractor import (
+    get_skills_database,
+    extraire_competences,
+    localiser_competences
+)
+
+
+def _ancienne_protection(texte, skills):
+    """Implémentation d'origine: un re.sub par compétence"""
+    for skill in skills:
+        pattern = r'\b' + re.escape(skill) + r'\b'
+        texte = re.sub(pattern, placeholder_competence(skill), texte, flags=re.IGNORECASE)
+    return texte
+
+
+@pytest.mark.parametrize("texte", [
+    "Python, Django and PostgreSQL on AWS",
+    "ASP.NET developer (C#), .NET core",
+    "python3 pythonic jython",
+    "Kubernetes / Docker / CI/CD",
+    "React Native et React sous Node.js",
+    ""
+])
+def test_equivalence_sans_chevauchement(texte):
+    skills = ["Python", "Django", "PostgreSQL", "AWS", "C#", ".NET", "Docker", "Kubernetes", "Node.js", "React"]
+    matcher = SkillMatcher.depuis_competences(skills)
+    assert matcher.sub(placeholder_competence, texte) == _ancienne_protection(texte, skills)
+
+
+def test_forme_la_plus_longue_gagne():
+    matcher = SkillMatcher.depuis_competences(["Spring", "Spring Boot", "Java", "JavaScript"])
+    occurrences = list(matcher.finditer("Spring Boot, Spring, JavaScript et Java"))
+    assert [c for _, _, c in occurrences] == ["Spring Boot", "Spring", "JavaScript", "Java"]
+
+
+def test_bornes_de_mot_et_retour_arriere():
+    matcher = SkillMatcher.depuis_competences(["C", "C++", "Go"])
+    # "C++" suivi d'un espace: \b après "++" échoue, "C" est retenu (comme avant)
+    assert [c for _, _, c in matcher.finditer("C++ Go golang")] == ["C", "Go"]
+    assert [c for _, _, c in matcher.finditer("C++11")] == ["C++"]
+
+
+def test_aliases_vers_canonique():
+    matcher = SkillMatcher({"k8s": "Kubernetes", "Kubernetes": "Kubernetes", "JS": "JavaScript"})
+    assert [(d, c) for d, _, c in matcher.finditer("K8S and js")] == [(0, "Kubernetes"), (8, "JavaScript")]
+    assert matcher.canonique("K8s") == "Kubernetes"
+
+
+def test_vocabulaire_vide():
+    matcher = SkillMatcher({})
+    assert len(matcher) == 0
+    assert list(matcher.finditer("python")) == []
+    assert matcher.sub(str.upper, "python") == "python"
+
+
+def test_cache_par_ensemble():
+    skills = get_skills_database().get_skills_set()
+    assert get_skills_database().get_skills_set() is skills
+    assert get_skill_matcher(skills) is get_skill_matcher(skills)
+    assert get_skill_matcher(set(skills)) is get_skill_matcher(skills)
+
+
+def test_pretraitement_deterministe():
+    skills = get_skills_database().get_skills_set()
+    texte = "Senior Python developer, Spring Boot, Machine Learning on AWS"
+    premier = pretraiter_texte(texte, skills_list=skills)
+    assert pretraiter_texte(texte, skills_list=set(skills)) == premier
+    assert pretraiter_texte(texte, preserve_skills=False, skills_list=skills)[0] != premier[0]
+
+
+def test_occurrences_chevauchantes():
+    matcher = SkillMatcher.depuis_competences(["Spring", "Spring Boot", "Boot", "C", "C++"])
+    assert list(matcher.occurrences("Spring Boot")) == [
+        (0, 11, "Spring Boot"), (0, 6, "Spring"), (7, 11, "Boot")
+    ]
+    # "C++ " : seule la forme "C" respecte la borne de mot
+    assert [c for _, _, c in matcher.occurrences("C++ dev")] == ["C"]
+
+
+def test_aliases_multiples_canoniques():
+    matcher = SkillMatcher.depuis_aliases(
+        ["kubernetes", "k8s", "javascript"],
+        {"kubernetes": ["k8s"], "javascript": ["js"], "inconnue": ["xyz"]}
+    )
+    assert sorted(c for _, _, c in matcher.occurrences("k8s")) == ["k8s", "kubernetes"]
+    assert list(matcher.occurrences("xyz")) == []
+
+
+def test_localiser_competences_section():
+    matcher = SkillMatcher.depuis_aliases(["python", "docker", "javascript"], {"javascript": ["js"]})
+    texte = "Experience with Docker.\nSKILLS\nPython, JS, Docker\n"
+    debut = texte.index("Python")
+    resultat = localiser_competences(texte, (debut, len(texte)), matcher)
+    assert resultat == [("docker", 16, True), ("python", debut, True), ("javascript", debut + 8, True)]
+    assert localiser_competences(texte, None, matcher)[0] == ("docker", 16, False)
+
+
+def test_extraire_competences_section_prioritaire():
+    texte = "Projet en Java et Docker.\n\nSKILLS\nPython, Kubernetes\n\nEDUCATION\nMaster"
+    resultat = extraire_competences(texte)
+    assert resultat[:2] == ["python", "kubernetes"]
+    assert set(resultat[2:]) >= {"java", "docker"}
+    assert extraire_competences(texte, priorite_section_skills=False)[:2] == ["java", "docker"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
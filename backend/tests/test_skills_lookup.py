@@ -0,0 +1,81 @@
+"""
+Tests des tables de correspondance de SkillsDatabase
+Emplacement: backend/tests/test_skills_lookup.py
+"""
+
+import builtins
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.extraction.skills_extractor import (
+    get_skills_database,
+    tag_taxonomie,
+    categoriser_competences,
+    valider_competence,
+    normaliser_competence
+)
+
+
+@pytest.mark.parametrize("skill, tag", [
+    ("Spring Boot", "spring_boot"),
+    ("Node.js", "nodejs"),
+    ("C#", "csharp"),
+    ("C++", "cpp"),
+    ("CI/CD", "ci_cd"),
+    ("scikit-learn", "scikit_learn")
+])
+def test_tag_taxonomie(skill, tag):
+    assert tag_taxonomie(skill) == tag
+
+
+def test_normaliser_nom_alias_et_tag():
+    assert normaliser_competence("PYTHON") == "python"
+    assert normaliser_competence("k8s") == "k8s"  # compétence à part entière
+    assert normaliser_competence("Postgres") == "postgresql"
+    assert normaliser_competence("spring_boot") == "spring boot"
+    assert normaliser_competence("inconnue") == "inconnue"
+
+
+def test_valider():
+    assert valider_competence(" Docker ")
+    assert valider_competence("postgres")
+    assert not valider_competence("cobolx")
+    assert not valider_competence("")
+
+
+def test_categoriser_ordre_json():
+    db = get_skills_database()
+    categories = categoriser_competences(["docker", "python", "Python", "inconnue"])
+    assert list(categories) == sorted(categories, key=db.categories.index)
+    assert categories["programming_languages"] == ["python", "Python"]
+    assert "docker" in categories["cloud_devops"]
+
+
+def test_aucune_lecture_fichier(monkeypatch):
+    get_skills_database()
+
+    def _interdit(*args, **kwargs):
+        raise AssertionError("lecture de fichier inattendue")
+
+    monkeypatch.setattr(builtins, "open", _interdit)
+    categoriser_competences(["python", "react"])
+    normaliser_competence("k8s")
+    valider_competence("js")
+
+
+def test_tags_taxonomie_partages():
+    db = get_skills_database()
+    assert db.taxonomy["python"] == "langages"
+    assert db.get_tag_taxonomie("Spring Boot") == "spring_boot"
+    assert db.get_tag_taxonomie("Postgres") == "postgresql"
+    assert db.get_tag_taxonomie("inconnue") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,286 @@
+"""
+Tests de la synchronisation PostgreSQL → index (outbox, BM25 incrémental)
+Emplacement: backend/tests/test_sync_index.py
+"""
+
+import random
+import sys
+import threading
+from collections import Counter, namedtuple
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.extraction.skills_extractor import get_skills_database
+from backend.indexation import sync_index
+from backend.indexation.preprocessing import nettoyer_texte_brut, pretraiter_texte
+from backend.indexation.sync_index import (
+    PositionOutbox,
+    SuiviBM25,
+    regrouper_changements,
+    offre_vers_job_json,
+    lire_noms_fichiers
+)
+from backend.search.frozen_index import FrozenBM25Index, SurcoucheBM25
+from backend.search.vectoriel_model import BM25Scorer, VectorielSearchModel
+
+
+# Documents sans rapport: les termes testés restent rares (IDF > 0)
+REMPLISSAGE = {f"r{i}": ["remplissage"] for i in range(10)}
+
+
+def _corpus(rng, n, prefixe="d"):
+    vocab = [f"t{i}" for i in range(120)]
+    return {
+        f"{prefixe}{i}": [rng.choice(vocab[:20] if rng.random() < 0.3 else vocab) for _ in range(rng.randint(0, 40))]
+        for i in range(n)
+    }
+
+
+def _scorer(docs):
+    scorer = BM25Scorer()
+    scorer.build_index([{"id": doc_id, "tokens": tokens} for doc_id, tokens in docs.items()])
+    return scorer
+
+
+def test_scorer_incremental_identique_a_reconstruction():
+    rng = random.Random(3)
+    docs = _corpus(rng, 200)
+    scorer = _scorer(docs)
+
+    upserts = {**{f"d{i}": ["t1", "t2", "python"] for i in range(0, 30, 3)}, **_corpus(rng, 15, "n")}
+    suppressions = [f"d{i}" for i in range(100, 140)] + ["absent"]
+    scorer.appliquer_changements(upserts, suppressions)
+
+    for doc_id in suppressions:
+        docs.pop(doc_id, None)
+    docs.update(upserts)
+    attendu = _scorer(docs)
+
+    assert (scorer.N, scorer.avgdl, scorer.df, scorer.idf) == (attendu.N, attendu.avgdl, attendu.df, attendu.idf)
+    for _ in range(10):
+        query = rng.sample([f"t{i}" for i in range(120)] + ["python"], 3)
+        assert scorer.score_all(query) == attendu.score_all(query)
+
+
+def test_surcouche_sans_changement_identique_a_l_index_fige():
+    docs = _corpus(random.Random(5), 150)
+    frozen = FrozenBM25Index.from_scorer(_scorer(docs))
+    surcouche = SurcoucheBM25(frozen)
+    for query in (["t1"], ["t3", "t50", "t7"], ["inconnu"]):
+        assert surcouche.score_all(query) == frozen.score_all(query)
+        assert surcouche.score(query, "d4") == frozen.score(query, "d4")
+
+
+def test_surcouche_ajouts_identiques_a_reconstruction():
+    rng = random.Random(11)
+    docs = _corpus(rng, 150)
+    ajouts = _corpus(rng, 20, "n")
+    surcouche = SurcoucheBM25(FrozenBM25Index.from_scorer(_scorer(docs)))
+    surcouche.appliquer_changements(ajouts)
+
+    attendu = _scorer({**docs, **ajouts})
+    assert surcouche.N == attendu.N and surcouche.avgdl == pytest.approx(attendu.avgdl)
+    for _ in range(10):
+        query = rng.sample([f"t{i}" for i in range(120)], 3)
+        assert surcouche.score_all(query) == pytest.approx(attendu.score_all(query))
+        assert surcouche.score(query, "n3") == pytest.approx(attendu.score(query, "n3"))
+
+
+def test_surcouche_masque_sans_toucher_l_index_fige():
+    docs = {"1": ["python", "django"], "2": ["java", "spring"], "3": ["python", "flask"], **REMPLISSAGE}
+    frozen = FrozenBM25Index.from_scorer(_scorer(docs))
+    surcouche = SurcoucheBM25(frozen)
+
+    surcouche.appliquer_changements({"1": ["cobol"]}, ["3"])
+    assert set(surcouche.score_all(["python"])) == set()
+    assert set(surcouche.score_all(["cobol"])) == {"1"}
+    assert surcouche.score(["python"], "3") == 0.0
+    assert set(frozen.score_all(["python"])) == {"1", "3"}
+
+    # Suppression d'une version ajoutée, puis nouvel ajout
+    surcouche.appliquer_changements({}, ["1"])
+    assert surcouche.score_all(["cobol"]) == {}
+    surcouche.appliquer_changements({"4": ["python"]})
+    assert set(surcouche.score_all(["python"])) == {"4"}
+    assert surcouche.get_stats()["documents_masques"] == 2
+
+
+def _modele():
+    modele = VectorielSearchModel.__new__(VectorielSearchModel)
+    modele._indices_lock = threading.Lock()
+    modele.bm25_cv_pg = FrozenBM25Index.from_scorer(_scorer({"1": ["python"], "2": ["java"], **REMPLISSAGE}))
+    modele.bm25_cv_whoosh = _scorer({"cv_a.pdf": ["python"], **REMPLISSAGE})
+    modele.bm25_job_pg = BM25Scorer()
+    modele.bm25_job_whoosh = BM25Scorer()
+    modele.position_outbox = PositionOutbox()
+    return modele
+
+
+def test_modele_route_les_changements():
+    modele = _modele()
+    modele.appliquer_changements("cvs", systeme={"3": ["python", "sql"]}, uploads={"2": ["java", "python"]}, suppressions=["1"])
+
+    assert isinstance(modele.bm25_cv_pg, SurcoucheBM25)
+    assert set(modele.bm25_cv_pg.score_all(["python"])) == {"3"}
+    assert modele.bm25_cv_pg.score_all(["java"]) == {}  # Passé en upload
+    assert set(modele.bm25_cv_whoosh.score_all(["python"])) == {"cv_a.pdf", "2"}
+    assert modele.bm25_job_pg.N == 0
+
+
+class _Curseur:
+    Colonne = namedtuple("Colonne", "name")
+
+    def __init__(self, base):
+        self.base = base
+        self.description = None
+        self._resultat = []
+
+    def execute(self, requete, params=()):
+        if requete.startswith("LISTEN"):
+            return
+        if "index_outbox" in requete:
+            position, attendus, limite = params
+            lignes = [l for l in self.base["outbox"] if l[0] > position or l[0] in attendus]
+            self._resultat = lignes[:limite]
+        else:
+            table = "cvs" if "FROM cvs" in requete else "offres"
+            self.description = [self.Colonne(c) for c in ("id", "source_systeme", "texte_complet")]
+            self._resultat = [self.base[table][i] for i in params[0] if i in self.base[table]]
+
+    def fetchall(self):
+        return self._resultat
+
+    def close(self):
+        pass
+
+
+class _Connexion:
+    closed = 0
+    notifies = []
+
+    def __init__(self, base):
+        self.base = base
+
+    def cursor(self):
+        return _Curseur(self.base)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def _tokens_indexation_cv(texte):
+    # Comme soumettre_cv_depuis_texte
+    skills = get_skills_database().get_skills_set()
+    return pretraiter_texte(nettoyer_texte_brut(texte), preserve_skills=True, skills_list=skills)[1]
+
+
+def test_suivi_applique_l_outbox(monkeypatch):
+    base = {
+        "outbox": [
+            (1, "cvs", 5, "INSERT", True),
+            (2, "cvs", 6, "INSERT", False),
+            (4, "cvs", 1, "DELETE", True),
+            (5, "cvs", 5, "UPDATE", True)
+        ],
+        "cvs": {5: (5, True, "Python developer with Django"), 6: (6, False, "Java Spring backend")},
+        "offres": {}
+    }
+    monkeypatch.setattr(sync_index, "get_db_connection", lambda: _Connexion(base))
+
+    modele = _modele()
+    suivi = SuiviBM25(modele, taille_lot=10)
+    assert suivi.executer_cycle() == 4
+
+    assert "5" in modele.bm25_cv_pg.score_all(["python"])
+    assert "1" not in modele.bm25_cv_pg.score_all(["python"])
+    # Upload: mêmes tokens que l'indexation Whoosh (compétences connues)
+    java = _tokens_indexation_cv("Java")
+    assert "6" in modele.bm25_cv_whoosh.score_all(java)
+    assert modele.bm25_cv_whoosh.doc_terms["6"] == Counter(_tokens_indexation_cv("Java Spring backend"))
+    assert modele.position_outbox.position == 5
+    assert modele.position_outbox.ids_attendus() == [3]
+
+    # L'id 3 est commité plus tard: relu malgré la position
+    base["outbox"].append((3, "cvs", 6, "DELETE", False))
+    del base["cvs"][6]
+    assert suivi.executer_cycle() == 1
+    assert modele.bm25_cv_whoosh.score_all(java) == {}
+    assert modele.position_outbox.ids_attendus() == []
+
+
+def test_chargement_pg_sans_pool_pendant_une_requete(monkeypatch):
+    appels = []
+
+    def pretraiter(textes, workers=None, **kwargs):
+        appels.append(workers)
+        return [(texte, texte.split()) for texte in textes]
+
+    monkeypatch.setattr("backend.search.vectoriel_model.pretraiter_textes", pretraiter)
+
+    class _Pg:
+        def cursor(self):
+            return self
+
+        def execute(self, requete):
+            pass
+
+        def fetchall(self):
+            return [(5, "Meriem", "Python developer", ["python"])]
+
+        def close(self):
+            pass
+
+    modele = VectorielSearchModel.__new__(VectorielSearchModel)
+    modele._pg_conn = _Pg()
+    assert modele._load_postgresql_documents("cvs")[0]["tokens"] == ["Python", "developer"]
+    modele._load_postgresql_documents("cvs", workers=None)  # Préchargement
+    assert appels == [1, None]
+
+
+def test_position_outbox_trous_expires():
+    position = PositionOutbox(10, delai=5)
+    position.avancer([11, 14], maintenant=0)
+    assert (position.position, position.ids_attendus()) == (14, [12, 13])
+    position.avancer([13], maintenant=1)
+    assert position.ids_attendus() == [12]
+    position.avancer([], maintenant=10)
+    assert position.ids_attendus() == []
+    assert position.position == 14
+
+
+def test_regroupement_et_conversion():
+    lignes = [
+        (1, "cvs", 7, "INSERT", False),
+        (2, "cvs", 7, "UPDATE", True),
+        (3, "offres", 9, "UPDATE", True),
+        (4, "users", 1, "INSERT", False)
+    ]
+    assert regrouper_changements(lignes) == {"cvs": {7: True}, "offres": {9: False}}
+
+    job = offre_vers_job_json({"id": 9, "titre": "Dev", "competences_requises": ["python"], "texte_complet": "Texte"})
+    assert job["job_id"] == "9" and job["description"] == "Texte" and job["required_skills"] == ["python"]
+
+
+def test_noms_de_fichier_conserves(tmp_path):
+    from whoosh.index import create_in
+    from backend.indexation.cv_indexer import cv_schema
+
+    ix = create_in(str(tmp_path), cv_schema)
+    writer = ix.writer()
+    writer.add_document(doc_id="7", nom="A", original_filename="cv_meriem.pdf")
+    writer.add_document(doc_id="8", nom="B")
+    writer.commit()
+
+    assert lire_noms_fichiers(tmp_path, ["7", "8", "9"]) == {"7": "cv_meriem.pdf"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
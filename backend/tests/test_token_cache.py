@@ -0,0 +1,88 @@
+"""
+Tests du cache persistant des tokens prétraités
+Emplacement: backend/tests/test_token_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+
+from backend.indexation import preprocessing, token_cache
+from backend.indexation.token_cache import TokenCache, cle_cache
+from backend.indexation.preprocessing import (
+    pretraiter_texte,
+    pretraiter_textes,
+    pretraiter_texte_cache,
+    signature_pretraitement
+)
+
+
+SKILLS = frozenset({"Python", "Spring Boot", "Docker"})
+TEXTES = [f"Ingénieur {i}: Python, Spring Boot et Docker en production" for i in range(30)] + [""]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TokenCache(tmp_path / "tokens.sqlite")
+    monkeypatch.setattr(token_cache, "_cache", cache)
+    return cache
+
+
+def test_aller_retour(tmp_path):
+    cache = TokenCache(tmp_path / "tokens.sqlite")
+    cle = cle_cache(b"sig", "texte")
+    cache.put_many([(cle, ["spring boot", "python", "-x"]), (cle_cache(b"sig", ""), [])])
+    assert cache.get_many([cle, cle_cache(b"sig", ""), cle_cache(b"autre", "texte")]) == {
+        cle: ["spring boot", "python", "-x"],
+        cle_cache(b"sig", ""): []
+    }
+    # Persistance: une nouvelle instance relit le fichier
+    assert TokenCache(tmp_path / "tokens.sqlite").get_stats()["entrees"] == 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_second_passage_sans_nlp(cache, monkeypatch, workers):
+    attendu = [pretraiter_texte(t, True, SKILLS) for t in TEXTES]
+    assert list(pretraiter_textes(TEXTES, workers=workers, chunk_size=4, skills_list=SKILLS)) == attendu
+
+    def _interdit(*args, **kwargs):
+        raise AssertionError("prétraitement NLP inattendu")
+
+    monkeypatch.setattr(preprocessing, "pretraiter_texte", _interdit)
+    monkeypatch.setattr(preprocessing, "_pretraiter_lot", _interdit)
+    assert list(pretraiter_textes(TEXTES, workers=workers, chunk_size=4, skills_list=SKILLS)) == attendu
+    assert cache.get_stats()["hits"] >= len(set(TEXTES))
+
+
+def test_lot_partiellement_connu(cache):
+    pretraiter_textes_liste = lambda textes: list(pretraiter_textes(textes, workers=1, skills_list=SKILLS))
+    pretraiter_textes_liste(TEXTES[::2])
+    assert pretraiter_textes_liste(TEXTES) == [pretraiter_texte(t, True, SKILLS) for t in TEXTES]
+
+
+def test_signature_depend_de_la_configuration():
+    assert signature_pretraitement(True, SKILLS) == signature_pretraitement(True, set(SKILLS))
+    assert signature_pretraitement(True, SKILLS) != signature_pretraitement(False, SKILLS)
+    assert signature_pretraitement(False, SKILLS) == signature_pretraitement(True, None)
+
+
+def test_collecte_vocabulaire_contourne_le_cache(cache):
+    pretraiter_texte_cache(TEXTES[0], skills_list=SKILLS)
+    with preprocessing.collecte_vocabulaire() as vocabulaire:
+        pretraiter_texte_cache(TEXTES[0], skills_list=SKILLS)
+    assert "ingénieur" in vocabulaire
+
+
+def test_cache_desactive(monkeypatch):
+    monkeypatch.setattr(token_cache, "TOKEN_CACHE_ENABLED", False)
+    assert token_cache.get_token_cache() is None
+    assert pretraiter_texte_cache("Python et Docker") == pretraiter_texte("Python et Docker")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
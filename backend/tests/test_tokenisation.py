@@ -0,0 +1,69 @@
+"""
+Tests de la tokenisation rapide (regex) du texte pré-nettoyé
+Emplacement: backend/tests/test_tokenisation.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+
+from backend.config.settings import CV_FOLDER, JOB_FOLDER
+from backend.extraction.pdf_reader import lire_pdf
+from backend.indexation.preprocessing import preparer_tokenisation, tokeniser_rapide
+
+
+# word_tokenize() = Punkt (une seule phrase sans ponctuation) + ce tokenizer
+_treebank = NLTKWordTokenizer()
+
+
+def _textes_corpus():
+    textes = []
+    for chemin in sorted(JOB_FOLDER.glob("*.json")):
+        with open(chemin, "r", encoding="utf-8") as f:
+            offre = json.load(f)
+        textes.append(json.dumps(offre, ensure_ascii=False))
+    for chemin in sorted(CV_FOLDER.glob("*.pdf")):
+        texte = lire_pdf(chemin)
+        if texte:
+            textes.append(texte)
+    return textes
+
+
+def test_equivalence_corpus():
+    textes = _textes_corpus()
+    if not textes:
+        pytest.skip("corpus CV/offres absent")
+    for texte in textes:
+        prepare = preparer_tokenisation(texte)
+        assert tokeniser_rapide(prepare) == _treebank.tokenize(prepare)
+
+
+@pytest.mark.parametrize("texte", [
+    "front-end back-end full-stack -python python- x-",
+    "a--b --- ---- -- x--",
+    "cannot CANNOT cannot-do x-cannot cannotx",
+    "gimme lemme gonna gotta wanna wanna-be wannabe",
+    "WANNA\tGonna\nGotta",
+    "développeur spécialisé  données big data",
+    "",
+    "   "
+])
+def test_equivalence_cas_limites(texte):
+    prepare = preparer_tokenisation(texte)
+    assert tokeniser_rapide(prepare) == _treebank.tokenize(prepare)
+
+
+def test_preparation():
+    assert preparer_tokenisation("C++/Node.js, Spring_Boot (2019-2021)").split() == ["c", "node", "js", "springboot"]
+    assert tokeniser_rapide("front-end  cannot") == ["front-end", "can", "not"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
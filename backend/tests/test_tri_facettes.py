@@ -0,0 +1,96 @@
+"""
+Tests du tri et des facettes par colonnes Whoosh (modèle booléen)
+Emplacement: backend/tests/test_tri_facettes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter la racine du projet au path
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+sys.path.insert(0, str(root_path / "backend"))  # Imports "search.*" de l'orchestrateur
+
+import pytest
+from whoosh.index import create_in
+from whoosh.searching import Hit
+
+from backend.indexation.cv_indexer import cv_schema
+from backend.search.boolean_search import BooleanSearchModel
+from backend.search.projection import normaliser_tri
+from backend.search.search_orchestrator import SearchOrchestrator
+
+
+EXPERIENCES = [3, 10, 0, 7, 3, 5]
+
+
+@pytest.fixture
+def modele(tmp_path):
+    ix = create_in(str(tmp_path), cv_schema)
+    writer = ix.writer()
+    for i, annees in enumerate(EXPERIENCES):
+        writer.add_document(doc_id=f"cv{i}", nom=f"Candidat {i}", competences="python,sql", annees_experience=annees)
+    writer.add_document(doc_id="java", nom="Autre", competences="java", annees_experience=20)
+    writer.commit()
+
+    modele = BooleanSearchModel.__new__(BooleanSearchModel)
+    modele.whoosh_cv_index = ix
+    return modele
+
+
+def test_tri_decroissant_et_facettes(modele):
+    resultats, facettes = modele._search_whoosh(
+        {"must_have": ["python"]}, {}, "cvs", champs=("nom", "experience"), tri=("experience", True), facettes=True
+    )
+    assert [r["experience"] for r in resultats] == sorted(EXPERIENCES, reverse=True)
+    assert resultats[0]["nom"] == "Candidat 1"
+    assert all(r["score_boolean"] is None for r in resultats)
+    assert facettes == {"experience": {0: 1, 3: 2, 5: 1, 7: 1, 10: 1}}
+
+
+def test_tri_sans_champs_stockes(modele, monkeypatch):
+    def interdit(self):
+        raise AssertionError("champs stockés lus")
+    monkeypatch.setattr(Hit, "fields", interdit)
+
+    resultats, facettes = modele._search_whoosh(
+        {"must_have": ["python"]}, {}, "cvs", champs=("experience",), tri=("experience", False)
+    )
+    assert [r["doc_id"] for r in resultats][:2] == ["cv2", "cv0"]
+    assert [r["experience"] for r in resultats] == sorted(EXPERIENCES)
+    assert facettes == {}
+
+
+def test_fusion_triee_des_branches(modele):
+    pg = [{"id": 1, "experience": 12}, {"id": 2, "experience": 4}, {"id": 3, "experience": None}]
+    whoosh = [{"id": "a", "experience": 8}, {"id": "b", "experience": 4}]
+    fusion = modele._merge_results(pg, whoosh, ("experience", True))
+    assert [r["id"] for r in fusion] == [1, "a", 2, "b", 3]
+
+    croissant = modele._merge_results(list(reversed(pg[:2])) + pg[2:], list(reversed(whoosh)), ("experience", False))
+    assert [r["id"] for r in croissant] == [2, "b", "a", 1, 3]
+
+    assert modele._merge_facettes({"experience": {4.0: 2, None: 1}}, {"experience": {4: 1, 8: 1}}) == {
+        "experience": {4: 3, 8: 1}
+    }
+
+
+@pytest.mark.parametrize("mode", ["vectoriel", "hybrid"])
+def test_tri_et_facettes_refuses_hors_mode_booleen(mode):
+    orchestrateur = SearchOrchestrator.__new__(SearchOrchestrator)
+    with pytest.raises(ValueError, match="mode booléen"):
+        orchestrateur.search("python", mode=mode, sort="-experience")
+    with pytest.raises(ValueError, match="mode booléen"):
+        orchestrateur.search("python", mode=mode, facets=True)
+
+
+def test_normaliser_tri():
+    assert normaliser_tri(None) is None
+    assert normaliser_tri("experience") == ("experience", False)
+    assert normaliser_tri("-experience") == ("experience", True)
+    with pytest.raises(ValueError):
+        normaliser_tri("nom")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -13,11 +13,27 @@ from .logger import (
     log_section
 )
 
+from .skill_matcher import (
+    SkillMatcher,
+    get_skill_matcher
+)
+
+from .nltk_resources import (
+    RessourceNLTKManquante,
+    etat_ressources,
+    exiger_ressource
+)
+
 __all__ = [
     'setup_logging',
     'get_logger',
     'log_separator',
-    'log_section'
+    'log_section',
+    'SkillMatcher',
+    'get_skill_matcher',
+    'RessourceNLTKManquante',
+    'etat_ressources',
+    'exiger_ressource'
 ]
 
 
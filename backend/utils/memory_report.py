@@ -0,0 +1,178 @@
+"""
+============================================================================
+SMARTHIRE - Rapport mémoire par worker (Linux)
+Lit /proc/<pid>/smaps_rollup : RSS, PSS et USS (mémoire privée = ce que
+coûte réellement chaque worker supplémentaire)
+
+Usage:
+    python -m backend.utils.memory_report --pid <pid du maître gunicorn>
+    python -m backend.utils.memory_report --simulate 2 4    # fork local
+============================================================================
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROC = Path("/proc")
+
+
+# ========================================================
+# LECTURE /proc
+# ========================================================
+def parser_smaps(texte: str) -> Dict[str, int]:
+    """Somme les champs "Cle:   123 kB" d'un smaps / smaps_rollup (en kB)"""
+    totaux: Dict[str, int] = {}
+    for ligne in texte.splitlines():
+        parties = ligne.split()
+        if len(parties) >= 3 and parties[0].endswith(":") and parties[2] == "kB":
+            cle = parties[0][:-1]
+            totaux[cle] = totaux.get(cle, 0) + int(parties[1])
+    return totaux
+
+
+def memoire_processus(pid: int) -> Dict:
+    """
+    Mémoire d'un processus
+
+    Returns:
+        {"pid", "rss_kb", "pss_kb", "uss_kb", "shared_kb", "swap_kb"}
+        (USS = Private_Clean + Private_Dirty)
+    """
+    rollup = PROC / str(pid) / "smaps_rollup"
+    source = rollup if rollup.exists() else PROC / str(pid) / "smaps"
+    champs = parser_smaps(source.read_text())
+
+    return {
+        "pid": pid,
+        "rss_kb": champs.get("Rss", 0),
+        "pss_kb": champs.get("Pss", 0),
+        "uss_kb": champs.get("Private_Clean", 0) + champs.get("Private_Dirty", 0),
+        "shared_kb": champs.get("Shared_Clean", 0) + champs.get("Shared_Dirty", 0),
+        "swap_kb": champs.get("Swap", 0)
+    }
+
+
+def trouver_enfants(pid: int) -> List[int]:
+    """Pids des processus fils directs (workers d'un maître)"""
+    enfants = []
+    for stat in PROC.glob("[0-9]*/stat"):
+        try:
+            contenu = stat.read_text()
+        except OSError:
+            continue
+        # Le nom du processus (2e champ) peut contenir des espaces: couper après ")"
+        champs = contenu[contenu.rfind(")") + 2:].split()
+        if len(champs) > 1 and int(champs[1]) == pid:
+            enfants.append(int(stat.parent.name))
+    return sorted(enfants)
+
+
+def rapport_memoire(master_pid: int, worker_pids: Optional[List[int]] = None) -> Dict:
+    """Mémoire du maître et de chacun de ses workers"""
+    if worker_pids is None:
+        worker_pids = trouver_enfants(master_pid)
+    workers = [memoire_processus(pid) for pid in worker_pids]
+    return {
+        "master": memoire_processus(master_pid),
+        "workers": workers,
+        "total_uss_kb": sum(w["uss_kb"] for w in workers),
+        "total_pss_kb": sum(w["pss_kb"] for w in workers)
+    }
+
+
+def afficher_rapport(rapport: Dict, titre: str = "RAPPORT MÉMOIRE"):
+    """Affiche le rapport dans la console (MB)"""
+    def mb(kb):
+        return f"{kb / 1024:8.1f}"
+
+    print("=" * 70)
+    print(f"🧠 {titre}")
+    print("=" * 70)
+    print(f"{'':10} {'pid':>8} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9} {'partagé':>9}")
+    m = rapport["master"]
+    print(f"{'maître':10} {m['pid']:>8} {mb(m['rss_kb'])} {mb(m['pss_kb'])} {mb(m['uss_kb'])} {mb(m['shared_kb'])}")
+    for i, w in enumerate(rapport["workers"], 1):
+        print(f"{'worker ' + str(i):10} {w['pid']:>8} {mb(w['rss_kb'])} {mb(w['pss_kb'])} {mb(w['uss_kb'])} {mb(w['shared_kb'])}")
+    print(f"\n📊 Workers: USS total {rapport['total_uss_kb'] / 1024:.1f} MB, "
+          f"PSS total {rapport['total_pss_kb'] / 1024:.1f} MB")
+
+
+# ========================================================
+# SIMULATION LOCALE (préchargement puis fork)
+# ========================================================
+def simuler_workers(nb_workers: int, freeze: bool = True, requete: str = "python developer") -> Dict:
+    """
+    Précharge les index dans ce processus puis forke nb_workers workers
+    qui exécutent chacun une recherche; mesure leur mémoire puis les arrête.
+    """
+    from backend.utils.preload import precharger_application, reinitialiser_apres_fork
+    from backend.routes.search_routes import get_orchestrator
+
+    precharger_application(freeze=freeze)
+
+    pids = []
+    for _ in range(nb_workers):
+        lecture, ecriture = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(lecture)
+            reinitialiser_apres_fork()
+            for target in ("cvs", "offres"):
+                get_orchestrator().search(requete, target=target, mode="vectoriel")
+            os.write(ecriture, b"1")
+            signal.pause()
+            os._exit(0)
+        os.close(ecriture)
+        os.read(lecture, 1)
+        os.close(lecture)
+        pids.append(pid)
+
+    time.sleep(0.2)
+    try:
+        return rapport_memoire(os.getpid(), pids)
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+
+
+# ========================================================
+# CLI
+# ========================================================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mémoire par worker SmartHire")
+    parser.add_argument("--pid", type=int, help="Pid du maître (ex: gunicorn)")
+    parser.add_argument("--simulate", type=int, nargs="+", metavar="N",
+                        help="Précharge puis forke N workers (une mesure par N)")
+    parser.add_argument("--no-freeze", action="store_true",
+                        help="Simulation avec index BM25 non figés (dicts)")
+    args = parser.parse_args(argv)
+
+    if args.pid:
+        afficher_rapport(rapport_memoire(args.pid))
+        return 0
+
+    if args.simulate:
+        root = Path(__file__).resolve().parent.parent.parent
+        sys.path[:0] = [str(root / "backend"), str(root)]
+        for n in args.simulate:
+            pid = os.fork()
+            if pid == 0:
+                # Maître neuf par mesure (index reconstruits à chaque fois)
+                rapport = simuler_workers(n, freeze=not args.no_freeze)
+                afficher_rapport(rapport, f"SIMULATION: {n} workers (freeze={not args.no_freeze})")
+                os._exit(0)
+            os.waitpid(pid, 0)
+        return 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+============================================================================
+SMARTHIRE - Gestionnaire des ressources NLTK
+- Vérifie la présence locale des données sans importer NLTK ni télécharger
+- Chaque ressource est chargée au premier usage par son consommateur
+- Mode hors ligne (SMARTHIRE_NLTK_OFFLINE=1): une ressource absente lève
+  immédiatement une erreur explicite au lieu d'un mode dégradé silencieux
+- Stopwords mis en cache dans un JSON (chargement en ~1 ms, sans NLTK)
+
+Usage:
+    python -m backend.utils.nltk_resources             # État des ressources
+    python -m backend.utils.nltk_resources --download  # Installation (réseau)
+============================================================================
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Sequence
+
+from backend.config.settings import (
+    NLTK_DOWNLOADS,
+    NLTK_OFFLINE,
+    NLTK_AUTO_DOWNLOAD,
+    STOPWORDS_CACHE_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+# Nom de téléchargement → chemin dans un répertoire nltk_data
+RESSOURCES_NLTK = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet',
+    'omw-1.4': 'corpora/omw-1.4',
+    'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger'
+}
+
+_avertissements = set()
+_telechargement_lock = threading.Lock()
+
+
+class RessourceNLTKManquante(LookupError):
+    """Ressource NLTK absente localement (LookupError, comme NLTK)"""
+
+    def __init__(self, noms: Sequence[str]):
+        self.noms = list(noms)
+        super().__init__(
+            f"Ressource(s) NLTK absente(s): {', '.join(self.noms)}. "
+            f"Installez-les sur une machine connectée avec "
+            f"'python -m nltk.downloader {' '.join(self.noms)}' "
+            f"(ou 'python -m backend.utils.nltk_resources --download') "
+            f"puis copiez nltk_data vers l'un de: {', '.join(map(str, repertoires_nltk_data()))}"
+        )
+
+
+# ========================================================
+# DÉTECTION LOCALE (sans import de NLTK)
+# ========================================================
+def repertoires_nltk_data() -> List[Path]:
+    """Mêmes emplacements que nltk.data.path (NLTK_DATA en tête)"""
+    repertoires = [Path(p) for p in os.environ.get("NLTK_DATA", "").split(os.pathsep) if p]
+    repertoires.append(Path.home() / "nltk_data")
+    for prefixe in (sys.prefix, getattr(sys, "base_prefix", sys.prefix)):
+        repertoires += [Path(prefixe) / "nltk_data", Path(prefixe) / "share" / "nltk_data", Path(prefixe) / "lib" / "nltk_data"]
+    if sys.platform.startswith("win"):
+        repertoires += [Path(os.environ.get("APPDATA", "C:\\")) / "nltk_data", Path("C:/nltk_data")]
+    else:
+        repertoires += [Path(p) for p in ("/usr/share/nltk_data", "/usr/local/share/nltk_data", "/usr/lib/nltk_data", "/usr/local/lib/nltk_data")]
+    return list(dict.fromkeys(repertoires))
+
+
+@lru_cache(maxsize=None)
+def ressource_disponible(nom: str) -> bool:
+    """Présence locale d'une ressource (dossier ou archive .zip)"""
+    chemin = RESSOURCES_NLTK.get(nom, nom)
+    return any(
+        (base / chemin).exists() or (base / f"{chemin}.zip").exists()
+        for base in repertoires_nltk_data()
+    )
+
+
+def etat_ressources(noms: Iterable[str] = NLTK_DOWNLOADS) -> Dict[str, bool]:
+    return {nom: ressource_disponible(nom) for nom in noms}
+
+
+def telecharger_ressources(noms: Iterable[str] = NLTK_DOWNLOADS) -> Dict[str, bool]:
+    """Télécharge les ressources absentes (installation: jamais au démarrage)"""
+    import nltk
+
+    with _telechargement_lock:
+        for nom in noms:
+            if not ressource_disponible(nom):
+                nltk.download(nom, quiet=True)
+        ressource_disponible.cache_clear()
+    return etat_ressources(noms)
+
+
+def exiger_ressource(nom: str, *alternatives: str) -> str:
+    """
+    Garantit qu'une ressource (ou l'une de ses alternatives) est présente
+    avant son premier chargement
+
+    Returns:
+        Le nom de la ressource disponible
+
+    Raises:
+        RessourceNLTKManquante: si aucune n'est présente. Hors mode
+            hors ligne, un avertissement unique est journalisé: l'appelant
+            retombe sur son mode dégradé (LookupError)
+    """
+    candidats = (nom,) + alternatives
+    for candidat in candidats:
+        if ressource_disponible(candidat):
+            return candidat
+
+    if NLTK_AUTO_DOWNLOAD and not NLTK_OFFLINE:
+        telecharger_ressources([nom])
+        if ressource_disponible(nom):
+            return nom
+
+    erreur = RessourceNLTKManquante(candidats)
+    if not NLTK_OFFLINE and nom not in _avertissements:
+        _avertissements.add(nom)
+        logger.warning(f"⚠️ {erreur} Mode dégradé.")
+    raise erreur
+
+
+def verifier_ressources(requises: Iterable[Sequence[str]]):
+    """
+    Échec immédiat en mode hors ligne si une ressource requise manque
+    (chaque élément: nom, ou tuple de noms interchangeables)
+    """
+    manquantes = []
+    for groupe in requises:
+        groupe = (groupe,) if isinstance(groupe, str) else tuple(groupe)
+        if not any(ressource_disponible(nom) for nom in groupe):
+            manquantes.append(groupe[0])
+    if manquantes and NLTK_OFFLINE:
+        raise RessourceNLTKManquante(manquantes)
+    return manquantes
+
+
+# ========================================================
+# STOPWORDS (CACHE JSON)
+# ========================================================
+def charger_stopwords(langues: Sequence[str] = ("english", "french"), chemin: Path = STOPWORDS_CACHE_FILE) -> FrozenSet[str]:
+    """
+    Stopwords NLTK des langues demandées
+
+    Lus dans le cache JSON s'il correspond aux langues, sinon dans le
+    corpus NLTK (puis mis en cache). Vide si le corpus est absent hors
+    mode hors ligne.
+    """
+    chemin = Path(chemin)
+    try:
+        if chemin.exists():
+            with open(chemin, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("langues") == list(langues):
+                return frozenset(data["mots"])
+    except Exception as e:
+        logger.warning(f"⚠️ Cache de stopwords illisible ({chemin}): {e}")
+
+    try:
+        exiger_ressource('stopwords')
+    except RessourceNLTKManquante:
+        if NLTK_OFFLINE:
+            raise
+        return frozenset()
+
+    from nltk.corpus import stopwords
+
+    mots = frozenset(mot for langue in langues for mot in stopwords.words(langue))
+    try:
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        tmp = chemin.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"langues": list(langues), "mots": sorted(mots)}, f, ensure_ascii=False)
+        tmp.replace(chemin)
+    except OSError as e:
+        logger.warning(f"⚠️ Cache de stopwords non écrit: {e}")
+    return mots
+
+
+# ========================================================
+# CLI
+# ========================================================
+def main():
+    parser = argparse.ArgumentParser(description="État et installation des ressources NLTK")
+    parser.add_argument("--download", action="store_true", help="Télécharge les ressources absentes")
+    args = parser.parse_args()
+
+    etat = telecharger_ressources() if args.download else etat_ressources()
+    for nom, present in etat.items():
+        print(f"  {'✅' if present else '❌'} {nom:<30} {RESSOURCES_NLTK.get(nom, nom)}")
+    print(f"\n📁 Recherche dans: {', '.join(map(str, repertoires_nltk_data()))}")
+    sys.exit(0 if all(etat.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+============================================================================
+SMARTHIRE - Préchargement avant fork (déploiement multi-workers)
+Construit les index de recherche une seule fois dans le processus maître ;
+les workers forkés les partagent en copy-on-write
+============================================================================
+"""
+
+import gc
+import logging
+import time
+
+from backend.config.settings import SEARCH_FREEZE_INDEXES, SYNC_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+def precharger_application(freeze: bool = SEARCH_FREEZE_INDEXES):
+    """
+    À appeler dans le maître, après import de l'app et avant le fork.
+
+    1. Charge les ressources NLTK puis construit l'orchestrateur partagé
+       des routes et ses index BM25
+    2. Fige les index en buffers plats (pas d'objets Python par posting)
+    3. Ferme les connexions PostgreSQL (jamais de socket hérité)
+    4. gc.freeze(): les objets survivants sortent des générations du GC,
+       dont les passes ne réécriront plus leurs en-têtes dans les workers
+    """
+    from backend.indexation.preprocessing import charger_ressources
+    from backend.routes.search_routes import get_orchestrator
+
+    debut = time.perf_counter()
+    charger_ressources()
+    get_orchestrator().preload(freeze=freeze)
+
+    gc.collect()
+    gc.freeze()
+
+    logger.info(
+        f"🧊 Préchargement terminé en {time.perf_counter() - debut:.2f}s "
+        f"({gc.get_freeze_count()} objets figés)"
+    )
+
+
+def reinitialiser_apres_fork():
+    """
+    À appeler dans chaque worker juste après le fork: les connexions
+    éventuellement héritées appartiennent au maître, on les oublie sans
+    les fermer (un close() terminerait la session du maître). Les index
+    BM25 hérités suivent ensuite index_outbox (un thread par worker: les
+    threads ne survivent pas au fork).
+    """
+    from backend.indexation.sync_index import oublier_synchroniseur_whoosh
+    from backend.routes import search_routes
+
+    oublier_synchroniseur_whoosh()
+
+    if search_routes._orchestrator is not None:
+        search_routes._orchestrator.reset_connections(close=False)
+        if SYNC_ENABLED:
+            search_routes._orchestrator.demarrer_synchronisation()
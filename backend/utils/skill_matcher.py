@@ -0,0 +1,192 @@
+"""
+============================================================================
+SMARTHIRE - Matcher multi-compétences (un seul passage sur le texte)
+Le vocabulaire (compétences, aliases) est compilé une fois en une regex
+issue d'un trie : toutes les occurrences sont trouvées en un parcours,
+avec la sémantique \\b...\\b de l'ancien re.sub par compétence
+============================================================================
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+_CARACTERE_MOT = re.compile(r"\w")
+
+
+class SkillMatcher:
+    """
+    Recherche simultanée de toutes les formes d'un vocabulaire.
+
+    - insensible à la casse
+    - bornes de mot (\\b) aux deux extrémités de chaque forme
+    - à une position donnée, la forme la plus longue gagne
+      ("Spring Boot" avant "Spring", "Node.js" avant "Node")
+    - finditer()/sub(): occurrences sans chevauchement, de gauche à droite
+    - occurrences(): toutes les occurrences, chevauchantes comprises
+      (comme une recherche indépendante par forme)
+    """
+
+    def __init__(self, formes: Dict[str, str]):
+        """
+        Args:
+            formes: {forme à chercher: nom canonique}
+                (ex: {"k8s": "Kubernetes", "Kubernetes": "Kubernetes"})
+        """
+        self._canoniques: Dict[str, Tuple[str, ...]] = {}
+        for forme, canonique in formes.items():
+            self._ajouter(forme, canonique)
+        self._compiler()
+
+    def _ajouter(self, forme: str, canonique: str):
+        cle = forme.lower()
+        if not cle:
+            return
+        existants = self._canoniques.get(cle, ())
+        if canonique not in existants:
+            self._canoniques[cle] = existants + (canonique,)
+
+    def _compiler(self):
+        self.regex: Optional[re.Pattern] = None
+        self._regex_positions: Optional[re.Pattern] = None
+        if self._canoniques:
+            trie = _trie_regex(self._canoniques.keys())
+            self.regex = re.compile(r"\b(?:" + trie + r")\b", re.IGNORECASE)
+            # Lookahead: une tentative par position, chevauchements compris
+            self._regex_positions = re.compile(r"(?=\b(" + trie + r")\b)", re.IGNORECASE)
+
+    @classmethod
+    def depuis_competences(cls, competences: Iterable[str]) -> "SkillMatcher":
+        """Matcher dont chaque compétence est sa propre forme canonique"""
+        return cls({skill: skill for skill in competences})
+
+    @classmethod
+    def depuis_aliases(cls, competences: Iterable[str], aliases: Dict[str, List[str]]) -> "SkillMatcher":
+        """
+        Matcher compétences + aliases: chaque alias renvoie vers la
+        compétence qui le déclare (si elle fait partie de `competences`).
+        Une forme peut désigner plusieurs compétences (ex: alias "k8s"
+        de "kubernetes", aussi compétence à part entière).
+        """
+        competences = list(competences)
+        matcher = cls({})
+        for skill in competences:
+            matcher._ajouter(skill, skill)
+        connues = set(competences)
+        for skill, formes in aliases.items():
+            if skill in connues:
+                for alias in formes:
+                    matcher._ajouter(alias, skill)
+        matcher._compiler()
+        return matcher
+
+    def __len__(self) -> int:
+        return len(self._canoniques)
+
+    def canonique(self, forme: str) -> Optional[str]:
+        """Nom canonique d'une forme (None si inconnue)"""
+        canoniques = self._canoniques.get(forme.lower())
+        return canoniques[0] if canoniques else None
+
+    def finditer(self, texte: str) -> Iterator[Tuple[int, int, str]]:
+        """Occurrences (début, fin, nom canonique), de gauche à droite"""
+        if self.regex is None or not texte:
+            return
+        for match in self.regex.finditer(texte):
+            canoniques = self._canoniques.get(match.group(0).lower())
+            if canoniques:
+                yield match.start(), match.end(), canoniques[0]
+
+    def occurrences(self, texte: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Toutes les occurrences (début, fin, nom canonique), y compris
+        chevauchantes: "Spring Boot" donne "Spring Boot" puis "Spring".
+        Ordre: par position, puis de la forme la plus longue à la plus courte.
+        """
+        if self._regex_positions is None or not texte:
+            return
+        for match in self._regex_positions.finditer(texte):
+            debut = match.start()
+            plus_longue = match.group(1)
+            # Les formes plus courtes au même début sont des préfixes
+            for longueur in range(len(plus_longue), 0, -1):
+                fin = debut + longueur
+                canoniques = self._canoniques.get(texte[debut:fin].lower())
+                if canoniques and (longueur == len(plus_longue) or _borne_mot(texte, fin)):
+                    for canonique in canoniques:
+                        yield debut, fin, canonique
+
+    def sub(self, remplacement: Callable[[str], str], texte: str) -> str:
+        """Remplace chaque occurrence par remplacement(nom canonique)"""
+        if self.regex is None or not texte:
+            return texte
+
+        def _remplacer(match):
+            canoniques = self._canoniques.get(match.group(0).lower())
+            return remplacement(canoniques[0]) if canoniques else match.group(0)
+
+        return self.regex.sub(_remplacer, texte)
+
+
+def _borne_mot(texte: str, position: int) -> bool:
+    """Équivalent de \\b à une position (après au moins un caractère)"""
+    avant = bool(_CARACTERE_MOT.match(texte[position - 1]))
+    apres = position < len(texte) and bool(_CARACTERE_MOT.match(texte[position]))
+    return avant != apres
+
+
+# ========================================================
+# COMPILATION TRIE → REGEX
+# ========================================================
+_FIN = ""  # Marqueur de fin de mot dans le trie (clé vide: jamais un caractère)
+
+
+def _trie_regex(mots: Iterable[str]) -> str:
+    """
+    Regex équivalente à l'alternance des mots, factorisée par préfixes:
+    ["java", "javascript"] → "java(?:script)?". Les quantificateurs sont
+    gloutons: la forme la plus longue est essayée d'abord, avec retour
+    arrière si la borne \\b qui suit échoue.
+    """
+    trie: Dict = {}
+    for mot in mots:
+        noeud = trie
+        for caractere in mot:
+            noeud = noeud.setdefault(caractere, {})
+        noeud[_FIN] = True
+    return _noeud_regex(trie)
+
+
+def _noeud_regex(noeud: Dict) -> str:
+    branches = [
+        re.escape(caractere) + _noeud_regex(enfant)
+        for caractere, enfant in sorted(noeud.items())
+        if caractere != _FIN
+    ]
+    if not branches:
+        return ""
+
+    corps = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _FIN in noeud:
+        if len(branches) == 1:
+            corps = "(?:" + corps + ")"
+        return corps + "?"
+    return corps
+
+
+# ========================================================
+# CACHE DES MATCHERS COMPILÉS
+# ========================================================
+@lru_cache(maxsize=8)
+def _matcher_pour(competences: FrozenSet[str]) -> SkillMatcher:
+    return SkillMatcher.depuis_competences(sorted(competences))
+
+
+def get_skill_matcher(competences: Iterable[str]) -> SkillMatcher:
+    """
+    Matcher compilé pour un ensemble de compétences (mis en cache:
+    passer le même frozenset évite toute recompilation)
+    """
+    if not isinstance(competences, frozenset):
+        competences = frozenset(competences)
+    return _matcher_pour(competences)
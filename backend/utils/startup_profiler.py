@@ -0,0 +1,169 @@
+"""
+============================================================================
+SMARTHIRE - Profilage du temps d'import (démarrage à froid)
+Lance `python -X importtime` dans un sous-processus propre et agrège
+le temps d'import par module et par package
+
+Usage:
+    python -m backend.utils.startup_profiler app --top 25 --budget-ms 1000
+============================================================================
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Racine du projet et dossier backend (run.py importe `app` depuis backend/)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+
+# Ligne émise par -X importtime:
+# "import time:       self [us] |  cumulative | imported package"
+_LIGNE_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# ========================================================
+# MESURE
+# ========================================================
+def mesurer_imports(module: str = "app", python: str = sys.executable) -> Dict:
+    """
+    Importe `module` dans un interpréteur neuf avec -X importtime
+
+    Args:
+        module: Module à importer (ex: "app", "backend.app")
+        python: Interpréteur à utiliser
+
+    Returns:
+        {
+            "module": str,
+            "total_ms": float (cumulatif du module demandé),
+            "wall_ms": float (durée du sous-processus),
+            "modules": [{"name", "self_ms", "cumulative_ms", "depth"}, ...],
+            "returncode": int,
+            "stderr_tail": str (erreurs d'import éventuelles)
+        }
+    """
+    code = (
+        "import sys, time; "
+        f"sys.path[:0] = [{str(BACKEND_DIR)!r}, {str(PROJECT_ROOT)!r}]; "
+        "t = time.perf_counter(); "
+        f"import {module}; "
+        "print('WALL_MS', (time.perf_counter() - t) * 1000)"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(BACKEND_DIR), str(PROJECT_ROOT), env.get("PYTHONPATH", "")]
+    ).rstrip(os.pathsep)
+
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=str(BACKEND_DIR),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+
+    modules = parser_importtime(proc.stderr)
+    wall_ms = 0.0
+    for ligne in proc.stdout.splitlines():
+        if ligne.startswith("WALL_MS"):
+            wall_ms = float(ligne.split()[1])
+
+    racine = next((m for m in modules if m["name"] == module), None)
+    erreurs = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+
+    return {
+        "module": module,
+        "total_ms": racine["cumulative_ms"] if racine else wall_ms,
+        "wall_ms": round(wall_ms, 1),
+        "modules": modules,
+        "returncode": proc.returncode,
+        "stderr_tail": "\n".join(erreurs[-10:])
+    }
+
+
+def parser_importtime(sortie: str) -> List[Dict]:
+    """Parse la sortie stderr de -X importtime (durées converties en ms)"""
+    modules = []
+    for ligne in sortie.splitlines():
+        match = _LIGNE_IMPORTTIME.match(ligne)
+        if not match:
+            continue
+        self_us, cumul_us, indentation, nom = match.groups()
+        modules.append({
+            "name": nom,
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cumul_us) / 1000.0,
+            "depth": max(0, (len(indentation) - 1) // 2)
+        })
+    return modules
+
+
+# ========================================================
+# AGRÉGATION
+# ========================================================
+def top_modules(modules: List[Dict], n: int = 20, cle: str = "cumulative_ms") -> List[Dict]:
+    """Les n modules les plus coûteux (cumulatif ou propre)"""
+    return sorted(modules, key=lambda m: m[cle], reverse=True)[:n]
+
+
+def temps_par_package(modules: List[Dict]) -> Dict[str, float]:
+    """Temps propre (self) agrégé par package de premier niveau"""
+    totaux = defaultdict(float)
+    for m in modules:
+        totaux[m["name"].split(".")[0]] += m["self_ms"]
+    return dict(sorted(totaux.items(), key=lambda kv: kv[1], reverse=True))
+
+
+def afficher_rapport(rapport: Dict, top: int = 20, budget_ms: Optional[float] = None):
+    """Affiche le rapport de démarrage dans la console"""
+    print("=" * 70)
+    print(f"⏱️  IMPORT DE '{rapport['module']}': {rapport['total_ms']:.1f} ms "
+          f"(mesuré: {rapport['wall_ms']:.1f} ms)")
+    print("=" * 70)
+
+    if rapport["returncode"] != 0:
+        print(f"❌ Import en échec (code {rapport['returncode']}):")
+        print(rapport["stderr_tail"])
+
+    print(f"\n📦 Top {top} modules (cumulatif):")
+    for m in top_modules(rapport["modules"], top):
+        print(f"   {m['cumulative_ms']:9.1f} ms  (self {m['self_ms']:7.1f})  {m['name']}")
+
+    print("\n📊 Temps propre par package:")
+    for package, ms in list(temps_par_package(rapport["modules"]).items())[:top]:
+        print(f"   {ms:9.1f} ms  {package}")
+
+    if budget_ms is not None:
+        statut = "✅" if rapport["total_ms"] <= budget_ms else "❌"
+        print(f"\n{statut} Budget: {rapport['total_ms']:.1f} / {budget_ms:.0f} ms")
+
+
+# ========================================================
+# CLI
+# ========================================================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profil du temps d'import SmartHire")
+    parser.add_argument("module", nargs="?", default="app", help="Module à importer (défaut: app)")
+    parser.add_argument("--top", type=int, default=20, help="Nombre de modules affichés")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Code retour 1 si l'import dépasse ce budget")
+    args = parser.parse_args(argv)
+
+    rapport = mesurer_imports(args.module)
+    afficher_rapport(rapport, top=args.top, budget_ms=args.budget_ms)
+
+    if rapport["returncode"] != 0:
+        return 1
+    if args.budget_ms is not None and rapport["total_ms"] > args.budget_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
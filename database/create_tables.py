@@ -1,4 +1,5 @@
 from connection import get_db_connection
+from shared_queries import create_index_outbox
 
 def create_tables():
     conn = get_db_connection()
@@ -120,6 +121,10 @@ def create_tables():
     """)
     print("✅ Table 'messages' créée")
     
+    # Outbox de synchronisation des index (triggers sur cvs et offres)
+    cur.execute(create_index_outbox())
+    print("✅ Table 'index_outbox' et triggers créés")
+    
     conn.commit()
     cur.close()
     conn.close()
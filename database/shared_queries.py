@@ -232,6 +232,181 @@ def insert_system_offre():
         RETURNING id
     """
 
+def bulk_insert_system_cvs():
+    """
+    Insère un lot de CVs du système (psycopg2.extras.execute_values)
+    Les ids sont réservés à l'avance (reserve_ids) et fournis en tête de ligne
+
+    Returns:
+        (requête avec VALUES %s, template d'une ligne)
+    """
+    return """
+        INSERT INTO cvs (
+            id, nom, email, competences, niveau_estime, localisation,
+            type_contrat, diplome, annees_experience, tags_manuels,
+            chemin_pdf, texte_complet, source_systeme, est_public
+        ) VALUES %s
+    """, "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE, TRUE)"
+
+def bulk_insert_system_offres():
+    """
+    Insère un lot d'offres du système (psycopg2.extras.execute_values)
+    Les ids sont réservés à l'avance (reserve_ids) et fournis en tête de ligne
+
+    Returns:
+        (requête avec VALUES %s, template d'une ligne)
+    """
+    return """
+        INSERT INTO offres (
+            id, titre, entreprise, competences_requises, description,
+            localisation, niveau_souhaite, type_contrat, diplome_requis,
+            experience_min, tags_manuels, texte_complet, source_systeme,
+            est_active, date_expiration
+        ) VALUES %s
+    """, "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, TRUE, TRUE, NOW() + INTERVAL '90 days')"
+
+def reserve_ids(table):
+    """
+    Réserve n ids de la séquence SERIAL d'une table (paramètre: n)
+    Permet de relier chaque ligne insérée en masse à son identifiant source
+    """
+    return f"""
+        SELECT nextval(pg_get_serial_sequence('{table}', 'id'))
+        FROM generate_series(1, %s)
+    """
+
+# ==================== SYNCHRONISATION DES INDEX ====================
+
+def create_index_outbox(canal="smarthire_outbox"):
+    """
+    Table index_outbox + triggers de capture sur cvs et offres
+    Chaque INSERT/UPDATE/DELETE y ajoute (table, id, opération) et notifie
+    le canal (une notification par table et par transaction)
+    source_systeme: TRUE seulement si la ligne est (et était) une donnée
+    système, absente des index Whoosh
+    (TRUNCATE ne déclenche pas ces triggers)
+    """
+    return f"""
+        CREATE TABLE IF NOT EXISTS index_outbox (
+            id BIGSERIAL PRIMARY KEY,
+            table_source VARCHAR(20) NOT NULL,
+            doc_id INTEGER NOT NULL,
+            operation VARCHAR(10) NOT NULL,
+            source_systeme BOOLEAN NOT NULL DEFAULT FALSE,
+            cree_le TIMESTAMP DEFAULT NOW(),
+            traite_le TIMESTAMP
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_index_outbox_a_traiter
+            ON index_outbox (id) WHERE traite_le IS NULL;
+
+        CREATE OR REPLACE FUNCTION smarthire_capture_outbox() RETURNS TRIGGER AS $$
+        DECLARE
+            systeme BOOLEAN;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO index_outbox (table_source, doc_id, operation, source_systeme)
+                VALUES (TG_TABLE_NAME, OLD.id, TG_OP, COALESCE(OLD.source_systeme, FALSE));
+            ELSE
+                systeme := COALESCE(NEW.source_systeme, FALSE);
+                IF TG_OP = 'UPDATE' THEN
+                    systeme := systeme AND COALESCE(OLD.source_systeme, FALSE);
+                END IF;
+                INSERT INTO index_outbox (table_source, doc_id, operation, source_systeme)
+                VALUES (TG_TABLE_NAME, NEW.id, TG_OP, systeme);
+            END IF;
+            PERFORM pg_notify('{canal}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS cvs_index_outbox ON cvs;
+        CREATE TRIGGER cvs_index_outbox
+            AFTER INSERT OR UPDATE OR DELETE ON cvs
+            FOR EACH ROW EXECUTE PROCEDURE smarthire_capture_outbox();
+
+        DROP TRIGGER IF EXISTS offres_index_outbox ON offres;
+        CREATE TRIGGER offres_index_outbox
+            AFTER INSERT OR UPDATE OR DELETE ON offres
+            FOR EACH ROW EXECUTE PROCEDURE smarthire_capture_outbox();
+    """
+
+def get_outbox_position():
+    """
+    Dernier changement antérieur à n secondes (paramètre: n)
+    Les changements plus récents sont relus: une transaction encore
+    ouverte peut y avoir réservé un id plus petit que le maximum commité
+    """
+    return """
+        SELECT COALESCE(MAX(id), 0)
+        FROM index_outbox
+        WHERE cree_le < NOW() - %s * INTERVAL '1 second'
+    """
+
+def get_outbox_changes_since():
+    """
+    Changements après une position, plus les ids manquants encore attendus
+    (paramètres: position, ids attendus, limite)
+    """
+    return """
+        SELECT id, table_source, doc_id, operation, source_systeme
+        FROM index_outbox
+        WHERE id > %s OR id = ANY(%s::bigint[])
+        ORDER BY id
+        LIMIT %s
+    """
+
+def claim_outbox_changes():
+    """
+    Réserve les changements non traités (paramètre: limite)
+    Verrouillés jusqu'à la fin de la transaction, ignorés par les autres
+    consommateurs (SKIP LOCKED)
+    """
+    return """
+        SELECT id, table_source, doc_id, operation, source_systeme
+        FROM index_outbox
+        WHERE traite_le IS NULL
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    """
+
+def mark_outbox_processed():
+    """
+    Marque des changements comme traités (paramètre: liste d'ids)
+    """
+    return """
+        UPDATE index_outbox SET traite_le = NOW()
+        WHERE id = ANY(%s::bigint[])
+    """
+
+def purge_outbox():
+    """
+    Supprime les changements traités depuis plus de n secondes (paramètre: n)
+    """
+    return """
+        DELETE FROM index_outbox
+        WHERE traite_le < NOW() - %s * INTERVAL '1 second'
+    """
+
+def get_rows_for_sync(table):
+    """
+    État courant des lignes modifiées (paramètre: liste d'ids)
+    Une ligne absente du résultat a été supprimée
+    """
+    if table == "cvs":
+        return """
+            SELECT id, source_systeme, texte_complet, chemin_pdf, user_id
+            FROM cvs
+            WHERE id = ANY(%s)
+        """
+    return """
+        SELECT id, source_systeme, texte_complet, user_id, titre, description,
+               competences_requises, localisation, niveau_souhaite, entreprise, type_contrat
+        FROM offres
+        WHERE id = ANY(%s)
+    """
+
 # ==================== REQUÊTES CANDIDATURES ====================
 
 def create_candidature():